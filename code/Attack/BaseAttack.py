@@ -9,7 +9,6 @@ import random as rnd
 import re
 import socket
 import sys
-import tempfile
 import time
 import collections
 import typing as t
@@ -17,10 +16,11 @@ import typing as t
 import ID2TLib.libpcapreader as pr
 import lea
 import numpy as np
-import scapy.layers.inet as inet
 import scapy.utils
 
 import Attack.AttackParameters as atkParam
+import ID2TLib.PacketSink as PacketSink
+import ID2TLib.TemplateCache as TemplateCache
 import ID2TLib.Utility as Util
 import Core.TimestampController as tc
 
@@ -56,6 +56,7 @@ class BaseAttack(metaclass=abc.ABCMeta):
         self.packets = []
         self.exceeding_packets = 0
         self.path_attack_pcap = ""
+        self.packet_sink = None
         self.timestamp_controller = None
 
         # get_reply_delay
@@ -511,7 +512,8 @@ class BaseAttack(metaclass=abc.ABCMeta):
 
     def write_attack_pcap(self, packets: list, append_flag: bool = False, destination_path: str = None):
         """
-        Writes the attack's packets into a PCAP file with a temporary filename.
+        Writes the attack's packets into a PCAP file with a temporary filename. Appended packets are written through
+        the attack's packet sink, which keeps the PCAP file open until close_packet_sink is called.
 
         :return: The path of the written PCAP file.
         """
@@ -520,21 +522,39 @@ class BaseAttack(metaclass=abc.ABCMeta):
             # Check if all req. parameters are set
             self.check_parameters()
 
+        # Append to the pcap file of the packet sink
+        if append_flag and self.packet_sink is not None and self.packet_sink.path == destination_path:
+            self.packet_sink.write(packets)
+            return self.packet_sink.path
+
+        # Append to a pcap file which was not written by the packet sink
+        if append_flag and destination_path is not None and os.path.exists(destination_path):
+            pktdump = scapy.utils.PcapWriter(destination_path, append=True)
+            pktdump.write(packets)
+            pktdump.close()
+            return destination_path
+
         # Determine destination path
         if destination_path is not None and os.path.exists(destination_path):
-            destination = destination_path
+            sink = PacketSink.PacketSink(destination_path)
         else:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pcap')
-            destination = temp_file.name
+            sink = PacketSink.PacketSink()
+        sink.write(packets)
 
-        # Write packets into pcap file
-        pktdump = scapy.utils.PcapWriter(destination, append=append_flag)
-        pktdump.write(packets)
-
-        # Store pcap path and close file objects
-        pktdump.close()
+        if append_flag:
+            self.close_packet_sink()
+            self.packet_sink = sink
+        else:
+            sink.close()
+        return sink.path
 
-        return destination
+    def close_packet_sink(self):
+        """
+        Writes the packets buffered by the attack's packet sink into its PCAP file and closes the file.
+        """
+        if self.packet_sink is not None:
+            self.packet_sink.close()
+            self.packet_sink = None
 
     def get_remaining_bandwidth(self, timestamp: int=0, ip_src: str= "", ip_dst: str= "", custom_max_bandwidth: float=0,
                                 custom_bandwidth_local: float=0, custom_bandwidth_public: float=0):
@@ -626,36 +646,7 @@ class BaseAttack(metaclass=abc.ABCMeta):
            :return orderList_conversations: An array contains the conversations ids (IP_A,port_A, IP_b,port_B) in the
            order they appeared in the original packets.
            """
-        conversations = {}
-        order_list_conversations = []
-        for pkt_num, pkt in enumerate(exploit_raw_packets):
-            eth_frame = inet.Ether(pkt[0])
-
-            ip_pkt = eth_frame.payload
-            ip_dst = ip_pkt.getfieldval("dst")
-            ip_src = ip_pkt.getfieldval("src")
-
-            tcp_pkt = ip_pkt.payload
-            port_dst = tcp_pkt.getfieldval("dport")
-            port_src = tcp_pkt.getfieldval("sport")
-
-            conv_req = (ip_src, port_src, ip_dst, port_dst)
-            conv_rep = (ip_dst, port_dst, ip_src, port_src)
-            if conv_req not in conversations and conv_rep not in conversations:
-                pkt_list = [pkt]
-                conversations[conv_req] = pkt_list
-                # Order list of conv
-                order_list_conversations.append(conv_req)
-            else:
-                if conv_req in conversations:
-                    pkt_list = conversations[conv_req]
-                    pkt_list.append(pkt)
-                    conversations[conv_req] = pkt_list
-                else:
-                    pkt_list = conversations[conv_rep]
-                    pkt_list.append(pkt)
-                    conversations[conv_rep] = pkt_list
-        return conversations, order_list_conversations
+        return TemplateCache.packets_to_convs(exploit_raw_packets)
 
     @staticmethod
     def is_valid_ip_address(addr):
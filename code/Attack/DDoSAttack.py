@@ -3,10 +3,12 @@ import logging
 import random as rnd
 
 import lea
+import numpy as np
 import scapy.layers.inet as inet
 
 import Attack.AttackParameters as atkParam
 import Attack.BaseAttack as BaseAttack
+import ID2TLib.AttackerConfigPool as AttackerConfigPool
 import ID2TLib.Utility as Util
 
 logging.getLogger("scapy.runtime").setLevel(logging.ERROR)
@@ -197,16 +199,17 @@ class DDoSAttack(BaseAttack.BaseAttack):
         if latency_max != 0:
             latency_limit = latency_max
 
-        # Stores triples of (timestamp, source_id, destination_id) for each timestamp.
-        # Victim has id=0. Attacker tuple does not need to specify the destination because it's always the victim.
-        timestamps_tuples = []
+        # Stores the timestamps, source ids and destination ids of all packets, one array per attacker and direction.
+        # Victim has id=0. Attacker packets do not need to specify the destination because it's always the victim.
+        timestamps = []
+        source_ids = []
+        destination_ids = []
         # For each attacker(id), stores the current source-ports of SYN-packets
         # which still have to be acknowledged by the victim, as a "FIFO" for each attacker
         previous_attacker_port = []
         replies_count = 0
         self.total_pkt_num = 0
         already_used_pkts = 0
-        sum_diff = 0
 
         self.attack_start_utime = self.get_param_value(atkParam.Parameter.INJECT_AT_TIMESTAMP)
         self.timestamp_controller.set_pps(attacker_pps)
@@ -223,10 +226,10 @@ class DDoSAttack(BaseAttack.BaseAttack):
             # Initialize empty port "FIFO" for current attacker
             previous_attacker_port.append([])
             # Calculate timestamp of first SYN-packet of attacker
-            timestamp_next_pkt = self.timestamp_controller.reset_timestamp()
+            timestamp_first_pkt = self.timestamp_controller.reset_timestamp()
             if attacker != 0:
-                timestamp_next_pkt = rnd.uniform(timestamp_next_pkt,
-                                                 self.timestamp_controller.next_timestamp(latency=latency_limit))
+                timestamp_first_pkt = rnd.uniform(timestamp_first_pkt,
+                                                  self.timestamp_controller.next_timestamp(latency=latency_limit))
             # calculate each attackers packet count without exceeding the total number of attackers
             attacker_pkts_num = 0
             if already_used_pkts < pkts_num:
@@ -240,29 +243,28 @@ class DDoSAttack(BaseAttack.BaseAttack):
                 attacker_pps = pps * ratio
                 self.timestamp_controller.set_pps(attacker_pps)
 
-            for pkt_num in range(attacker_pkts_num):
-                # Count attack packets that exceed the attack duration
-                if timestamp_next_pkt > attack_ends_time:
-                    diff = timestamp_next_pkt-attack_ends_time
-                    sum_diff += diff
-                    self.exceeding_packets += 1
+            # Timestamps of the attacker SYN-packets, each one delayed according to the attackers pps
+            request_delays = self.timestamp_controller.random_delays(attacker_pkts_num)
+            request_timestamps = timestamp_first_pkt + np.cumsum(request_delays) - request_delays
+            # Timestamps of the victim ACK-packets, each one delayed by the latency after its SYN-packet
+            reply_timestamps = request_timestamps + self.timestamp_controller.random_delays(
+                attacker_pkts_num, latency=latency_limit if latency_limit else 0)
 
-                # Add timestamp of attacker SYN-packet. Attacker tuples do not need to specify destination
-                timestamps_tuples.append((timestamp_next_pkt, attacker+1))
+            # Count attack packets that exceed the attack duration
+            self.exceeding_packets += int(np.count_nonzero(request_timestamps > attack_ends_time))
 
-                # Calculate timestamp of victim ACK-packet
-                timestamp_reply = self.timestamp_controller.next_timestamp(latency=latency_limit)
+            timestamps += [request_timestamps, reply_timestamps]
+            source_ids += [np.full(attacker_pkts_num, attacker + 1), np.zeros(attacker_pkts_num, dtype=int)]
+            destination_ids += [np.zeros(attacker_pkts_num, dtype=int), np.full(attacker_pkts_num, attacker + 1)]
 
-                # Add timestamp of victim ACK-packet(victim always has id=0)
-                timestamps_tuples.append((timestamp_reply, 0, attacker+1))
+        # Sort the packets of all attackers and the victim according to their timestamps in ascending order
+        timestamps = np.concatenate(timestamps)
+        order = np.argsort(timestamps, kind="stable")
+        timestamps_tuples = zip(timestamps[order].tolist(), np.concatenate(source_ids)[order].tolist(),
+                                np.concatenate(destination_ids)[order].tolist())
+        self.attack_start_utime = float(timestamps[order[0]])
 
-                # Calculate timestamp for next attacker SYN-packet
-                self.timestamp_controller.set_timestamp(timestamp_next_pkt)
-                timestamp_next_pkt = self.timestamp_controller.next_timestamp()
-
-        # Sort timestamp-triples according to their timestamps in ascending order
-        timestamps_tuples.sort(key=lambda tmstmp: tmstmp[0])
-        self.attack_start_utime = timestamps_tuples[0][0]
+        attacker_configs = AttackerConfigPool.AttackerConfigPool(ip_source_list)
 
         sent_bytes = 0
         previous_interval = 0
@@ -272,7 +274,7 @@ class DDoSAttack(BaseAttack.BaseAttack):
 
         # For each triple, generate packet
         for timestamp in timestamps_tuples:
-            # tuple layout: [timestamp, attacker_id]
+            # tuple layout: [timestamp, source_id, destination_id]
 
             # If current current triple is an attacker
             if timestamp[1] != 0:
@@ -284,7 +286,7 @@ class DDoSAttack(BaseAttack.BaseAttack):
                 mac_source = mac_source_list[attacker_id]
 
                 # Determine source port
-                (port_source, ttl_value) = Util.get_attacker_config(ip_source_list, ip_source)
+                (port_source, ttl_value) = attacker_configs.get_attacker_config(ip_source)
 
                 # If source ports were specified by the user, get random port from specified ports
                 if port_source_list[0] != self.default_port:
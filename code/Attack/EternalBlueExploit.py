@@ -2,11 +2,11 @@ import logging
 import random as rnd
 
 import lea
-import scapy.layers.inet as inet
-import scapy.utils
 
 import Attack.AttackParameters as atkParam
 import Attack.BaseAttack as BaseAttack
+import ID2TLib.RawPacket as RawPacket
+import ID2TLib.TemplateCache as TemplateCache
 import ID2TLib.SMBLib as SMBLib
 import ID2TLib.Utility as Util
 
@@ -87,7 +87,7 @@ class EternalBlueExploit(BaseAttack.BaseAttack):
         pps = self.get_param_value(atkParam.Parameter.PACKETS_PER_SECOND)
 
         # calculate complement packet rates of BG traffic per interval
-        complement_interval_pps = self.statistics.calculate_complement_packet_rates(pps)
+        complement_interval_pps = self.statistics.get_complement_rate_table(pps)
 
         # Initialize parameters
         self.packets = []
@@ -141,12 +141,10 @@ class EternalBlueExploit(BaseAttack.BaseAttack):
         # Inject EternalBlue exploit packets
         # Read Win7_eternalblue_exploit pcap file
         source_origin_wins, destination_origin_wins = {}, {}
-        exploit_raw_packets = scapy.utils.RawPcapReader(self.template_attack_pcap_path)
-
         port_source = rnd.randint(self.minDefaultPort, self.maxDefaultPort)  # experiments show this range of ports
         # conversations = {(ip.src, ip.dst, port.src, port.dst): packets}
-        conversations, order_list_conversations = self.packets_to_convs(exploit_raw_packets)
-        exploit_raw_packets.close()
+        conversations, order_list_conversations = TemplateCache.template_cache.get_conversations(
+            self.template_attack_pcap_path)
 
         conv_start_timesamp = timestamp_next_pkt
         for conv_index, conv in enumerate(order_list_conversations):
@@ -163,74 +161,61 @@ class EternalBlueExploit(BaseAttack.BaseAttack):
             if conv_index != len(order_list_conversations) - 1:  # Not the last conversation
                 port_source += 2
                 for self.pkt_num, pkt in enumerate(conv_pkts):
-                    eth_frame = inet.Ether(pkt[0])
-                    ip_pkt = eth_frame.payload
-                    tcp_pkt = ip_pkt.payload
+                    new_pkt = RawPacket.RawPacket(pkt[0])
 
                     if self.pkt_num == 0:
-                        if tcp_pkt.getfieldval("dport") == SMBLib.smb_port:
-                            orig_ip_dst = ip_pkt.getfieldval("dst")
+                        if new_pkt.get_dport() == SMBLib.smb_port:
+                            orig_ip_dst = new_pkt.get_ip_dst()
 
                     # Request
-                    if ip_pkt.getfieldval("dst") == orig_ip_dst:  # victim IP
+                    if new_pkt.get_ip_dst() == orig_ip_dst:  # victim IP
                         # Ether
-                        eth_frame.setfieldval("src", mac_source)
-                        eth_frame.setfieldval("dst", mac_destination)
+                        new_pkt.set_mac_src(mac_source)
+                        new_pkt.set_mac_dst(mac_destination)
                         # IP
-                        ip_pkt.setfieldval("src", ip_source)
-                        ip_pkt.setfieldval("dst", ip_destination)
-                        ip_pkt.setfieldval("ttl", source_ttl_value)
+                        new_pkt.set_ip_src(ip_source)
+                        new_pkt.set_ip_dst(ip_destination)
+                        new_pkt.set_ttl(source_ttl_value)
                         # TCP
-                        tcp_pkt.setfieldval("sport", port_source)
-                        tcp_pkt.setfieldval("dport", port_destination)
+                        new_pkt.set_sport(port_source)
+                        new_pkt.set_dport(port_destination)
                         # Window Size
-                        source_origin_win = tcp_pkt.getfieldval("window")
+                        source_origin_win = new_pkt.get_window()
                         if source_origin_win not in source_origin_wins:
                             source_origin_wins[source_origin_win] = source_win_prob_dict.random()
                         new_win = source_origin_wins[source_origin_win]
-                        tcp_pkt.setfieldval("window", new_win)
+                        new_pkt.set_window(new_win)
                         # MSS
-                        tcp_options = tcp_pkt.getfieldval("options")
-                        if tcp_options:
-                            if tcp_options[0][0] == "MSS":
-                                tcp_options[0] = ("MSS", mss_value)
-                                tcp_pkt.setfieldval("options", tcp_options)
+                        new_pkt.set_mss(mss_value)
 
-                        new_pkt = (eth_frame / ip_pkt / tcp_pkt)
                         new_pkt.time = timestamp_next_pkt
 
-                        pps = max(Util.get_interval_pps(complement_interval_pps, timestamp_next_pkt), 10)
+                        pps = max(complement_interval_pps.get_interval_pps(timestamp_next_pkt), 10)
                         timestamp_next_pkt = self.timestamp_controller.next_timestamp() + inter_arrival_times[
                             self.pkt_num]  # float(timeSteps.random())
 
                     # Reply
                     else:
                         # Ether
-                        eth_frame.setfieldval("src", mac_destination)
-                        eth_frame.setfieldval("dst", mac_source)
+                        new_pkt.set_mac_src(mac_destination)
+                        new_pkt.set_mac_dst(mac_source)
                         # IP
-                        ip_pkt.setfieldval("src", ip_destination)
-                        ip_pkt.setfieldval("dst", ip_source)
-                        ip_pkt.setfieldval("ttl", destination_ttl_value)
+                        new_pkt.set_ip_src(ip_destination)
+                        new_pkt.set_ip_dst(ip_source)
+                        new_pkt.set_ttl(destination_ttl_value)
                         # TCP
-                        tcp_pkt.setfieldval("dport", port_source)
-                        tcp_pkt.setfieldval("sport", port_destination)
+                        new_pkt.set_dport(port_source)
+                        new_pkt.set_sport(port_destination)
                         # Window Size
-                        destination_origin_win = tcp_pkt.getfieldval("window")
+                        destination_origin_win = new_pkt.get_window()
                         if destination_origin_win not in destination_origin_wins:
                             destination_origin_wins[destination_origin_win] = destination_win_prob_dict.random()
                         new_win = destination_origin_wins[destination_origin_win]
-                        tcp_pkt.setfieldval("window", new_win)
+                        new_pkt.set_window(new_win)
                         # MSS
-                        tcp_options = tcp_pkt.getfieldval("options")
-                        if tcp_options:
-                            if tcp_options[0][0] == "MSS":
-                                tcp_options[0] = ("MSS", mss_value)
-                                tcp_pkt.setfieldval("options", tcp_options)
-
-                        new_pkt = (eth_frame / ip_pkt / tcp_pkt)
+                        new_pkt.set_mss(mss_value)
 
-                        pps = max(Util.get_interval_pps(complement_interval_pps, timestamp_next_pkt), 10)
+                        pps = max(complement_interval_pps.get_interval_pps(timestamp_next_pkt), 10)
                         timestamp_next_pkt = self.timestamp_controller.next_timestamp() + inter_arrival_times[
                             self.pkt_num]  # float(timeSteps.random())
 
@@ -242,70 +227,57 @@ class EternalBlueExploit(BaseAttack.BaseAttack):
                 timestamp_next_pkt = self.packets[-1].time + rnd.uniform(0.001, 0.01)
                 port_source = rnd.randint(self.minDefaultPort, self.maxDefaultPort)
                 for self.pkt_num, pkt in enumerate(conv_pkts):
-                    eth_frame = inet.Ether(pkt[0])
-                    ip_pkt = eth_frame.payload
-                    tcp_pkt = ip_pkt.payload
+                    new_pkt = RawPacket.RawPacket(pkt[0])
 
                     # Request
-                    if tcp_pkt.getfieldval("dport") == self.last_conn_dst_port:
+                    if new_pkt.get_dport() == self.last_conn_dst_port:
                         # Ether
-                        eth_frame.setfieldval("src", mac_destination)
-                        eth_frame.setfieldval("dst", mac_source)
+                        new_pkt.set_mac_src(mac_destination)
+                        new_pkt.set_mac_dst(mac_source)
                         # IP
-                        ip_pkt.setfieldval("src", ip_destination)
-                        ip_pkt.setfieldval("dst", ip_source)
-                        ip_pkt.setfieldval("ttl", destination_ttl_value)
+                        new_pkt.set_ip_src(ip_destination)
+                        new_pkt.set_ip_dst(ip_source)
+                        new_pkt.set_ttl(destination_ttl_value)
                         # TCP
-                        tcp_pkt.setfieldval("sport", port_source)
+                        new_pkt.set_sport(port_source)
                         # destination port is fixed 4444
                         # Window Size
-                        destination_origin_win = tcp_pkt.getfieldval("window")
+                        destination_origin_win = new_pkt.get_window()
                         if destination_origin_win not in destination_origin_wins:
                             destination_origin_wins[destination_origin_win] = destination_win_prob_dict.random()
                         new_win = destination_origin_wins[destination_origin_win]
-                        tcp_pkt.setfieldval("window", new_win)
+                        new_pkt.set_window(new_win)
                         # MSS
-                        tcp_options = tcp_pkt.getfieldval("options")
-                        if tcp_options:
-                            if tcp_options[0][0] == "MSS":
-                                tcp_options[0] = ("MSS", mss_value)
-                                tcp_pkt.setfieldval("options", tcp_options)
+                        new_pkt.set_mss(mss_value)
 
-                        new_pkt = (eth_frame / ip_pkt / tcp_pkt)
                         new_pkt.time = timestamp_next_pkt
 
-                        pps = max(Util.get_interval_pps(complement_interval_pps, timestamp_next_pkt), 10)
+                        pps = max(complement_interval_pps.get_interval_pps(timestamp_next_pkt), 10)
                         timestamp_next_pkt = self.timestamp_controller.next_timestamp() + inter_arrival_times[
                             self.pkt_num]  # float(timeSteps.random())
 
                     # Reply
                     else:
                         # Ether
-                        eth_frame.setfieldval("src", mac_source)
-                        eth_frame.setfieldval("dst", mac_destination)
+                        new_pkt.set_mac_src(mac_source)
+                        new_pkt.set_mac_dst(mac_destination)
                         # IP
-                        ip_pkt.setfieldval("src", ip_source)
-                        ip_pkt.setfieldval("dst", ip_destination)
-                        ip_pkt.setfieldval("ttl", source_ttl_value)
+                        new_pkt.set_ip_src(ip_source)
+                        new_pkt.set_ip_dst(ip_destination)
+                        new_pkt.set_ttl(source_ttl_value)
                         # TCP
-                        tcp_pkt.setfieldval("dport", port_source)
+                        new_pkt.set_dport(port_source)
                         # source port is fixed 4444
                         # Window Size
-                        source_origin_win = tcp_pkt.getfieldval("window")
+                        source_origin_win = new_pkt.get_window()
                         if source_origin_win not in source_origin_wins:
                             source_origin_wins[source_origin_win] = source_win_prob_dict.random()
                         new_win = source_origin_wins[source_origin_win]
-                        tcp_pkt.setfieldval("window", new_win)
+                        new_pkt.set_window(new_win)
                         # MSS
-                        tcp_options = tcp_pkt.getfieldval("options")
-                        if tcp_options:
-                            if tcp_options[0][0] == "MSS":
-                                tcp_options[0] = ("MSS", mss_value)
-                                tcp_pkt.setfieldval("options", tcp_options)
-
-                        new_pkt = (eth_frame / ip_pkt / tcp_pkt)
+                        new_pkt.set_mss(mss_value)
 
-                        pps = max(Util.get_interval_pps(complement_interval_pps, timestamp_next_pkt), 10)
+                        pps = max(complement_interval_pps.get_interval_pps(timestamp_next_pkt), 10)
                         timestamp_next_pkt = self.timestamp_controller.next_timestamp() + inter_arrival_times[
                             self.pkt_num]  # float(timeSteps.random())
 
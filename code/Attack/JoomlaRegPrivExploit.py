@@ -2,12 +2,12 @@ import logging
 import random as rnd
 
 import lea
-import scapy.layers.inet as inet
-import scapy.utils
 import sys
 
 import Attack.AttackParameters as atkParam
 import Attack.BaseAttack as BaseAttack
+import ID2TLib.RawPacket as RawPacket
+import ID2TLib.TemplateCache as TemplateCache
 import ID2TLib.Utility as Util
 
 logging.getLogger("scapy.runtime").setLevel(logging.ERROR)
@@ -119,11 +119,9 @@ class JoomlaRegPrivExploit(BaseAttack.BaseAttack):
         # Inject Joomla_registration_privesc
         # Read joomla_registration_privesc pcap file
         orig_ip_dst = None
-        exploit_raw_packets = scapy.utils.RawPcapReader(self.template_attack_pcap_path)
+        exploit_raw_packets = TemplateCache.template_cache.get_packets(self.template_attack_pcap_path)
         inter_arrival_times, inter_arrival_time_dist = self.get_inter_arrival_time(exploit_raw_packets, True)
-        exploit_raw_packets.close()
         time_steps = lea.Lea.fromValFreqsDict(inter_arrival_time_dist)
-        exploit_raw_packets = scapy.utils.RawPcapReader(self.template_attack_pcap_path)
 
         # Random TCP sequence numbers
         global attacker_seq
@@ -132,55 +130,47 @@ class JoomlaRegPrivExploit(BaseAttack.BaseAttack):
         victim_seq = rnd.randint(1000, 50000)
 
         for self.pkt_num, pkt in enumerate(exploit_raw_packets):
-            eth_frame = inet.Ether(pkt[0])
-            ip_pkt = eth_frame.payload
-            tcp_pkt = ip_pkt.payload
-            str_tcp_seg = str(tcp_pkt.payload)
+            new_pkt = RawPacket.RawPacket(pkt[0])
+            str_tcp_seg = str(new_pkt.get_payload())
 
-            # Clean payloads
-            eth_frame.payload = b''
-            ip_pkt.payload = b''
-            tcp_pkt.payload = b''
-
-            # FIXME: no getfieldval in class bytes
             if self.pkt_num == 0:
-                prev_orig_port_source = tcp_pkt.getfieldval("sport")
-                if tcp_pkt.getfieldval("dport") == self.http_port:
-                    orig_ip_dst = ip_pkt.getfieldval("dst")  # victim IP
+                prev_orig_port_source = new_pkt.get_sport()
+                if new_pkt.get_dport() == self.http_port:
+                    orig_ip_dst = new_pkt.get_ip_dst()  # victim IP
 
             # Request: Attacker --> vicitm
-            if ip_pkt.getfieldval("dst") == orig_ip_dst:  # victim IP
+            if new_pkt.get_ip_dst() == orig_ip_dst:  # victim IP
                 # There are 7 TCP connections with different source ports, for each of them we generate random port
-                if tcp_pkt.getfieldval("sport") != prev_orig_port_source:
+                if new_pkt.get_sport() != prev_orig_port_source:
                     port_source = rnd.randint(self.minDefaultPort, self.maxDefaultPort)
-                    prev_orig_port_source = tcp_pkt.getfieldval("sport")
+                    prev_orig_port_source = new_pkt.get_sport()
                     # New connection, new random TCP sequence numbers
                     attacker_seq = rnd.randint(1000, 50000)
                     victim_seq = rnd.randint(1000, 50000)
                     # First packet in a connection has ACK = 0
-                    tcp_pkt.setfieldval("ack", 0)
+                    new_pkt.set_ack(0)
 
                 # Ether
-                eth_frame.setfieldval("src", mac_source)
-                eth_frame.setfieldval("dst", mac_destination)
+                new_pkt.set_mac_src(mac_source)
+                new_pkt.set_mac_dst(mac_destination)
                 # IP
-                ip_pkt.setfieldval("src", ip_source)
-                ip_pkt.setfieldval("dst", ip_destination)
-                ip_pkt.setfieldval("ttl", source_ttl_value)
+                new_pkt.set_ip_src(ip_source)
+                new_pkt.set_ip_dst(ip_destination)
+                new_pkt.set_ttl(source_ttl_value)
                 # TCP
-                tcp_pkt.setfieldval("sport", port_source)
-                tcp_pkt.setfieldval("dport", port_destination)
+                new_pkt.set_sport(port_source)
+                new_pkt.set_dport(port_destination)
 
                 str_tcp_seg = self.modify_http_header(str_tcp_seg, '/joomla360', target_uri, orig_ip_dst, target_host)
 
                 # TCP Seq, Ack
-                if tcp_pkt.getfieldval("ack") != 0:
-                    tcp_pkt.setfieldval("ack", victim_seq)
-                tcp_pkt.setfieldval("seq", attacker_seq)
-                if not (tcp_pkt.getfieldval("flags") == 16 and len(str_tcp_seg) == 0):  # flags=A:
+                if new_pkt.get_ack() != 0:
+                    new_pkt.set_ack(victim_seq)
+                new_pkt.set_seq(attacker_seq)
+                if not (new_pkt.get_flags() == 16 and len(str_tcp_seg) == 0):  # flags=A:
                     attacker_seq += max(len(str_tcp_seg), 1)
 
-                new_pkt = (eth_frame / ip_pkt / tcp_pkt / str_tcp_seg)
+                new_pkt.set_payload(str_tcp_seg.encode())
                 new_pkt.time = timestamp_next_pkt
 
                 timestamp_next_pkt = self.timestamp_controller.next_timestamp() + float(time_steps.random())
@@ -188,33 +178,31 @@ class JoomlaRegPrivExploit(BaseAttack.BaseAttack):
             # Reply: Victim --> attacker
             else:
                 # Ether
-                eth_frame.setfieldval("src", mac_destination)
-                eth_frame.setfieldval("dst", mac_source)
+                new_pkt.set_mac_src(mac_destination)
+                new_pkt.set_mac_dst(mac_source)
                 # IP
-                ip_pkt.setfieldval("src", ip_destination)
-                ip_pkt.setfieldval("dst", ip_source)
-                ip_pkt.setfieldval("ttl", destination_ttl_value)
+                new_pkt.set_ip_src(ip_destination)
+                new_pkt.set_ip_dst(ip_source)
+                new_pkt.set_ttl(destination_ttl_value)
                 # TCP
-                tcp_pkt.setfieldval("dport", port_source)
-                tcp_pkt.setfieldval("sport", port_destination)
+                new_pkt.set_dport(port_source)
+                new_pkt.set_sport(port_destination)
 
                 str_tcp_seg = self.modify_http_header(str_tcp_seg, '/joomla360', target_uri, orig_ip_dst, target_host)
 
                 # TCP Seq, ACK
-                tcp_pkt.setfieldval("ack", attacker_seq)
-                tcp_pkt.setfieldval("seq", victim_seq)
+                new_pkt.set_ack(attacker_seq)
+                new_pkt.set_seq(victim_seq)
                 str_len = len(str_tcp_seg)
-                if not (tcp_pkt.getfieldval("flags") == 16 and str_len == 0):  # flags=A:
+                if not (new_pkt.get_flags() == 16 and str_len == 0):  # flags=A:
                     victim_seq += max(str_len, 1)
 
-                new_pkt = (eth_frame / ip_pkt / tcp_pkt / str_tcp_seg)
+                new_pkt.set_payload(str_tcp_seg.encode())
                 timestamp_next_pkt = self.timestamp_controller.next_timestamp() + float(time_steps.random())
                 new_pkt.time = timestamp_next_pkt
 
             self.packets.append(new_pkt)
 
-        exploit_raw_packets.close()
-
     def generate_attack_pcap(self):
         """
         Creates a pcap containing the attack packets.
@@ -2,11 +2,11 @@ import logging
 import random as rnd
 
 import lea
-import scapy.layers.inet as inet
-import scapy.utils
 
 import Attack.AttackParameters as atkParam
 import Attack.BaseAttack as BaseAttack
+import ID2TLib.RawPacket as RawPacket
+import ID2TLib.TemplateCache as TemplateCache
 import ID2TLib.SMBLib as SMBLib
 import ID2TLib.Utility as Util
 
@@ -135,48 +135,39 @@ class MS17ScanAttack(BaseAttack.BaseAttack):
         # Scan (MS17)
         # Read Win7_eternalblue_scan pcap file
         orig_ip_dst = None
-        exploit_raw_packets = scapy.utils.RawPcapReader(self.template_scan_pcap_path)
+        exploit_raw_packets = TemplateCache.template_cache.get_packets(self.template_scan_pcap_path)
         inter_arrival_times = self.get_inter_arrival_time(exploit_raw_packets)
-        exploit_raw_packets.close()
-        exploit_raw_packets = scapy.utils.RawPcapReader(self.template_scan_pcap_path)
 
         source_origin_wins, destination_origin_wins = {}, {}
 
         for self.pkt_num, pkt in enumerate(exploit_raw_packets):
-            eth_frame = inet.Ether(pkt[0])
-            ip_pkt = eth_frame.payload
-            tcp_pkt = ip_pkt.payload
+            new_pkt = RawPacket.RawPacket(pkt[0])
 
             if self.pkt_num == 0:
-                if tcp_pkt.getfieldval("dport") == SMBLib.smb_port:
-                    orig_ip_dst = ip_pkt.getfieldval("dst")  # victim IP
+                if new_pkt.get_dport() == SMBLib.smb_port:
+                    orig_ip_dst = new_pkt.get_ip_dst()  # victim IP
 
             # Request
-            if ip_pkt.getfieldval("dst") == orig_ip_dst:  # victim IP
+            if new_pkt.get_ip_dst() == orig_ip_dst:  # victim IP
                 # Ether
-                eth_frame.setfieldval("src", mac_source)
-                eth_frame.setfieldval("dst", mac_destination)
+                new_pkt.set_mac_src(mac_source)
+                new_pkt.set_mac_dst(mac_destination)
                 # IP
-                ip_pkt.setfieldval("src", ip_source)
-                ip_pkt.setfieldval("dst", ip_destination)
-                ip_pkt.setfieldval("ttl", source_ttl_value)
+                new_pkt.set_ip_src(ip_source)
+                new_pkt.set_ip_dst(ip_destination)
+                new_pkt.set_ttl(source_ttl_value)
                 # TCP
-                tcp_pkt.setfieldval("sport", port_source)
-                tcp_pkt.setfieldval("dport", port_destination)
+                new_pkt.set_sport(port_source)
+                new_pkt.set_dport(port_destination)
                 # Window Size (mapping)
-                source_origin_win = tcp_pkt.getfieldval("window")
+                source_origin_win = new_pkt.get_window()
                 if source_origin_win not in source_origin_wins:
                     source_origin_wins[source_origin_win] = source_win_prob_dict.random()
                 new_win = source_origin_wins[source_origin_win]
-                tcp_pkt.setfieldval("window", new_win)
+                new_pkt.set_window(new_win)
                 # MSS
-                tcp_options = tcp_pkt.getfieldval("options")
-                if tcp_options:
-                    if tcp_options[0][0] == "MSS":
-                        tcp_options[0] = ("MSS", mss_value)
-                        tcp_pkt.setfieldval("options", tcp_options)
+                new_pkt.set_mss(mss_value)
 
-                new_pkt = (eth_frame / ip_pkt / tcp_pkt)
                 new_pkt.time = timestamp_next_pkt
 
                 # FIXME: double check inter_arrival_times calculation
@@ -185,29 +176,24 @@ class MS17ScanAttack(BaseAttack.BaseAttack):
             # Reply
             else:
                 # Ether
-                eth_frame.setfieldval("src", mac_destination)
-                eth_frame.setfieldval("dst", mac_source)
+                new_pkt.set_mac_src(mac_destination)
+                new_pkt.set_mac_dst(mac_source)
                 # IP
-                ip_pkt.setfieldval("src", ip_destination)
-                ip_pkt.setfieldval("dst", ip_source)
-                ip_pkt.setfieldval("ttl", destination_ttl_value)
+                new_pkt.set_ip_src(ip_destination)
+                new_pkt.set_ip_dst(ip_source)
+                new_pkt.set_ttl(destination_ttl_value)
                 # TCP
-                tcp_pkt.setfieldval("dport", port_source)
-                tcp_pkt.setfieldval("sport", port_destination)
+                new_pkt.set_dport(port_source)
+                new_pkt.set_sport(port_destination)
                 # Window Size
-                destination_origin_win = tcp_pkt.getfieldval("window")
+                destination_origin_win = new_pkt.get_window()
                 if destination_origin_win not in destination_origin_wins:
                     destination_origin_wins[destination_origin_win] = destination_win_prob_dict.random()
                 new_win = destination_origin_wins[destination_origin_win]
-                tcp_pkt.setfieldval("window", new_win)
+                new_pkt.set_window(new_win)
                 # MSS
-                tcp_options = tcp_pkt.getfieldval("options")
-                if tcp_options:
-                    if tcp_options[0][0] == "MSS":
-                        tcp_options[0] = ("MSS", mss_value)
-                        tcp_pkt.setfieldval("options", tcp_options)
+                new_pkt.set_mss(mss_value)
 
-                new_pkt = (eth_frame / ip_pkt / tcp_pkt)
                 # FIXME: double check inter_arrival_times calculation
                 timestamp_next_pkt = self.timestamp_controller.next_timestamp() + inter_arrival_times[
                     self.pkt_num]  # + float(timeSteps.random())
@@ -215,8 +201,6 @@ class MS17ScanAttack(BaseAttack.BaseAttack):
 
             self.packets.append(new_pkt)
 
-        exploit_raw_packets.close()
-
     def generate_attack_pcap(self):
         """
         Creates a pcap containing the attack packets.
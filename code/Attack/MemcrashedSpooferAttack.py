@@ -2,6 +2,7 @@ import logging
 import random as rnd
 import typing
 
+import numpy as np
 import scapy.layers.inet as inet
 
 import Attack.AttackParameters as atkParam
@@ -78,7 +79,10 @@ class MemcrashedSpooferAttack(BaseAttack.BaseAttack):
         attacker_ether = inet.Ether(src=mac_attacker, dst=mac_amplifier)
         attacker_ip = inet.IP(src=ip_victim, dst=ip_amplifier, ttl=src_ttl, flags='DF')
 
-        while timestamp_next_pkt <= attack_ends_time:
+        timestamps = np.concatenate(([timestamp_next_pkt],
+                                     self.timestamp_controller.next_timestamps_until(attack_ends_time)))
+
+        for timestamp_next_pkt in timestamps.tolist():
             request_udp = inet.UDP(sport=sport, dport=Memcd.memcached_port)
             request_memcd = Memcd.Memcached_Request(Request=b'stats\r\n', RequestID=inet.RandShort())
             request = (attacker_ether / attacker_ip / request_udp / request_memcd)
@@ -86,8 +90,6 @@ class MemcrashedSpooferAttack(BaseAttack.BaseAttack):
 
             self.packets.append(request)
 
-            timestamp_next_pkt = self.timestamp_controller.next_timestamp()
-
     def generate_attack_pcap(self) -> typing.Tuple[int, str]:
         # store end time of attack
         self.attack_end_utime = self.packets[-1].time
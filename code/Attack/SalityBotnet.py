@@ -1,11 +1,10 @@
 import logging
 import random as rnd
 
-import scapy.layers.inet as inet
-import scapy.utils
-
 import Attack.AttackParameters as atkParam
 import Attack.BaseAttack as BaseAttack
+import ID2TLib.RawPacket as RawPacket
+import ID2TLib.TemplateCache as TemplateCache
 import ID2TLib.Utility as Util
 
 logging.getLogger("scapy.runtime").setLevel(logging.ERROR)
@@ -91,43 +90,39 @@ class SalityBotnet(BaseAttack.BaseAttack):
 
         # Inject Sality botnet
         # Read sality_botnet pcap file
-        exploit_raw_packets = scapy.utils.RawPcapReader(self.template_attack_pcap_path)
+        exploit_raw_packets = TemplateCache.template_cache.get_packets(self.template_attack_pcap_path)
 
         for self.pkt_num, pkt in enumerate(exploit_raw_packets):
-            eth_frame = inet.Ether(pkt[0])
-            ip_pkt = eth_frame.payload
+            new_pkt = RawPacket.RawPacket(pkt[0])
 
             # Ether
-            if eth_frame.getfieldval("src") in mac_map:
-                eth_frame.setfieldval("src", mac_map[eth_frame.getfieldval("src")])
-            if eth_frame.getfieldval("dst") in mac_map:
-                eth_frame.setfieldval("dst", mac_map[eth_frame.getfieldval("dst")])
+            if new_pkt.get_mac_src() in mac_map:
+                new_pkt.set_mac_src(mac_map[new_pkt.get_mac_src()])
+            if new_pkt.get_mac_dst() in mac_map:
+                new_pkt.set_mac_dst(mac_map[new_pkt.get_mac_dst()])
 
             # IP
-            if ip_pkt.getfieldval("src") in ip_map:
-                ip_pkt.setfieldval("src", ip_map[ip_pkt.getfieldval("src")])
-            if ip_pkt.getfieldval("dst") in ip_map:
-                ip_pkt.setfieldval("dst", ip_map[ip_pkt.getfieldval("dst")])
+            if new_pkt.get_ip_src() in ip_map:
+                new_pkt.set_ip_src(ip_map[new_pkt.get_ip_src()])
+            if new_pkt.get_ip_dst() in ip_map:
+                new_pkt.set_ip_dst(ip_map[new_pkt.get_ip_dst()])
 
             # TTL
-            if ip_pkt.getfieldval("ttl") not in ttl_map:
-                source_ttl = self.statistics.get_most_used_ttl(ip_pkt.getfieldval("src"))
+            if new_pkt.get_ttl() not in ttl_map:
+                source_ttl = self.statistics.get_most_used_ttl(new_pkt.get_ip_src())
                 if not source_ttl:
                     source_ttl = self.statistics.process_db_query("SELECT ttlValue FROM ip_ttl;")
                     if isinstance(source_ttl, list):
                         source_ttl = rnd.choice(source_ttl)
-                ttl_map[ip_pkt.getfieldval("ttl")] = source_ttl
-            ip_pkt.setfieldval("ttl", ttl_map[ip_pkt.getfieldval("ttl")])
+                ttl_map[new_pkt.get_ttl()] = source_ttl
+            new_pkt.set_ttl(ttl_map[new_pkt.get_ttl()])
 
-            new_pkt = (eth_frame / ip_pkt)
             new_pkt.time = timestamp_next_pkt
 
             timestamp_next_pkt = self.timestamp_controller.next_timestamp()
 
             self.packets.append(new_pkt)
 
-        exploit_raw_packets.close()
-
     def generate_attack_pcap(self):
         """
         Creates a pcap containing the attack packets.
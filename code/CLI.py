@@ -48,6 +48,10 @@ class CLI(object):
         parser.add_argument('-e', '--export',
                             help='store statistics as a ".stat" file',
                             action='store_true', default=False)
+        parser.add_argument('-ec', '--export-columnar', metavar="FORMAT", nargs='?', const='npy',
+                            help='export the IP, conversation and interval statistics to a columnar format next to '
+                                 'the input PCAP file. Formats: npy (default, one memory-mappable file per column), '
+                                 'parquet (requires pyarrow).')
         parser.add_argument('-r', '--recalculate',
                             help='recalculate statistics even if a cached version exists.',
                             action='store_true', default=False)
@@ -56,7 +60,11 @@ class CLI(object):
         parser.add_argument('-p', '--plot',
                             help='creates the following plots: the values distributions of TTL, MSS, Window Size, '
                                  'protocol, and the novelty distributions of IP, port, TTL, MSS, Window Size,'
-                                 ' and ToS. In addition to packets count in interval-wise.', action='append',
+                                 ' and ToS. In addition to packets count in interval-wise. Plots which are newer '
+                                 'than the statistics are skipped. Options: format=pdf|png, plots=NAME,... to create '
+                                 'the given plots only, jobs=N to render the plots in N processes, top=K to plot the K '
+                                 'largest IPs and connections with an "other" bar, logarithmic histograms and at '
+                                 'most K bins.', action='append',
                             nargs='?')
         parser.add_argument('-q', '--query', metavar="QUERY",
                             action='append', nargs='?',
@@ -73,6 +81,16 @@ class CLI(object):
         parser.add_argument('-o', '--output', metavar="PCAP_FILE", help='path to the output pcap file')
         parser.add_argument('-ie', '--inject_empty', action='store_true',
                             help='injects ATTACK into an EMPTY PCAP file, using the statistics of the input PCAP.')
+        parser.add_argument('-us', '--update-statistics', action='store_true', default=False,
+                            help='derives the statistics database of the output pcap from the statistics of the input '
+                                 'pcap and the injected packets instead of recalculating it on the next run.')
+        parser.add_argument('-pa', '--parallel-attacks', metavar="N", type=int, default=1,
+                            help='number of worker processes generating the attacks in parallel.')
+        parser.add_argument('-b', '--batch', metavar="MANIFEST_FILE",
+                            help='creates all datasets listed in a JSON or YAML batch manifest from the input pcap, '
+                                 'loading its statistics only once.')
+        parser.add_argument('-bj', '--batch-jobs', metavar="N", type=int, default=1,
+                            help='number of worker processes creating the datasets of a batch manifest in parallel.')
         parser.add_argument('-d', '--debug', help='Runs ID2T in debug mode.', action='store_true', default=False)
         parser.add_argument('-si', '--statistics_interval', help='interval duration in seconds', action='store',
                             type=float, nargs='+', default=[])
@@ -91,6 +109,8 @@ class CLI(object):
                                  'does not recalculate old interval statistics, but keeps them.'
                                  'surpresses (yes, no, delete) prompt.', action='store_true',
                             default=False)
+        parser.add_argument('-j', '--jobs', metavar="N", type=int, default=1,
+                            help='number of threads used to collect the statistics of the input pcap file.')
         parser.add_argument('-li', '--list-intervals', action='store_true',
                             help='prints all interval statistics tables available in the database')
         parser.add_argument('--skip', action='store_true', help='skips every initialization right to query mode\n'
@@ -183,11 +203,14 @@ class CLI(object):
                 self.args.recalculate = True
             controller.load_pcap_statistics(self.args.export, self.args.recalculate, self.args.statistics,
                                             self.args.statistics_interval, self.args.recalculate_delete,
-                                            recalculate_intervals)
+                                            recalculate_intervals, self.args.jobs)
 
             if self.args.list_intervals:
                 controller.list_interval_statistics()
 
+            if self.args.export_columnar is not None:
+                controller.export_columnar_statistics(self.args.export_columnar)
+
             # Create statistics plots
             if self.args.plot is not None:
                 do_entropy = False
@@ -199,10 +222,14 @@ class CLI(object):
             if not isinstance(self.args.rngSeed, list):
                 self.args.rngSeed = [self.args.rngSeed]
 
+            # Process the datasets of a batch manifest
+            if self.args.batch is not None:
+                controller.process_batch(self.args.batch, self.args.batch_jobs, self.args.parallel_attacks)
             # Process attack(s) with given attack params
-            if self.args.attack is not None:
+            elif self.args.attack is not None:
                 # If attack is present, load attack with params
-                controller.process_attacks(self.args.attack, self.args.rngSeed, self.args.time, self.args.inject_empty)
+                controller.process_attacks(self.args.attack, self.args.rngSeed, self.args.time, self.args.inject_empty,
+                                           self.args.update_statistics, self.args.parallel_attacks)
 
         # Parameter -q without arguments was given -> go into query loop
         if self.args.query == [None]:
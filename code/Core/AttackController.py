@@ -1,10 +1,10 @@
-import importlib
 import sys
 import difflib
 import pkgutil
 import typing
 
 import Attack.AttackParameters as atkParam
+import Core.AttackRegistry as AttackRegistry
 import Core.LabelManager as LabelManager
 import Core.Statistics as Statistics
 import ID2TLib.Label as Label
@@ -106,8 +106,7 @@ class AttackController:
         """
         print("\nCreating attack instance of \033[1m" + attack_name + "\033[0m")
         # Load attack class
-        attack_module = importlib.import_module("Attack." + attack_name)
-        attack_class = getattr(attack_module, attack_name)
+        attack_class = AttackRegistry.get_attack_class(attack_name)
 
         # Instantiate the desired attack
         self.current_attack = attack_class()
@@ -177,6 +176,7 @@ class AttackController:
         duration = self.current_attack.get_packet_generation_time()
         # Write attack into pcap file
         attack_result = self.current_attack.generate_attack_pcap()
+        self.current_attack.close_packet_sink()
 
         self.total_packets = attack_result[0]
         temp_attack_pcap_path = attack_result[1]
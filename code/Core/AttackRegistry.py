@@ -0,0 +1,66 @@
+import ast
+import functools
+import importlib
+
+import Attack.AttackParameters as atkParam
+import Attack.BaseAttack as BaseAttack
+
+
+@functools.lru_cache(maxsize=None)
+def get_attack_class(attack_name: str):
+    """
+    Imports the module of an attack and returns its class. The classes are cached, so every module is only looked up
+    once.
+
+    :param attack_name: The name of the attack class, which is also the name of its module in the package Attack
+    :return: the class of the attack
+    """
+    attack_module = importlib.import_module("Attack." + attack_name)
+    return getattr(attack_module, attack_name)
+
+
+@functools.lru_cache(maxsize=None)
+def get_supported_params(attack_name: str) -> dict:
+    """
+    Returns the schema of the parameters of an attack. The schema is extracted from a single instance of the attack
+    class and cached, so that parameters can be typed without constructing an attack object every time.
+    The returned dict is shared and must not be modified.
+
+    :param attack_name: The name of the attack class
+    :return: a dict of the supported parameters (AttackParameters.Parameter) and their types (ParameterTypes)
+    """
+    return dict(get_attack_class(attack_name)().supported_params)
+
+
+def parse_param_value(param_type: atkParam.ParameterTypes, value: str):
+    """
+    Converts the text of a validated parameter value, e.g. from a label file, to the type of the parameter. Unlike
+    BaseAttack.add_param_value, the value is neither resolved against the statistics nor randomized.
+
+    :param param_type: The type of the parameter
+    :param value: The value as text, as written by str(value)
+    :return: a tuple of whether the value is valid and the converted value
+    """
+    list_types = {atkParam.ParameterTypes.TYPE_IP_ADDRESS, atkParam.ParameterTypes.TYPE_PORT,
+                  atkParam.ParameterTypes.TYPE_MAC_ADDRESS}
+    # lists of addresses and ports are written as Python lists
+    if param_type in list_types and value.startswith("["):
+        try:
+            return True, ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return False, value
+
+    if param_type == atkParam.ParameterTypes.TYPE_IP_ADDRESS:
+        return BaseAttack.BaseAttack._is_ip_address(value)
+    elif param_type == atkParam.ParameterTypes.TYPE_PORT:
+        result = BaseAttack.BaseAttack._is_port(value)
+        return result if result else (False, value)
+    elif param_type == atkParam.ParameterTypes.TYPE_MAC_ADDRESS:
+        return BaseAttack.BaseAttack._is_mac_address(value), value
+    elif param_type in {atkParam.ParameterTypes.TYPE_INTEGER_POSITIVE, atkParam.ParameterTypes.TYPE_PADDING}:
+        return value.isdigit(), int(value) if value.isdigit() else value
+    elif param_type in {atkParam.ParameterTypes.TYPE_FLOAT, atkParam.ParameterTypes.TYPE_PERCENTAGE}:
+        return BaseAttack.BaseAttack._is_float(value)
+    elif param_type == atkParam.ParameterTypes.TYPE_BOOLEAN:
+        return BaseAttack.BaseAttack._is_boolean(value)
+    return True, value
@@ -0,0 +1,32 @@
+import numpy as np
+
+
+class ComplementRateTable:
+    def __init__(self, complement_interval_pps: list):
+        """
+        Creates a new ComplementRateTable, which holds the complement packet rates of the intervals as arrays sorted by
+        the last timestamps of the intervals, so that the packet rate of a timestamp is found by binary search instead
+        of scanning all intervals.
+
+        :param complement_interval_pps: a list of tuples (the last timestamp in the interval, the packet rate in the
+                                        corresponding interval), ordered by the timestamps, see
+                                        Statistics.calculate_complement_packet_rates
+        """
+        self.timestamps = np.array([row[0] for row in complement_interval_pps], dtype=float)
+        self.rates = np.array([row[1] for row in complement_interval_pps], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def get_interval_pps(self, timestamps):
+        """
+        Gets the packet rate (pps) of the intervals of one or several timestamps, like Utility.get_interval_pps.
+
+        :param timestamps: a timestamp or an array of timestamps in seconds
+        :return: the packet rate of the first interval ending at or after each timestamp, the rate of the last interval
+                 for timestamps after the end of the capture; an int for a single timestamp, otherwise an array
+        """
+        positions = np.searchsorted(self.timestamps, timestamps, side="left").clip(max=len(self.timestamps) - 1)
+        if np.ndim(timestamps) == 0:
+            return int(self.rates[positions])
+        return self.rates[positions]
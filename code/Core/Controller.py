@@ -1,3 +1,6 @@
+import contextlib
+import io
+import multiprocessing
 import os
 import readline
 import sys
@@ -9,11 +12,88 @@ import pyparsing as pp
 import Core.AttackController as atkCtrl
 import Core.LabelManager as LabelManager
 import Core.Statistics as Statistics
+import ID2TLib.BatchManifest as BatchManifest
 import ID2TLib.PcapFile as PcapFile
 import ID2TLib.Utility as Util
 import Core.StatsDatabase as StatsDB
 
 
+# The attack controller of the worker processes of Controller.process_attacks_parallel, inherited by fork
+_worker_attack_controller = None
+# The controller of the worker processes of Controller.process_batch, inherited by fork
+_worker_controller = None
+
+
+def _init_attack_worker():
+    """
+    Initializes a worker process generating attacks with its own connection to the statistics database.
+    """
+    _worker_attack_controller.statistics.stats_db.reopen_read_only()
+
+
+def _process_attack_worker(job: tuple):
+    """
+    Generates an attack in a worker process.
+
+    :param job: a tuple of the attack with its parameters, the random seed and whether to measure the time
+    :return: a tuple of the result, the exit status and the output printed while generating the attack. The result is
+             a tuple of the path to the temporary PCAP, the packet generation time, the number of packets, the
+             additional files and the labels of the attack, or None if the attack exited with the exit status.
+    """
+    attack, rng_seed, measure_time = job
+    controller = _worker_attack_controller
+    controller.additional_files = []
+    controller.label_mgr.labels = []
+
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            controller.set_seed(seed=rng_seed)
+            temp_attack_pcap, duration = controller.process_attack(attack[0], attack[1:], measure_time)
+    except SystemExit as e:
+        # attacks exit on invalid parameters, which would kill the worker and leave the pool waiting for its result
+        return None, e.code, output.getvalue()
+    return (temp_attack_pcap, duration, controller.total_packets, controller.additional_files,
+            controller.label_mgr.labels), None, output.getvalue()
+
+
+def _process_dataset_worker(dataset: dict):
+    """
+    Generates a dataset of a batch manifest in a worker process.
+
+    :param dataset: the dataset, see BatchManifest.load_manifest
+    :return: a tuple of the created files, the exit status and the output printed while generating the dataset. The
+             created files are None if the generation exited with the exit status.
+    """
+    controller = _worker_controller
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            controller.process_dataset(dataset)
+    except SystemExit as e:
+        # see _process_attack_worker
+        return None, e.code, output.getvalue()
+    return controller.created_files, None, output.getvalue()
+
+
+def _parse_positive_plot_param(key: str, value: str):
+    """
+    Parses the value of a plot parameter which must be a positive integer, printing an error if it is not.
+
+    :param key: The name of the plot parameter
+    :param value: The value of the plot parameter
+    :return: the value as int, None if the value is not a positive integer
+    """
+    try:
+        result = int(value)
+    except ValueError:
+        result = 0
+    if result < 1:
+        print("Error: The plot parameter {} must be a positive integer, got '{}'.".format(key, value))
+        return None
+    return result
+
+
 class Controller:
     def __init__(self, pcap_file_path: str, do_extra_tests: bool, non_verbose: bool=True, pcap_out_path: str=None,
                  debug: bool=False):
@@ -34,6 +114,7 @@ class Controller:
         self.added_packets = 0
         self.created_files = []
         self.debug = debug
+        self.threads = 1
 
         # Initialize class instances
         print("Input file: %s" % self.pcap_src_path)
@@ -57,8 +138,19 @@ class Controller:
     def list_interval_statistics(self):
         self.statistics.list_previous_interval_statistic_tables()
 
+    def export_columnar_statistics(self, file_format: str):
+        """
+        Exports the IP, conversation and interval statistics to a columnar format next to the input PCAP.
+
+        :param file_format: the columnar format, npy or parquet
+        """
+        try:
+            self.statistics.export_columnar(file_format)
+        except ValueError as e:
+            print("Error: " + str(e))
+
     def load_pcap_statistics(self, flag_write_file: bool, flag_recalculate_stats: bool, flag_print_statistics: bool,
-                             intervals, delete: bool=False, recalculate_intervals: bool=None):
+                             intervals, delete: bool=False, recalculate_intervals: bool=None, threads: int=1):
         """
         Loads the PCAP statistics either from the database, if the statistics were calculated earlier, or calculates
         the statistics and creates a new database.
@@ -69,13 +161,60 @@ class Controller:
         :param intervals: user specified interval in seconds
         :param delete: Delete old interval statistics.
         :param recalculate_intervals: Recalculate old interval statistics or not. Prompt user if None.
+        :param threads: Number of threads used to collect the statistics.
         :return: None
         """
+        self.threads = threads
         self.statistics.load_pcap_statistics(flag_write_file, flag_recalculate_stats, flag_print_statistics,
                                              self.non_verbose, intervals=intervals, delete=delete,
-                                             recalculate_intervals=recalculate_intervals)
+                                             recalculate_intervals=recalculate_intervals, threads=threads)
+
+    def add_processed_attack(self, temp_attack_pcap: str, duration):
+        """
+        Records an attack generated by the attack controller.
+
+        :param temp_attack_pcap: the path to the temporary PCAP file of the attack
+        :param duration: the packet generation time of the attack
+        """
+        self.durations.append(duration)
+        self.added_packets += self.attack_controller.total_packets
+        if not self.non_verbose:
+            self.statistics.stats_summary_post_attack(self.added_packets)
+        self.written_pcaps.append(temp_attack_pcap)
+
+    def process_attacks_parallel(self, attacks_config: list, rng_seeds: list, measure_time: bool, processes: int):
+        """
+        Generates the attacks in worker processes, each one with a copy of the attack controller and a read-only
+        connection to the statistics database. The results are collected in the order of attacks_config, so that the
+        temporary PCAPs and labels are the same as when generating the attacks sequentially with the same seeds.
 
-    def process_attacks(self, attacks_config: list, seeds=None, measure_time: bool=False, inject_empty: bool=False):
+        :param attacks_config: A list of attacks with their attack parameters.
+        :param rng_seeds: The random seeds for the given attacks.
+        :param measure_time: Measure time for packet generation.
+        :param processes: The number of worker processes.
+        """
+        global _worker_attack_controller
+
+        # resolve the attack names beforehand, the workers cannot exit on unknown attacks
+        attacks_config = [[self.attack_controller.choose_attack(attack[0])] + attack[1:] for attack in attacks_config]
+
+        _worker_attack_controller = self.attack_controller
+        # the workers are forked, as the statistics can not be passed to spawned processes
+        with multiprocessing.get_context("fork").Pool(processes, initializer=_init_attack_worker) as pool:
+            jobs = [(attack, rng_seed, measure_time) for attack, rng_seed in zip(attacks_config, rng_seeds)]
+            for result, exit_status, output in pool.imap(_process_attack_worker, jobs):
+                print(output, end="")
+                if result is None:
+                    sys.exit(exit_status)
+                temp_attack_pcap, duration, total_packets, additional_files, labels = result
+                self.attack_controller.total_packets = total_packets
+                self.attack_controller.additional_files += additional_files
+                self.label_manager.add_labels(tuple(labels))
+                self.add_processed_attack(temp_attack_pcap, duration)
+        _worker_attack_controller = None
+
+    def process_attacks(self, attacks_config: list, seeds=None, measure_time: bool=False, inject_empty: bool=False,
+                        update_statistics: bool=False, parallel_attacks: int=1):
         """
         Creates the attack based on the attack name and the attack parameters given in the attacks_config. The
         attacks_config is a list of attacks.
@@ -87,63 +226,70 @@ class Controller:
         :param seeds: A list of random seeds for the given attacks.
         :param measure_time: Measure time for packet generation.
         :param inject_empty: if flag is set, Attack PCAPs will not be merged with the base PCAP, ie. Attacks are injected into an empty PCAP
+        :param update_statistics: if flag is set, the statistics database of the output PCAP is derived from the
+                                  statistics of the base PCAP and the injected packets
+        :param parallel_attacks: the number of worker processes generating the attacks, 1 to generate them sequentially
         """
 
-        # load attacks sequentially
-        i = 0
-        for attack in attacks_config:
+        # determine the seeds of all attacks in advance, so that they do not depend on the order of generation
+        rng_seeds = []
+        for i in range(len(attacks_config)):
             if seeds is not None and len(seeds) > i:
-                rng_seed = seeds[i][0]
+                rng_seeds.append(seeds[i][0])
             else:
-                rng_seed = int.from_bytes(os.urandom(16), sys.byteorder)
-            self.attack_controller.set_seed(seed=rng_seed)
-            temp_attack_pcap, duration = self.attack_controller.process_attack(attack[0], attack[1:], measure_time)
-            self.durations.append(duration)
-            self.added_packets += self.attack_controller.total_packets
-            if not self.non_verbose:
-                self.statistics.stats_summary_post_attack(self.added_packets)
-            self.written_pcaps.append(temp_attack_pcap)
-            i += 1
+                rng_seeds.append(int.from_bytes(os.urandom(16), sys.byteorder))
+
+        if parallel_attacks > 1 and len(attacks_config) > 1:
+            self.process_attacks_parallel(attacks_config, rng_seeds, measure_time, parallel_attacks)
+        else:
+            # load attacks sequentially
+            for attack, rng_seed in zip(attacks_config, rng_seeds):
+                self.attack_controller.set_seed(seed=rng_seed)
+                temp_attack_pcap, duration = self.attack_controller.process_attack(attack[0], attack[1:], measure_time)
+                self.add_processed_attack(temp_attack_pcap, duration)
 
         attacks_pcap_path = None
 
-        # merge attack pcaps to get single attack pcap
-        if len(self.written_pcaps) > 1:
-            print("\nMerging temporary attack pcaps into single pcap file...", end=" ")
-            sys.stdout.flush()  # force python to print text immediately
-            for i in range(0, len(self.written_pcaps) - 1):
-                attacks_pcap = PcapFile.PcapFile(self.written_pcaps[i])
-                attacks_pcap_path = attacks_pcap.merge_attack(self.written_pcaps[i + 1])
-                os.remove(self.written_pcaps[i + 1])  # remove merged pcap
-                self.written_pcaps[i + 1] = attacks_pcap_path
-            print("done.")
-        elif len(self.written_pcaps) == 1:
-            attacks_pcap_path = self.written_pcaps[0]
+        if self.written_pcaps:
+            # the output path is passed to the merge, so that datasets created in parallel never share a merged file
+            if self.pcap_out_path and not self.pcap_out_path.endswith(".pcap"):
+                self.pcap_out_path += ".pcap"
 
-        if attacks_pcap_path:
             if inject_empty:
+                # merge attack pcaps to get single attack pcap
+                if len(self.written_pcaps) > 1:
+                    print("\nMerging temporary attack pcaps into single pcap file...", end=" ")
+                    sys.stdout.flush()  # force python to print text immediately
+                    attacks_pcap = PcapFile.PcapFile(self.written_pcaps[0])
+                    attacks_pcap_path = attacks_pcap.merge_attacks(self.written_pcaps[1:])
+                    print("done.")
+                else:
+                    attacks_pcap_path = self.written_pcaps[0]
+
                 # copy the attack pcap to the directory of the base PCAP instead of merging them
                 print("Copying single attack pcap to location of base pcap...", end=" ")
                 sys.stdout.flush()  # force python to print text immediately
 
-                timestamp = '_' + time.strftime("%Y%m%d") + '-' + time.strftime("%X").replace(':', '')
-                self.pcap_dest_path = self.pcap_src_path.replace(".pcap", timestamp + '.pcap')
+                if self.pcap_out_path:
+                    self.pcap_dest_path = self.pcap_out_path
+                else:
+                    timestamp = '_' + time.strftime("%Y%m%d") + '-' + time.strftime("%X").replace(':', '')
+                    self.pcap_dest_path = self.pcap_src_path.replace(".pcap", timestamp + '.pcap')
                 shutil.copy(attacks_pcap_path, self.pcap_dest_path)
             else:
-                # merge single attack pcap with all attacks into base pcap
-                print("Merging base pcap with single attack pcap...", end=" ")
+                # merge all attack pcaps into base pcap in a single pass
+                print("Merging base pcap with attack pcaps...", end=" ")
                 sys.stdout.flush()  # force python to print text immediately
-                self.pcap_dest_path = self.pcap_file.merge_attack(attacks_pcap_path)
+                self.pcap_dest_path = self.pcap_file.merge_attacks(self.written_pcaps, self.pcap_out_path)
 
             if self.pcap_out_path:
-                if not self.pcap_out_path.endswith(".pcap"):
-                    self.pcap_out_path += ".pcap"
                 result_path = self.pcap_out_path
             else:
                 tmp_path_tuple = self.pcap_dest_path.rpartition("/")
                 result_path = Util.OUT_DIR + tmp_path_tuple[2]
 
-            os.rename(self.pcap_dest_path, result_path)
+            if self.pcap_dest_path != result_path:
+                os.rename(self.pcap_dest_path, result_path)
             self.pcap_dest_path = result_path
             self.created_files = [self.pcap_dest_path]
 
@@ -156,13 +302,21 @@ class Controller:
 
             print("done.")
 
+            # fold the injected packets into the statistics of the base pcap
+            if update_statistics and not inject_empty:
+                print("Updating statistics with injected packets...")
+                self.statistics.update_pcap_statistics(PcapFile.PcapFile(self.pcap_dest_path), self.written_pcaps,
+                                                       self.threads)
+
             # delete intermediate PCAP files
             if self.debug:
                 print('NOT deleting intermediate attack pcap while in debug mode.')
             else:
-                print('Deleting intermediate attack pcap...', end=" ")
+                print('Deleting intermediate attack pcaps...', end=" ")
                 sys.stdout.flush()  # force python to print text immediately
-                os.remove(attacks_pcap_path)
+                for pcap_path in set(self.written_pcaps + [attacks_pcap_path]):
+                    if pcap_path is not None:
+                        os.remove(pcap_path)
                 print("done.")
 
             # write label file with attacks
@@ -182,6 +336,87 @@ class Controller:
         if not self.non_verbose and len(attacks_config) is not 1:
             self.statistics.stats_summary_post_attack(self.added_packets)
 
+    def reset_attacks(self, pcap_out_path: str):
+        """
+        Discards the attacks processed so far, so that the next attacks are injected into a new output PCAP, reusing
+        the loaded statistics of the input PCAP.
+
+        :param pcap_out_path: the path to the new output PCAP file
+        """
+        self.pcap_dest_path = ''
+        self.pcap_out_path = pcap_out_path
+        self.written_pcaps = []
+        self.durations = []
+        self.added_packets = 0
+        self.created_files = []
+
+        self.label_manager = LabelManager.LabelManager(self.pcap_src_path)
+        self.attack_controller.label_mgr = self.label_manager
+        self.attack_controller.additional_files = []
+        self.attack_controller.added_attacks = []
+        self.attack_controller.total_packets = 0
+
+        out_dir = os.path.dirname(pcap_out_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+    def process_dataset(self, dataset: dict, parallel_attacks: int=1):
+        """
+        Creates a dataset of a batch manifest by injecting its attacks into the input PCAP.
+
+        :param dataset: the dataset, see BatchManifest.load_manifest
+        :param parallel_attacks: the number of worker processes generating the attacks, 1 to generate them sequentially
+        """
+        print("\nCreating dataset " + dataset["output"])
+        self.reset_attacks(dataset["output"])
+        self.process_attacks(dataset["attacks"], dataset["seeds"], dataset["time"], dataset["inject_empty"],
+                             dataset["update_statistics"], parallel_attacks)
+
+    def process_batch(self, manifest_path: str, processes: int=1, parallel_attacks: int=1):
+        """
+        Creates all datasets listed in a batch manifest from the input PCAP. The statistics of the input PCAP are loaded
+        once and shared by all datasets, so that each dataset only costs the generation and merging of its attacks.
+
+        :param manifest_path: the path to the batch manifest, see BatchManifest.load_manifest
+        :param processes: the number of worker processes creating the datasets, 1 to create them sequentially
+        :param parallel_attacks: the number of worker processes generating the attacks of a dataset, if the datasets
+                                 are created sequentially
+        """
+        global _worker_attack_controller, _worker_controller
+
+        try:
+            datasets = BatchManifest.load_manifest(manifest_path)
+        except (OSError, ValueError) as e:
+            print("Error: could not load the batch manifest. " + str(e))
+            sys.exit(1)
+
+        # resolve the attack names beforehand, the workers cannot exit on unknown attacks
+        for dataset in datasets:
+            for attack in dataset["attacks"]:
+                attack[0] = self.attack_controller.choose_attack(attack[0])
+
+        created_files = []
+        if processes > 1 and len(datasets) > 1:
+            _worker_attack_controller = self.attack_controller
+            _worker_controller = self
+            # the workers are forked, as the statistics can not be passed to spawned processes
+            with multiprocessing.get_context("fork").Pool(processes, initializer=_init_attack_worker) as pool:
+                for dataset_files, exit_status, output in pool.imap(_process_dataset_worker, datasets):
+                    print(output, end="")
+                    if dataset_files is None:
+                        sys.exit(exit_status)
+                    created_files += dataset_files
+            _worker_attack_controller = None
+            _worker_controller = None
+        else:
+            for dataset in datasets:
+                self.process_dataset(dataset, parallel_attacks)
+                created_files += self.created_files
+
+        print("\nBatch finished, {} datasets processed. Output files created:".format(len(datasets)))
+        for filepath in created_files:
+            print(filepath)
+
     def process_db_queries(self, query, print_results=False):
         """
         Processes a statistics database query. This can be a standard SQL query or a named query.
@@ -415,14 +650,39 @@ class Controller:
         # Save the label file, in case content has changed
         self.label_manager.write_label_file(self.pcap_src_path)
 
-    def create_statistics_plot(self, params: str, entropy: bool):
+    def create_statistics_plot(self, params: list, entropy: bool):
         """
         Plots the statistics to a file by using the given customization parameters.
+
+        :param params: a list of parameters like format=png, plots=ttl,mss, jobs=4 or top=20, None entries are ignored
+        :param entropy: whether the plots of the extra tests are created
         """
+        file_format = 'pdf'
+        plot_names = None
+        processes = 1
+        top_k = None
+        for param in params or []:
+            if param is None:
+                continue
+            key, _, value = param.partition("=")
+            if key == "format":
+                file_format = value
+            elif key == "plots":
+                plot_names = (plot_names or []) + [name for name in value.split(",") if name]
+            elif key == "jobs":
+                processes = _parse_positive_plot_param(key, value)
+                if processes is None:
+                    return
+            elif key == "top":
+                top_k = _parse_positive_plot_param(key, value)
+                if top_k is None:
+                    return
+            else:
+                print("Unknown plot parameter: " + param)
+
         print("Statistical plots are being generated", end="", flush=True)
-        if params is not None and params[0] is not None:
-            # FIXME: cleanup
-            params_dict = dict([z.split("=") for z in params])
-            self.statistics.plot_statistics(entropy=entropy, file_format=params_dict['format'])
-        else:
-            self.statistics.plot_statistics(entropy=entropy)
+        try:
+            self.statistics.plot_statistics(entropy=entropy, file_format=file_format, plot_names=plot_names,
+                                            processes=processes, top_k=top_k)
+        except ValueError as e:
+            print("\nError: " + str(e))
@@ -0,0 +1,87 @@
+import numpy as np
+
+import Core.StatsDatabase as statsDB
+
+
+class IntervalIndex:
+    def __init__(self, stats_db: statsDB.StatsDatabase, table_name: str, pcap_start: int):
+        """
+        Creates a new IntervalIndex, which holds the start timestamps of the intervals of an interval statistics table
+        in memory, so that the interval statistics of timestamps can be looked up without querying the database.
+        The columns of the table are loaded once on their first lookup.
+
+        :param stats_db: the statistics database containing the interval statistics table
+        :param table_name: the name of the interval statistics table
+        :param pcap_start: the timestamp of the first packet of the PCAP file in microseconds
+        """
+        self.stats_db = stats_db
+        self.table_name = table_name
+        self.interval_length = int(table_name[len("interval_statistics_"):])
+        self.pcap_start = pcap_start
+        self.columns = {}
+
+        rows = self.stats_db.process_user_defined_query(
+            "SELECT CAST(first_pkt_timestamp AS INTEGER) FROM {} ORDER BY 1".format(table_name))
+        self.starts = np.array([row[0] for row in rows], dtype=np.int64)
+
+    def get_column(self, field: str):
+        """
+        :param field: the name of a column of the interval statistics table
+        :return: the values of the column as float array in the order of the interval start timestamps, NaN for NULL
+        """
+        field = field.lower()
+        if field not in self.columns:
+            rows = self.stats_db.process_user_defined_query(
+                "SELECT {0} FROM {1} ORDER BY CAST(first_pkt_timestamp AS INTEGER)".format(field, self.table_name))
+            self.columns[field] = np.array([np.nan if row[0] is None else row[0] for row in rows], dtype=float)
+        return self.columns[field]
+
+    def _unix_timestamps(self, timestamps):
+        """
+        :param timestamps: a timestamp or an array of timestamps in seconds
+        :return: the timestamps in microseconds, timestamps before the start of the PCAP are taken as relative to it
+        """
+        micros = np.asarray(timestamps, dtype=float) * 1000000
+        return np.where(micros > self.pcap_start, micros, self.pcap_start + micros)
+
+    def interval_keys(self, timestamps):
+        """
+        :param timestamps: a timestamp or an array of timestamps in seconds
+        :return: the start of the interval of the given length, counted from the start of the PCAP, each timestamp
+                 belongs to, in microseconds
+        """
+        diff = self._unix_timestamps(timestamps) - self.pcap_start
+        return self.pcap_start + (diff // self.interval_length).astype(np.int64) * self.interval_length
+
+    def positions(self, timestamps):
+        """
+        :param timestamps: a timestamp or an array of timestamps in seconds
+        :return: the positions of the intervals which started at most one interval length before each timestamp,
+                 -1 if there is no such interval
+        """
+        unix_timestamps = np.atleast_1d(self._unix_timestamps(timestamps))
+        if len(self.starts) == 0:
+            return np.full(unix_timestamps.shape, -1, dtype=np.int64)
+        positions = np.searchsorted(self.starts, unix_timestamps, side="right") - 1
+        valid = (positions >= 0) & \
+            (self.starts[positions.clip(0)] >= np.floor(unix_timestamps - self.interval_length))
+        return np.where(valid, positions, -1)
+
+    def lookup(self, field: str, timestamps, default=None):
+        """
+        Looks up the interval statistics of one or several timestamps.
+
+        :param field: the name of a column of the interval statistics table
+        :param timestamps: a timestamp or an array of timestamps in seconds
+        :param default: the value returned for a single timestamp, if it belongs to no interval
+        :return: the value of the field for a single timestamp, or an array of values with NaN for timestamps which
+                 belong to no interval
+        """
+        positions = self.positions(timestamps)
+        column = self.get_column(field)
+        values = np.full(positions.shape, np.nan)
+        values[positions >= 0] = column[positions[positions >= 0]]
+
+        if np.ndim(timestamps) == 0:
+            return default if np.isnan(values[0]) else float(values[0])
+        return values
@@ -1,9 +1,13 @@
-import importlib
 import datetime as dt
 import os.path
-import xml.dom.minidom as minidom
+import xml.etree.ElementTree as ElementTree
+from xml.sax.saxutils import XMLGenerator
+
 import pytz as pytz
 
+import Attack.AttackParameters as atkParam
+import Attack.BaseAttack as BaseAttack
+import Core.AttackRegistry as AttackRegistry
 import ID2TLib.Label as Label
 import ID2TLib.TestLibrary as Lib
 
@@ -65,191 +69,181 @@ class LabelManager:
     def write_label_file(self, filepath=None):
         """
         Writes previously added/loaded labels to a XML file. Uses the given filepath as destination path, if no path is
-        given, uses the path in label_file_path.
+        given, uses the path in label_file_path. The XML is streamed to the file label by label.
 
         :param filepath: The path where the label file should be written to.
         """
 
-        def get_subtree_fileinfo(xml_tag_root, filename) -> minidom.Element:
+        def write_element(tag_name, text, depth, attributes=None):
             """
-            Creates the subtree for pcap file information (filename and hash).
+            Writes an element containing only text on a new line.
 
-            :return: The root node of the XML subtree
+            :param tag_name: The tag name of the element
+            :param text: The text of the element
+            :param depth: The indentation depth of the element
+            :param attributes: The attributes of the element
             """
+            xml.ignorableWhitespace("\n" + "\t" * depth)
+            xml.startElement(tag_name, attributes or {})
+            xml.characters(text)
+            xml.endElement(tag_name)
 
-            input_root = doc.createElement(xml_tag_root)
-
-            file = doc.createElement(self.TAG_FILE_NAME)
-            file.appendChild(doc.createTextNode(os.path.split(filename)[-1]))
-            input_root.appendChild(file)
+        def start_element(tag_name, depth, attributes=None):
+            """
+            Starts an element containing other elements on a new line.
+            """
+            xml.ignorableWhitespace("\n" + "\t" * depth)
+            xml.startElement(tag_name, attributes or {})
 
-            hash_node = doc.createElement(self.TAG_FILE_HASH)
-            hash_node.appendChild(doc.createTextNode(Lib.get_sha256(filename)))
-            input_root.appendChild(hash_node)
+        def end_element(tag_name, depth):
+            """
+            Ends an element containing other elements on a new line.
+            """
+            xml.ignorableWhitespace("\n" + "\t" * depth)
+            xml.endElement(tag_name)
 
-            return input_root
+        def write_subtree_fileinfo(xml_tag_root, filename):
+            """
+            Writes the subtree for pcap file information (filename and hash).
+            """
+            start_element(xml_tag_root, 1)
+            write_element(self.TAG_FILE_NAME, os.path.split(filename)[-1], 2)
+            write_element(self.TAG_FILE_HASH, Lib.get_sha256(filename), 2)
+            end_element(xml_tag_root, 1)
 
-        def get_subtree_timestamp(xml_tag_root, timestamp_entry):
+        def write_subtree_timestamp(xml_tag_root, timestamp_entry):
             """
-            Creates the subtree for a given timestamp, consisting of the unix time format (seconds) and a human-readable
+            Writes the subtree for a given timestamp, consisting of the unix time format (seconds) and a human-readable
             output.
 
             :param xml_tag_root: The tag name for the root of the subtree
             :param timestamp_entry: The timestamp as unix time
-            :return: The root node of the XML subtree
             """
-            timestamp_root = doc.createElement(xml_tag_root)
-
+            start_element(xml_tag_root, 2)
             # add timestamp in unix format
-            timestamp = doc.createElement(self.TAG_TIMESTAMP)
-            timestamp.appendChild(doc.createTextNode(str(timestamp_entry)))
-            timestamp_root.appendChild(timestamp)
-
+            write_element(self.TAG_TIMESTAMP, str(timestamp_entry), 3)
             # add timestamp in human-readable format
-            timestamp_hr = doc.createElement(self.TAG_TIMESTAMP_HR)
             timestamp_hr_text = dt.datetime.utcfromtimestamp(timestamp_entry).strftime('%Y-%m-%d %H:%M:%S.%f')
-            timestamp_hr.appendChild(doc.createTextNode(timestamp_hr_text))
-            timestamp_root.appendChild(timestamp_hr)
-
-            return timestamp_root
+            write_element(self.TAG_TIMESTAMP_HR, timestamp_hr_text, 3)
+            end_element(xml_tag_root, 2)
 
-        def get_subtree_parameters(parameters):
+        def write_subtree_parameters(parameters):
             """
-            Creates a subtree containing all parameters used to construct the attack
+            Writes a subtree containing all parameters used to construct the attack
 
             :param parameters: The list of parameters used to run the attack
-            :return: The root node of the XML subtree
             """
-            parameters_root = doc.createElement(self.TAG_PARAMETERS)
-
+            start_element(self.TAG_PARAMETERS, 2)
             for param_key, param_value in parameters.items():
-                param = doc.createElement(param_key.value)
-                param.appendChild(doc.createTextNode(str(param_value.value)))
-                param.setAttribute(self.ATTR_PARAM_USERSPECIFIED, str(param_value.user_specified))
-                parameters_root.appendChild(param)
-
-            return parameters_root
+                write_element(param_key.value, str(param_value.value), 3,
+                              {self.ATTR_PARAM_USERSPECIFIED: str(param_value.user_specified)})
+            end_element(self.TAG_PARAMETERS, 2)
 
         if filepath is not None:
             self.label_file_path = os.path.splitext(filepath)[0] + '_labels.xml'
 
-        # Generate XML
-        doc = minidom.Document()
-        node = doc.createElement(self.TAG_ROOT)
-        node.setAttribute(self.ATTR_VERSION, self.ATTR_VERSION_VALUE)
-        node.appendChild(get_subtree_fileinfo(self.TAG_INPUT, self.filepath_input_pcap))
-        node.appendChild(get_subtree_fileinfo(self.TAG_OUTPUT, filepath))
-
-        for label in self.labels:
-            xml_tree = doc.createElement(self.TAG_ATTACK)
-
-            # add attack to XML tree
-            attack_name = doc.createElement(self.TAG_ATTACK_NAME)
-            attack_name.appendChild(doc.createTextNode(str(label.attack_name)))
-            xml_tree.appendChild(attack_name)
-            attack_note = doc.createElement(self.TAG_ATTACK_NOTE)
-            attack_note.appendChild(doc.createTextNode(str(label.attack_note)))
-            xml_tree.appendChild(attack_note)
-            attack_seed = doc.createElement(self.TAG_ATTACK_SEED)
-            attack_seed.appendChild(doc.createTextNode(str(label.seed)))
-            xml_tree.appendChild(attack_seed)
-            injected_packets = doc.createElement(self.TAG_ATTACK_PACKETS)
-            injected_packets.appendChild(doc.createTextNode(str(label.injected_packets)))
-            xml_tree.appendChild(injected_packets)
-
-            # add timestamp_start to XML tree
-            xml_tree.appendChild(get_subtree_timestamp(self.TAG_TIMESTAMP_START, label.timestamp_start))
-
-            # add timestamp_end to XML tree
-            xml_tree.appendChild(get_subtree_timestamp(self.TAG_TIMESTAMP_END, label.timestamp_end))
-
-            # add parameters to XML tree
-            xml_tree.appendChild(get_subtree_parameters(label.parameters))
-
-            node.appendChild(xml_tree)
-
-        doc.appendChild(node)
-
-        # Write XML to file
-        file = open(self.label_file_path, 'w')
-        file.write(doc.toprettyxml())
-        file.close()
+        with open(self.label_file_path, 'w', encoding='utf-8') as file:
+            xml = XMLGenerator(file, encoding='utf-8')
+            xml.startDocument()
+            xml.startElement(self.TAG_ROOT, {self.ATTR_VERSION: self.ATTR_VERSION_VALUE})
+            write_subtree_fileinfo(self.TAG_INPUT, self.filepath_input_pcap)
+            write_subtree_fileinfo(self.TAG_OUTPUT, filepath)
+
+            for label in self.labels:
+                start_element(self.TAG_ATTACK, 1)
+                write_element(self.TAG_ATTACK_NAME, str(label.attack_name), 2)
+                write_element(self.TAG_ATTACK_NOTE, str(label.attack_note), 2)
+                write_element(self.TAG_ATTACK_SEED, str(label.seed), 2)
+                write_element(self.TAG_ATTACK_PACKETS, str(label.injected_packets), 2)
+                write_subtree_timestamp(self.TAG_TIMESTAMP_START, label.timestamp_start)
+                write_subtree_timestamp(self.TAG_TIMESTAMP_END, label.timestamp_end)
+                write_subtree_parameters(label.parameters)
+                end_element(self.TAG_ATTACK, 1)
+
+            end_element(self.TAG_ROOT, 0)
+            xml.ignorableWhitespace("\n")
+            xml.endDocument()
 
     def load_labels(self):
         """
         Loads the labels from an already existing label XML file located at label_file_path (set by constructor).
+        The file is parsed incrementally and each attack element is discarded once its label was created.
         """
 
-        def get_value_from_node(node, tag_name, *child_number):
-            """
-            Returns the value located in the tag specified by tag_name from a given node. Walks therefor the
-            node's children along as indicated by child_number, e.g., childNumber = (1,2,) first goes to the 1st child,
-            and then to the 2nd child of the first child -> elem.childNodes[1].childNodes[2].
-            """
-            elem = node.getElementsByTagName(tag_name)
-            if len(elem) == 1:
-                elem = elem[0]
-                for c in child_number:
-                    if len(elem.childNodes) > 0:
-                        elem = elem.childNodes[c]
-                    else:
-                        return ""
-                return elem.data
-            else:
-                return ""
-
         print("Label file found. Loading labels...")
+        labels = []
+        root = None
+        depth = 0
         try:
-            dom = minidom.parse(self.label_file_path)
-        except Exception:
-            # TODO: more specific exception
+            for event, elem in ElementTree.iterparse(self.label_file_path, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                        # Check if version of parser and version of file match
+                        if elem.tag == self.TAG_ROOT and elem.get(self.ATTR_VERSION) != self.ATTR_VERSION_VALUE:
+                            print("The file " + self.label_file_path + " was created by another version of "
+                                                                       "ID2TLib.LabelManager. Ignoring label file.")
+                    depth += 1
+                    continue
+
+                depth -= 1
+                # only the children of the root element are complete subtrees of interest
+                if depth != 1:
+                    continue
+                if elem.tag == self.TAG_INPUT:
+                    self.input_filename = elem.findtext(self.TAG_FILE_NAME, "")
+                    self.input_hash = elem.findtext(self.TAG_FILE_HASH, "")
+                elif elem.tag == self.TAG_OUTPUT:
+                    self.output_filename = elem.findtext(self.TAG_FILE_NAME, "")
+                    self.output_hash = elem.findtext(self.TAG_FILE_HASH, "")
+                elif elem.tag == self.TAG_ATTACK:
+                    labels.append(self._parse_label(elem))
+                    # drop the parsed attacks to keep the memory usage constant
+                    root.clear()
+        except ElementTree.ParseError:
             print('ERROR: Provided label file could not be parsed. Ignoring label file')
             return
 
-        # Check if version of parser and version of file match
-        version = dom.getElementsByTagName(self.TAG_ROOT)
-        if len(version) > 0:
-            version = version[0].getAttribute(self.ATTR_VERSION)
-            if version == [] or not version == self.ATTR_VERSION_VALUE:
-                print(
-                    "The file " + self.label_file_path + " was created by another version of ID2TLib.LabelManager. "
-                                                         "Ignoring label file.")
-
-        self.input_filename = get_value_from_node(dom, self.TAG_INPUT, 1, 0)
-        self.input_hash = get_value_from_node(dom, self.TAG_INPUT, 3, 0)
-        self.output_filename = get_value_from_node(dom, self.TAG_OUTPUT, 1, 0)
-        self.output_hash = get_value_from_node(dom, self.TAG_OUTPUT, 3, 0)
-
-        # Parse attacks from XML file
-        attacks = dom.getElementsByTagName(self.TAG_ATTACK)
-        count_labels = 0
-        for a in attacks:
-            attack_name = get_value_from_node(a, self.TAG_ATTACK_NAME, 0)
-            attack_note = get_value_from_node(a, self.TAG_ATTACK_NOTE, 0)
-            timestamp_start = get_value_from_node(a, self.TAG_TIMESTAMP_START, 1, 0)
-            timestamp_end = get_value_from_node(a, self.TAG_TIMESTAMP_END, 1, 0)
-            attack_seed = get_value_from_node(a, self.TAG_ATTACK_SEED, 0)
-
-            # Instantiate this attack to create a parameter list with the correct types
-            attack_module = importlib.import_module("Attack." + attack_name)
-            attack_class = getattr(attack_module, attack_name)
-            attack = attack_class()
-
-            # Loop through all parameters listed in the XML file
-            param = a.getElementsByTagName(self.TAG_PARAMETERS)[0]
-            for param in param.childNodes:
-                # Skip empty text nodes returned by minidom
-                if not isinstance(param, minidom.Text):
-                    import distutils.util
-                    param_name = param.tagName
-                    param_value = param.childNodes[0].nodeValue
-                    param_userspecified = bool(distutils.util.strtobool(param.getAttribute(self.ATTR_PARAM_USERSPECIFIED)))
-                    attack.add_param_value(param_name, param_value, param_userspecified)
-
-            # Create the label from the data read
-            label = Label.Label(attack_name, float(timestamp_start), float(timestamp_end), attack_seed, attack.params,
-                                attack_note)
-            self.labels.append(label)
-            count_labels += 1
-
-        print("Read " + str(count_labels) + " label(s) successfully.")
+        self.labels.extend(labels)
+        print("Read " + str(len(labels)) + " label(s) successfully.")
+
+    def _parse_label(self, attack_elem):
+        """
+        Creates the label of an attack element of a label file.
+
+        :param attack_elem: The attack element
+        :return: the label
+        """
+        attack_name = attack_elem.findtext(self.TAG_ATTACK_NAME, "")
+        attack_note = attack_elem.findtext(self.TAG_ATTACK_NOTE, "")
+        timestamp_start = attack_elem.findtext(self.TAG_TIMESTAMP_START + "/" + self.TAG_TIMESTAMP, "")
+        timestamp_end = attack_elem.findtext(self.TAG_TIMESTAMP_END + "/" + self.TAG_TIMESTAMP, "")
+        attack_seed = attack_elem.findtext(self.TAG_ATTACK_SEED, "")
+        injected_packets = int(attack_elem.findtext(self.TAG_ATTACK_PACKETS, "") or 0)
+
+        # Type the parameters by the cached schema of the attack instead of instantiating the attack
+        supported_params = AttackRegistry.get_supported_params(attack_name)
+        params = {}
+        import distutils.util
+        for param in attack_elem.find(self.TAG_PARAMETERS):
+            if not any(param.tag == item.value for item in atkParam.Parameter):
+                print("ERROR: Parameter " + param.tag + " is not supported by ID2T. Skipping parameter.")
+                continue
+            param_name = atkParam.Parameter(param.tag)
+            param_type = supported_params.get(param_name)
+            if param_type is None:
+                print('Parameter ' + str(param_name) + ' not available for attack ' + attack_name +
+                      '. Skipping parameter.')
+                continue
+
+            is_valid, param_value = AttackRegistry.parse_param_value(param_type, param.text or "")
+            if not is_valid:
+                print("ERROR: Parameter " + param.tag + " or parameter value " + str(param.text) +
+                      " not valid. Skipping parameter.")
+                continue
+            param_userspecified = bool(distutils.util.strtobool(param.get(self.ATTR_PARAM_USERSPECIFIED)))
+            params[param_name] = BaseAttack.BaseAttack.ValuePair(param_value, param_userspecified)
+
+        # Create the label from the data read
+        return Label.Label(attack_name, float(timestamp_start), float(timestamp_end), injected_packets, attack_seed,
+                           params, attack_note)
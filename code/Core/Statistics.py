@@ -1,16 +1,20 @@
 import os
 import random
+import shutil
 import time
-import numpy
 from math import sqrt, ceil, log
 from operator import itemgetter
 
 import ID2TLib.libpcapreader as pr
+import Core.ComplementRateTable as ComplementRateTable
+import Core.IntervalIndex as IntervalIndex
+import Core.StatisticsExport as StatisticsExport
+import Core.StatisticsPlots as StatisticsPlots
 import Core.StatsDatabase as statsDB
 import ID2TLib.PcapFile as PcapFile
 import ID2TLib.Utility as Util
 from ID2TLib.IPv4 import IPAddress
-import matplotlib.pyplot as plt
+import scapy.utils as pcr
 
 
 class Statistics:
@@ -27,10 +31,12 @@ class Statistics:
         self.file_info = None
         self.kbyte_rate = {"local": None, "public": None}
         self.interval_stat = {}
+        self.interval_indexes = {}
+        self.complement_rate_tables = {}
         self.interval_len = None
 
         # Create folder for statistics database if required
-        self.path_db = pcap_file.get_db_path()
+        self.path_db = pcap_file.get_db_path(loaded=True)
         path_dir = os.path.dirname(self.path_db)
         if not os.path.isdir(path_dir):
             os.makedirs(path_dir)
@@ -78,7 +84,8 @@ class Statistics:
         return previous_intervals
 
     def load_pcap_statistics(self, flag_write_file: bool, flag_recalculate_stats: bool, flag_print_statistics: bool,
-                             flag_non_verbose: bool, intervals, delete: bool=False, recalculate_intervals: bool=None):
+                             flag_non_verbose: bool, intervals, delete: bool=False, recalculate_intervals: bool=None,
+                             threads: int=1):
         """
         Loads the PCAP statistics for the file specified by pcap_filepath. If the database is not existing yet, the
         statistics are calculated by the PCAP file processor and saved into the newly created database. Otherwise the
@@ -92,6 +99,7 @@ class Statistics:
         :param intervals: user specified interval in seconds
         :param delete: Delete old interval statistics.
         :param recalculate_intervals: Recalculate old interval statistics or not. Prompt user if None.
+        :param threads: Number of threads used by the PCAP file processor to collect the statistics.
         """
         # Load pcap and get loading time
         time_start = time.clock()
@@ -149,7 +157,7 @@ class Statistics:
                 print("User specified intervals will be used to calculate interval statistics: " +
                       str(current_intervals)[1:-1])
 
-            self.pcap_proc.collect_statistics(intervals)
+            self.pcap_proc.collect_statistics(intervals, threads)
             self.pcap_proc.write_to_database(self.path_db, intervals, delete)
             outstring_datasource = "by PCAP file processor."
 
@@ -172,7 +180,7 @@ class Statistics:
                 final_intervals = intervals
 
             if final_intervals != [0.0]:
-                self.pcap_proc.collect_statistics(final_intervals)
+                self.pcap_proc.collect_statistics(final_intervals, threads)
                 self.pcap_proc.write_new_interval_statistics(self.path_db, final_intervals)
 
         self.stats_db.set_current_interval_statistics_tables(current_intervals)
@@ -192,6 +200,81 @@ class Statistics:
         if flag_print_statistics:
             self.print_statistics()
 
+    def update_pcap_statistics(self, pcap_file: PcapFile.PcapFile, injected_pcap_paths: list, threads: int=1):
+        """
+        Derives the statistics database of a PCAP file, which consists of the packets of this statistics' PCAP file and
+        the injected packets of other PCAP files, from the already calculated statistics instead of processing the
+        whole PCAP file again. Only the injected packets are processed; their statistics are folded into a copy of this
+        statistics database, which becomes the database of the given PCAP file. If injected packets lie outside of the
+        intervals of the interval statistics, the statistics of the given PCAP file are recalculated instead.
+
+        :param pcap_file: the PcapFile object of the PCAP file containing the base and the injected packets
+        :param injected_pcap_paths: the paths to the PCAP files containing only the injected packets, e.g. the
+                                    temporary PCAP files of the attacks
+        :param threads: Number of threads used by the PCAP file processor to collect the statistics.
+        """
+        time_start = time.perf_counter()
+
+        path_db = pcap_file.get_db_path(loaded=True)
+        path_dir = os.path.dirname(path_db)
+        if not os.path.isdir(path_dir):
+            os.makedirs(path_dir)
+
+        injected_db_path = path_db + ".injected"
+        for path in [path_db, injected_db_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+        shutil.copyfile(self.path_db, path_db)
+        stats_db = statsDB.StatsDatabase(path_db)
+        interval_range = stats_db.get_interval_range()
+        injected_packets_count = 0
+        recalculate = False
+        try:
+            # the statistics of the injected packets are collected and folded in per PCAP file, which avoids merging
+            # the PCAP files beforehand
+            for injected_pcap_path in injected_pcap_paths:
+                injected_packets = []
+                injected_pcap = pcr.RawPcapReader(injected_pcap_path)
+                for pkt, metadata in injected_pcap:
+                    # Ethernet frames are padded to the minimum frame size of 60 bytes, like in the PCAP file processor
+                    injected_packets.append((metadata[0] * 1000000 + metadata[1], max(len(pkt), 60)))
+                injected_pcap.close()
+
+                # the intervals start at the first packet and end at the first packet after their barrier, so injected
+                # packets outside of them change the intervals of the whole file
+                if interval_range is not None and any(not interval_range[0] <= timestamp < interval_range[1]
+                                                      for timestamp, _ in injected_packets):
+                    recalculate = True
+                    break
+
+                pcap_proc = pr.pcap_processor(injected_pcap_path, str(self.do_extra_tests), Util.RESOURCE_DIR,
+                                              injected_db_path)
+                pcap_proc.collect_statistics([0.0], threads)
+                pcap_proc.write_to_database(injected_db_path, [0.0], False)
+
+                stats_db.fold_statistics(injected_db_path, injected_packets)
+                injected_packets_count += len(injected_packets)
+                os.remove(injected_db_path)
+        finally:
+            stats_db.database.close()
+
+        if recalculate:
+            print("Injected packets lie outside of the interval statistics. Recalculating statistics.")
+            os.remove(path_db)
+            intervals = self.list_previous_interval_statistic_tables(output=False) or [0.0]
+            pcap_proc = pr.pcap_processor(pcap_file.pcap_file_path, str(self.do_extra_tests), Util.RESOURCE_DIR,
+                                          path_db)
+            pcap_proc.collect_statistics(intervals, threads)
+            pcap_proc.write_to_database(path_db, intervals, False)
+            time_end = time.perf_counter()
+            print("Recalculated file statistics in " + str(time_end - time_start)[:4] + " sec.")
+            return
+
+        time_end = time.perf_counter()
+        print("Updated file statistics in " + str(time_end - time_start)[:4] + " sec with " +
+              str(injected_packets_count) + " injected packets.")
+
     def get_file_information(self):
         """
         Returns a list of tuples, each containing a information of the file.
@@ -331,6 +414,18 @@ class Statistics:
             self.interval_len = int(current_table[len("statistics_interval_"):])
         return self.interval_len
 
+    def get_interval_index(self, table_name: str=""):
+        """
+        :param table_name: name of the interval statistics table, the current one if no name is given
+        :return: the IntervalIndex of the interval statistics table, which is loaded once and kept in memory
+        """
+        if table_name == "":
+            table_name = self.stats_db.get_current_interval_statistics_table()
+        if table_name not in self.interval_indexes:
+            start = int(Util.get_timestamp_from_datetime_str(self.get_pcap_timestamp_start()) * 1000000)
+            self.interval_indexes[table_name] = IntervalIndex.IntervalIndex(self.stats_db, table_name, start)
+        return self.interval_indexes[table_name]
+
     def get_interval_stat(self, table_name: str, field: str="", timestamp: int=0):
         """
         Takes an interval statistics table name, field/column name and a timestamp and provides the requested stat.
@@ -344,37 +439,11 @@ class Statistics:
         if field not in self.interval_stat.keys():
             self.interval_stat[field] = {}
 
-        # get unix timestamp depending on pcap start timestamp
-        start = int(Util.get_timestamp_from_datetime_str(self.get_pcap_timestamp_start()) * 1000000)
-        diff = timestamp * 1000000
-        # catch --inject-empty timestamp issue
-        if diff > start:
-            diff -= start
-        unix_timestamp = start + diff
-
-        # get interval length
-        interval_length = self.get_current_interval_len()
-
-        interval = start + int(diff/interval_length) * interval_length
+        index = self.get_interval_index(table_name)
+        interval = int(index.interval_keys(timestamp))
 
         if interval not in self.interval_stat[field].keys():
-            # get interval borders
-            lower = int(unix_timestamp - interval_length)
-            upper = int(unix_timestamp)
-            # catch negative borders
-            if lower < 0:
-                lower = 0
-
-            # get interval start timestamps
-            query_result = self.stats_db.process_interval_statistics_query\
-                ("SELECT {0} FROM %s WHERE {1} BETWEEN {2} AND {3}".format(field, "first_pkt_timestamp", lower, upper),
-                 table_name)
-
-            result = None
-            if query_result:
-                result = query_result[0][0]
-
-            self.interval_stat[field][interval] = result
+            self.interval_stat[field][interval] = index.lookup(field, timestamp)
 
         return self.interval_stat[field][interval], interval
 
@@ -476,6 +545,18 @@ class Statistics:
 
         return complement_interval_pps
 
+    def get_complement_rate_table(self, pps):
+        """
+        :param pps: the maximum packet rate the complement packet rates are normalized to
+        :return: the ComplementRateTable of the complement packet rates of the current interval statistics table, which
+                 is calculated once per table and packet rate
+        """
+        key = (self.stats_db.get_current_interval_statistics_table(), pps)
+        if key not in self.complement_rate_tables:
+            self.complement_rate_tables[key] = \
+                ComplementRateTable.ComplementRateTable(self.calculate_complement_packet_rates(pps))
+        return self.complement_rate_tables[key]
+
     def get_tests_statistics(self):
         """
         Writes the calculated basic defects tests statistics into a file.
@@ -1090,812 +1171,34 @@ class Statistics:
         sd = sqrt(variance)
         return sd
 
-    def plot_statistics(self, entropy: int, file_format: str = 'pdf'):  # 'png'
+    def plot_statistics(self, entropy: int, file_format: str = 'pdf', plot_names: list = None, processes: int = 1,
+                        top_k: int = None):
         """
         Plots the statistics associated with the dataset.
 
         :param entropy: the statistics entropy
         :param file_format: The format to be used to save the statistics diagrams.
+        :param plot_names: The names of the plots to create, None to create the default plots that are not up to date,
+                           see StatisticsPlots.PLOT_NAMES
+        :param processes: The number of worker processes rendering the plots.
+        :param top_k: The number K of bars of the scalable plots, None to plot all IPs, connections and values.
         """
+        StatisticsPlots.plot_statistics(self, entropy, file_format, plot_names, processes, top_k)
+        print("Saved plots in the input PCAP directory.")
 
-        def plot_distribution(query_output, title, x_label, y_label, file_ending: str):
-            """
-            TODO: FILL ME
-            :param query_output:
-            :param title:
-            :param x_label:
-            :param y_label:
-            :param file_ending:
-            :return:
-            """
-            plt.gcf().clear()
-            graphx, graphy = [], []
-            for row in query_output:
-                graphx.append(row[0])
-                graphy.append(row[1])
-            plt.autoscale(enable=True, axis='both')
-            plt.title(title)
-            plt.xlabel(x_label)
-            plt.ylabel(y_label)
-            width = 0.1
-            plt.xlim([0, (max(graphx) * 1.1)])
-            plt.grid(True)
-            plt.bar(graphx, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
-            out = self.pcap_filepath.replace('.pcap', '_plot-' + title + file_ending)
-            plt.savefig(out, dpi=500)
-            return out
-
-        def plot_ttl(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_user_defined_query(
-                "SELECT ttlValue, SUM(ttlCount) FROM ip_ttl GROUP BY ttlValue")
-            title = "TTL Distribution"
-            x_label = "TTL Value"
-            y_label = "Number of Packets"
-            if query_output:
-                return plot_distribution(query_output, title, x_label, y_label, file_ending)
-
-        def plot_mss(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_user_defined_query(
-                "SELECT mssValue, SUM(mssCount) FROM tcp_mss GROUP BY mssValue")
-            title = "MSS Distribution"
-            x_label = "MSS Value"
-            y_label = "Number of Packets"
-            if query_output:
-                return plot_distribution(query_output, title, x_label, y_label, file_ending)
-
-        def plot_win(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_user_defined_query(
-                "SELECT winSize, SUM(winCount) FROM tcp_win GROUP BY winSize")
-            title = "Window Size Distribution"
-            x_label = "Window Size"
-            y_label = "Number of Packets"
-            if query_output:
-                return plot_distribution(query_output, title, x_label, y_label, file_ending)
-
-        def plot_protocol(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            plt.gcf().clear()
-            result = self.stats_db.process_user_defined_query(
-                "SELECT protocolName, SUM(protocolCount) FROM ip_protocols GROUP BY protocolName")
-            if result:
-                graphx, graphy = [], []
-                for row in result:
-                    graphx.append(row[0])
-                    graphy.append(row[1])
-                plt.autoscale(enable=True, axis='both')
-                plt.title("Protocols Distribution")
-                plt.xlabel('Protocols')
-                plt.ylabel('Number of Packets')
-                width = 0.1
-                plt.xlim([0, len(graphx)])
-                plt.grid(True)
-
-                # Protocols' names on x-axis
-                x = range(0, len(graphx))
-                my_xticks = graphx
-                plt.xticks(x, my_xticks)
-
-                plt.bar(x, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
-                out = self.pcap_filepath.replace('.pcap', '_plot-protocol' + file_ending)
-                plt.savefig(out, dpi=500)
-                return out
-            else:
-                print("Error plot protocol: No protocol values found!")
-
-        def plot_port(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            plt.gcf().clear()
-            result = self.stats_db.process_user_defined_query(
-                "SELECT portNumber, SUM(portCount) FROM ip_ports GROUP BY portNumber")
-            graphx, graphy = [], []
-            for row in result:
-                graphx.append(row[0])
-                graphy.append(row[1])
-            plt.autoscale(enable=True, axis='both')
-            plt.title("Ports Distribution")
-            plt.xlabel('Ports Numbers')
-            plt.ylabel('Number of Packets')
-            width = 0.1
-            plt.xlim([0, max(graphx)])
-            plt.grid(True)
-            plt.bar(graphx, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
-            out = self.pcap_filepath.replace('.pcap', '_plot-port' + file_ending)
-            plt.savefig(out, dpi=500)
-            return out
-
-        # This distribution is not drawable for big datasets
-        def plot_ip_src(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            plt.gcf().clear()
-            result = self.stats_db.process_user_defined_query(
-                "SELECT ipAddress, pktsSent FROM ip_statistics")
-            graphx, graphy = [], []
-            for row in result:
-                graphx.append(row[0])
-                graphy.append(row[1])
-            plt.autoscale(enable=True, axis='both')
-            plt.title("Source IP Distribution")
-            plt.xlabel('Source IP')
-            plt.ylabel('Number of Packets')
-            width = 0.1
-            plt.xlim([0, len(graphx)])
-            plt.grid(True)
-
-            # IPs on x-axis
-            x = range(0, len(graphx))
-            my_xticks = graphx
-            plt.xticks(x, my_xticks, rotation='vertical', fontsize=5)
-            # plt.tight_layout()
-
-            # limit the number of xticks
-            plt.locator_params(axis='x', nbins=20)
-
-            plt.bar(x, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
-            out = self.pcap_filepath.replace('.pcap', '_plot-ip-src' + file_ending)
-            plt.savefig(out, dpi=500)
-            return out
-
-        # This distribution is not drawable for big datasets
-        def plot_ip_dst(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            plt.gcf().clear()
-            result = self.stats_db.process_user_defined_query(
-                "SELECT ipAddress, pktsReceived FROM ip_statistics")
-            graphx, graphy = [], []
-            for row in result:
-                graphx.append(row[0])
-                graphy.append(row[1])
-            plt.autoscale(enable=True, axis='both')
-            plt.title("Destination IP Distribution")
-            plt.xlabel('Destination IP')
-            plt.ylabel('Number of Packets')
-            width = 0.1
-            plt.xlim([0, len(graphx)])
-            plt.grid(True)
-
-            # IPs on x-axis
-            x = range(0, len(graphx))
-            my_xticks = graphx
-            plt.xticks(x, my_xticks, rotation='vertical', fontsize=5)
-            # plt.tight_layout()
-
-            # limit the number of xticks
-            plt.locator_params(axis='x', nbins=20)
-
-            plt.bar(x, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
-            out = self.pcap_filepath.replace('.pcap', '_plot-ip-dst' + file_ending)
-            plt.savefig(out, dpi=500)
-            return out
-
-        def plot_interval_statistics(query_output, title, x_label, y_label, file_ending: str):
-            """
-            TODO: FILL ME
-            :param query_output:
-            :param title:
-            :param x_label:
-            :param y_label:
-            :param file_ending:
-            :return:
-            """
-            plt.gcf().clear()
-            graphx, graphy = [], []
-            for row in query_output:
-                graphx.append(row[0])
-                graphy.append(row[1])
-            plt.autoscale(enable=True, axis='both')
-            plt.title(title)
-            plt.xlabel(x_label)
-            plt.ylabel(y_label)
-            width = 0.5
-            plt.xlim([0, len(graphx)])
-            plt.grid(True)
-
-            # timestamp on x-axis
-            x = range(0, len(graphx))
-
-            # limit the number of xticks
-            plt.locator_params(axis='x', nbins=20)
-
-            plt.bar(x, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
-            out = self.pcap_filepath.replace('.pcap', '_plot-' + title + file_ending)
-            plt.savefig(out, dpi=500)
-            return out
-
-        def plot_interval_pkt_count(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, pkts_count FROM %s ORDER BY last_pkt_timestamp")
-            title = "Packet Rate"
-            x_label = "Time Interval"
-            y_label = "Number of Packets"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_ip_src_ent(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, ip_src_entropy FROM %s ORDER BY last_pkt_timestamp")
-            title = "Source IP Entropy"
-            x_label = "Time Interval"
-            y_label = "Entropy"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_ip_dst_ent(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, ip_dst_entropy FROM %s ORDER BY last_pkt_timestamp")
-            title = "Destination IP Entropy"
-            x_label = "Time Interval"
-            y_label = "Entropy"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_new_ip(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, newIPCount FROM %s ORDER BY last_pkt_timestamp")
-            title = "IP Novelty Distribution"
-            x_label = "Time Interval"
-            y_label = "Novel values count"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_new_port(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, port_novel_count FROM %s ORDER BY last_pkt_timestamp")
-            title = "Port Novelty Distribution"
-            x_label = "Time Interval"
-            y_label = "Novel values count"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_new_ttl(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, ttl_novel_count FROM %s ORDER BY last_pkt_timestamp")
-            title = "TTL Novelty Distribution"
-            x_label = "Time Interval"
-            y_label = "Novel values count"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_new_tos(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, tos_novel_count FROM %s ORDER BY last_pkt_timestamp")
-            title = "ToS Novelty Distribution"
-            x_label = "Time Interval"
-            y_label = "Novel values count"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_new_win_size(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, win_size_novel_count FROM %s ORDER BY last_pkt_timestamp")
-            title = "Window Size Novelty Distribution"
-            x_label = "Time Interval"
-            y_label = "Novel values count"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_new_mss(file_ending: str):
-            """
-            TODO: FILL ME
-            :param file_ending:
-            :return:
-            """
-            query_output = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, mss_novel_count FROM %s ORDER BY last_pkt_timestamp")
-            title = "MSS Novelty Distribution"
-            x_label = "Time Interval"
-            y_label = "Novel values count"
-            if query_output:
-                return plot_interval_statistics(query_output, title, x_label, y_label, file_ending)
-
-        def plot_interval_ip_cum_ent(ip_type: str, file_ending: str):
-            """
-            TODO: FILL ME
-            :param ip_type: source or destination
-            :param file_ending:
-            :return:
-            """
-            if ip_type is "src":
-                sod = "Src"
-                full = "Source"
-            elif ip_type is "dst":
-                sod = "Dst"
-                full = "Destination"
-            else:
-                return None
-
-            plt.gcf().clear()
-            result = self.stats_db.process_interval_statistics_query(
-                "SELECT last_pkt_timestamp, ip{0}_cum_entropy FROM %s ORDER BY last_pkt_timestamp".format(sod))
-            graphx, graphy = [], []
-            for row in result:
-                graphx.append(row[0])
-                graphy.append(row[1])
-            # If entropy was not calculated do not plot the graph
-            if graphy[0] != -1:
-                plt.autoscale(enable=True, axis='both')
-                plt.title(full + " IP Cumulative Entropy")
-                # plt.xlabel('Timestamp')
-                plt.xlabel('Time Interval')
-                plt.ylabel('Entropy')
-                plt.xlim([0, len(graphx)])
-                plt.grid(True)
-
-                # timestamp on x-axis
-                x = range(0, len(graphx))
-                # my_xticks = graphx
-                # plt.xticks(x, my_xticks, rotation='vertical', fontsize=5)
-                # plt.tight_layout()
-
-                # limit the number of xticks
-                plt.locator_params(axis='x', nbins=20)
-
-                plt.plot(x, graphy, 'r')
-                out = self.pcap_filepath.replace('.pcap', '_plot-interval-ip-' + ip_type + '-cum-ent' + file_ending)
-                plt.savefig(out, dpi=500)
-                return out
-
-        def plot_degree(degree_type: str, file_ending: str):
-            """
-            Creates a Plot, visualizing a degree for every IP Address
-
-            :param degree_type: the type of degree, which should be plotted
-            :param file_ending: The file extension for the output file containing the plot, e.g. "pdf"
-            :return: A filepath to the file containing the created plot
-            """
-            if degree_type not in ["in", "out", "overall"]:
-                return None
-
-            plt.gcf().clear()
-
-            # retrieve data
-
-            degree = self.stats_db.process_user_defined_query(
-                "SELECT ipAddress, %s FROM ip_degrees" % (degree_type + "Degree"))
-
-            if degree is None:
-                return None
-
-            graphx, graphy = [], []
-            for entry in degree:
-                if entry[1] <= 0:
-                    continue
-                # degree values
-                graphx.append(entry[1])
-                # IP labels
-                graphy.append(entry[0])
-
-            # set labels
-            plt.title(degree_type + " Degree per IP Address")
-            plt.ylabel('IpAddress')
-            plt.xlabel(degree_type + 'Degree')
-
-            # set width of the bars
-            width = 0.3
-
-            # set scalings
-            plt.figure(
-                figsize=(int(len(graphx)) / 20 + 5, int(len(graphy) / 5) + 5))  # these proportions just worked well
-
-            # set limits of the axis
-            plt.ylim([0, len(graphy)])
-            plt.xlim([0, max(graphx) + 10])
-
-            # display numbers at each bar
-            for i, v in enumerate(graphx):
-                plt.text(v + 1, i + .1, str(v), color='blue', fontweight='bold')
-
-            # display grid for better visuals
-            plt.grid(True)
-
-            # plot the bar
-            labels = graphy
-            graphy = list(range(len(graphx)))
-            plt.barh(graphy, graphx, width, align='center', linewidth=1, color='red', edgecolor='red')
-            plt.yticks(graphy, labels)
-            out = self.pcap_filepath.replace('.pcap', '_plot-' + degree_type + ' Degree of an IP' + file_ending)
-            # plt.tight_layout()
-            plt.savefig(out, dpi=500)
-
-            return out
-
-        def plot_big_conv_ext_stat(attr: str, title: str, xlabel: str, suffix: str):
-            """
-            Plots the desired statistc per connection as horizontal bar plot.
-            Included are 'half-open' connections, where only one packet is exchanged.
-            The given statistics table has to have at least the attributes 'ipAddressA', 'portA', 'ipAddressB',
-            'portB' and the specified additional attribute.
-            Note: there may be cutoff/scaling problems within the plot if there is too little data.
-
-            :param attr: The desired statistic, named with respect to its attribute in the given statistics table
-            :param title: The title of the created plot
-            :param xlabel: The name of the x-axis of the created plot
-            :param suffix: The suffix of the created file, including file extension
-            :return: A filepath to the file containing the created plot
-            """
-            plt.gcf().clear()
-            result = self.stats_db.process_user_defined_query(
-                "SELECT ipAddressA, portA, ipAddressB, portB, %s FROM conv_statistics_extended" % attr)
-
-            if result:
-                graphy, graphx = [], []
-                # plot data in descending order
-                result = sorted(result, key=lambda r: r[4])
-                # compute plot data
-                for i, row in enumerate(result):
-                    addr1, addr2 = "%s:%d" % (row[0], row[1]), "%s:%d" % (row[2], row[3])
-                    # adjust the justification of strings to improve appearance
-                    len_max = max(len(addr1), len(addr2))
-                    addr1 = addr1.ljust(len_max)
-                    addr2 = addr2.ljust(len_max)
-                    # add plot data
-                    graphy.append("%s\n%s" % (addr1, addr2))
-                    graphx.append(row[4])
-
-            # have x axis and its label appear at the top (instead of bottom)
-            fig, ax = plt.subplots()
-            ax.xaxis.tick_top()
-            ax.xaxis.set_label_position("top")
-
-            # compute plot height in inches for scaling the plot
-            dist_mult_height = 0.55  # this value turned out to work well
-            plt_height = len(graphy) * dist_mult_height
-            # originally, a good title distance turned out to be 1.012 with a plot height of 52.8
-            title_distance = 1 + 0.012 * 52.8 / plt_height
-
-            plt.gcf().set_size_inches(plt.gcf().get_size_inches()[0], plt_height)  # set plot height
-            plt.gcf().subplots_adjust(left=0.35)
-
-            # set additional plot parameters
-            plt.title(title, y=title_distance)
-            plt.xlabel(xlabel)
-            plt.ylabel('Connection')
-            width = 0.5
-            plt.grid(True)
-            plt.gca().margins(y=0)  # removes the space between data and x-axis within the plot
-
-            # plot the above data, first use plain numbers as graphy to maintain sorting
-            plt.barh(range(len(graphy)), graphx, width, align='center', linewidth=0.5, color='red', edgecolor='red')
-            # now change the y numbers to the respective address labels
-            plt.yticks(range(len(graphy)), graphy)
-
-            # save created figure
-            out = self.pcap_filepath.replace('.pcap', suffix)
-            plt.savefig(out, dpi=500)
-            return out
-
-        def plot_packets_per_connection(file_ending: str):
-            """
-            Plots the total number of exchanged packets per connection.
-
-            :param file_ending: The file extension for the output file containing the plot
-            :return: A filepath to the file containing the created plot
-            """
-
-            title = 'Number of exchanged packets per connection'
-            suffix = '_plot-PktCount per Connection Distribution' + file_ending
-
-            # plot data and return outpath
-            return plot_big_conv_ext_stat("pktsCount", title, "Number of packets", suffix)
-
-        def plot_avg_pkts_per_comm_interval(file_ending: str):
-            """
-            Plots the average number of exchanged packets per communication interval for every connection.
-
-            :param file_ending: The file extension for the output file containing the plot
-            :return: A filepath to the file containing the created plot
-            """
-
-            title = 'Average number of exchanged packets per communication interval'
-            suffix = '_plot-Avg PktCount Communication Interval Distribution' + file_ending
-
-            # plot data and return outpath
-            return plot_big_conv_ext_stat("avgIntervalPktCount", title, "Number of packets", suffix)
-
-        def plot_avg_time_between_comm_interval(file_ending: str):
-            """
-            Plots the average time between the communication intervals of every connection.
-
-            :param file_ending: The file extension for the output file containing the plot
-            :return: A filepath to the file containing the created plot
-            """
-
-            title = 'Average time between communication intervals in seconds'
-            suffix = '_plot-Avg Time Between Communication Intervals Distribution' + file_ending
-
-            # plot data and return outpath
-            return plot_big_conv_ext_stat("avgTimeBetweenIntervals", title, 'Average time between intervals', suffix)
-
-        def plot_avg_comm_interval_time(file_ending: str):
-            """
-            Plots the average duration of a communication interval of every connection.
-
-            :param file_ending: The file extension for the output file containing the plot
-            :return: A filepath to the file containing the created plot
-            """
-
-            title = 'Average duration of a communication interval in seconds'
-            suffix = '_plot-Avg Duration Communication Interval Distribution' + file_ending
-
-            # plot data and return outpath
-            return plot_big_conv_ext_stat("avgIntervalTime", title, 'Average interval time', suffix)
-
-        def plot_total_comm_duration(file_ending: str):
-            """
-            Plots the total communication duration of every connection.
-
-            :param file_ending: The file extension for the output file containing the plot
-            :return: A filepath to the file containing the created plot
-            """
-
-            title = 'Total communication duration in seconds'
-            suffix = '_plot-Total Communication Duration Distribution' + file_ending
-
-            # plot data and return outpath
-            return plot_big_conv_ext_stat("totalConversationDuration", title, 'Duration', suffix)
-
-        def plot_comm_histogram(attr: str, title: str, label: str, suffix: str):
-            """
-            Plots a histogram about the specified attribute for communications.
-            :param attr: The statistics attribute for this histogram
-            :param title: The title of the histogram
-            :param label: The xlabel of the histogram
-            :param suffix: The file suffix
-            :return: The path to the created plot
-            """
-
-            plt.gcf().clear()
-            result_raw = self.stats_db.process_user_defined_query(
-                "SELECT %s FROM conv_statistics_extended" % attr)
-
-            # return without plotting if no data available
-            if not result_raw:
-                return None
-
-            result = []
-            for entry in result_raw:
-                result.append(entry[0])
-
-            # if title would be cut off, set minimum width
-            plt_size = plt.gcf().get_size_inches()
-            min_width = len(title) * 0.12
-            if plt_size[0] < min_width:
-                plt.gcf().set_size_inches(min_width, plt_size[1])  # set plot size
-
-            # set additional plot parameters
-            plt.title(title)
-            plt.ylabel("Relative frequency of connections")
-            plt.xlabel(label)
-            plt.grid(True)
-
-            # create 11 bins
-            bins = []
-            max_val = max(result)
-            for i in range(0, 11):
-                bins.append(i * max_val / 10)
-
-            # set weights normalize histogram
-            weights = numpy.ones_like(result) / float(len(result))
-
-            # plot the above data, first use plain numbers as graphy to maintain sorting
-            plt.hist(result, bins=bins, weights=weights, color='red', edgecolor='red', align="mid", rwidth=0.5)
-            plt.xticks(bins)
-
-            # save created figure
-            out = self.pcap_filepath.replace('.pcap', suffix)
-            plt.savefig(out, dpi=500)
-            return out
-
-        def plot_histogram_degree(degree_type: str, title: str, label: str, suffix: str):
-            """
-            Plots a histogram about the specified type for the degree of an IP.
-            :param degree_type: The type of degree, i.e. inDegree, outDegree or overallDegree
-            :param title: The title of the histogram
-            :param label: The xlabel of the histogram
-            :param suffix: The file suffix
-            :return: The path to the created plot
-            """
-
-            plt.gcf().clear()
-            result_raw = self.get_filtered_degree(degree_type)
-
-            # return without plotting if no data available
-            if not result_raw:
-                return None
-
-            result = []
-            for entry in result_raw:
-                result.append(entry[1])
-
-            # set additional plot parameters
-            plt.title(title)
-            plt.ylabel("Relative frequency of IPs")
-            plt.xlabel(label)
-            plt.grid(True)
-
-            # create 11 bins
-            bins = []
-            max_val = max(result)
-            for i in range(0, 11):
-                bins.append(int(i * max_val / 10))
-
-            # set weights normalize histogram
-            weights = numpy.ones_like(result) / float(len(result))
-
-            # plot the above data, first use plain numbers as graphy to maintain sorting
-            plt.hist(result, bins=bins, weights=weights, color='red', edgecolor='red', align="mid", rwidth=0.5)
-            plt.xticks(bins)
-
-            # save created figure
-            out = self.pcap_filepath.replace('.pcap', suffix)
-            plt.savefig(out, dpi=500)
-            return out
-
-        ttl_out_path = plot_ttl('.' + file_format)
-        print(".", end="", flush=True)
-        mss_out_path = plot_mss('.' + file_format)
-        print(".", end="", flush=True)
-        win_out_path = plot_win('.' + file_format)
-        print(".", end="", flush=True)
-        protocol_out_path = plot_protocol('.' + file_format)
-        print(".", end="", flush=True)
-        plot_interval_pktCount = plot_interval_pkt_count('.' + file_format)
-        print(".", end="", flush=True)
-        if entropy:
-            plot_interval_ip_src_ent = plot_interval_ip_src_ent('.' + file_format)
-            print(".", end="", flush=True)
-            plot_interval_ip_dst_ent = plot_interval_ip_dst_ent('.' + file_format)
-            print(".", end="", flush=True)
-            plot_interval_ip_src_cum_ent = plot_interval_ip_cum_ent("src", '.' + file_format)
-            print(".", end="", flush=True)
-            plot_interval_ip_dst_cum_ent = plot_interval_ip_cum_ent("dst", '.' + file_format)
-            print(".", end="", flush=True)
-        plot_interval_new_ip = plot_interval_new_ip('.' + file_format)
-        print(".", end="", flush=True)
-        plot_interval_new_port = plot_interval_new_port('.' + file_format)
-        print(".", end="", flush=True)
-        plot_interval_new_ttl = plot_interval_new_ttl('.' + file_format)
-        print(".", end="", flush=True)
-        plot_interval_new_tos = plot_interval_new_tos('.' + file_format)
-        print(".", end="", flush=True)
-        plot_interval_new_win_size = plot_interval_new_win_size('.' + file_format)
-        print(".", end="", flush=True)
-        plot_interval_new_mss = plot_interval_new_mss('.' + file_format)
-        print(".", end="", flush=True)
-        plot_hist_indegree_out = plot_histogram_degree("inDegree", "Histogram - Ingoing degree per IP Address",
-                                                       "Ingoing degree",
-                                                       "_plot-Histogram Ingoing Degree per IP" + file_format)
-        print(".", end="", flush=True)
-        plot_hist_outdegree_out = plot_histogram_degree("outDegree", "Histogram - Outgoing degree per IP Address",
-                                                        "Outgoing degree",
-                                                        "_plot-Histogram Outgoing Degree per IP" + file_format)
-        print(".", end="", flush=True)
-        plot_hist_overalldegree_out = plot_histogram_degree("overallDegree",
-                                                            "Histogram - Overall degree per IP Address",
-                                                            "Overall degree",
-                                                            "_plot-Histogram Overall Degree per IP" + file_format)
-        print(".", end="", flush=True)
-        plot_hist_pkts_per_connection_out = plot_comm_histogram("pktsCount",
-                                                                "Histogram - Number of exchanged packets per connection",
-                                                                "Number of packets",
-                                                                "_plot-Histogram PktCount per Connection" + "." + file_format)
-        print(".", end="", flush=True)
-        plot_hist_avgpkts_per_commint_out = plot_comm_histogram("avgIntervalPktCount",
-                                                                "Histogram - Average number of exchanged packets per communication interval",
-                                                                "Average number of packets",
-                                                                "_plot-Histogram Avg PktCount per Interval per Connection" + "." + file_format)
-        print(".", end="", flush=True)
-        plot_hist_avgtime_betw_commints_out = plot_comm_histogram("avgTimeBetweenIntervals",
-                                                                  "Histogram - Average time between communication intervals in seconds",
-                                                                  "Average time between intervals",
-                                                                  "_plot-Histogram Avg Time Between Intervals per Connection" + "." + file_format)
-        print(".", end="", flush=True)
-        plot_hist_avg_int_time_per_connection_out = plot_comm_histogram("avgIntervalTime",
-                                                                        "Histogram - Average duration of a communication interval in seconds",
-                                                                        "Average interval time",
-                                                                        "_plot-Histogram Avg Interval Time per Connection" + "." + file_format)
-        print(".", end="", flush=True)
-        plot_hist_total_comm_duration_out = plot_comm_histogram("totalConversationDuration",
-                                                                "Histogram - Total communication duration in seconds",
-                                                                "Duration",
-                                                                "_plot-Histogram Communication Duration per Connection" + "." + file_format)
-        print(".", end="", flush=True)
-        if entropy:
-            plot_out_degree = plot_degree("out", '.' + file_format)
-            print(".", end="", flush=True)
-            plot_in_degree = plot_degree("in", '.' + file_format)
-            print(".", end="", flush=True)
-            plot_overall_degree = plot_degree("overall", '.' + file_format)
-            print(".", end="", flush=True)
-            plot_packets_per_connection_out = plot_packets_per_connection('.' + file_format)
-            print(".", end="", flush=True)
-            plot_avg_pkts_per_comm_interval_out = plot_avg_pkts_per_comm_interval('.' + file_format)
-            print(".", end="", flush=True)
-            plot_avg_time_between_comm_interval_out = plot_avg_time_between_comm_interval('.' + file_format)
-            print(".", end="", flush=True)
-            plot_avg_comm_interval_time_out = plot_avg_comm_interval_time("." + file_format)
-            print(".", end="", flush=True)
-            plot_total_comm_duration_out = plot_total_comm_duration("." + file_format)
-            print(".", end="", flush=True)
-        print(" done.")
-
-        # Time consuming plot
-        # port_out_path = plot_port('.' + format)
-        # Not drawable for too many IPs
-        # ip_src_out_path = plot_ip_src('.' + format)
-        # ip_dst_out_path = plot_ip_dst('.' + format)
+    def export_columnar(self, file_format: str = "npy", out_dir: str = None):
+        """
+        Exports the IP, conversation and interval statistics to a columnar format.
 
-        print("Saved plots in the input PCAP directory.")
+        :param file_format: The columnar format, see StatisticsExport.FORMATS.
+        :param out_dir: The directory to export the statistics to, None to export them next to the input PCAP.
+        :return: the directory the statistics were exported to
+        """
+        if out_dir is None:
+            out_dir = os.path.splitext(self.pcap_filepath)[0] + "_statistics"
+        tables = StatisticsExport.export_statistics(self.path_db, out_dir, file_format)
+        print("Exported {} statistics tables to {}".format(len(tables), out_dir))
+        return out_dir
 
     def stats_summary_post_attack(self, added_packets):
         """
@@ -0,0 +1,139 @@
+import os.path
+import sqlite3
+import urllib.request
+
+import numpy
+
+# The tables exported besides the interval statistics tables
+EXPORTED_TABLES = ["ip_statistics", "conv_statistics", "conv_statistics_extended"]
+INTERVAL_TABLE_PREFIX = "interval_statistics_"
+
+FORMATS = ["npy", "parquet"]
+
+
+def _connect_read_only(db_path: str):
+    """
+    :param db_path: The path to the statistics database
+    :return: a read-only connection to the statistics database
+    """
+    return sqlite3.connect("file:{}?mode=ro".format(urllib.request.pathname2url(db_path)), uri=True)
+
+
+def get_exported_tables(connection: sqlite3.Connection):
+    """
+    :param connection: A connection to the statistics database
+    :return: the names of the exported tables existing in the database, the interval statistics tables last
+    """
+    existing = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")]
+    interval_tables = [name for name in existing if name.startswith(INTERVAL_TABLE_PREFIX)]
+    return [name for name in EXPORTED_TABLES if name in existing] + interval_tables
+
+
+def _to_array(values: list, declared_type: str):
+    """
+    Converts the values of a column to an array, typed by the declared type of the column.
+
+    :param values: The values of the column
+    :param declared_type: The SQL type of the column, like INTEGER, REAL or TEXT
+    :return: the array of the values; NULL is stored as NaN in numeric and as empty string in text columns
+    """
+    declared_type = declared_type.upper()
+    if "INT" in declared_type:
+        if None not in values:
+            return numpy.array(values, dtype=numpy.int64)
+        declared_type = "REAL"
+    if any(name in declared_type for name in ["REAL", "FLOA", "DOUB", "NUMERIC"]):
+        return numpy.array([numpy.nan if value is None else value for value in values], dtype=numpy.float64)
+    return numpy.array(["" if value is None else str(value) for value in values], dtype=str)
+
+
+def read_table_columns(connection: sqlite3.Connection, table: str):
+    """
+    Reads a table of the statistics database column-wise.
+
+    :param connection: A connection to the statistics database
+    :param table: The name of the table
+    :return: a dict of the column names and the arrays of their values
+    """
+    columns = [(row[1], row[2]) for row in connection.execute("PRAGMA table_info('%s')" % table)]
+    rows = connection.execute("SELECT * FROM '%s'" % table).fetchall()
+    values = list(zip(*rows)) if rows else [() for _ in columns]
+    return {name: _to_array(list(column_values), declared_type)
+            for (name, declared_type), column_values in zip(columns, values)}
+
+
+def export_statistics(db_path: str, out_dir: str, file_format: str = "npy"):
+    """
+    Exports the IP, conversation and interval statistics of a statistics database to a columnar format, so that they
+    can be analyzed vectorized without querying the database row by row. The tables are written to
+    out_dir/<table>/<column>.npy for the format npy, which can be memory-mapped by load_statistics, or to
+    out_dir/<table>.parquet for the format parquet, which requires pyarrow.
+
+    :param db_path: The path to the statistics database
+    :param out_dir: The directory to write the tables to
+    :param file_format: The columnar format, see FORMATS
+    :return: the names of the exported tables
+    """
+    if file_format not in FORMATS:
+        raise ValueError("Unknown export format {}, the supported formats are: {}".format(file_format,
+                                                                                          ", ".join(FORMATS)))
+    if file_format == "parquet":
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("Exporting the statistics to Parquet requires pyarrow, use the format npy instead.")
+
+    connection = _connect_read_only(db_path)
+    try:
+        tables = get_exported_tables(connection)
+        os.makedirs(out_dir, exist_ok=True)
+        for table in tables:
+            columns = read_table_columns(connection, table)
+            if file_format == "parquet":
+                pyarrow.parquet.write_table(pyarrow.table(columns), os.path.join(out_dir, table + ".parquet"))
+            else:
+                table_dir = os.path.join(out_dir, table)
+                os.makedirs(table_dir, exist_ok=True)
+                for name, values in columns.items():
+                    numpy.save(os.path.join(table_dir, name + ".npy"), values)
+    finally:
+        connection.close()
+    return tables
+
+
+def load_statistics(export_dir: str, tables: list = None, mmap: bool = True, as_pandas: bool = False):
+    """
+    Loads statistics exported by export_statistics.
+
+    :param export_dir: The directory the statistics were exported to
+    :param tables: The names of the tables to load, None to load all exported tables
+    :param mmap: Whether the columns of the format npy are memory-mapped instead of read into memory
+    :param as_pandas: Whether the tables are returned as pandas DataFrames, which requires pandas
+    :return: a dict of the table names and their columns, each table as dict of the column names and their arrays or as
+             DataFrame
+    """
+    if tables is None:
+        tables = sorted(os.path.splitext(name)[0] for name in os.listdir(export_dir)
+                        if name.endswith(".parquet") or os.path.isdir(os.path.join(export_dir, name)))
+
+    result = {}
+    for table in tables:
+        parquet_path = os.path.join(export_dir, table + ".parquet")
+        if os.path.exists(parquet_path):
+            import pyarrow.parquet
+            arrow_table = pyarrow.parquet.read_table(parquet_path)
+            columns = {name: arrow_table.column(name).to_numpy() for name in arrow_table.column_names}
+        else:
+            table_dir = os.path.join(export_dir, table)
+            if not os.path.isdir(table_dir):
+                raise ValueError("The table {} was not exported to {}.".format(table, export_dir))
+            columns = {os.path.splitext(name)[0]: numpy.load(os.path.join(table_dir, name),
+                                                             mmap_mode="r" if mmap else None)
+                       for name in sorted(os.listdir(table_dir)) if name.endswith(".npy")}
+        result[table] = columns
+
+    if as_pandas:
+        import pandas
+        result = {table: pandas.DataFrame(columns) for table, columns in result.items()}
+    return result
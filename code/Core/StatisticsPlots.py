@@ -0,0 +1,795 @@
+import multiprocessing
+import os
+
+import matplotlib.pyplot as plt
+import numpy
+
+# The number of logarithmic bins of the histograms of the scalable plots
+LOG_HISTOGRAM_BINS = 20
+
+
+#################################################
+########         Plot rendering          ########
+#################################################
+
+def _save_figure(fig, out: str):
+    """
+    Saves a figure and releases it.
+
+    :param fig: The figure to be saved
+    :param out: The path of the output file
+    :return: the path of the output file
+    """
+    fig.savefig(out, dpi=500)
+    plt.close(fig)
+    return out
+
+
+def _bar_distribution(graphx, graphy, width, bins: int = None):
+    """
+    Draws the bars of a distribution of values, summed up into equally wide bins if there are more values than bins.
+
+    :param graphx: The values
+    :param graphy: The counts of the values
+    :param width: The width of the bars of single values
+    :param bins: The maximum number of bars, None to draw a bar for every value
+    """
+    if bins is not None and len(graphx) > bins:
+        counts, edges = numpy.histogram(graphx, bins=bins, weights=graphy)
+        plt.bar(edges[:-1], counts, numpy.diff(edges), align='edge', linewidth=1, color='red', edgecolor='red')
+    else:
+        plt.bar(graphx, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
+
+
+def render_distribution(data, out: str, title: str, x_label: str, y_label: str, bins: int = None):
+    """
+    Plots a distribution of values as bar plot.
+
+    :param data: The rows (value, count) of the distribution
+    :param out: The path of the output file
+    :param title: The title of the plot
+    :param x_label: The label of the x-axis
+    :param y_label: The label of the y-axis
+    :param bins: The maximum number of bars, None to draw a bar for every value
+    :return: the path of the output file
+    """
+    fig = plt.figure()
+    graphx, graphy = [], []
+    for row in data:
+        graphx.append(row[0])
+        graphy.append(row[1])
+    plt.autoscale(enable=True, axis='both')
+    plt.title(title)
+    plt.xlabel(x_label)
+    plt.ylabel(y_label)
+    width = 0.1
+    plt.xlim([0, (max(graphx) * 1.1)])
+    plt.grid(True)
+    _bar_distribution(graphx, graphy, width, bins)
+    return _save_figure(fig, out)
+
+
+def render_labeled_distribution(data, out: str, title: str, x_label: str, y_label: str, label_size: int = None):
+    """
+    Plots a distribution of labeled values, e.g. protocols or IPs, as bar plot with the labels on the x-axis.
+
+    :param data: The rows (label, count) of the distribution
+    :param out: The path of the output file
+    :param title: The title of the plot
+    :param x_label: The label of the x-axis
+    :param y_label: The label of the y-axis
+    :param label_size: The font size of the vertical labels, None for horizontal labels in the default size
+    :return: the path of the output file
+    """
+    fig = plt.figure()
+    graphx, graphy = [], []
+    for row in data:
+        graphx.append(row[0])
+        graphy.append(row[1])
+    plt.autoscale(enable=True, axis='both')
+    plt.title(title)
+    plt.xlabel(x_label)
+    plt.ylabel(y_label)
+    width = 0.1
+    plt.xlim([0, len(graphx)])
+    plt.grid(True)
+
+    # labels on x-axis
+    x = range(0, len(graphx))
+    if label_size is None:
+        plt.xticks(x, graphx)
+    else:
+        plt.xticks(x, graphx, rotation='vertical', fontsize=label_size)
+        # limit the number of xticks
+        plt.locator_params(axis='x', nbins=20)
+
+    plt.bar(x, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
+    return _save_figure(fig, out)
+
+
+def render_port_distribution(data, out: str, bins: int = None):
+    """
+    Plots the distribution of the port numbers as bar plot.
+
+    :param data: The rows (port number, count) of the distribution
+    :param out: The path of the output file
+    :param bins: The maximum number of bars, None to draw a bar for every port
+    :return: the path of the output file
+    """
+    fig = plt.figure()
+    graphx, graphy = [], []
+    for row in data:
+        graphx.append(row[0])
+        graphy.append(row[1])
+    plt.autoscale(enable=True, axis='both')
+    plt.title("Ports Distribution")
+    plt.xlabel('Ports Numbers')
+    plt.ylabel('Number of Packets')
+    width = 0.1
+    plt.xlim([0, max(graphx)])
+    plt.grid(True)
+    _bar_distribution(graphx, graphy, width, bins)
+    return _save_figure(fig, out)
+
+
+def render_interval_statistics(data, out: str, title: str, x_label: str, y_label: str, bins: int = None):
+    """
+    Plots an interval statistic as bar plot over the intervals.
+
+    :param data: The rows (last timestamp of the interval, value) of the intervals
+    :param out: The path of the output file
+    :param title: The title of the plot
+    :param x_label: The label of the x-axis
+    :param y_label: The label of the y-axis
+    :param bins: The maximum number of bars, each showing the mean of consecutive intervals, None to draw a bar for
+                 every interval
+    :return: the path of the output file
+    """
+    fig = plt.figure()
+    graphy = [row[1] for row in data]
+    if bins is not None and len(graphy) > bins:
+        graphy = [chunk.mean() for chunk in numpy.array_split(numpy.array(graphy, dtype=float), bins)]
+    plt.autoscale(enable=True, axis='both')
+    plt.title(title)
+    plt.xlabel(x_label)
+    plt.ylabel(y_label)
+    width = 0.5
+    plt.xlim([0, len(graphy)])
+    plt.grid(True)
+
+    # timestamp on x-axis
+    x = range(0, len(graphy))
+
+    # limit the number of xticks
+    plt.locator_params(axis='x', nbins=20)
+
+    plt.bar(x, graphy, width, align='center', linewidth=1, color='red', edgecolor='red')
+    return _save_figure(fig, out)
+
+
+def render_interval_cum_entropy(data, out: str, title: str):
+    """
+    Plots a cumulative entropy as line plot over the intervals.
+
+    :param data: The rows (last timestamp of the interval, cumulative entropy) of the intervals
+    :param out: The path of the output file
+    :param title: The title of the plot
+    :return: the path of the output file
+    """
+    fig = plt.figure()
+    graphy = [row[1] for row in data]
+    plt.autoscale(enable=True, axis='both')
+    plt.title(title)
+    plt.xlabel('Time Interval')
+    plt.ylabel('Entropy')
+    plt.xlim([0, len(graphy)])
+    plt.grid(True)
+
+    # timestamp on x-axis
+    x = range(0, len(graphy))
+
+    # limit the number of xticks
+    plt.locator_params(axis='x', nbins=20)
+
+    plt.plot(x, graphy, 'r')
+    return _save_figure(fig, out)
+
+
+def render_degree(data, out: str, degree_type: str):
+    """
+    Plots a degree for every IP address as horizontal bar plot.
+
+    :param data: The rows (IP address, degree) of the IPs with a positive degree
+    :param out: The path of the output file
+    :param degree_type: The type of degree, in, out or overall
+    :return: the path of the output file
+    """
+    # degree values
+    graphx = [entry[1] for entry in data]
+    # IP labels
+    labels = [entry[0] for entry in data]
+
+    # set scalings
+    # these proportions just worked well
+    fig = plt.figure(figsize=(int(len(graphx)) / 20 + 5, int(len(labels) / 5) + 5))
+
+    # set labels
+    plt.title(degree_type + " Degree per IP Address")
+    plt.ylabel('IpAddress')
+    plt.xlabel(degree_type + 'Degree')
+
+    # set width of the bars
+    width = 0.3
+
+    # set limits of the axis
+    plt.ylim([0, len(labels)])
+    plt.xlim([0, max(graphx) + 10])
+
+    # display numbers at each bar
+    for i, v in enumerate(graphx):
+        plt.text(v + 1, i + .1, str(v), color='blue', fontweight='bold')
+
+    # display grid for better visuals
+    plt.grid(True)
+
+    # plot the bar
+    graphy = list(range(len(graphx)))
+    plt.barh(graphy, graphx, width, align='center', linewidth=1, color='red', edgecolor='red')
+    plt.yticks(graphy, labels)
+    return _save_figure(fig, out)
+
+
+def render_conv_statistic(data, out: str, title: str, x_label: str):
+    """
+    Plots a statistic per connection as horizontal bar plot.
+    Note: there may be cutoff/scaling problems within the plot if there is too little data.
+
+    :param data: The rows (label, value) of the connections, sorted by the value
+    :param out: The path of the output file
+    :param title: The title of the plot
+    :param x_label: The label of the x-axis
+    :return: the path of the output file
+    """
+    graphy = [row[0] for row in data]
+    graphx = [row[1] for row in data]
+
+    # have x axis and its label appear at the top (instead of bottom)
+    fig, ax = plt.subplots()
+    ax.xaxis.tick_top()
+    ax.xaxis.set_label_position("top")
+
+    # compute plot height in inches for scaling the plot
+    dist_mult_height = 0.55  # this value turned out to work well
+    plt_height = len(graphy) * dist_mult_height
+    # originally, a good title distance turned out to be 1.012 with a plot height of 52.8
+    title_distance = 1 + 0.012 * 52.8 / plt_height
+
+    fig.set_size_inches(fig.get_size_inches()[0], plt_height)  # set plot height
+    fig.subplots_adjust(left=0.35)
+
+    # set additional plot parameters
+    plt.title(title, y=title_distance)
+    plt.xlabel(x_label)
+    plt.ylabel('Connection')
+    width = 0.5
+    plt.grid(True)
+    plt.gca().margins(y=0)  # removes the space between data and x-axis within the plot
+
+    # plot the above data, first use plain numbers as graphy to maintain sorting
+    plt.barh(range(len(graphy)), graphx, width, align='center', linewidth=0.5, color='red', edgecolor='red')
+    # now change the y numbers to the respective address labels
+    plt.yticks(range(len(graphy)), graphy)
+    return _save_figure(fig, out)
+
+
+def render_log_histogram(data, out: str, title: str, x_label: str, y_label: str):
+    """
+    Plots a histogram with logarithmic bins, which was already computed.
+
+    :param data: A tuple of the bin edges and the relative frequencies of the bins
+    :param out: The path of the output file
+    :param title: The title of the histogram
+    :param x_label: The label of the x-axis
+    :param y_label: The label of the y-axis
+    :return: the path of the output file
+    """
+    edges, frequencies = data
+    fig = plt.figure()
+
+    # if title would be cut off, set minimum width
+    plt_size = fig.get_size_inches()
+    min_width = len(title) * 0.12
+    if plt_size[0] < min_width:
+        fig.set_size_inches(min_width, plt_size[1])  # set plot size
+
+    plt.title(title)
+    plt.ylabel(y_label)
+    plt.xlabel(x_label + " (log scale)")
+    plt.grid(True)
+    plt.xscale('log')
+    plt.bar(edges[:-1], frequencies, numpy.diff(edges), align='edge', color='red', edgecolor='white')
+    return _save_figure(fig, out)
+
+
+def render_histogram(data, out: str, title: str, x_label: str, y_label: str, integer_bins: bool = False):
+    """
+    Plots a histogram of values with 10 bins, normalized to relative frequencies.
+
+    :param data: The values
+    :param out: The path of the output file
+    :param title: The title of the histogram
+    :param x_label: The label of the x-axis
+    :param y_label: The label of the y-axis
+    :param integer_bins: Whether the bin edges are rounded down to integers
+    :return: the path of the output file
+    """
+    fig = plt.figure()
+
+    # if title would be cut off, set minimum width
+    plt_size = fig.get_size_inches()
+    min_width = len(title) * 0.12
+    if plt_size[0] < min_width:
+        fig.set_size_inches(min_width, plt_size[1])  # set plot size
+
+    # set additional plot parameters
+    plt.title(title)
+    plt.ylabel(y_label)
+    plt.xlabel(x_label)
+    plt.grid(True)
+
+    # create 11 bins
+    bins = []
+    max_val = max(data)
+    for i in range(0, 11):
+        bins.append(int(i * max_val / 10) if integer_bins else i * max_val / 10)
+
+    # set weights normalize histogram
+    weights = numpy.ones_like(data) / float(len(data))
+
+    # plot the above data, first use plain numbers as graphy to maintain sorting
+    plt.hist(data, bins=bins, weights=weights, color='red', edgecolor='red', align="mid", rwidth=0.5)
+    plt.xticks(bins)
+    return _save_figure(fig, out)
+
+
+#################################################
+########      Plot data retrieval        ########
+#################################################
+
+def _query(query: str):
+    """
+    :param query: A SQL query over the statistics database
+    :return: a function retrieving the result of the query from a Statistics object
+    """
+    return lambda statistics: statistics.stats_db.process_user_defined_query(query)
+
+
+def _interval_query(query: str):
+    """
+    :param query: A SQL query over the current interval statistics table, which is inserted for %s
+    :return: a function retrieving the result of the query from a Statistics object
+    """
+    return lambda statistics: statistics.stats_db.process_interval_statistics_query(query)
+
+
+def _cum_entropy(ip_type: str):
+    """
+    :param ip_type: Src or Dst
+    :return: a function retrieving the cumulative entropies of the intervals, None if they were not calculated
+    """
+    def fetch(statistics):
+        result = statistics.stats_db.process_interval_statistics_query(
+            "SELECT last_pkt_timestamp, ip{0}_cum_entropy FROM %s ORDER BY last_pkt_timestamp".format(ip_type))
+        # If entropy was not calculated do not plot the graph
+        if result and result[0][1] != -1:
+            return result
+        return None
+    return fetch
+
+
+def _degrees(degree_type: str):
+    """
+    :param degree_type: in, out or overall
+    :return: a function retrieving the IPs with a positive degree of the given type
+    """
+    def fetch(statistics):
+        degree = statistics.stats_db.process_user_defined_query(
+            "SELECT ipAddress, %s FROM ip_degrees" % (degree_type + "Degree"))
+        return [entry for entry in degree or [] if entry[1] > 0]
+    return fetch
+
+
+def _conv_label(row):
+    """
+    :param row: A row starting with ipAddressA, portA, ipAddressB, portB of a connection
+    :return: the label of the connection
+    """
+    addr1, addr2 = "%s:%d" % (row[0], row[1]), "%s:%d" % (row[2], row[3])
+    # adjust the justification of strings to improve appearance
+    len_max = max(len(addr1), len(addr2))
+    return "%s\n%s" % (addr1.ljust(len_max), addr2.ljust(len_max))
+
+
+def _conv_statistic(attr: str):
+    """
+    :param attr: An attribute of the table conv_statistics_extended
+    :return: a function retrieving the labels of the connections with the attribute, sorted by the attribute
+    """
+    def fetch(statistics):
+        result = statistics.stats_db.process_user_defined_query(
+            "SELECT ipAddressA, portA, ipAddressB, portB, %s FROM conv_statistics_extended" % attr)
+        return [(_conv_label(row), row[4]) for row in sorted(result or [], key=lambda r: r[4])]
+    return fetch
+
+
+def _conv_values(attr: str):
+    """
+    :param attr: An attribute of the table conv_statistics_extended
+    :return: a function retrieving the values of the attribute of all connections
+    """
+    def fetch(statistics):
+        result = statistics.stats_db.process_user_defined_query("SELECT %s FROM conv_statistics_extended" % attr)
+        return [entry[0] for entry in result or []]
+    return fetch
+
+
+def _degree_values(degree_type: str):
+    """
+    :param degree_type: inDegree, outDegree or overallDegree
+    :return: a function retrieving the positive degrees of the given type of all IPs
+    """
+    return lambda statistics: [entry[1] for entry in statistics.get_filtered_degree(degree_type)]
+
+
+def _top_k(table: str, columns: str, value: str, label, other: str, ascending: bool = False, positive: bool = False):
+    """
+    Returns a function retrieving the rows with the K largest values of a table and an "other" row with the mean value
+    of the remaining rows, so that the plot of the rows is bounded by K instead of the number of rows.
+
+    :param table: The table to retrieve the rows from
+    :param columns: The columns labeling a row
+    :param value: The column of the values
+    :param label: A function creating the label from the label columns of a row
+    :param other: The label of the "other" row, formatted with the number of remaining rows
+    :param ascending: Whether the rows are returned in ascending order, with the "other" row first, or in descending
+                      order, with the "other" row last
+    :param positive: Whether only rows with a positive value are retrieved
+    :return: a function retrieving the rows (label, value) from a Statistics object and K
+    """
+    where = "WHERE {} > 0".format(value) if positive else ""
+
+    def fetch(statistics, k: int):
+        query = statistics.stats_db.process_user_defined_query
+        rows = query("SELECT {0}, {1} FROM {2} {3} ORDER BY {1} DESC, {0} LIMIT {4}".format(
+            columns, value, table, where, k))
+        result = [(label(row), row[-1]) for row in rows or []]
+        remaining = query("SELECT COUNT(*), AVG(v) FROM (SELECT {0} AS v FROM {1} {2} ORDER BY {0} DESC, {3} "
+                          "LIMIT -1 OFFSET {4})".format(value, table, where, columns, k))
+        if remaining and remaining[0][0]:
+            result.append((other.format(remaining[0][0]), round(remaining[0][1], 2)))
+        if ascending:
+            result.reverse()
+        return result
+    return fetch
+
+
+def _log_histogram(table: str, column: str):
+    """
+    Returns a function computing a histogram with logarithmic bins of the positive values of a column in SQL, so that
+    only the counts of the bins are retrieved from the database.
+
+    :param table: The table containing the column
+    :param column: The column of the values
+    :return: a function retrieving the bin edges and the relative frequencies of the bins from a Statistics object
+    """
+    def fetch(statistics, k: int):
+        query = statistics.stats_db.process_user_defined_query
+        bounds = query("SELECT MIN({0}), MAX({0}), COUNT(*) FROM {1} WHERE {0} > 0".format(column, table))
+        if not bounds or not bounds[0][2]:
+            return None
+        min_val, max_val, count = bounds[0]
+        bins = LOG_HISTOGRAM_BINS if max_val > min_val else 1
+        edges = numpy.logspace(numpy.log10(min_val), numpy.log10(max_val), bins + 1)
+        edges[-1] = max_val * (1 + 1e-9)
+
+        cases = " ".join("WHEN {0} < {1!r} THEN {2}".format(column, float(edge), i)
+                         for i, edge in enumerate(edges[1:-1]))
+        bin_expression = "CASE {0} ELSE {1} END".format(cases, bins - 1) if cases else "0"
+        frequencies = numpy.zeros(bins)
+        for i, bin_count in query("SELECT {0}, COUNT(*) FROM {1} WHERE {2} > 0 GROUP BY 1".format(
+                bin_expression, table, column)):
+            frequencies[i] = bin_count / count
+        return edges, frequencies
+    return fetch
+
+
+#################################################
+########         Plot selection          ########
+#################################################
+
+class Plot(object):
+    def __init__(self, name: str, suffix: str, fetch, render, entropy: bool = False, default: bool = True,
+                 fetch_scalable=None, render_scalable=None, scalable_options: dict = None, binned: bool = False,
+                 **options):
+        """
+        Creates a new Plot, which describes how to retrieve the data of a plot from the statistics and how to render it.
+
+        :param name: The name to select the plot by
+        :param suffix: The suffix of the output file, which is appended to the name of the PCAP file
+        :param fetch: A function retrieving the data of the plot from a Statistics object, returning None or an empty
+                      result if there is nothing to plot
+        :param render: A module level function rendering the data to an output file, called with the data, the path
+                       of the output file and the options
+        :param entropy: Whether the plot is only created by default if the extra tests were performed
+        :param default: Whether the plot is created by default or only if it is selected by its name
+        :param fetch_scalable: A function retrieving the data of the scalable plot from a Statistics object and the
+                               number K of bars, None if the plot has no scalable variant with its own data
+        :param render_scalable: The render function of the scalable plot, None to use the render function
+        :param scalable_options: The options passed to the render function of the scalable plot, None to pass the
+                                 options
+        :param binned: Whether the render function bins its data into at most K bars in the scalable plot
+        :param options: The options passed to the render function
+        """
+        self.name = name
+        self.suffix = suffix
+        self.fetch = fetch
+        self.render = render
+        self.entropy = entropy
+        self.default = default
+        self.fetch_scalable = fetch_scalable
+        self.render_scalable = render_scalable or render
+        self.scalable_options = options if scalable_options is None else scalable_options
+        self.binned = binned
+        self.options = options
+
+    def is_scalable(self):
+        """
+        :return: whether the scalable plot differs from the plot
+        """
+        return self.fetch_scalable is not None or self.binned
+
+    def get_job(self, statistics, out: str, top_k: int = None):
+        """
+        Retrieves the data of the plot.
+
+        :param statistics: The Statistics object to retrieve the data from
+        :param out: The path of the output file
+        :param top_k: The number K of bars of the scalable plot, None for the plot of all data
+        :return: a job for _render_plot, None if there is nothing to plot
+        """
+        if top_k is not None and self.fetch_scalable is not None:
+            data = self.fetch_scalable(statistics, top_k)
+            render, options = self.render_scalable, dict(self.scalable_options)
+        else:
+            data = self.fetch(statistics)
+            render, options = self.render, dict(self.options)
+        if data is None or len(data) == 0:
+            return None
+
+        if top_k is not None and self.binned:
+            options["bins"] = top_k
+        return render, data, out, options
+
+
+def _interval_plot(name: str, column: str, title: str, y_label: str, entropy: bool = False):
+    """
+    :return: the Plot of a column of the current interval statistics table
+    """
+    return Plot(name, '_plot-' + title, _interval_query(
+        "SELECT last_pkt_timestamp, %s FROM %%s ORDER BY last_pkt_timestamp" % column),
+                render_interval_statistics, entropy=entropy, binned=True, title=title, x_label="Time Interval",
+                y_label=y_label)
+
+
+def _conv_plot(name: str, attr: str, title: str, x_label: str, suffix: str):
+    """
+    :return: the Plot of a statistic per connection
+    """
+    return Plot(name, '_plot-' + suffix, _conv_statistic(attr), render_conv_statistic, entropy=True,
+                fetch_scalable=_top_k("conv_statistics_extended", "ipAddressA, portA, ipAddressB, portB", attr,
+                                      _conv_label, "other {} connections\n(mean)", ascending=True),
+                title=title, x_label=x_label)
+
+
+def _conv_histogram(name: str, attr: str, title: str, x_label: str, suffix: str):
+    """
+    :return: the Plot of a histogram of a statistic per connection
+    """
+    return Plot(name, '_plot-Histogram ' + suffix, _conv_values(attr), render_histogram,
+                fetch_scalable=_log_histogram("conv_statistics_extended", attr), render_scalable=render_log_histogram,
+                title="Histogram - " + title, x_label=x_label, y_label="Relative frequency of connections")
+
+
+def _degree_histogram(name: str, degree_type: str, direction: str):
+    """
+    :return: the Plot of a histogram of a degree per IP
+    """
+    labels = dict(title="Histogram - %s degree per IP Address" % direction, x_label="%s degree" % direction,
+                  y_label="Relative frequency of IPs")
+    return Plot(name, '_plot-Histogram %s Degree per IP' % direction, _degree_values(degree_type), render_histogram,
+                fetch_scalable=_log_histogram("ip_degrees", degree_type), render_scalable=render_log_histogram,
+                scalable_options=labels, integer_bins=True, **labels)
+
+
+def _degree_plot(degree_type: str):
+    """
+    :return: the Plot of a degree per IP
+    """
+    return Plot(degree_type + "-degree", '_plot-' + degree_type + ' Degree of an IP', _degrees(degree_type),
+                render_degree, entropy=True,
+                fetch_scalable=_top_k("ip_degrees", "ipAddress", degree_type + "Degree", lambda row: row[0],
+                                      "other {} IPs (mean)", ascending=True, positive=True),
+                degree_type=degree_type)
+
+
+def _ip_plot(name: str, column: str, title: str, x_label: str):
+    """
+    :return: the Plot of the number of packets per IP
+    """
+    return Plot(name, '_plot-' + name, _query("SELECT ipAddress, %s FROM ip_statistics" % column),
+                render_labeled_distribution, default=False,
+                fetch_scalable=_top_k("ip_statistics", "ipAddress", column, lambda row: row[0], "other {} IPs (mean)"),
+                title=title, x_label=x_label, y_label="Number of Packets", label_size=5)
+
+
+# All plots in the order they are created
+PLOTS = [
+    Plot("ttl", '_plot-TTL Distribution', _query("SELECT ttlValue, SUM(ttlCount) FROM ip_ttl GROUP BY ttlValue"),
+         render_distribution, binned=True, title="TTL Distribution", x_label="TTL Value", y_label="Number of Packets"),
+    Plot("mss", '_plot-MSS Distribution', _query("SELECT mssValue, SUM(mssCount) FROM tcp_mss GROUP BY mssValue"),
+         render_distribution, binned=True, title="MSS Distribution", x_label="MSS Value", y_label="Number of Packets"),
+    Plot("win", '_plot-Window Size Distribution', _query("SELECT winSize, SUM(winCount) FROM tcp_win GROUP BY winSize"),
+         render_distribution, binned=True, title="Window Size Distribution", x_label="Window Size", y_label="Number of Packets"),
+    Plot("protocol", '_plot-protocol',
+         _query("SELECT protocolName, SUM(protocolCount) FROM ip_protocols GROUP BY protocolName"),
+         render_labeled_distribution, title="Protocols Distribution", x_label="Protocols",
+         y_label="Number of Packets"),
+    # Time consuming plot
+    Plot("port", '_plot-port', _query("SELECT portNumber, SUM(portCount) FROM ip_ports GROUP BY portNumber"),
+         render_port_distribution, default=False, binned=True),
+    # Not drawable for too many IPs, unless only the top K IPs are plotted
+    _ip_plot("ip-src", "pktsSent", "Source IP Distribution", "Source IP"),
+    _ip_plot("ip-dst", "pktsReceived", "Destination IP Distribution", "Destination IP"),
+    _interval_plot("interval-pkt-count", "pkts_count", "Packet Rate", "Number of Packets"),
+    _interval_plot("interval-ip-src-ent", "ip_src_entropy", "Source IP Entropy", "Entropy", entropy=True),
+    _interval_plot("interval-ip-dst-ent", "ip_dst_entropy", "Destination IP Entropy", "Entropy", entropy=True),
+    Plot("interval-ip-src-cum-ent", '_plot-interval-ip-src-cum-ent', _cum_entropy("Src"), render_interval_cum_entropy,
+         entropy=True, title="Source IP Cumulative Entropy"),
+    Plot("interval-ip-dst-cum-ent", '_plot-interval-ip-dst-cum-ent', _cum_entropy("Dst"), render_interval_cum_entropy,
+         entropy=True, title="Destination IP Cumulative Entropy"),
+    _interval_plot("interval-new-ip", "newIPCount", "IP Novelty Distribution", "Novel values count"),
+    _interval_plot("interval-new-port", "port_novel_count", "Port Novelty Distribution", "Novel values count"),
+    _interval_plot("interval-new-ttl", "ttl_novel_count", "TTL Novelty Distribution", "Novel values count"),
+    _interval_plot("interval-new-tos", "tos_novel_count", "ToS Novelty Distribution", "Novel values count"),
+    _interval_plot("interval-new-win-size", "win_size_novel_count", "Window Size Novelty Distribution",
+                   "Novel values count"),
+    _interval_plot("interval-new-mss", "mss_novel_count", "MSS Novelty Distribution", "Novel values count"),
+    _degree_histogram("hist-in-degree", "inDegree", "Ingoing"),
+    _degree_histogram("hist-out-degree", "outDegree", "Outgoing"),
+    _degree_histogram("hist-overall-degree", "overallDegree", "Overall"),
+    _conv_histogram("hist-pkts-per-connection", "pktsCount", "Number of exchanged packets per connection",
+                    "Number of packets", "PktCount per Connection"),
+    _conv_histogram("hist-avg-pkts-per-interval", "avgIntervalPktCount",
+                    "Average number of exchanged packets per communication interval", "Average number of packets",
+                    "Avg PktCount per Interval per Connection"),
+    _conv_histogram("hist-avg-time-between-intervals", "avgTimeBetweenIntervals",
+                    "Average time between communication intervals in seconds", "Average time between intervals",
+                    "Avg Time Between Intervals per Connection"),
+    _conv_histogram("hist-avg-interval-time", "avgIntervalTime",
+                    "Average duration of a communication interval in seconds", "Average interval time",
+                    "Avg Interval Time per Connection"),
+    _conv_histogram("hist-comm-duration", "totalConversationDuration",
+                    "Total communication duration in seconds", "Duration", "Communication Duration per Connection"),
+    _degree_plot("out"),
+    _degree_plot("in"),
+    _degree_plot("overall"),
+    _conv_plot("pkts-per-connection", "pktsCount", "Number of exchanged packets per connection", "Number of packets",
+               "PktCount per Connection Distribution"),
+    _conv_plot("avg-pkts-per-interval", "avgIntervalPktCount",
+               "Average number of exchanged packets per communication interval", "Number of packets",
+               "Avg PktCount Communication Interval Distribution"),
+    _conv_plot("avg-time-between-intervals", "avgTimeBetweenIntervals",
+               "Average time between communication intervals in seconds", "Average time between intervals",
+               "Avg Time Between Communication Intervals Distribution"),
+    _conv_plot("avg-interval-time", "avgIntervalTime", "Average duration of a communication interval in seconds",
+               "Average interval time", "Avg Duration Communication Interval Distribution"),
+    _conv_plot("comm-duration", "totalConversationDuration", "Total communication duration in seconds", "Duration",
+               "Total Communication Duration Distribution"),
+]
+
+PLOT_NAMES = [plot.name for plot in PLOTS]
+
+
+def select_plots(entropy: bool, plot_names: list = None):
+    """
+    :param entropy: Whether the extra tests were performed, which enables the plots of entropies, degrees and
+                    connections
+    :param plot_names: The names of the plots to create, None to create the default plots
+    :return: the selected Plots
+    """
+    if plot_names is None:
+        return [plot for plot in PLOTS if plot.default and (entropy or not plot.entropy)]
+
+    unknown_names = [name for name in plot_names if name not in PLOT_NAMES]
+    if unknown_names:
+        raise ValueError("Unknown plots: {}. Available plots: {}".format(", ".join(unknown_names),
+                                                                       ", ".join(PLOT_NAMES)))
+    return [plot for plot in PLOTS if plot.name in plot_names]
+
+
+#################################################
+########       Parallel rendering        ########
+#################################################
+
+def _init_plot_worker():
+    """
+    Initializes a worker process rendering plots with the non-interactive Agg backend.
+    """
+    plt.switch_backend("Agg")
+
+
+def _render_plot(job: tuple):
+    """
+    Renders a plot.
+
+    :param job: a tuple of the render function, the data, the path of the output file and the options of the plot
+    :return: the path of the output file
+    """
+    render, data, out, options = job
+    return render(data, out, **options)
+
+
+def plot_statistics(statistics, entropy: bool, file_format: str = 'pdf', plot_names: list = None,
+                    processes: int = 1, top_k: int = None):
+    """
+    Plots the statistics of a PCAP file. The data of all plots is retrieved from the statistics database first, then
+    the plots are rendered, in worker processes if requested. If no plots are selected by name, the default plots
+    whose output file is newer than the statistics database are skipped.
+
+    If top_k is given, the scalable plots are created, whose cost depends on K instead of the number of IPs and
+    connections: plots per IP or connection show the K largest values and an "other" bar with the mean of the rest,
+    histograms use logarithmic bins computed in SQL and distributions are summed up into at most K bins.
+
+    :param statistics: The Statistics object of the PCAP file
+    :param entropy: Whether the extra tests were performed
+    :param file_format: The format of the output files, e.g. pdf or png
+    :param plot_names: The names of the plots to create, None to create the default plots, see PLOT_NAMES
+    :param processes: The number of worker processes rendering the plots
+    :param top_k: The number K of bars of the scalable plots, None to create the plots of all data
+    :return: the paths of the created plots
+    """
+    if top_k is not None and top_k < 1:
+        raise ValueError("The number of bars of the scalable plots must be positive, got {}.".format(top_k))
+    db_time = os.path.getmtime(statistics.path_db)
+    jobs = []
+    skipped = 0
+    for plot in select_plots(entropy, plot_names):
+        suffix = plot.suffix
+        if top_k is not None and plot.is_scalable():
+            suffix += '-top%d' % top_k
+        out = statistics.pcap_filepath.replace('.pcap', suffix + '.' + file_format)
+        if plot_names is None and os.path.exists(out) and os.path.getmtime(out) > db_time:
+            skipped += 1
+            continue
+
+        job = plot.get_job(statistics, out, top_k)
+        if job is not None:
+            jobs.append(job)
+        elif plot.name == "protocol":
+            print("Error plot protocol: No protocol values found!")
+
+    created = []
+    if processes > 1 and len(jobs) > 1:
+        with multiprocessing.get_context("fork").Pool(min(processes, len(jobs)), initializer=_init_plot_worker) as pool:
+            for out in pool.imap(_render_plot, jobs):
+                created.append(out)
+                print(".", end="", flush=True)
+    else:
+        for job in jobs:
+            created.append(_render_plot(job))
+            print(".", end="", flush=True)
+    print(" done.")
+
+    if skipped:
+        print("Skipped {} plots, which are up to date with the statistics.".format(skipped))
+    return created
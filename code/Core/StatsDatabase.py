@@ -1,8 +1,11 @@
+import bisect
+import datetime
 import os.path
 import random as rnd
 import typing
 import sqlite3
 import sys
+import urllib.request
 
 import ID2TLib.libpcapreader as pr
 import Core.QueryParser as qp
@@ -36,10 +39,13 @@ class StatsDatabase:
         """
         self.query_parser = qp.QueryParser()
 
+        self.db_path = db_path
         self.existing_db = os.path.exists(db_path)
         self.database = sqlite3.connect(db_path)
         self.cursor = self.database.cursor()
         self.current_interval_statistics_tables = []
+        # Results of deterministic named queries, keyed by their query list
+        self.named_query_cache = {}
 
         # If DB not existing, create a new DB scheme
         if self.existing_db:
@@ -75,6 +81,14 @@ class StatsDatabase:
         """
         return self.existing_db
 
+    def reopen_read_only(self):
+        """
+        Replaces the connection to the database by a new read-only connection. Used by worker processes, which must
+        not use the connection inherited from their parent process.
+        """
+        self.database = sqlite3.connect("file:{}?mode=ro".format(urllib.request.pathname2url(self.db_path)), uri=True)
+        self.cursor = self.database.cursor()
+
     def get_db_outdated(self):
         """
         Retrieves the database version from the database and compares it to the version
@@ -130,6 +144,8 @@ class StatsDatabase:
         :param query_parameters: The tuple of parameters to inject into the query
         :return: the results of the query
         """
+        if not query_string.lstrip().lower().startswith("select"):
+            self.named_query_cache.clear()
         if query_parameters is not None:
             self.cursor.execute(query_string, query_parameters)
         else:
@@ -255,9 +271,14 @@ class StatsDatabase:
 
         where_clause = " AND ".join(conditions)
         query += where_clause
+        if keyword == "ipaddress":
+            # the indexes of the filtered columns change the order in which the joined rows are visited
+            query += " ORDER BY ip_statistics.ipAddress ASC"
         self.cursor.execute(query)
         return self.cursor.fetchall()
 
+    # The most_used, least_used and avg queries are precomputed by statistics_db::writeSummary of the PCAP file
+    # processor, changes to them must be made there as well; test_NamedQueries compares the results of both
     named_queries = {
         "most_used.ipaddress": "SELECT ipAddress FROM ip_statistics WHERE (pktsSent+pktsReceived) == "
                                "(SELECT MAX(pktsSent+pktsReceived) from ip_statistics) ORDER BY ipAddress ASC",
@@ -320,10 +341,39 @@ class StatsDatabase:
         "all.winsize": "SELECT DISTINCT winSize FROM tcp_win ORDER BY winSize ASC",
         "all.ipclass": "SELECT DISTINCT ipClass FROM ip_statistics ORDER BY ipClass ASC"}
 
+    @staticmethod
+    def _is_deterministic(query_list):
+        """
+        :param query_list: The query statement list obtained from the query parser
+        :return: True if the query and all of its nested queries do not select random results, otherwise False
+        """
+        for token in query_list:
+            if isinstance(token, (list, tuple, pp.ParseResults)):
+                if not StatsDatabase._is_deterministic(token):
+                    return False
+            elif token == "random":
+                return False
+        return True
+
     def _execute_query_list(self, query_list):
         """
         Recursively executes a list of named queries. They are of the following form:
         ['macaddress_param', [['ipaddress', 'in', ['most_used', 'ipaddress']]]]
+        The results of deterministic queries are cached, so that repeated queries do not access the database again.
+        :param query_list: The query statement list obtained from the query parser
+        :return: The result of the query (either a single result or a list).
+        """
+        if not self._is_deterministic(query_list):
+            return self._execute_query_list_uncached(query_list)
+
+        key = str(query_list)
+        if key not in self.named_query_cache:
+            self.named_query_cache[key] = self._execute_query_list_uncached(query_list)
+        return list(self.named_query_cache[key])
+
+    def _execute_query_list_uncached(self, query_list):
+        """
+        Recursively executes a list of named queries without looking up cached results.
         :param query_list: The query statement list obtained from the query parser
         :return: The result of the query (either a single result or a list).
         """
@@ -338,15 +388,33 @@ class StatsDatabase:
         elif query_list[0] == "ipaddress_param":
             return self.named_query_parameterized("ipaddress", query_list[1])
         else:
-            query = self.named_queries.get(query_list[0] + "." + query_list[1])
+            query_name = query_list[0] + "." + query_list[1]
+            query = self.named_queries.get(query_name)
             if query is None:
                 raise QueryExecutionException("The requested query '" + query_list[0] + "(" + query_list[1] +
                                               ")' was not found in the internal query list!")
+            summary = self._get_summary(query_name)
+            if summary:
+                return summary
             self.cursor.execute(str(query))
             # TODO: fetch query on demand
             last_result = self.cursor.fetchall()
             return last_result
 
+    def _get_summary(self, query_name: str):
+        """
+        Retrieves the results of a most_used, least_used or avg named query, which were precomputed by the PCAP file
+        processor when the database was created.
+
+        :param query_name: The name of the named query, like most_used.ttlvalue
+        :return: the precomputed results of the query, or an empty list if they are not available
+        """
+        try:
+            self.cursor.execute("SELECT value FROM summary WHERE query=? ORDER BY position", (query_name,))
+        except sqlite3.OperationalError:
+            return []
+        return self.cursor.fetchall()
+
     def process_db_query(self, query_string_in: str, print_results=False, sql_query_parameters: tuple = None):
         """
         Processes a database query. This can either be a standard SQL query or a named query (predefined query).
@@ -418,6 +486,208 @@ class StatsDatabase:
             table_name = self.process_db_query("SELECT name FROM interval_tables WHERE is_default=1")
         return self.process_user_defined_query(query_string_in % table_name)
 
+    def fold_statistics(self, injected_db_path: str, injected_packets: list):
+        """
+        Folds the statistics of injected packets into this database, so that it describes the PCAP file consisting of
+        the packets of this database and the injected packets without processing the whole PCAP file again.
+
+        Counters are summed up exactly. Latencies, delays and rates of existing IPs and conversations are combined from
+        both databases, IP degrees are summed up and therefore an upper bound. The interval statistics keep their
+        interval lengths and only count the injected packets and their bytes; entropies and novelty counts of the
+        intervals are not updated.
+
+        :param injected_db_path: the path to the statistics database of the injected packets
+        :param injected_packets: a list of (timestamp in microseconds, packet size in bytes) of the injected packets
+        """
+        self.cursor.execute("ATTACH DATABASE ? AS injected", (injected_db_path,))
+        try:
+            self._fold_table("ip_statistics", ["ipAddress"],
+                             {"pktsReceived": "m.pktsReceived + i.pktsReceived",
+                              "pktsSent": "m.pktsSent + i.pktsSent",
+                              "kbytesReceived": "m.kbytesReceived + i.kbytesReceived",
+                              "kbytesSent": "m.kbytesSent + i.kbytesSent",
+                              "maxPktRate": "MAX(m.maxPktRate, i.maxPktRate)",
+                              "minPktRate": self._min_nonzero("minPktRate"),
+                              "maxKByteRate": "MAX(m.maxKByteRate, i.maxKByteRate)",
+                              "minKByteRate": self._min_nonzero("minKByteRate"),
+                              "maxLatency": "MAX(m.maxLatency, i.maxLatency)",
+                              "minLatency": self._min_nonzero("minLatency"),
+                              "avgLatency": self._weighted_avg("avgLatency", "pktsSent")})
+            self._fold_table("ip_degrees", ["ipAddress"],
+                             {"inDegree": "m.inDegree + i.inDegree",
+                              "outDegree": "m.outDegree + i.outDegree",
+                              "overallDegree": "m.overallDegree + i.overallDegree"})
+            self._fold_table("ip_ttl", ["ipAddress", "ttlValue"], {"ttlCount": "m.ttlCount + i.ttlCount"})
+            self._fold_table("tcp_mss", ["ipAddress", "mssValue"], {"mssCount": "m.mssCount + i.mssCount"})
+            self._fold_table("ip_tos", ["ipAddress", "tosValue"], {"tosCount": "m.tosCount + i.tosCount"})
+            self._fold_table("tcp_win", ["ipAddress", "winSize"], {"winCount": "m.winCount + i.winCount"})
+            self._fold_table("ip_protocols", ["ipAddress", "protocolName"],
+                             {"protocolCount": "m.protocolCount + i.protocolCount",
+                              "byteCount": "m.byteCount + i.byteCount"})
+            self._fold_table("ip_ports", ["ipAddress", "portDirection", "portNumber", "portProtocol"],
+                             {"portCount": "m.portCount + i.portCount", "byteCount": "m.byteCount + i.byteCount"})
+            self._fold_table("ip_mac", ["ipAddress"], {})
+            self._fold_table("unrecognized_pdus", ["srcMac", "dstMac", "etherType"],
+                             {"pktCount": "m.pktCount + i.pktCount",
+                              "timestampLastOccurrence": "MAX(m.timestampLastOccurrence, i.timestampLastOccurrence)"})
+            conv_delays = {"pktsCount": "m.pktsCount + i.pktsCount",
+                           "avgDelay": self._weighted_avg("avgDelay", "pktsCount"),
+                           "minDelay": "MIN(COALESCE(m.minDelay, i.minDelay), COALESCE(i.minDelay, m.minDelay))",
+                           "maxDelay": "MAX(COALESCE(m.maxDelay, i.maxDelay), COALESCE(i.maxDelay, m.maxDelay))"}
+            self._fold_table("conv_statistics", ["ipAddressA", "portA", "ipAddressB", "portB"], conv_delays)
+            self._fold_table("conv_statistics_extended", ["ipAddressA", "portA", "ipAddressB", "portB", "protocol"],
+                             conv_delays)
+            self._fold_file_statistics()
+            self._fold_interval_statistics(injected_packets)
+            # the precomputed named query results are outdated, the named queries are executed on the tables instead
+            self.cursor.execute("DROP TABLE IF EXISTS main.summary")
+            self.database.commit()
+            self.named_query_cache.clear()
+        except sqlite3.Error:
+            self.database.rollback()
+            raise
+        finally:
+            self.cursor.execute("DETACH DATABASE injected")
+
+    @staticmethod
+    def _min_nonzero(column: str):
+        """
+        :param column: a column holding a minimum, which is 0 if no value was recorded
+        :return: a SQL expression for the minimum of the column of the base row m and the injected row i
+        """
+        return "CASE WHEN m.{0} = 0 THEN i.{0} WHEN i.{0} = 0 THEN m.{0} ELSE MIN(m.{0}, i.{0}) END".format(column)
+
+    @staticmethod
+    def _weighted_avg(column: str, weight: str):
+        """
+        :param column: a column holding an average, which may be NULL if no value was recorded
+        :param weight: the column holding the number of values the average was calculated from
+        :return: a SQL expression for the average of the base row m and the injected row i
+        """
+        return "CASE WHEN m.{0} IS NULL OR m.{1} + i.{1} = 0 THEN i.{0} WHEN i.{0} IS NULL THEN m.{0} " \
+               "ELSE (m.{0} * m.{1} + i.{0} * i.{1}) / (m.{1} + i.{1}) END".format(column, weight)
+
+    def _fold_table(self, table: str, keys: list, merged: dict):
+        """
+        Folds a table of the attached database of injected packets into the same table of this database. Rows with new
+        keys are inserted, rows with existing keys are replaced by the combination of both rows.
+
+        :param table: the name of the table
+        :param keys: the columns of the table's primary key
+        :param merged: maps columns to SQL expressions combining the base row m and the injected row i, all other
+                       columns keep the value of the base row
+        """
+        injected_table = self.cursor.execute("SELECT sql FROM injected.sqlite_master WHERE type='table' AND name=?",
+                                             (table,)).fetchone()
+        if injected_table is None:
+            return
+        if self.cursor.execute("SELECT name FROM main.sqlite_master WHERE type='table' AND name=?",
+                               (table,)).fetchone() is None:
+            self.cursor.execute(injected_table[0])
+        elif merged:
+            self.cursor.execute("PRAGMA main.table_info('%s')" % table)
+            columns = [merged.get(field[1], "m." + field[1]) for field in self.cursor.fetchall()]
+            join = " AND ".join("m.{0} = i.{0}".format(key) for key in keys)
+            self.cursor.execute("INSERT OR REPLACE INTO main.{0} SELECT {1} FROM injected.{0} i JOIN main.{0} m ON {2}"
+                                .format(table, ", ".join(columns), join))
+        self.cursor.execute("INSERT OR IGNORE INTO main.{0} SELECT * FROM injected.{0}".format(table))
+
+    def _fold_file_statistics(self):
+        """
+        Recalculates the general file statistics from the folded IP statistics and the file statistics of the
+        injected packets.
+        """
+        self.cursor.execute("SELECT packetCount, captureDuration, timestampFirstPacket, timestampLastPacket, "
+                            "avgPacketSize FROM injected.file_statistics")
+        injected = self.cursor.fetchone()
+        if injected is None:
+            return
+        self.cursor.execute("SELECT packetCount, captureDuration, timestampFirstPacket, timestampLastPacket, "
+                            "avgPacketSize FROM main.file_statistics")
+        base = self.cursor.fetchone()
+
+        def parse(timestamp: str):
+            return datetime.datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S.%f")
+
+        first_packet = min(base[2], injected[2])
+        last_packet = max(base[3], injected[3])
+        duration = float(base[1]) + (parse(base[2]) - parse(first_packet)).total_seconds() + \
+            (parse(last_packet) - parse(base[3])).total_seconds()
+        packet_count = base[0] + injected[0]
+        avg_packet_size = (base[4] * base[0] + injected[4] * injected[0]) / packet_count
+
+        self.cursor.execute("SELECT SUM(pktsSent), SUM(kbytesReceived), SUM(kbytesSent), COUNT(*) "
+                            "FROM main.ip_statistics")
+        pkts_sent, kbytes_received, kbytes_sent, ip_count = self.cursor.fetchone()
+        if duration > 0:
+            avg_packet_rate = packet_count / duration
+            avg_bandwidth_in = kbytes_received / duration / ip_count * 8
+            avg_bandwidth_out = kbytes_sent / duration / ip_count * 8
+        else:
+            avg_packet_rate = avg_bandwidth_in = avg_bandwidth_out = float("inf")
+
+        self.cursor.execute("UPDATE main.file_statistics SET packetCount=?, captureDuration=?, "
+                            "timestampFirstPacket=?, timestampLastPacket=?, avgPacketRate=?, avgPacketSize=?, "
+                            "avgPacketsSentPerHost=?, avgBandwidthIn=?, avgBandwidthOut=?",
+                            (packet_count, duration, first_packet, last_packet, avg_packet_rate, avg_packet_size,
+                             float(pkts_sent // ip_count), avg_bandwidth_in, avg_bandwidth_out))
+
+    def get_interval_range(self):
+        """
+        Retrieves the time range covered by the intervals of all interval statistics tables. Injected packets outside
+        of this range can not be folded into the interval statistics, see fold_statistics.
+
+        :return: a tuple of the start of the first and the end of the last interval in microseconds, where the range is
+                 the one covered by all tables, or None if there are no intervals
+        """
+        interval_range = None
+        self.cursor.execute("SELECT name FROM main.interval_tables")
+        for (table_name,) in self.cursor.fetchall():
+            self.cursor.execute("SELECT MIN(CAST(first_pkt_timestamp AS INTEGER)), "
+                                "MAX(CAST(last_pkt_timestamp AS INTEGER)) FROM main.{0}".format(table_name))
+            start, end = self.cursor.fetchone()
+            if start is None:
+                continue
+            if interval_range is not None:
+                start, end = max(start, interval_range[0]), min(end, interval_range[1])
+            interval_range = (start, end)
+        return interval_range
+
+    def _fold_interval_statistics(self, injected_packets: list):
+        """
+        Adds the injected packets to the packet and byte counts of the intervals of all interval statistics tables and
+        recalculates their rates. Packets outside of the intervals are not counted, just like the PCAP file processor
+        drops the last incomplete interval; use get_interval_range to detect them beforehand.
+
+        :param injected_packets: a list of (timestamp in microseconds, packet size in bytes) of the injected packets
+        """
+        self.cursor.execute("SELECT name FROM main.interval_tables")
+        for (table_name,) in self.cursor.fetchall():
+            interval_seconds = float(table_name[len("interval_statistics_"):]) / 1000000
+            self.cursor.execute("SELECT CAST(first_pkt_timestamp AS INTEGER), CAST(last_pkt_timestamp AS INTEGER), "
+                                "last_pkt_timestamp FROM main.{0} ORDER BY 1".format(table_name))
+            intervals = self.cursor.fetchall()
+            if not intervals:
+                continue
+            starts = [interval[0] for interval in intervals]
+            counts = [0] * len(intervals)
+            sizes = [0] * len(intervals)
+            for timestamp, size in injected_packets:
+                if timestamp < starts[0] or timestamp >= intervals[-1][1]:
+                    continue
+                index = bisect.bisect_right(starts, timestamp) - 1
+                counts[index] += 1
+                sizes[index] += size
+
+            updates = []
+            for interval, count, size in zip(intervals, counts, sizes):
+                if count:
+                    kbytes = size / 1024
+                    updates.append((count, kbytes, count, interval_seconds, kbytes, interval_seconds, interval[2]))
+            self.cursor.executemany("UPDATE main.{0} SET pkts_count = pkts_count + ?, kBytes = kBytes + ?, "
+                                    "pkt_rate = (pkts_count + ?) / ?, kByte_rate = (kBytes + ?) / ? "
+                                    "WHERE last_pkt_timestamp = ?".format(table_name), updates)
+
     def _print_query_results(self, query_string_in: str, result: typing.List[typing.Union[str, float, int]]) -> None:
         """
         Prints the results of a query.
@@ -1,6 +1,11 @@
 import lea
+import numpy as np
 import random as rnd
 
+# Factors applied to the delay between two packets and their frequencies, used to randomize the delays
+DELAY_FACTORS = np.array([1.3, 1.2, 1.1, 1, 1 / 1.1, 1 / 1.2, 1 / 1.3])
+DELAY_FACTOR_PROBABILITIES = np.array([12, 13, 15, 20, 15, 13, 12]) / 100
+
 
 class TimestampController:
 
@@ -14,6 +19,8 @@ class TimestampController:
         self.first_timestamp = timestamp
         self.current_timestamp = timestamp
         self.pps = pps
+        # randomized delay distributions of next_timestamp by (pps, latency)
+        self.delay_distributions = {}
 
     def get_pps(self) -> float:
         """
@@ -63,10 +70,60 @@ class TimestampController:
             delay = latency
         #else Calculate request timestamp
 
-        random_delay = lea.Lea.fromValFreqsDict({delay * 1.3: 12, delay * 1.2: 13, delay * 1.1: 15, delay: 20,
-                                                 delay / 1.1: 15, delay / 1.2: 13, delay / 1.3: 12})
-        delay = rnd.uniform(delay, random_delay.random())
+        key = (self.pps, latency)
+        if key not in self.delay_distributions:
+            self.delay_distributions[key] = lea.Lea.fromValFreqsDict(
+                {delay * 1.3: 12, delay * 1.2: 13, delay * 1.1: 15, delay: 20, delay / 1.1: 15, delay / 1.2: 13,
+                 delay / 1.3: 12})
+        delay = rnd.uniform(delay, self.delay_distributions[key].random())
 
         # add latency or delay to timestamp
         self.current_timestamp = self.current_timestamp + delay
         return self.current_timestamp
+
+    def random_delays(self, n: int, latency: float=0):
+        """
+        Draws n randomized delays at once, following the same distribution as the delays added by next_timestamp.
+        Parameter consideration order: latency > pps > default delay
+
+        :param n: the number of delays to draw
+        :param latency: the latency for reply pkts
+        :return: a NumPy array of n delays
+        """
+        delay = latency if latency != 0 else 1 / self.pps
+        factors = np.random.choice(DELAY_FACTORS, size=n, p=DELAY_FACTOR_PROBABILITIES)
+        return np.random.uniform(delay, delay * factors)
+
+    def next_timestamps(self, n: int, latency: float=0):
+        """
+        Calculates the next n timestamps at once, each one delayed like a timestamp calculated by next_timestamp.
+        The random delays are drawn from numpy.random, which is seeded together with random by BaseAttack.set_seed.
+
+        :param n: the number of timestamps to calculate
+        :param latency: the latency for reply pkts
+        :return: a NumPy array of the next n timestamps in ascending order
+        """
+        timestamps = self.current_timestamp + np.cumsum(self.random_delays(n, latency))
+        if n > 0:
+            self.current_timestamp = float(timestamps[-1])
+        return timestamps
+
+    def next_timestamps_until(self, end_timestamp: float, latency: float=0):
+        """
+        Calculates the next timestamps up to end_timestamp, each one delayed like a timestamp calculated by
+        next_timestamp. The delays are drawn in chunks of the expected number of remaining timestamps until the end is
+        passed, and the current timestamp is set to the last returned timestamp.
+
+        :param end_timestamp: the last allowed timestamp
+        :param latency: the latency for reply pkts
+        :return: a NumPy array of the next timestamps in ascending order, which are not greater than end_timestamp
+        """
+        delay = latency if latency != 0 else 1 / self.pps
+        start_timestamp = self.current_timestamp
+        chunks = []
+        while self.current_timestamp <= end_timestamp:
+            chunks.append(self.next_timestamps(int((end_timestamp - self.current_timestamp) / delay) + 1, latency))
+        timestamps = np.concatenate(chunks) if chunks else np.empty(0)
+        timestamps = timestamps[timestamps <= end_timestamp]
+        self.current_timestamp = float(timestamps[-1]) if len(timestamps) > 0 else start_timestamp
+        return timestamps
@@ -0,0 +1,44 @@
+import scapy.layers.inet as inet
+import scipy.stats as stats
+
+# Gamma distribution parameters of the attacker TTL values, derived from MAWI 13.8G dataset
+TTL_GAMMA_PARAMETERS = (2.3261710235, -0.188306914406, 44.4853123884)
+
+
+class AttackerConfigPool(object):
+    def __init__(self, ip_source_list: list):
+        """
+        Creates a new AttackerConfigPool, which determines the fixed TTL value and the starting port of every attacker
+        once, so that the configuration for the next attacking packet of an attacker can be looked up directly.
+        A pool is meant to be created for each attack, so that no configuration is shared between attacks.
+
+        :param ip_source_list: List of source IPs
+        """
+        alpha, loc, beta = TTL_GAMMA_PARAMETERS
+        gd = [int(round(value)) for value in stats.gamma.rvs(alpha, loc=loc, scale=beta, size=len(ip_source_list))]
+
+        self.ttls = {}
+        self.ports = {}
+        for pos, ip_address in enumerate(ip_source_list):
+            if ip_address in self.ttls:
+                continue
+            # use the first valid TTL value starting at the position of the IP address
+            while not 0 < gd[pos] < 256:
+                pos = (pos + 1) % len(gd)
+            self.ttls[ip_address] = gd[pos]
+            # the starting port is the port preceding the one of the first attacking packet
+            self.ports[ip_address] = int(inet.RandShort()) - 1
+
+    def get_attacker_config(self, ip_address: str):
+        """
+        Returns the attacker configuration depending on the IP address, this includes the port for the next
+        attacking packet and the fixed TTL value.
+
+        :param ip_address: The IP address of the attacker
+        :return: A tuple consisting of (port, ttlValue)
+        """
+        next_port = self.ports[ip_address] + 1
+        if next_port > (2 ** 16 - 1):
+            next_port = 1
+        self.ports[ip_address] = next_port
+        return next_port, self.ttls[ip_address]
@@ -0,0 +1,68 @@
+import json
+import os
+
+# Optional flags of a dataset entry and their defaults
+DATASET_FLAGS = {"inject_empty": False, "update_statistics": False, "time": False}
+
+
+def read_manifest_file(manifest_path: str):
+    """
+    Reads a batch manifest file, which is parsed as YAML if its extension is .yaml or .yml, otherwise as JSON.
+
+    :param manifest_path: The path to the manifest file
+    :return: the parsed content of the manifest file
+    """
+    with open(manifest_path) as manifest_file:
+        if os.path.splitext(manifest_path)[1].lower() in [".yaml", ".yml"]:
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Reading the YAML manifest {} requires PyYAML, use a JSON manifest instead."
+                                 .format(manifest_path))
+            return yaml.safe_load(manifest_file)
+        return json.load(manifest_file)
+
+
+def load_manifest(manifest_path: str):
+    """
+    Loads the datasets of a batch manifest. A manifest is a dict with a list of datasets under the key "datasets", or
+    just the list of datasets. Each dataset is a dict like
+    {"output": "out/dataset_1.pcap", "attacks": [["DDoSAttack", "attackers.count=10"], "PortscanAttack"],
+     "seeds": [42, 43], "inject_empty": false, "update_statistics": false, "time": false}
+    where an attack is given either as list of the attack name and its parameters or as string like on the command
+    line, the seeds belong to the attacks in the same order and all keys except "output" and "attacks" are optional.
+    Relative output paths are relative to the directory of the manifest.
+
+    :param manifest_path: The path to the manifest file
+    :return: the list of datasets, with the attacks as lists, the seeds in the form of the -S/--rngSeed argument and
+             all flags set
+    """
+    manifest = read_manifest_file(manifest_path)
+    if isinstance(manifest, dict):
+        manifest = manifest.get("datasets")
+    if not isinstance(manifest, list) or not manifest:
+        raise ValueError("The manifest {} does not list any datasets.".format(manifest_path))
+
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    datasets = []
+    outputs = set()
+    for i, entry in enumerate(manifest):
+        if not isinstance(entry, dict) or not entry.get("output") or not entry.get("attacks"):
+            raise ValueError("Dataset {} of the manifest {} needs an output path and attacks.".format(i, manifest_path))
+
+        output = os.path.join(manifest_dir, os.path.expanduser(entry["output"]))
+        if not output.endswith(".pcap"):
+            output += ".pcap"
+        if output in outputs:
+            raise ValueError("The output path {} is used by several datasets.".format(output))
+        outputs.add(output)
+
+        attacks = [attack.split() if isinstance(attack, str) else [str(value) for value in attack]
+                   for attack in entry["attacks"]]
+        seeds = [[seed] for seed in entry.get("seeds", [])]
+
+        dataset = {"output": output, "attacks": attacks, "seeds": seeds}
+        for flag, default in DATASET_FLAGS.items():
+            dataset[flag] = bool(entry.get(flag, default))
+        datasets.append(dataset)
+    return datasets
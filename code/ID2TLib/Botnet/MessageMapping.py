@@ -1,5 +1,5 @@
 import os.path
-from xml.dom.minidom import *
+from xml.sax.saxutils import XMLGenerator
 import datetime
 
 
@@ -24,39 +24,48 @@ class MessageMapping:
     def map_message(self, message, packet):
         self.id_to_packet[message.msg_id] = packet
 
-    def to_xml(self, ):
-        doc = Document()
-
-        mappings = doc.createElement(self.TAG_MAPPING_GROUP)
-        doc.appendChild(mappings)
-
-        for message in sorted(self.messages, key=lambda msg: msg.time):
-            mapping = doc.createElement(self.TAG_MAPPING)
-            mapping.setAttribute(self.ATTR_ID, str(message.msg_id))
-            mapping.setAttribute(self.ATTR_LINENO, str(message.line_no))
-
-            mapping.setAttribute("Src", str(message.src["ID"]))
-            mapping.setAttribute("Dst", str(message.dst["ID"]))
-            mapping.setAttribute("Type", str(message.type.value))
-            mapping.setAttribute("CSV_XML_Time", str(message.csv_time))
-
-            dt = datetime.datetime.fromtimestamp(message.time)
-            dt_relative = dt - self.pcap_start_dt
-            mapping.setAttribute("PCAP_Time-Timestamp", str(message.time))
-            mapping.setAttribute("PCAP_Time-Datetime", dt.strftime("%Y-%m-%d %H:%M:%S.") + str(dt.microsecond))
-            mapping.setAttribute("PCAP_Time-Relative", "%d.%s" % (dt_relative.total_seconds(), str(dt_relative.microseconds).rjust(6, "0")))
-
-            packet = self.id_to_packet.get(message.msg_id)
-            mapping.setAttribute(self.ATTR_HAS_PACKET, "true" if packet is not None else "false")
-            if packet:
-                mapping.setAttribute(self.ATTR_PACKET_TIME, str(packet.time))
-
-            mappings.appendChild(mapping)
-
-        return doc
+    def get_attributes(self, message):
+        """
+        Creates the attributes of the mapping entry of a message.
+
+        :param message: The message
+        :return: a dict of the attribute names and values
+        """
+        attributes = {self.ATTR_ID: str(message.msg_id), self.ATTR_LINENO: str(message.line_no),
+                      "Src": str(message.src["ID"]), "Dst": str(message.dst["ID"]), "Type": str(message.type.value),
+                      "CSV_XML_Time": str(message.csv_time)}
+
+        dt = datetime.datetime.fromtimestamp(message.time)
+        dt_relative = dt - self.pcap_start_dt
+        attributes["PCAP_Time-Timestamp"] = str(message.time)
+        attributes["PCAP_Time-Datetime"] = dt.strftime("%Y-%m-%d %H:%M:%S.") + str(dt.microsecond)
+        attributes["PCAP_Time-Relative"] = "%d.%s" % (dt_relative.total_seconds(), str(dt_relative.microseconds).rjust(6, "0"))
+
+        packet = self.id_to_packet.get(message.msg_id)
+        attributes[self.ATTR_HAS_PACKET] = "true" if packet is not None else "false"
+        if packet:
+            attributes[self.ATTR_PACKET_TIME] = str(packet.time)
+        return attributes
 
     def write_to(self, buffer, close = True):
-        buffer.write(self.to_xml().toprettyxml())
+        """
+        Writes the mapping as XML to a buffer. Each mapping entry is written as soon as it is created instead of
+        building the whole document in memory first.
+
+        :param buffer: The text buffer to write to
+        :param close: Whether the buffer is closed afterwards
+        """
+        xml = XMLGenerator(buffer, encoding="utf-8", short_empty_elements=True)
+        xml.startDocument()
+        xml.startElement(self.TAG_MAPPING_GROUP, {})
+        for message in sorted(self.messages, key=lambda msg: msg.time):
+            xml.ignorableWhitespace("\n\t")
+            xml.startElement(self.TAG_MAPPING, self.get_attributes(message))
+            xml.endElement(self.TAG_MAPPING)
+        xml.ignorableWhitespace("\n")
+        xml.endElement(self.TAG_MAPPING_GROUP)
+        xml.ignorableWhitespace("\n")
+        xml.endDocument()
         if close: buffer.close()
 
     def write_to_file(self, filename: str, *args, **kwargs):
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+# Size in bytes of the blocks read to calculate a sampled fingerprint
+SAMPLE_BLOCK_SIZE = 1024 * 1024
+# Number of blocks read evenly spread between the first and the last block of a file
+SAMPLE_MIDDLE_BLOCKS = 8
+
+
+def sampled_fingerprint(file_path: str):
+    """
+    Calculates a fingerprint of a file from its size and large blocks read from its head, its middle and its tail.
+    Files that fit into the sampled blocks are hashed completely.
+
+    :param file_path: The path to the file
+    :return: the hex digest of the BLAKE2b hash of the file size and the sampled blocks
+    """
+    size = os.path.getsize(file_path)
+    hasher = hashlib.blake2b(digest_size=28)
+    hasher.update(str(size).encode('utf-8'))
+
+    with open(file_path, 'rb') as afile:
+        if size <= (SAMPLE_MIDDLE_BLOCKS + 2) * SAMPLE_BLOCK_SIZE:
+            offsets = range(0, size, SAMPLE_BLOCK_SIZE)
+        else:
+            last_block = size - SAMPLE_BLOCK_SIZE
+            step = last_block // (SAMPLE_MIDDLE_BLOCKS + 1)
+            offsets = [i * step for i in range(SAMPLE_MIDDLE_BLOCKS + 1)] + [last_block]
+        for offset in offsets:
+            afile.seek(offset)
+            hasher.update(afile.read(SAMPLE_BLOCK_SIZE))
+
+    return hasher.hexdigest()
+
+
+def _process_running(pid: int):
+    """
+    :param pid: The id of a process
+    :return: whether the process is running
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class DatabaseCache(object):
+    def __init__(self, root_directory: str, max_size: int):
+        """
+        Creates a new DatabaseCache for the statistics databases stored below root_directory. The cache index maps the
+        identity of files (device, inode, size and modification time) to their fingerprints, so that unchanged files
+        are not read again, and keeps track of the last use of every database to evict the least recently used ones.
+
+        :param root_directory: The root directory of the statistics databases
+        :param max_size: The maximum size in bytes of all databases in the cache
+        """
+        self.root_directory = root_directory
+        self.max_size = max_size
+
+        if not os.path.isdir(root_directory):
+            os.makedirs(root_directory)
+        index_path = os.path.join(root_directory, "index.sqlite3")
+        existing_index = os.path.exists(index_path)
+        self.index = sqlite3.connect(index_path, timeout=60)
+        self.index.execute("CREATE TABLE IF NOT EXISTS files (device INTEGER, inode INTEGER, size INTEGER, "
+                           "mtime INTEGER, fingerprint TEXT, PRIMARY KEY(device, inode));")
+        self.index.execute("CREATE TABLE IF NOT EXISTS databases (path TEXT, fingerprint TEXT, last_used REAL, "
+                           "PRIMARY KEY(path));")
+        self.index.execute("CREATE TABLE IF NOT EXISTS loaded_databases (path TEXT, pid INTEGER, "
+                           "PRIMARY KEY(path, pid));")
+        if not existing_index:
+            self._index_existing_databases()
+        self.index.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Closes the connection to the cache index.
+        """
+        self.index.close()
+
+    def _index_existing_databases(self):
+        """
+        Adds the databases created before the cache index existed, using their modification time as last use.
+        """
+        for directory, _, file_names in os.walk(self.root_directory):
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                if file_name.endswith(".sqlite3") and path != os.path.join(self.root_directory, "index.sqlite3"):
+                    self.index.execute("INSERT OR IGNORE INTO databases VALUES (?, NULL, ?)",
+                                       (path, os.path.getmtime(path)))
+
+    def lookup_fingerprint(self, file_path: str):
+        """
+        :param file_path: The path to the file
+        :return: the fingerprint stored for the file, or None if the file is unknown or was modified since
+        """
+        stat = os.stat(file_path)
+        result = self.index.execute("SELECT fingerprint FROM files WHERE device=? AND inode=? AND size=? AND mtime=?",
+                                    (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)).fetchone()
+        return result[0] if result else None
+
+    def store_fingerprint(self, file_path: str, fingerprint: str):
+        """
+        Stores the fingerprint of a file together with its identity.
+
+        :param file_path: The path to the file
+        :param fingerprint: The fingerprint of the file
+        """
+        stat = os.stat(file_path)
+        self.index.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                           (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, fingerprint))
+        self.index.commit()
+
+    def use_database(self, db_path: str, fingerprint: str, loaded: bool=False):
+        """
+        Marks a database as most recently used and evicts the least recently used other databases while the cache
+        exceeds its maximum size. Databases loaded by running processes are never evicted, neither those of this
+        process nor those of other processes using the same cache, e.g. parallel batch workers.
+
+        :param db_path: The path to the database
+        :param fingerprint: The fingerprint of the file the database belongs to
+        :param loaded: Whether the database is loaded by this process, which protects it from eviction until the
+                       process exits
+        """
+        self.index.execute("INSERT OR REPLACE INTO databases VALUES (?, ?, ?)", (db_path, fingerprint, time.time()))
+        if loaded:
+            self.index.execute("INSERT OR IGNORE INTO loaded_databases VALUES (?, ?)", (db_path, os.getpid()))
+
+        loaded_paths = set()
+        for path, pid in self.index.execute("SELECT path, pid FROM loaded_databases").fetchall():
+            if _process_running(pid):
+                loaded_paths.add(path)
+            else:
+                self.index.execute("DELETE FROM loaded_databases WHERE path=? AND pid=?", (path, pid))
+
+        databases = self.index.execute("SELECT path, fingerprint FROM databases ORDER BY last_used").fetchall()
+        sizes = {}
+        for path, _ in databases:
+            if os.path.exists(path):
+                sizes[path] = os.path.getsize(path)
+        total_size = sum(sizes.values())
+
+        for path, path_fingerprint in databases:
+            if path == db_path or path in loaded_paths or (path in sizes and total_size <= self.max_size):
+                continue
+            if path in sizes:
+                os.remove(path)
+                total_size -= sizes[path]
+            self.index.execute("DELETE FROM databases WHERE path=?", (path,))
+            self.index.execute("DELETE FROM files WHERE fingerprint=?", (path_fingerprint,))
+        self.index.commit()
@@ -9,6 +9,7 @@ from random import getrandbits
 from scapy.layers.inet import IP, Ether, UDP, TCP
 from scapy.packet import Raw
 from ID2TLib.Botnet.Message import MessageType
+import ID2TLib.IPAllocator as IPAllocator
 from . import IPv4 as ip
 
 
@@ -294,6 +295,9 @@ class IPChooser:
     def random_ip(self):
         return ip.IPAddress.from_int(random.randrange(0, 1 << 32))
 
+    def ranges(self):
+        return [(0, 1 << 32)]
+
     def size(self):
         return 1 << 32
 
@@ -310,6 +314,10 @@ class IPChooserByRange(IPChooser):
         end = start + self.range.block_size()
         return ip.IPAddress.from_int(random.randrange(start, end))
 
+    def ranges(self):
+        start = int(self.range.first_address())
+        return [(start, start + self.range.block_size())]
+
     def size(self):
         return self.range.block_size()
 
@@ -323,6 +331,11 @@ class IPChooserByList(IPChooser):
     def random_ip(self):
         return random.choice(self.ips)
 
+    def ranges(self):
+        addresses = [int(address if isinstance(address, ip.IPAddress) else ip.IPAddress.parse(address))
+                     for address in self.ips]
+        return [(address, address + 1) for address in addresses]
+
     def size(self):
         return len(self.ips)
 
@@ -334,6 +347,8 @@ class IPGenerator:
                  include_link_local=False, blacklist=None):
         self.blacklist = []
         self.generated_ips = set()
+        # the allocator of the addresses of the chooser, which are neither blacklisted nor generated yet
+        self.allocator = None
 
         if not include_private_ips:
             for segment in ip.ReservedIPBlocks.PRIVATE_IP_SEGMENTS:
@@ -360,21 +375,23 @@ class IPGenerator:
             self.blacklist.append(ip_segment)
         else:
             self.blacklist.append(ip.IPAddressBlock.parse(ip_segment))
+        self.allocator = None
 
     def random_ip(self):
-        if len(self.generated_ips) == self.chooser.size():
-            raise ValueError("Exhausted the space of possible ip-addresses, no new unique ip-address can be generated")
-
-        while True:
-            random_ip = self.chooser.random_ip()
+        if self.allocator is None:
+            excluded = [(int(block.first_address()), int(block.first_address()) + block.block_size())
+                        for block in self.blacklist]
+            excluded += [(int(generated_ip), int(generated_ip) + 1) for generated_ip in self.generated_ips]
+            self.allocator = IPAllocator.IPAllocator(self.chooser.ranges(), excluded)
 
-            if not self._is_in_blacklist(random_ip) and random_ip not in self.generated_ips:
-                self.generated_ips.add(random_ip)
-                return str(random_ip)
+        random_ip = ip.IPAddress.from_int(self.allocator.allocate())
+        self.generated_ips.add(random_ip)
+        return str(random_ip)
 
     def clear(self, clear_blacklist=True, clear_generated_ips=True):
         if clear_blacklist: self.blacklist.clear()
         if clear_generated_ips: self.generated_ips.clear()
+        self.allocator = None
 
     def _is_in_blacklist(self, ip: ip.IPAddress):
         return any(ip in block for block in self.blacklist)
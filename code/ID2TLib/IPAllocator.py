@@ -0,0 +1,122 @@
+import bisect
+import random
+
+
+def merge_ranges(ranges):
+    """
+    Merges overlapping and adjacent ranges.
+
+    :param ranges: An iterable of ranges as tuples (first address, end address), the end address being exclusive
+    :return: the sorted list of disjoint, non-empty ranges covering the same addresses
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(ranges, excluded):
+    """
+    Removes the excluded addresses from ranges of addresses.
+
+    :param ranges: An iterable of ranges as tuples (first address, end address), the end address being exclusive
+    :param excluded: An iterable of ranges of the addresses to be removed
+    :return: the sorted list of disjoint, non-empty ranges of the remaining addresses
+    """
+    excluded = merge_ranges(excluded)
+    remaining = []
+    i = 0
+    for start, end in merge_ranges(ranges):
+        # skip the excluded ranges ending before this range
+        while i < len(excluded) and excluded[i][1] <= start:
+            i += 1
+        j = i
+        while j < len(excluded) and excluded[j][0] < end:
+            if start < excluded[j][0]:
+                remaining.append((start, excluded[j][0]))
+            start = max(start, excluded[j][1])
+            j += 1
+        if start < end:
+            remaining.append((start, end))
+    return remaining
+
+
+class IPAllocator(object):
+    def __init__(self, ranges, excluded=()):
+        """
+        Creates a new IPAllocator, which hands out the addresses of ranges of integer IP addresses in random order,
+        each address once. The excluded addresses, e.g. blacklisted blocks, are subtracted from the ranges up front.
+        The free addresses are numbered consecutively across the ranges and drawn like in a Fisher-Yates shuffle, of
+        which only the swapped positions are stored. Thus, every allocation samples uniformly from the free addresses
+        without rejection and takes O(log n) for n ranges, regardless of how many addresses were allocated already.
+
+        :param ranges: An iterable of ranges as tuples (first address, end address), the end address being exclusive
+        :param excluded: An iterable of ranges of addresses, which must not be allocated
+        """
+        self.ranges = subtract_ranges(ranges, excluded)
+        # the number of the first address of each range
+        self.offsets = []
+        self.total = 0
+        for start, end in self.ranges:
+            self.offsets.append(self.total)
+            self.total += end - start
+
+        # the numbers of the free addresses are at the positions [0, remaining) of a virtual array, which holds the
+        # number i at position i unless a different number was swapped to this position
+        self.remaining = self.total
+        self.swaps = {}
+
+    def __len__(self):
+        return self.remaining
+
+    def _address(self, number: int):
+        """
+        :param number: The number of an address
+        :return: the address with the given number
+        """
+        i = bisect.bisect_right(self.offsets, number) - 1
+        return self.ranges[i][0] + number - self.offsets[i]
+
+    def allocate(self):
+        """
+        Allocates a random free address.
+
+        :return: the allocated address as integer
+        """
+        if self.remaining == 0:
+            raise ValueError("Exhausted the space of possible ip-addresses, no new unique ip-address can be generated")
+
+        position = random.randrange(self.remaining)
+        number = self.swaps.get(position, position)
+        # move the number at the last free position to the drawn position
+        last = self.remaining - 1
+        last_number = self.swaps.pop(last, last)
+        if position != last:
+            self.swaps[position] = last_number
+        self.remaining -= 1
+        return self._address(number)
+
+    def add_range(self, start: int, end: int):
+        """
+        Adds a range of free addresses, which must not overlap with the addresses of this allocator.
+
+        :param start: The first address of the range
+        :param end: The end address of the range, which is exclusive
+        """
+        if end <= start:
+            return
+        self.ranges.append((start, end))
+        self.offsets.append(self.total)
+        if self.remaining == self.total:
+            self.remaining += end - start
+        else:
+            # place the numbers of the new addresses behind the free positions
+            for number in range(self.total, self.total + end - start):
+                self.swaps[self.remaining] = number
+                self.remaining += 1
+        self.total += end - start
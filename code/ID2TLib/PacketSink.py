@@ -0,0 +1,87 @@
+import struct
+import tempfile
+
+# Link type of Ethernet frames in PCAP files
+LINKTYPE_ETHERNET = 1
+
+
+class PacketSink(object):
+    def __init__(self, path: str = None, linktype: int = LINKTYPE_ETHERNET, snaplen: int = 65535,
+                 buffer_size: int = 4 * 1024 * 1024):
+        """
+        Creates a new PacketSink, which writes packets into a PCAP file through a single file handle. The packets are
+        serialized into a buffer, which is written to the file in large chunks once it exceeds buffer_size.
+
+        :param path: The path of the PCAP file, a temporary file is created if no path is given
+        :param linktype: The link type of the written packets
+        :param snaplen: The maximum number of captured bytes per packet written into the PCAP header
+        :param buffer_size: The number of buffered bytes which triggers a write to the file
+        """
+        if path is None:
+            self.file = tempfile.NamedTemporaryFile(delete=False, suffix='.pcap')
+            self.path = self.file.name
+        else:
+            self.path = path
+            self.file = open(path, 'wb')
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered_bytes = 0
+        self.packet_count = 0
+
+        self._append(struct.pack("<IHHiIII", 0xa1b2c3d4, 2, 4, 0, 0, snaplen, linktype))
+
+    def _append(self, data: bytes):
+        """
+        Appends data to the buffer and writes the buffer to the file if it is full.
+
+        :param data: The data to be written
+        """
+        self.buffer.append(data)
+        self.buffered_bytes += len(data)
+        if self.buffered_bytes >= self.buffer_size:
+            self.flush()
+
+    def write_raw(self, data: bytes, timestamp: float):
+        """
+        Writes a packet given by its raw bytes.
+
+        :param data: The bytes of the packet, starting with the link layer header
+        :param timestamp: The timestamp of the packet as unix timestamp
+        """
+        seconds = int(timestamp)
+        microseconds = int(round((timestamp - seconds) * 1000000))
+        if microseconds >= 1000000:
+            seconds += 1
+            microseconds -= 1000000
+        self._append(struct.pack("<IIII", seconds, microseconds, len(data), len(data)))
+        self._append(data)
+        self.packet_count += 1
+
+    def write(self, packets):
+        """
+        Writes scapy packets, using their time field as timestamp.
+
+        :param packets: A scapy packet or an iterable of scapy packets
+        """
+        if not isinstance(packets, (list, tuple)) and hasattr(packets, "time"):
+            packets = [packets]
+        for packet in packets:
+            self.write_raw(bytes(packet), float(packet.time))
+
+    def flush(self):
+        """
+        Writes all buffered packets to the file.
+        """
+        if self.buffer:
+            self.file.write(b"".join(self.buffer))
+            self.buffer = []
+            self.buffered_bytes = 0
+        self.file.flush()
+
+    def close(self):
+        """
+        Writes all buffered packets and closes the file.
+        """
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
@@ -1,10 +1,16 @@
+import weakref
 from random import choice
 
+import ID2TLib.IPAllocator as IPAllocator
 from Core import Statistics
 from ID2TLib.IPv4 import IPAddress
 
 is_ipv4 = IPAddress.is_ipv4
 
+# The local and external IPs of the statistics, classified once per Statistics object and shared by all
+# PcapAddressOperations of the statistics, e.g. of the attacks of all datasets of a batch
+_classified_ips = weakref.WeakKeyDictionary()
+
 class PcapAddressOperations():
 
     def __init__(self, statistics: Statistics, uncertain_ip_mult: int=3):
@@ -100,19 +106,13 @@ class PcapAddressOperations():
         if count <= 0:
             return []
 
-        # add more unused local ips to the pool, if needed
-        while len(self.unused_local_ips) < count and self.expand_unused_local_ips() == True:
-            pass
-
         unused_local_ips = self.unused_local_ips
         uncertain_local_ips = self.uncertain_local_ips
         count_certain = min(count, len(unused_local_ips))
         retr_local_ips = []
 
         for _ in range(0, count_certain):
-            random_local_ip = choice(sorted(unused_local_ips))
-            retr_local_ips.append(str(random_local_ip))
-            unused_local_ips.remove(random_local_ip)
+            retr_local_ips.append(str(IPAddress.from_int(unused_local_ips.allocate())))
 
         # retrieve uncertain local ips
         if count_certain < count:
@@ -122,29 +122,21 @@ class PcapAddressOperations():
             if len(uncertain_local_ips) < count_uncertain:
                 ipspace_multiplier = self.UNCERTAIN_IPSPACE_MULTIPLIER
 
-                max_new_ip = self.max_uncertain_local_ip.to_int() + ipspace_multiplier * count_uncertain
-
-                count_new_ips = max_new_ip - self.max_uncertain_local_ip.to_int()
-
                 # create ipspace_multiplier * count_uncertain new uncertain local IP addresses
-                last_gen_ip = None
-                for i in range(1, count_new_ips + 1):
-                    ip = IPAddress.from_int(self.max_uncertain_local_ip.to_int() + i)
-                    # exclude the definite broadcast address
-                    if self.priv_ip_segment:
-                        if ip.to_int() >= self.priv_ip_segment.last_address().to_int():
-                            break
-                    uncertain_local_ips.add(ip)
-                    last_gen_ip = ip
-                self.max_uncertain_local_ip = last_gen_ip
+                first_new_ip = self.max_uncertain_local_ip.to_int() + 1
+                end_new_ips = first_new_ip + ipspace_multiplier * count_uncertain
+                # exclude the definite broadcast address
+                if self.priv_ip_segment:
+                    end_new_ips = min(end_new_ips, self.priv_ip_segment.last_address().to_int())
+                if first_new_ip < end_new_ips:
+                    uncertain_local_ips.add_range(first_new_ip, end_new_ips)
+                    self.max_uncertain_local_ip = IPAddress.from_int(end_new_ips - 1)
 
             # choose the uncertain IPs to return
             total_uncertain = min(count_uncertain, len(uncertain_local_ips))
             for _ in range(0, total_uncertain):
-                random_local_ip = choice(sorted(uncertain_local_ips))
-                retr_local_ips.append(str(random_local_ip))
-                uncertain_local_ips.remove(random_local_ip)
-            
+                retr_local_ips.append(str(IPAddress.from_int(uncertain_local_ips.allocate())))
+
         return retr_local_ips
 
     def get_existing_external_ips(self, count: int=1):
@@ -176,56 +168,18 @@ class PcapAddressOperations():
         """
 
         # retrieve local and external IPs
-        all_ips_str = set(self.statistics.process_db_query("all(ipAddress)", print_results=False))
-        # external_ips_str = set(self.statistics.process_db_query("ipAddress(macAddress=%s)" % self.get_probable_router_mac(), print_results=False))  # including router
-        # local_ips_str = all_ips_str - external_ips_str
-        external_ips = set()
-        local_ips = set()
-        all_ips = set()
+        if self.statistics not in _classified_ips:
+            _classified_ips[self.statistics] = self._classify_ips()
+        local_ips, external_ips = (set(ips) for ips in _classified_ips[self.statistics])
 
         self.contains_priv_ips = False
         self.priv_ip_segment = None
 
-        # convert IP strings to IPv4.IPAddress representation
-        for ip in all_ips_str:
-            if is_ipv4(ip):
-                ip = IPAddress.parse(ip)
-                # exclude local broadcast address and other special addresses
-                if (not str(ip) == "255.255.255.255") and (not ip.is_localhost()) and (not ip.is_multicast()) and (
-                not ip.is_reserved()) and (not ip.is_zero_conf()):
-                    all_ips.add(ip)
-
-        for ip in all_ips:
-            if ip.is_private():
-                local_ips.add(ip)
-
-        external_ips = all_ips - local_ips
-
-        # save the certain unused local IPs of the network
-        # to do that, divide the unused local Addressspace into chunks of (chunks_size) Addresses
-        # initally only the first chunk will be used, but more chunks can be added to the pool of unused_local_ips if needed
+        # save the certain unused local IPs of the network, which are the IPs between the minimum and maximum observed
+        # local IP that are not contained in the pcap file
         self.min_local_ip, self.max_local_ip = min(local_ips), max(local_ips)
-        local_ip_range = (self.max_local_ip.to_int()) - (self.min_local_ip.to_int() + 1)
-        if local_ip_range < 0:
-            # for min,max pairs like (1,1), (1,2) there is no free address in between, but for (1,1) local_ip_range may be -1, because 1-(1+1)=-1
-            local_ip_range = 0
-
-        # chunk size can be adjusted if needed
-        self.chunk_size = 200
-
-        self.current_chunk = 1
-        if local_ip_range < self.chunk_size:
-            # there are not more than chunk_size unused IP Addresses to begin with
-            self.chunks = 0
-            self.chunk_remainder = local_ip_range
-        else:
-            # determine how many chunks of (chunk_size) Addresses there are and the save the remainder
-            self.chunks = local_ip_range // self.chunk_size
-            self.chunk_remainder = local_ip_range % self.chunk_size
-
-        # add the first chunk of IP Addresses
-        self.unused_local_ips = set()
-        self.expand_unused_local_ips()
+        self.unused_local_ips = IPAllocator.IPAllocator([(self.min_local_ip.to_int() + 1, self.max_local_ip.to_int())],
+                                                        [(ip.to_int(), ip.to_int() + 1) for ip in local_ips])
 
         # save the gathered information for efficient later use
         self.external_ips = frozenset(external_ips)
@@ -235,44 +189,31 @@ class PcapAddressOperations():
         # print("External IPS: " + str(external_ips))
         # print("LOCAL IPS: " + str(local_ips))
         self.remaining_local_ips = local_ips
-        self.uncertain_local_ips = set()
+        self.uncertain_local_ips = IPAllocator.IPAllocator([])
 
-    def expand_unused_local_ips(self):
+    def _classify_ips(self):
         """
-        expands the set of unused_local_ips by one chunk_size
-        to illustrate this algorithm: suppose we have a chunksize of 100 and an Address space of 1 to 1000 (1 and 1000 are unused too), we then have 10 chunks
-        every time this method is called, one chunk (100 Addresses) is added, each chunk starts at the base_address + the number of its chunk
-        then, every chunk_amounth'th Address is added. Therefore for 10 chunks, every 10th address is added
-        For the above example for the first, second and last call, we get the following IPs, respectively:
-        first Call:  1+0,  1+10,  1+20,  1+30, ...,  1+990
-        second Call: 2+0,  2+10,  2+20,  2+30, ...,  2+990
-        ten'th Call: 10+0, 10+10, 10+20, 10+30, ..., 10+990
-
-        :return: False if there are no more available unusd local IP Addresses, True otherwise
-        """
-
-        if self.current_chunk == self.chunks+1:
-            # all chunks are used up, therefore add the remainder
-            remainder_base_addr = self.min_local_ip.to_int() + self.chunks*self.chunk_size + 1
-            for i in range(0,self.chunk_remainder):
-                ip = IPAddress.from_int(remainder_base_addr + i)
-                self.unused_local_ips.add(ip)
-
-            self.current_chunk = self.current_chunk + 1
-            return True
+        Classifies the IPs contained in the statistics into local and external IPs.
 
-        elif self.current_chunk <= self.chunks:
-            # add another chunk
-            # choose IPs from the whole address space, that is available
-            base_address = self.min_local_ip.to_int() + self.current_chunk
+        :return: a tuple of the local and the external IPs as frozensets of IPv4.IPAddress
+        """
+        all_ips_str = set(self.statistics.process_db_query("all(ipAddress)", print_results=False))
+        # external_ips_str = set(self.statistics.process_db_query("ipAddress(macAddress=%s)" % self.get_probable_router_mac(), print_results=False))  # including router
+        # local_ips_str = all_ips_str - external_ips_str
+        local_ips = set()
+        all_ips = set()
 
-            for i in range(0,self.chunk_size):
-                ip = IPAddress.from_int(base_address + i*self.chunks)
-                self.unused_local_ips.add(ip)
+        # convert IP strings to IPv4.IPAddress representation
+        for ip in all_ips_str:
+            if is_ipv4(ip):
+                ip = IPAddress.parse(ip)
+                # exclude local broadcast address and other special addresses
+                if (not str(ip) == "255.255.255.255") and (not ip.is_localhost()) and (not ip.is_multicast()) and (
+                not ip.is_reserved()) and (not ip.is_zero_conf()):
+                    all_ips.add(ip)
 
-            self.current_chunk = self.current_chunk + 1
-            return True
+        for ip in all_ips:
+            if ip.is_private():
+                local_ips.add(ip)
 
-        else:
-            # no free IPs remaining
-            return False
\ No newline at end of file
+        return frozenset(local_ips), frozenset(all_ips - local_ips)
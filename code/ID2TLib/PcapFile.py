@@ -1,11 +1,14 @@
-import hashlib
 import os.path
 
+import ID2TLib.DatabaseCache as DatabaseCache
 import ID2TLib.libpcapreader as pr
 import ID2TLib.Utility as Util
 
 
 class PcapFile(object):
+    # Function calculating the fingerprint of a PCAP file from its path
+    fingerprint = staticmethod(DatabaseCache.sampled_fingerprint)
+
     def __init__(self, pcap_file_path: str):
         """
         Creates a new PcapFile associated to the PCAP file at pcap_file_path.
@@ -25,54 +28,48 @@ class PcapFile(object):
         file_out_path = pcap.merge_pcaps(attack_pcap_path)
         return file_out_path
 
-    def get_file_hash(self):
+    def merge_attacks(self, attack_pcap_paths: list, out_path: str = None):
         """
-        Returns the hash for the loaded PCAP file. The hash is calculated based on:
-
-        - the file size in bytes
-        - the first 224*40000 bytes of the file
+        Merges the loaded PCAP with all PCAPs in attack_pcap_paths in a single pass.
 
-        :return: The hash for the PCAP file as string.
+        :param attack_pcap_paths: The paths to the PCAP files to merge with the PCAP at pcap_file_path
+        :param out_path: The path of the resulting PCAP file, None to derive it from pcap_file_path and the current time
+        :return: The file path of the resulting PCAP file
         """
-        # Blocksize in bytes
-        const_blocksize = 224
-        # Number of blocks to read at beginning of file
-        const_max_blocks_read = 40000
-
-        # Initialize required variables
-        hasher = hashlib.sha224()
-        blocks_read = 0
-
-        # Hash calculation
-        with open(self.pcap_file_path, 'rb') as afile:
-            # Add filename -> makes trouble when renaming the PCAP
-            # hasher.update(afile.name.encode('utf-8'))
-
-            # Add file's last modification date -> makes trouble when copying the PCAP
-            # hasher.update(str(time.ctime(os.path.getmtime(self.pcap_file_path))).encode('utf-8'))
+        pcap = pr.pcap_processor(self.pcap_file_path, "False", Util.RESOURCE_DIR, "")
+        file_out_path = pcap.merge_pcaps_multi(attack_pcap_paths, out_path or "")
+        return file_out_path
 
-            # Add file size
-            hasher.update(str(os.path.getsize(self.pcap_file_path)).encode('utf-8'))
+    def get_file_hash(self, cache: DatabaseCache.DatabaseCache=None):
+        """
+        Returns the fingerprint for the loaded PCAP file, which is calculated by the fingerprint function. If a cache is
+        given, the fingerprint is looked up by the identity of the file (device, inode, size and modification time)
+        first and only calculated if the file is unknown to the cache or was modified.
 
-            # Add max. first 40000 * 224 bytes = 8,5 MB of file
-            buf = afile.read(const_blocksize)
-            blocks_read += 1
-            while len(buf) > 0 and blocks_read < const_max_blocks_read:
-                hasher.update(buf)
-                buf = afile.read(const_blocksize)
-                blocks_read += 1
+        :param cache: The DatabaseCache storing the fingerprints of known files (optional)
+        :return: The hash for the PCAP file as string.
+        """
+        if cache is None:
+            return self.fingerprint(self.pcap_file_path)
 
-        return hasher.hexdigest()
+        file_hash = cache.lookup_fingerprint(self.pcap_file_path)
+        if file_hash is None:
+            file_hash = self.fingerprint(self.pcap_file_path)
+            cache.store_fingerprint(self.pcap_file_path, file_hash)
+        return file_hash
 
-    def get_db_path(self, root_directory: str = os.path.join(Util.CACHE_DIR, 'db')):
+    def get_db_path(self, root_directory: str = os.path.join(Util.CACHE_DIR, 'db'), loaded: bool=False):
         """
         Creates a path based on a hashed directory structure. Derives a hash code by the file's hash and derives
-        thereof the database path.
+        thereof the database path. The database is marked as recently used in the cache index of the root directory,
+        which evicts the least recently used databases once the cache exceeds Util.CACHE_DB_MAX_SIZE. Databases loaded
+        by running processes are not evicted.
 
         Code and idea based on:
         http://michaelandrews.typepad.com/the_technical_times/2009/10/creating-a-hashed-directory-structure.html
 
         :param root_directory: The root directory of the hashed directory structure (optional)
+        :param loaded: Whether the database is loaded by this process until it exits (optional)
         :return: The full path to the database file
         """
 
@@ -89,10 +86,14 @@ class PcapFile(object):
                 h = (31 * h + ord(c)) & 0xFFFFFFFF
             return ((h + 0x80000000) & 0xFFFFFFFF) - 0x80000000
 
-        file_hash = self.get_file_hash()
-        hashcode = hashcode(file_hash)
-        mask = 255
-        dir_first_level = hashcode & mask
-        dir_second_level = (hashcode >> 8) & mask
-
-        return os.path.join(root_directory, str(dir_first_level), str(dir_second_level), file_hash[0:12] + ".sqlite3")
+        with DatabaseCache.DatabaseCache(root_directory, Util.CACHE_DB_MAX_SIZE) as cache:
+            file_hash = self.get_file_hash(cache)
+            hashcode = hashcode(file_hash)
+            mask = 255
+            dir_first_level = hashcode & mask
+            dir_second_level = (hashcode >> 8) & mask
+
+            db_path = os.path.join(root_directory, str(dir_first_level), str(dir_second_level),
+                                   file_hash[0:12] + ".sqlite3")
+            cache.use_database(db_path, file_hash, loaded)
+        return db_path
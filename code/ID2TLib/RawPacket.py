@@ -0,0 +1,347 @@
+import socket
+import struct
+
+# Ether types of the frames whose headers are located
+ETHER_TYPE_IPV4 = 0x0800
+ETHER_TYPE_VLAN = 0x8100
+# IP protocol numbers of the transport layers whose headers are located
+IP_PROTOCOL_TCP = 6
+IP_PROTOCOL_UDP = 17
+# TCP option kinds
+TCP_OPTION_END = 0
+TCP_OPTION_NOP = 1
+TCP_OPTION_MSS = 2
+
+
+def fold_checksum(value: int):
+    """
+    Folds a sum of 16 bit words into 16 bits using the one's complement addition.
+
+    :param value: The sum of 16 bit words
+    :return: the folded sum
+    """
+    while value >> 16:
+        value = (value & 0xFFFF) + (value >> 16)
+    return value
+
+
+def internet_checksum(data: bytes):
+    """
+    Calculates the internet checksum (RFC 1071) of data.
+
+    :param data: The data to be checksummed
+    :return: the checksum as integer
+    """
+    if len(data) % 2:
+        data += b"\x00"
+    return ~fold_checksum(sum(struct.unpack("!%dH" % (len(data) // 2), data))) & 0xFFFF
+
+
+def update_checksum(checksum: int, old: bytes, new: bytes):
+    """
+    Updates an internet checksum incrementally after 16 bit aligned data changed, following RFC 1624 (eqn. 3):
+    HC' = ~(~HC + ~m + m')
+
+    :param checksum: The checksum before the change
+    :param old: The 16 bit aligned data before the change
+    :param new: The 16 bit aligned data after the change
+    :return: the updated checksum
+    """
+    words = len(old) // 2
+    value = ~checksum & 0xFFFF
+    for old_word, new_word in zip(struct.unpack("!%dH" % words, old), struct.unpack("!%dH" % words, new)):
+        value += (~old_word & 0xFFFF) + new_word
+    return ~fold_checksum(value) & 0xFFFF
+
+
+class RawPacket(object):
+    def __init__(self, data: bytes, time: float = 0):
+        """
+        Creates a new RawPacket, which rewrites the fields of an Ethernet frame carrying IPv4 and TCP or UDP directly in
+        its bytes. The header offsets are located once, each field is written at its fixed offset and the IP and
+        transport layer checksums are updated incrementally, so that no packet needs to be dissected or rebuilt.
+
+        :param data: The bytes of the frame, e.g. read by scapy.utils.RawPcapReader
+        :param time: The timestamp of the packet
+        """
+        self.data = bytearray(data)
+        self.time = time
+
+        self.ip_offset = None
+        self.l4_offset = None
+        self.payload_offset = len(self.data)
+        self.protocol = None
+
+        ether_type_offset = 12
+        ether_type = struct.unpack_from("!H", self.data, ether_type_offset)[0]
+        if ether_type == ETHER_TYPE_VLAN:
+            ether_type_offset += 4
+            ether_type = struct.unpack_from("!H", self.data, ether_type_offset)[0]
+        if ether_type != ETHER_TYPE_IPV4:
+            return
+
+        self.ip_offset = ether_type_offset + 2
+        self.protocol = self.data[self.ip_offset + 9]
+        fragment_offset = struct.unpack_from("!H", self.data, self.ip_offset + 6)[0] & 0x1FFF
+        l4_offset = self.ip_offset + (self.data[self.ip_offset] & 0x0F) * 4
+        self.payload_offset = l4_offset
+        if fragment_offset == 0 and self.protocol == IP_PROTOCOL_TCP:
+            self.l4_offset = l4_offset
+            self.payload_offset = l4_offset + (self.data[l4_offset + 12] >> 4) * 4
+        elif fragment_offset == 0 and self.protocol == IP_PROTOCOL_UDP:
+            self.l4_offset = l4_offset
+            self.payload_offset = l4_offset + 8
+
+    def __bytes__(self):
+        return bytes(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def _l4_checksum_offset(self):
+        """
+        :return: the offset of the transport layer checksum, None if there is no checksum to be updated
+        """
+        if self.l4_offset is None:
+            return None
+        if self.protocol == IP_PROTOCOL_TCP:
+            return self.l4_offset + 16
+        if struct.unpack_from("!H", self.data, self.l4_offset + 6)[0] == 0:  # UDP without checksum
+            return None
+        return self.l4_offset + 6
+
+    def _write(self, offset: int, value: bytes, checksum_offsets: list):
+        """
+        Writes a field and updates the checksums covering it.
+
+        :param offset: The offset of the field
+        :param value: The new bytes of the field
+        :param checksum_offsets: The offsets of the checksums covering the field
+        """
+        start = offset - offset % 2
+        end = offset + len(value) + (offset + len(value)) % 2
+        old = bytes(self.data[start:end])
+        self.data[offset:offset + len(value)] = value
+        new = bytes(self.data[start:end])
+        if old == new:
+            return
+        for checksum_offset in checksum_offsets:
+            if checksum_offset is not None:
+                checksum = update_checksum(struct.unpack_from("!H", self.data, checksum_offset)[0], old, new)
+                if checksum == 0 and self.protocol == IP_PROTOCOL_UDP and checksum_offset == self.l4_offset + 6:
+                    checksum = 0xFFFF
+                struct.pack_into("!H", self.data, checksum_offset, checksum)
+
+    def _write_l4(self, offset: int, fmt: str, value: int):
+        """
+        Writes a transport layer header field and updates the transport layer checksum.
+
+        :param offset: The offset of the field relative to the transport layer header
+        :param fmt: The struct format of the field
+        :param value: The new value of the field
+        """
+        self._write(self.l4_offset + offset, struct.pack(fmt, value), [self._l4_checksum_offset()])
+
+    def _read_l4(self, offset: int, fmt: str):
+        """
+        :param offset: The offset of the field relative to the transport layer header
+        :param fmt: The struct format of the field
+        :return: the value of the transport layer header field
+        """
+        return struct.unpack_from(fmt, self.data, self.l4_offset + offset)[0]
+
+    # Ethernet
+
+    def get_mac_src(self):
+        """
+        :return: the source MAC address
+        """
+        return ":".join("%02x" % b for b in self.data[6:12])
+
+    def get_mac_dst(self):
+        """
+        :return: the destination MAC address
+        """
+        return ":".join("%02x" % b for b in self.data[0:6])
+
+    def set_mac_src(self, mac: str):
+        """
+        :param mac: The new source MAC address
+        """
+        self.data[6:12] = bytes.fromhex(mac.replace(":", ""))
+
+    def set_mac_dst(self, mac: str):
+        """
+        :param mac: The new destination MAC address
+        """
+        self.data[0:6] = bytes.fromhex(mac.replace(":", ""))
+
+    # IPv4
+
+    def get_ip_src(self):
+        """
+        :return: the source IP address
+        """
+        return socket.inet_ntoa(self.data[self.ip_offset + 12:self.ip_offset + 16])
+
+    def get_ip_dst(self):
+        """
+        :return: the destination IP address
+        """
+        return socket.inet_ntoa(self.data[self.ip_offset + 16:self.ip_offset + 20])
+
+    def set_ip_src(self, ip: str):
+        """
+        :param ip: The new source IP address
+        """
+        self._write(self.ip_offset + 12, socket.inet_aton(ip), [self.ip_offset + 10, self._l4_checksum_offset()])
+
+    def set_ip_dst(self, ip: str):
+        """
+        :param ip: The new destination IP address
+        """
+        self._write(self.ip_offset + 16, socket.inet_aton(ip), [self.ip_offset + 10, self._l4_checksum_offset()])
+
+    def get_ttl(self):
+        """
+        :return: the TTL value
+        """
+        return self.data[self.ip_offset + 8]
+
+    def set_ttl(self, ttl: int):
+        """
+        :param ttl: The new TTL value
+        """
+        self._write(self.ip_offset + 8, bytes([ttl]), [self.ip_offset + 10])
+
+    # TCP/UDP
+
+    def get_sport(self):
+        """
+        :return: the source port
+        """
+        return self._read_l4(0, "!H")
+
+    def get_dport(self):
+        """
+        :return: the destination port
+        """
+        return self._read_l4(2, "!H")
+
+    def set_sport(self, port: int):
+        """
+        :param port: The new source port
+        """
+        self._write_l4(0, "!H", port)
+
+    def set_dport(self, port: int):
+        """
+        :param port: The new destination port
+        """
+        self._write_l4(2, "!H", port)
+
+    # TCP
+
+    def get_seq(self):
+        """
+        :return: the TCP sequence number
+        """
+        return self._read_l4(4, "!I")
+
+    def get_ack(self):
+        """
+        :return: the TCP acknowledgment number
+        """
+        return self._read_l4(8, "!I")
+
+    def set_seq(self, seq: int):
+        """
+        :param seq: The new TCP sequence number
+        """
+        self._write_l4(4, "!I", seq)
+
+    def set_ack(self, ack: int):
+        """
+        :param ack: The new TCP acknowledgment number
+        """
+        self._write_l4(8, "!I", ack)
+
+    def get_flags(self):
+        """
+        :return: the TCP flags
+        """
+        return self._read_l4(12, "!H") & 0x01FF
+
+    def get_window(self):
+        """
+        :return: the TCP window size
+        """
+        return self._read_l4(14, "!H")
+
+    def set_window(self, window: int):
+        """
+        :param window: The new TCP window size
+        """
+        self._write_l4(14, "!H", window)
+
+    def set_mss(self, mss: int):
+        """
+        Replaces the value of the MSS option, if the TCP header contains one.
+
+        :param mss: The new maximum segment size
+        :return: True if the MSS option was replaced, otherwise False
+        """
+        offset = self.l4_offset + 20
+        while offset < self.payload_offset:
+            kind = self.data[offset]
+            if kind == TCP_OPTION_END:
+                break
+            if kind == TCP_OPTION_NOP:
+                offset += 1
+                continue
+            length = self.data[offset + 1]
+            if kind == TCP_OPTION_MSS and length == 4:
+                self._write(offset + 2, struct.pack("!H", mss), [self._l4_checksum_offset()])
+                return True
+            if length < 2:
+                break
+            offset += length
+        return False
+
+    # Payload
+
+    def get_payload(self):
+        """
+        :return: the payload of the transport layer, without the Ethernet padding
+        """
+        ip_length = struct.unpack_from("!H", self.data, self.ip_offset + 2)[0]
+        return bytes(self.data[self.payload_offset:self.ip_offset + ip_length])
+
+    def set_payload(self, payload: bytes):
+        """
+        Replaces the payload of the transport layer, removes the Ethernet padding and recalculates the lengths and
+        checksums of the IP and transport layer headers.
+
+        :param payload: The new payload
+        """
+        del self.data[self.payload_offset:]
+        self.data += payload
+
+        struct.pack_into("!H", self.data, self.ip_offset + 2, len(self.data) - self.ip_offset)
+        ip_header_end = self.ip_offset + (self.data[self.ip_offset] & 0x0F) * 4
+        struct.pack_into("!H", self.data, self.ip_offset + 10, 0)
+        struct.pack_into("!H", self.data, self.ip_offset + 10,
+                         internet_checksum(bytes(self.data[self.ip_offset:ip_header_end])))
+
+        checksum_offset = self._l4_checksum_offset()
+        if self.protocol == IP_PROTOCOL_UDP:
+            struct.pack_into("!H", self.data, self.l4_offset + 4, len(self.data) - self.l4_offset)
+        if checksum_offset is not None:
+            segment = self.data[self.l4_offset:]
+            pseudo_header = self.data[self.ip_offset + 12:self.ip_offset + 20] + \
+                struct.pack("!BBH", 0, self.protocol, len(segment))
+            struct.pack_into("!H", self.data, checksum_offset, 0)
+            checksum = internet_checksum(bytes(pseudo_header + self.data[self.l4_offset:]))
+            if checksum == 0 and self.protocol == IP_PROTOCOL_UDP:
+                checksum = 0xFFFF
+            struct.pack_into("!H", self.data, checksum_offset, checksum)
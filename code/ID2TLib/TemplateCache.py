@@ -0,0 +1,132 @@
+import os
+import pickle
+
+import scapy.utils
+
+import ID2TLib.DatabaseCache as DatabaseCache
+import ID2TLib.RawPacket as RawPacket
+import ID2TLib.Utility as Util
+
+
+def packets_to_convs(exploit_raw_packets):
+    """
+    Classifies a bunch of packets to conversations groups. A conversation is a set of packets go between host A
+    (IP,port) to host B (IP,port)
+
+    :param exploit_raw_packets: A set of packets contains several conversations.
+    :return conversations: A set of arrays, each array contains the packet of specific conversation
+    :return orderList_conversations: An array contains the conversations ids (IP_A,port_A, IP_b,port_B) in the
+    order they appeared in the original packets.
+    """
+    conversations = {}
+    order_list_conversations = []
+    for pkt in exploit_raw_packets:
+        raw_pkt = RawPacket.RawPacket(pkt[0])
+        ip_dst, ip_src, port_dst, port_src = None, None, None, None
+        # packets without IPv4 or TCP/UDP header, e.g. ICMP, are grouped by the fields they carry
+        if raw_pkt.ip_offset is not None:
+            ip_dst = raw_pkt.get_ip_dst()
+            ip_src = raw_pkt.get_ip_src()
+        if raw_pkt.l4_offset is not None:
+            port_dst = raw_pkt.get_dport()
+            port_src = raw_pkt.get_sport()
+
+        conv_req = (ip_src, port_src, ip_dst, port_dst)
+        conv_rep = (ip_dst, port_dst, ip_src, port_src)
+        if conv_req not in conversations and conv_rep not in conversations:
+            conversations[conv_req] = [pkt]
+            # Order list of conv
+            order_list_conversations.append(conv_req)
+        elif conv_req in conversations:
+            conversations[conv_req].append(pkt)
+        else:
+            conversations[conv_rep].append(pkt)
+    return conversations, order_list_conversations
+
+
+class TemplateCache(object):
+    def __init__(self, cache_directory: str = None):
+        """
+        Creates a new TemplateCache, which keeps the packets of the template PCAP files of the attacks, read once and
+        grouped into conversations, keyed by the fingerprint of the template file. If a cache directory is given, the
+        parsed templates are also stored there, so that other processes do not need to parse them again.
+
+        :param cache_directory: The directory to store the parsed templates in, None to keep them in memory only
+        """
+        self.cache_directory = cache_directory
+        self.templates = {}
+        self.fingerprints = {}
+
+    def _fingerprint(self, template_path: str):
+        """
+        :param template_path: The path to the template PCAP file
+        :return: the fingerprint of the template file, which is calculated once per file identity
+        """
+        stat = os.stat(template_path)
+        key = (os.path.abspath(template_path), stat.st_size, stat.st_mtime_ns)
+        if key not in self.fingerprints:
+            self.fingerprints[key] = DatabaseCache.sampled_fingerprint(template_path)
+        return self.fingerprints[key]
+
+    def _get_template(self, template_path: str):
+        """
+        :param template_path: The path to the template PCAP file
+        :return: the parsed template, a dict of its packets, conversations and the order of the conversations
+        """
+        fingerprint = self._fingerprint(template_path)
+        if fingerprint in self.templates:
+            return self.templates[fingerprint]
+
+        cache_path = None
+        if self.cache_directory is not None:
+            cache_path = os.path.join(self.cache_directory, fingerprint + ".pickle")
+            if os.path.exists(cache_path):
+                try:
+                    with open(cache_path, "rb") as cache_file:
+                        self.templates[fingerprint] = pickle.load(cache_file)
+                    return self.templates[fingerprint]
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    pass
+
+        reader = scapy.utils.RawPcapReader(template_path)
+        # store the packet metadata as plain tuple, which can be pickled independently of the scapy version
+        packets = [tuple(tuple(field) if isinstance(field, tuple) else field for field in pkt) for pkt in reader]
+        reader.close()
+
+        conversations, order_list_conversations = packets_to_convs(packets)
+        template = {"packets": tuple(packets),
+                    "conversations": {conv: tuple(pkts) for conv, pkts in conversations.items()},
+                    "order_list_conversations": tuple(order_list_conversations)}
+        self.templates[fingerprint] = template
+
+        if cache_path is not None:
+            try:
+                os.makedirs(self.cache_directory, exist_ok=True)
+                temp_path = cache_path + ".{}.tmp".format(os.getpid())
+                with open(temp_path, "wb") as cache_file:
+                    pickle.dump(template, cache_file, pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, cache_path)
+            except OSError:
+                pass
+        return template
+
+    def get_packets(self, template_path: str):
+        """
+        :param template_path: The path to the template PCAP file
+        :return: the packets of the template file as tuples of their raw bytes and their metadata, like the packets
+                 read by scapy.utils.RawPcapReader
+        """
+        return self._get_template(template_path)["packets"]
+
+    def get_conversations(self, template_path: str):
+        """
+        :param template_path: The path to the template PCAP file
+        :return: the packets of the template file grouped into conversations and the conversation ids in the order
+                 they appeared, see packets_to_convs
+        """
+        template = self._get_template(template_path)
+        return template["conversations"], template["order_list_conversations"]
+
+
+# Parsed templates shared by all attacks of this process
+template_cache = TemplateCache(os.path.join(Util.CACHE_DIR, "templates"))
@@ -116,12 +116,11 @@ def get_x86_nop(count, side_effect_free, char_filter):
     return b'\x90' * count
 
 
-def get_attacker_config(ip_source_list, ipAddress: str):
+def get_attacker_config(self, ip_address: str):
     """
-    unittest patch for get_attacker_config (ID2TLib.Utility.py)
+    unittest patch for AttackerConfigPool.get_attacker_config (ID2TLib.AttackerConfigPool.py)
 
-    :param ip_source_list: List of source IPs
-    :param ipAddress: The IP address of the attacker
+    :param ip_address: The IP address of the attacker
     :return: A tuple consisting of (port, ttlValue)
     """
     next_port = rnd.randint(0, 2 ** 16 - 1)
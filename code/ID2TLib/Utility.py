@@ -6,11 +6,11 @@ import os
 import random as rnd
 import lea
 import xdg.BaseDirectory as BaseDir
-import scapy.layers.inet as inet
-import scipy.stats as stats
 import pytz as pytz
 
 CACHE_DIR = os.path.join(BaseDir.xdg_cache_home, 'id2t')
+# Maximum size in bytes of all statistics databases in the cache, least recently used databases are evicted first
+CACHE_DB_MAX_SIZE = 10 * 1024 ** 3
 CODE_DIR = os.path.dirname(os.path.abspath(__file__)) + "/../"
 ROOT_DIR = CODE_DIR + "../"
 RESOURCE_DIR = ROOT_DIR + "resources/"
@@ -35,10 +35,6 @@ x86_pseudo_nops = {b'\x97', b'\x96', b'\x95', b'\x93', b'\x92', b'\x91', b'\x99'
 # Characters which result in operational behaviour (e.g. FTPWinaXeExploit.py)
 forbidden_chars = [b'\x00', b'\x0a', b'\x0d']
 
-# Used in get_attacker_config
-attacker_port_mapping = {}
-# Used in get_attacker_config
-attacker_ttl_mapping = {}
 # Identifier for attacks
 generic_attack_names = {"attack", "exploit"}
 
@@ -329,45 +325,6 @@ def handle_most_used_outputs(most_used_x):
         return most_used_x
 
 
-def get_attacker_config(ip_source_list, ip_address: str):
-    """
-    Returns the attacker configuration depending on the IP address, this includes the port for the next
-    attacking packet and the previously used (fixed) TTL value.
-
-    :param ip_source_list: List of source IPs
-    :param ip_address: The IP address of the attacker
-    :return: A tuple consisting of (port, ttlValue)
-    """
-    # Gamma distribution parameters derived from MAWI 13.8G dataset
-    alpha, loc, beta = (2.3261710235, -0.188306914406, 44.4853123884)
-    gd = stats.gamma.rvs(alpha, loc=loc, scale=beta, size=len(ip_source_list))
-
-    # Determine port
-    port = attacker_port_mapping.get(ip_address)
-    if port is not None:  # use next port
-        next_port = attacker_port_mapping.get(ip_address) + 1
-        if next_port > (2 ** 16 - 1):
-            next_port = 1
-    else:  # generate starting port
-        next_port = inet.RandShort()
-    attacker_port_mapping[ip_address] = next_port
-    # Determine TTL value
-    ttl = attacker_ttl_mapping.get(ip_address)
-    if ttl is None:  # determine TTL value
-        is_invalid = True
-        pos = ip_source_list.index(ip_address)
-        pos_max = len(gd)
-        while is_invalid:
-            ttl = int(round(gd[pos]))
-            if 0 < ttl < 256:  # validity check
-                is_invalid = False
-            else:
-                pos = (pos + 1) % pos_max
-        attacker_ttl_mapping[ip_address] = ttl
-    # return port and TTL
-    return next_port, ttl
-
-
 def remove_generic_ending(string):
     """"
     Returns the input string with it's ending cut off, in case it was a generic one
@@ -0,0 +1,41 @@
+import unittest
+import unittest.mock as mock
+
+import ID2TLib.AttackerConfigPool as AttackerConfigPool
+import ID2TLib.TestLibrary as Lib
+
+
+class TestAttackerConfigPool(unittest.TestCase):
+    def setUp(self):
+        self.ip_source_list = ["10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.3"]
+        self.pool = AttackerConfigPool.AttackerConfigPool(self.ip_source_list)
+
+    def test_ttl_fixed_and_valid(self):
+        for ip_address in self.ip_source_list:
+            _, ttl = self.pool.get_attacker_config(ip_address)
+            self.assertTrue(0 < ttl < 256)
+            self.assertEqual(self.pool.get_attacker_config(ip_address)[1], ttl)
+
+    def test_ports_consecutive(self):
+        port, _ = self.pool.get_attacker_config("10.0.0.2")
+        next_port, _ = self.pool.get_attacker_config("10.0.0.2")
+        self.assertEqual(next_port, 1 if port == 2 ** 16 - 1 else port + 1)
+
+    def test_ports_wrap_around(self):
+        self.pool.ports["10.0.0.3"] = 2 ** 16 - 1
+        self.assertEqual(self.pool.get_attacker_config("10.0.0.3")[0], 1)
+
+    def test_pools_independent(self):
+        self.pool.get_attacker_config("10.0.0.1")
+        other_pool = AttackerConfigPool.AttackerConfigPool(self.ip_source_list)
+        self.assertEqual(set(other_pool.ttls), {"10.0.0.1", "10.0.0.2", "10.0.0.3"})
+
+    @mock.patch.object(AttackerConfigPool.AttackerConfigPool, "get_attacker_config", Lib.get_attacker_config)
+    def test_patch(self):
+        port, ttl = self.pool.get_attacker_config("10.0.0.1")
+        self.assertTrue(0 <= port < 2 ** 16)
+        self.assertTrue(0 < ttl < 256)
+
+
+if __name__ == '__main__':
+    unittest.main()
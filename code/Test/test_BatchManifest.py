@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import unittest
+
+import ID2TLib.BatchManifest as BatchManifest
+
+
+class TestBatchManifest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.directory.name, "manifest.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_manifest(self, manifest):
+        with open(self.manifest_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+
+    def test_load_manifest(self):
+        self.write_manifest({"datasets": [
+            {"output": "out/first", "attacks": [["DDoSAttack", "attackers.count=10"], "PortscanAttack ip.dst=10.0.0.1"],
+             "seeds": [42, "abc"], "inject_empty": True},
+            {"output": "second.pcap", "attacks": ["SMBScanAttack"]}]})
+        datasets = BatchManifest.load_manifest(self.manifest_path)
+
+        self.assertEqual(len(datasets), 2)
+        self.assertEqual(datasets[0]["output"], os.path.join(self.directory.name, "out", "first.pcap"))
+        self.assertEqual(datasets[0]["attacks"], [["DDoSAttack", "attackers.count=10"],
+                                                  ["PortscanAttack", "ip.dst=10.0.0.1"]])
+        self.assertEqual(datasets[0]["seeds"], [[42], ["abc"]])
+        self.assertTrue(datasets[0]["inject_empty"])
+        self.assertEqual(datasets[1]["seeds"], [])
+        self.assertFalse(datasets[1]["inject_empty"])
+        self.assertFalse(datasets[1]["update_statistics"])
+
+    def test_load_dataset_list(self):
+        self.write_manifest([{"output": "dataset.pcap", "attacks": ["SMBScanAttack"]}])
+        self.assertEqual(BatchManifest.load_manifest(self.manifest_path)[0]["attacks"], [["SMBScanAttack"]])
+
+    def test_invalid_manifests(self):
+        for manifest in [{}, [], [{"output": "dataset.pcap"}],
+                         [{"output": "dataset", "attacks": ["SMBScanAttack"]},
+                          {"output": "dataset.pcap", "attacks": ["PortscanAttack"]}]]:
+            self.write_manifest(manifest)
+            with self.assertRaises(ValueError):
+                BatchManifest.load_manifest(self.manifest_path)
@@ -0,0 +1,19 @@
+import unittest
+
+import numpy as np
+
+import Core.ComplementRateTable as ComplementRateTable
+import ID2TLib.Utility as Utility
+
+
+class TestComplementRateTable(unittest.TestCase):
+    def setUp(self):
+        self.cipps = [(5, 1), (10, 2), (15, 3)]
+        self.table = ComplementRateTable.ComplementRateTable(self.cipps)
+
+    def test_get_interval_pps(self):
+        for timestamp in [0, 3, 5, 7, 10, 12, 15, 30]:
+            self.assertEqual(self.table.get_interval_pps(timestamp), Utility.get_interval_pps(self.cipps, timestamp))
+
+    def test_get_interval_pps_vectorized(self):
+        np.testing.assert_array_equal(self.table.get_interval_pps(np.array([3, 5, 7, 12, 30])), [1, 1, 2, 3, 3])
@@ -1,3 +1,4 @@
+import sys
 import unittest
 import unittest.mock as mock
 import Core.Controller as Ctrl
@@ -58,3 +59,47 @@ class TestController(unittest.TestCase):
     def test_process_help_examples(self, mock_print):
         Ctrl.Controller.process_help(["examples"])
         self.assertTrue(mock_print.called)
+
+    def test_attack_worker_exit(self):
+        def exit_attack(*args):
+            print("Unknown parameter")
+            sys.exit(1)
+
+        controller = mock.MagicMock()
+        controller.process_attack.side_effect = exit_attack
+        with mock.patch.object(Ctrl, "_worker_attack_controller", controller):
+            result, exit_status, output = Ctrl._process_attack_worker((["PortscanAttack"], 42, False))
+        self.assertIsNone(result)
+        self.assertEqual(exit_status, 1)
+        self.assertEqual(output, "Unknown parameter\n")
+
+    def test_dataset_worker_exit(self):
+        controller = mock.MagicMock()
+        controller.process_dataset.side_effect = SystemExit(-1)
+        with mock.patch.object(Ctrl, "_worker_controller", controller):
+            created_files, exit_status, output = Ctrl._process_dataset_worker({"output": "out.pcap"})
+        self.assertIsNone(created_files)
+        self.assertEqual(exit_status, -1)
+
+    @mock.patch("builtins.print")
+    def test_create_statistics_plot_invalid_jobs(self, mock_print):
+        controller = mock.MagicMock()
+        for value in ["x", "0", "-2"]:
+            Ctrl.Controller.create_statistics_plot(controller, ["jobs=" + value], False)
+        self.assertFalse(controller.statistics.plot_statistics.called)
+        self.assertEqual(mock_print.call_count, 3)
+
+    @mock.patch("builtins.print")
+    def test_create_statistics_plot_invalid_top(self, mock_print):
+        controller = mock.MagicMock()
+        for value in ["x", "0", "-5"]:
+            Ctrl.Controller.create_statistics_plot(controller, ["top=" + value], False)
+        self.assertFalse(controller.statistics.plot_statistics.called)
+        self.assertEqual(mock_print.call_count, 3)
+
+    @mock.patch("builtins.print")
+    def test_create_statistics_plot_top(self, mock_print):
+        controller = mock.MagicMock()
+        Ctrl.Controller.create_statistics_plot(controller, ["top=20", "jobs=2"], False)
+        controller.statistics.plot_statistics.assert_called_once_with(entropy=False, file_format="pdf",
+                                                                      plot_names=None, processes=2, top_k=20)
@@ -0,0 +1,71 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import unittest
+
+import ID2TLib.DatabaseCache as DatabaseCache
+
+
+class TestDatabaseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = DatabaseCache.DatabaseCache(self.tmp_dir, 1500)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def write_file(self, name: str, content: bytes):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return path
+
+    def test_sampled_fingerprint_same_prefix(self):
+        block = DatabaseCache.SAMPLE_BLOCK_SIZE
+        path_a = self.write_file("a.pcap", bytes(block * 20))
+        path_b = self.write_file("b.pcap", bytes(block * 19) + b"\x01" * block)
+        self.assertNotEqual(DatabaseCache.sampled_fingerprint(path_a), DatabaseCache.sampled_fingerprint(path_b))
+
+    def test_sampled_fingerprint_same_content(self):
+        path_a = self.write_file("a.pcap", b"\x01\x02" * 1000)
+        path_b = self.write_file("b.pcap", b"\x01\x02" * 1000)
+        self.assertEqual(DatabaseCache.sampled_fingerprint(path_a), DatabaseCache.sampled_fingerprint(path_b))
+
+    def test_lookup_fingerprint_modified(self):
+        path = self.write_file("a.pcap", b"\x01")
+        self.cache.store_fingerprint(path, "fingerprint")
+        self.assertEqual(self.cache.lookup_fingerprint(path), "fingerprint")
+        self.write_file("a.pcap", b"\x01\x02")
+        self.assertIsNone(self.cache.lookup_fingerprint(path))
+
+    def test_use_database_evicts_least_recently_used(self):
+        paths = [self.write_file(name + ".sqlite3", bytes(600)) for name in ["a", "b", "c"]]
+        for path in paths:
+            self.cache.use_database(path, os.path.basename(path))
+        self.assertEqual([os.path.exists(path) for path in paths], [False, True, True])
+
+    def test_use_database_keeps_loaded_databases(self):
+        paths = [self.write_file(name + ".sqlite3", bytes(600)) for name in ["a", "b", "c"]]
+        self.cache.use_database(paths[0], "a", loaded=True)
+        for path in paths[1:]:
+            self.cache.use_database(path, os.path.basename(path))
+        self.assertEqual([os.path.exists(path) for path in paths], [True, False, True])
+
+    def test_use_database_evicts_databases_of_exited_processes(self):
+        paths = [self.write_file(name + ".sqlite3", bytes(600)) for name in ["a", "b", "c"]]
+        process = subprocess.Popen(["true"])
+        process.wait()
+        self.cache.use_database(paths[0], "a")
+        self.cache.index.execute("INSERT INTO loaded_databases VALUES (?, ?)", (paths[0], process.pid))
+        for path in paths[1:]:
+            self.cache.use_database(path, os.path.basename(path))
+        self.assertEqual([os.path.exists(path) for path in paths], [False, True, True])
+
+    def test_close_on_exit(self):
+        with DatabaseCache.DatabaseCache(self.tmp_dir, 1500) as cache:
+            cache.use_database(self.write_file("a.sqlite3", bytes(600)), "a")
+        with self.assertRaises(sqlite3.ProgrammingError):
+            cache.index.execute("SELECT * FROM databases")
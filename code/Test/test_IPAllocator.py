@@ -0,0 +1,35 @@
+import random
+import unittest
+
+import ID2TLib.IPAllocator as IPAllocator
+
+
+class TestIPAllocator(unittest.TestCase):
+    def test_subtract_ranges(self):
+        self.assertEqual(IPAllocator.subtract_ranges([(0, 10), (8, 20), (30, 40)], [(5, 12), (15, 16), (35, 50)]),
+                         [(0, 5), (12, 15), (16, 20), (30, 35)])
+        self.assertEqual(IPAllocator.subtract_ranges([(0, 10)], [(0, 10)]), [])
+
+    def test_allocate_all_once(self):
+        allocator = IPAllocator.IPAllocator([(100, 110), (200, 205)], [(103, 106)])
+        self.assertEqual(len(allocator), 12)
+        addresses = [allocator.allocate() for _ in range(12)]
+        self.assertEqual(sorted(addresses), [100, 101, 102, 106, 107, 108, 109, 200, 201, 202, 203, 204])
+        self.assertEqual(len(allocator), 0)
+        with self.assertRaises(ValueError):
+            allocator.allocate()
+
+    def test_add_range(self):
+        allocator = IPAllocator.IPAllocator([(0, 5)])
+        addresses = [allocator.allocate() for _ in range(3)]
+        allocator.add_range(10, 14)
+        self.assertEqual(len(allocator), 6)
+        addresses += [allocator.allocate() for _ in range(6)]
+        self.assertEqual(sorted(addresses), [0, 1, 2, 3, 4, 10, 11, 12, 13])
+
+    def test_deterministic(self):
+        random.seed(42)
+        first = [IPAllocator.IPAllocator([(0, 1 << 32)]).allocate() for _ in range(5)]
+        random.seed(42)
+        second = [IPAllocator.IPAllocator([(0, 1 << 32)]).allocate() for _ in range(5)]
+        self.assertEqual(first, second)
@@ -0,0 +1,51 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+import Core.IntervalIndex as IntervalIndex
+import Core.StatsDatabase as StatsDB
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(self.tmp_dir, "stats.sqlite3")
+        db = sqlite3.connect(db_path)
+        db.execute("CREATE TABLE interval_statistics_1000000 (last_pkt_timestamp TEXT, first_pkt_timestamp TEXT, "
+                   "pkts_count INTEGER, kBytes REAL, PRIMARY KEY(last_pkt_timestamp));")
+        db.executemany("INSERT INTO interval_statistics_1000000 VALUES (?, ?, ?, ?)",
+                       [("12000000", "11000000", 20, 2.5), ("11000000", "10000000", 10, 1.5),
+                        ("15000000", "14000000", 40, None)])
+        db.commit()
+        db.close()
+        self.stats_db = StatsDB.StatsDatabase(db_path)
+        self.index = IntervalIndex.IntervalIndex(self.stats_db, "interval_statistics_1000000", 10000000)
+
+    def tearDown(self):
+        self.stats_db.database.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookup_single(self):
+        self.assertEqual(self.index.interval_length, 1000000)
+        self.assertEqual(self.index.lookup("kbytes", 10.5), 1.5)
+        self.assertEqual(self.index.lookup("pkts_count", 11.0), 20)
+        self.assertEqual(self.index.lookup("kbytes", 13.5), None)
+        self.assertEqual(self.index.lookup("kbytes", 9.0, default=0), 0)
+        self.assertEqual(self.index.lookup("kbytes", 14.5, default=0), 0)
+
+    def test_lookup_batch(self):
+        values = self.index.lookup("kbytes", np.array([10.5, 11.5, 13.5, 9.0]))
+        np.testing.assert_array_equal(values, [1.5, 2.5, np.nan, np.nan])
+
+    def test_interval_keys(self):
+        np.testing.assert_array_equal(self.index.interval_keys(np.array([10.5, 11.0, 2.5])),
+                                      [10000000, 11000000, 12000000])
+        self.assertEqual(int(self.index.interval_keys(10.5)), 10000000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+import Attack.AttackParameters as atkParam
+import Attack.BaseAttack as BaseAttack
+import Core.AttackRegistry as AttackRegistry
+import Core.LabelManager as LabelManager
+import ID2TLib.Label as Label
+
+
+class TestLabelManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.pcap_path = os.path.join(self.directory.name, "input.pcap")
+        with open(self.pcap_path, "wb") as pcap_file:
+            pcap_file.write(b"pcap")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_load_labels(self):
+        label_manager = LabelManager.LabelManager()
+        label_manager.filepath_input_pcap = self.pcap_path
+        for i in range(3):
+            label_manager.add_labels(Label.Label("PortscanAttack", 10.0 + i, 20.5 + i, 100 + i, i, {},
+                                                 "note <%d> & more" % i))
+        label_manager.write_label_file(self.pcap_path)
+
+        loaded = LabelManager.LabelManager(self.pcap_path)
+        self.assertEqual(loaded.input_filename, "input.pcap")
+        self.assertEqual(len(loaded.labels), 3)
+        for i, label in enumerate(loaded.labels):
+            self.assertEqual(label.attack_name, "PortscanAttack")
+            self.assertEqual(label.timestamp_start, 10.0 + i)
+            self.assertEqual(label.timestamp_end, 20.5 + i)
+            self.assertEqual(label.injected_packets, 100 + i)
+            self.assertEqual(label.seed, str(i))
+            self.assertEqual(label.attack_note, "note <%d> & more" % i)
+
+    def test_load_typed_parameters(self):
+        params = {atkParam.Parameter.PACKETS_PER_SECOND: BaseAttack.BaseAttack.ValuePair(42.5, True),
+                  atkParam.Parameter.PORT_DESTINATION: BaseAttack.BaseAttack.ValuePair([22, 80], False),
+                  atkParam.Parameter.IP_DESTINATION: BaseAttack.BaseAttack.ValuePair("10.0.0.1", True)}
+        label_manager = LabelManager.LabelManager()
+        label_manager.filepath_input_pcap = self.pcap_path
+        label_manager.add_labels(Label.Label("PortscanAttack", 1.0, 2.0, 10, 0, params))
+        label_manager.write_label_file(self.pcap_path)
+
+        self.assertEqual(LabelManager.LabelManager(self.pcap_path).labels[0].parameters, params)
+        self.assertIs(AttackRegistry.get_supported_params("PortscanAttack"),
+                      AttackRegistry.get_supported_params("PortscanAttack"))
+
+    def test_load_invalid_label_file(self):
+        with open(os.path.join(self.directory.name, "input_labels.xml"), "w") as label_file:
+            label_file.write("<labels><attack>")
+        self.assertEqual(LabelManager.LabelManager(self.pcap_path).labels, [])
@@ -1,6 +1,9 @@
 import Test.ID2TAttackTest as Test
 import ID2TLib.Utility as Util
 
+# FIXME: sha_default was generated before the IPAllocator and has to be regenerated for seed 42. The attack draws its
+# response delays from Util.BOTNET_PCAP, which is not part of the repository, so the new checksum can only be taken
+# from a checkout that has this resource (a failing run keeps the output pcap, see TestLibrary.rename_test_result_files).
 sha_default = 'f57edd9fe1f8a2cf31d56f263d72d8e10c71d18cb124f0fb0b5bfcab49497419'
 
 
@@ -0,0 +1,83 @@
+import os
+import struct
+import tempfile
+import unittest
+
+import scapy.utils
+
+import ID2TLib.PcapFile as PcapFile
+
+
+def ethernet_frame(marker: int):
+    """
+    :param marker: A byte identifying the frame
+    :return: an Ethernet frame with an IPv4 header carrying the marker as TTL and a wrong checksum
+    """
+    ip = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20, 0, 0, marker, 0, 0xdead, bytes([10, 0, 0, 1]), bytes([10, 0, 0, 2]))
+    return bytes(6) + bytes([2, 0, 0, 0, 0, 1]) + b"\x08\x00" + ip
+
+
+def write_pcap(path: str, records: list, link_type: int = 1):
+    """
+    Writes a PCAP file.
+
+    :param path: The path of the PCAP file
+    :param records: A list of (timestamp in microseconds, frame) of the packets
+    :param link_type: The link type of the PCAP file
+    """
+    with open(path, "wb") as pcap:
+        pcap.write(struct.pack("<IHHiIII", 0xa1b2c3d4, 2, 4, 0, 0, 65535, link_type))
+        for timestamp, frame in records:
+            pcap.write(struct.pack("<IIII", timestamp // 1000000, timestamp % 1000000, len(frame), len(frame)))
+            pcap.write(frame)
+
+
+class TestMergePcaps(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.base_path = os.path.join(self.directory.name, "base.pcap")
+        write_pcap(self.base_path, [(1000000, ethernet_frame(1)), (3000000, ethernet_frame(2)),
+                                    (3500000, ethernet_frame(3))])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def merge(self, records: list, link_type: int = 1):
+        """
+        :param records: The packets of the attack PCAP files, a list of records per file, see write_pcap
+        :param link_type: The link type of the attack PCAP files
+        :return: a list of (timestamp in microseconds, frame) of the packets of the merged PCAP file
+        """
+        attack_paths = []
+        for i, attack_records in enumerate(records):
+            attack_paths.append(os.path.join(self.directory.name, "attack{}.pcap".format(i)))
+            write_pcap(attack_paths[-1], attack_records, link_type)
+        out_path = os.path.join(self.directory.name, "merged.pcap")
+        PcapFile.PcapFile(self.base_path).merge_attacks(attack_paths, out_path)
+
+        reader = scapy.utils.RawPcapReader(out_path)
+        merged = [(metadata[0] * 1000000 + metadata[1], pkt) for pkt, metadata in reader]
+        reader.close()
+        return merged
+
+    def test_merge_order(self):
+        merged = self.merge([[(2000000, ethernet_frame(11)), (3000000, ethernet_frame(12))],
+                             [(3000000, ethernet_frame(21)), (4000000, ethernet_frame(22))]])
+        # packets with equal timestamps: later files first, the base PCAP file last
+        self.assertEqual([pkt[22] for _, pkt in merged], [1, 11, 21, 12, 2, 3, 22])
+        self.assertEqual([timestamp for timestamp, _ in merged],
+                         [1000000, 2000000, 3000000, 3000000, 3000000, 3500000, 4000000])
+
+    def test_records_copied(self):
+        merged = self.merge([[(2000000, ethernet_frame(11)), (2500000, ethernet_frame(12)[:16])]])
+        # the wrong IP checksum is kept and the malformed frame is skipped
+        self.assertEqual(merged[1], (2000000, ethernet_frame(11)))
+        self.assertEqual(len(merged), 4)
+
+    def test_different_link_types(self):
+        with self.assertRaises(RuntimeError):
+            self.merge([[(2000000, ethernet_frame(11))]], link_type=101)
+
+
+if __name__ == '__main__':
+    unittest.main()
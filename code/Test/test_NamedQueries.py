@@ -139,3 +139,27 @@ class UnitTestNamedQueries(unittest.TestCase):
 
     def test_is_query_no_string(self):
         self.assertFalse(controller.statistics.is_query(42))
+
+    def test_named_query_cached(self):
+        stats_db = controller.statistics.stats_db
+        stats_db.named_query_cache.clear()
+        first = controller.statistics.process_db_query('most_used(ttlValue)')
+        self.assertEqual(len(stats_db.named_query_cache), 1)
+        self.assertEqual(controller.statistics.process_db_query('most_used(ttlValue)'), first)
+
+    def test_random_query_not_cached(self):
+        stats_db = controller.statistics.stats_db
+        stats_db.named_query_cache.clear()
+        controller.statistics.process_db_query('random(all(ipaddress))')
+        # only the nested all(ipaddress) query is cached
+        self.assertEqual(len(stats_db.named_query_cache), 1)
+
+    def test_summary_matches_named_queries(self):
+        stats_db = controller.statistics.stats_db
+        summary_queries = [name for name in stats_db.named_queries if not name.startswith("all.")]
+        self.assertEqual(sorted(row[0] for row in stats_db.cursor.execute("SELECT DISTINCT query FROM summary")),
+                         sorted(summary_queries))
+        for name in summary_queries:
+            stats_db.cursor.execute(stats_db.named_queries[name])
+            results = stats_db.cursor.fetchall()
+            self.assertEqual(stats_db._get_summary(name), results, name)
@@ -29,6 +29,12 @@ class UnitTestNestedNamedQueries(unittest.TestCase):
                           '54.187.98.195', '54.192.44.108', '54.192.44.177', '72.247.178.113', '72.247.178.67',
                           '93.184.220.29'])
 
+        self.assertEqual(controller.statistics.process_db_query('ipaddress(portnumber in [80, 443])'),
+                         ['104.83.103.45', '13.107.21.200', '131.253.61.100', '172.217.23.142', '172.217.23.174',
+                          '204.79.197.200', '23.51.123.27', '35.161.3.50', '52.11.17.245', '52.34.37.177',
+                          '52.39.210.199', '52.41.250.141', '52.85.173.182', '54.149.74.139', '54.187.98.195',
+                          '54.192.44.108', '54.192.44.177', '72.247.178.113', '72.247.178.67', '93.184.220.29'])
+
         # semantically incorrect query
         with self.assertRaises(sqlite3.OperationalError):
             controller.statistics.process_db_query('ipaddress(ipaddress in most_used(macaddress))')
@@ -0,0 +1,42 @@
+import os
+import struct
+import unittest
+
+import ID2TLib.PacketSink as PacketSink
+
+
+class TestPacketSink(unittest.TestCase):
+    def setUp(self):
+        self.sink = PacketSink.PacketSink(buffer_size=64)
+
+    def tearDown(self):
+        self.sink.close()
+        os.remove(self.sink.path)
+
+    def read_records(self):
+        with open(self.sink.path, 'rb') as file:
+            data = file.read()
+        self.assertEqual(struct.unpack("<IHHiIII", data[:24]), (0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+        records = []
+        offset = 24
+        while offset < len(data):
+            seconds, microseconds, caplen, wirelen = struct.unpack("<IIII", data[offset:offset + 16])
+            records.append((seconds, microseconds, data[offset + 16:offset + 16 + caplen]))
+            offset += 16 + caplen
+        return records
+
+    def test_write_raw(self):
+        self.sink.write_raw(b"\x01" * 60, 1500000000.25)
+        self.sink.write_raw(b"\x02" * 100, 1500000001.9999999)
+        self.sink.close()
+        self.assertEqual(self.read_records(), [(1500000000, 250000, b"\x01" * 60),
+                                               (1500000002, 0, b"\x02" * 100)])
+
+    def test_flush_keeps_file_open(self):
+        self.sink.write_raw(b"\x03" * 80, 1.5)
+        self.sink.flush()
+        self.assertEqual(self.read_records(), [(1, 500000, b"\x03" * 80)])
+        self.sink.write_raw(b"\x04" * 10, 2.0)
+        self.sink.close()
+        self.assertEqual(len(self.read_records()), 2)
+        self.assertEqual(self.sink.packet_count, 2)
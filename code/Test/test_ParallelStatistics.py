@@ -0,0 +1,126 @@
+import os
+import random
+import sqlite3
+import struct
+import tempfile
+import unittest
+
+import ID2TLib.libpcapreader as pr
+import ID2TLib.Utility as Util
+
+# more packets than four shards of CHECKPOINT_INTERVAL packets, so that the capture is split into four shards
+PACKET_COUNT = 70000
+
+
+def write_pcap(path: str, packet_count: int, seed: int = 42):
+    """
+    Writes an Ethernet capture of TCP and UDP packets between a growing set of hosts, with varying TTL, ToS, window
+    size, MSS and port values, gaps of several seconds, some truncated packets and some ARP frames.
+
+    :param path: The path of the PCAP file
+    :param packet_count: The number of packets
+    :param seed: The seed of the generated values
+    """
+    rng = random.Random(seed)
+    timestamp = 1500000000 * 1000000
+    with open(path, "wb") as pcap:
+        pcap.write(struct.pack("<IHHiIII", 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+        for i in range(packet_count):
+            timestamp += rng.randint(1, 400) + (3000000 if i % 9000 == 8999 else 0)
+            hosts = min(200, 5 + i // 300)
+            src = bytes([10, 0, 0, rng.randrange(hosts)])
+            dst = bytes([10, 0, 1, rng.randrange(hosts)])
+            if i % 1000 == 999:
+                frame = bytes([255] * 6) + bytes([2, 0, 0, 0, 0, src[3]]) + b"\x08\x06" + bytes(28)
+                pcap.write(struct.pack("<IIII", timestamp // 1000000, timestamp % 1000000, len(frame), len(frame)))
+                pcap.write(frame)
+                continue
+            payload = bytes(rng.randrange(0, 40))
+            if rng.random() < 0.7:
+                mss = rng.random() < 0.1
+                transport = struct.pack("!HHIIBBHHH", rng.randrange(1024, 1034), rng.choice([80, 443, 22]), i, 0,
+                                        (6 if mss else 5) << 4, 0x12, rng.choice([8192, 29200, 65535]), 0, 0)
+                if mss:
+                    transport += struct.pack("!BBH", 2, 4, rng.choice([1360, 1460]))
+                protocol = 6
+            else:
+                transport = struct.pack("!HHHH", rng.randrange(5000, 5100), 53, 8 + len(payload), 0)
+                protocol = 17
+            ip = struct.pack("!BBHHHBBH4s4s", 0x45, rng.choice([0, 16]), 20 + len(transport) + len(payload), i & 0xffff,
+                             0, rng.choice([64, 128, 255]), protocol, 0, src, dst)
+            frame = bytes(6) + bytes([2, 0, 0, 0, 0, src[3]]) + b"\x08\x00" + ip + transport + payload
+            captured = frame[:10] if i % 5000 == 4999 else frame
+            pcap.write(struct.pack("<IIII", timestamp // 1000000, timestamp % 1000000, len(captured), len(frame)))
+            pcap.write(captured)
+
+
+class TestParallelStatistics(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.pcap_path = os.path.join(cls.directory.name, "test.pcap")
+        write_pcap(cls.pcap_path, PACKET_COUNT)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def collect_statistics(self, intervals: list, threads: int):
+        """
+        :param intervals: The interval lengths in seconds, an empty list for the default interval
+        :param threads: The number of threads collecting the statistics
+        :return: the path of the statistics database
+        """
+        db_path = os.path.join(self.directory.name, "test-{}-{}.sqlite3".format(len(intervals), threads))
+        if not os.path.exists(db_path):
+            pcap_proc = pr.pcap_processor(self.pcap_path, "True", Util.RESOURCE_DIR, db_path)
+            pcap_proc.collect_statistics(intervals, threads)
+            pcap_proc.write_to_database(db_path, intervals, False)
+        return db_path
+
+    def collect_interval_statistics(self, intervals: list, threads: int):
+        """
+        :param intervals: The interval lengths in seconds, an empty list for the default interval
+        :param threads: The number of threads collecting the statistics
+        :return: a dict of the interval statistics tables and their rows ordered by time
+        """
+        connection = sqlite3.connect(self.collect_statistics(intervals, threads))
+        try:
+            tables = [row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'interval_statistics_%'")]
+            return {table: connection.execute("SELECT * FROM {} ORDER BY CAST(last_pkt_timestamp AS INTEGER)"
+                                              .format(table)).fetchall() for table in tables}
+        finally:
+            connection.close()
+
+    def assert_same_interval_statistics(self, intervals: list):
+        sequential = self.collect_interval_statistics(intervals, 1)
+        parallel = self.collect_interval_statistics(intervals, 4)
+        self.assertEqual(sorted(sequential), sorted(parallel))
+        self.assertTrue(sequential)
+        for table, rows in sequential.items():
+            self.assertEqual(len(rows), len(parallel[table]), table)
+            for row, parallel_row in zip(rows, parallel[table]):
+                for value, parallel_value in zip(row, parallel_row):
+                    # entropies are summed over hash maps in a different order
+                    if isinstance(value, float):
+                        self.assertAlmostEqual(value, parallel_value, places=4, msg=table)
+                    else:
+                        self.assertEqual(value, parallel_value, table)
+
+    def test_default_interval(self):
+        self.assert_same_interval_statistics([])
+
+    def test_multiple_intervals(self):
+        self.assert_same_interval_statistics([0.5, 1.3, 4.0])
+
+    def test_unrecognized_pdus(self):
+        tables = []
+        for threads in [1, 4]:
+            connection = sqlite3.connect(self.collect_statistics([], threads))
+            try:
+                tables.append(connection.execute("SELECT * FROM unrecognized_pdus ORDER BY srcMac").fetchall())
+            finally:
+                connection.close()
+        self.assertTrue(tables[0])
+        self.assertEqual(tables[0], tables[1])
@@ -0,0 +1,69 @@
+import unittest
+
+import scapy.layers.inet as inet
+
+import ID2TLib.RawPacket as RawPacket
+
+
+def rebuild(pkt):
+    """
+    Rebuilds a packet with scapy, letting scapy calculate its lengths and checksums.
+    """
+    pkt = inet.Ether(bytes(pkt))
+    del pkt[inet.IP].len
+    del pkt[inet.IP].chksum
+    del pkt[inet.IP].payload.chksum
+    if inet.UDP in pkt:
+        del pkt[inet.UDP].len
+    return inet.Ether(bytes(pkt))
+
+
+class TestRawPacket(unittest.TestCase):
+    def setUp(self):
+        self.tcp_pkt = RawPacket.RawPacket(bytes(
+            inet.Ether(src="00:11:22:33:44:55", dst="66:77:88:99:aa:bb") /
+            inet.IP(src="10.0.0.1", dst="10.0.0.2", ttl=64) /
+            inet.TCP(sport=1234, dport=445, window=8192, options=[("MSS", 1460)]) / b"GET /joomla360 HTTP/1.1"), 1.5)
+
+    def test_getters(self):
+        self.assertEqual(self.tcp_pkt.get_mac_src(), "00:11:22:33:44:55")
+        self.assertEqual(self.tcp_pkt.get_ip_dst(), "10.0.0.2")
+        self.assertEqual(self.tcp_pkt.get_ttl(), 64)
+        self.assertEqual(self.tcp_pkt.get_dport(), 445)
+        self.assertEqual(self.tcp_pkt.get_window(), 8192)
+        self.assertEqual(self.tcp_pkt.get_flags(), 2)
+        self.assertEqual(self.tcp_pkt.get_payload(), b"GET /joomla360 HTTP/1.1")
+
+    def test_tcp_rewrite_checksums(self):
+        self.tcp_pkt.set_mac_dst("de:ad:be:ef:00:01")
+        self.tcp_pkt.set_ip_src("192.168.1.7")
+        self.tcp_pkt.set_ip_dst("172.16.0.9")
+        self.tcp_pkt.set_ttl(128)
+        self.tcp_pkt.set_sport(40000)
+        self.tcp_pkt.set_dport(80)
+        self.tcp_pkt.set_seq(123456)
+        self.tcp_pkt.set_ack(99)
+        self.tcp_pkt.set_window(65535)
+        self.assertTrue(self.tcp_pkt.set_mss(1400))
+
+        self.assertEqual(bytes(self.tcp_pkt), bytes(rebuild(self.tcp_pkt)))
+        pkt = inet.Ether(bytes(self.tcp_pkt))
+        self.assertEqual((pkt.dst, pkt[inet.IP].src, pkt[inet.TCP].dport), ("de:ad:be:ef:00:01", "192.168.1.7", 80))
+        self.assertEqual(pkt[inet.TCP].options, [("MSS", 1400)])
+
+    def test_payload_rewrite(self):
+        self.tcp_pkt.set_payload(b"GET /a/much/longer/uri HTTP/1.1")
+        self.assertEqual(bytes(self.tcp_pkt), bytes(rebuild(self.tcp_pkt)))
+        self.assertEqual(self.tcp_pkt.get_payload(), b"GET /a/much/longer/uri HTTP/1.1")
+
+    def test_udp_rewrite_checksums(self):
+        udp_pkt = RawPacket.RawPacket(bytes(inet.Ether() / inet.IP(src="1.1.1.1", dst="2.2.2.2") /
+                                            inet.UDP(sport=53, dport=1000) / b"abc"))
+        udp_pkt.set_ip_dst("9.9.9.9")
+        udp_pkt.set_ttl(3)
+        udp_pkt.set_dport(5353)
+        self.assertEqual(bytes(udp_pkt), bytes(rebuild(udp_pkt)))
+
+
+if __name__ == '__main__':
+    unittest.main()
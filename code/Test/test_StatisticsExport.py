@@ -0,0 +1,45 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import numpy
+
+import Core.StatisticsExport as StatisticsExport
+
+
+class TestStatisticsExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "test.sqlite3")
+        self.export_dir = os.path.join(self.directory.name, "export")
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("CREATE TABLE ip_statistics (ipAddress TEXT, pktsSent INTEGER, kbytesSent REAL)")
+        connection.executemany("INSERT INTO ip_statistics VALUES (?, ?, ?)",
+                               [("10.0.0.1", 5, 1.5), ("10.0.0.2", 7, None)])
+        connection.execute("CREATE TABLE interval_statistics_1000000 (last_pkt_timestamp TEXT, pkts_count INTEGER)")
+        connection.executemany("INSERT INTO interval_statistics_1000000 VALUES (?, ?)", [("1.5", 3), ("2.5", None)])
+        connection.execute("CREATE TABLE ip_ttl (ipAddress TEXT, ttlValue INTEGER)")
+        connection.commit()
+        connection.close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_export_and_load(self):
+        tables = StatisticsExport.export_statistics(self.db_path, self.export_dir)
+        self.assertEqual(tables, ["ip_statistics", "interval_statistics_1000000"])
+
+        loaded = StatisticsExport.load_statistics(self.export_dir)
+        self.assertEqual(sorted(loaded), sorted(tables))
+        ip_statistics = loaded["ip_statistics"]
+        self.assertEqual(list(ip_statistics["ipAddress"]), ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(ip_statistics["pktsSent"].dtype, numpy.int64)
+        self.assertEqual(ip_statistics["pktsSent"].sum(), 12)
+        self.assertTrue(numpy.isnan(ip_statistics["kbytesSent"][1]))
+        # integer columns containing NULL are exported as float columns
+        self.assertTrue(numpy.isnan(loaded["interval_statistics_1000000"]["pkts_count"][1]))
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            StatisticsExport.export_statistics(self.db_path, self.export_dir, "csv")
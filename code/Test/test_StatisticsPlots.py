@@ -0,0 +1,57 @@
+import sqlite3
+import unittest
+
+import Core.StatisticsPlots as StatisticsPlots
+
+
+class TestStatisticsPlots(unittest.TestCase):
+    def test_plot_names_unique(self):
+        self.assertEqual(len(StatisticsPlots.PLOT_NAMES), len(set(StatisticsPlots.PLOT_NAMES)))
+
+    def test_select_default_plots(self):
+        names = [plot.name for plot in StatisticsPlots.select_plots(entropy=False)]
+        self.assertIn("ttl", names)
+        self.assertNotIn("port", names)
+        self.assertNotIn("interval-ip-src-ent", names)
+        self.assertIn("interval-ip-src-ent", [plot.name for plot in StatisticsPlots.select_plots(entropy=True)])
+
+    def test_select_plots_by_name(self):
+        plots = StatisticsPlots.select_plots(entropy=False, plot_names=["port", "interval-ip-src-ent"])
+        self.assertEqual([plot.name for plot in plots], ["port", "interval-ip-src-ent"])
+        with self.assertRaises(ValueError):
+            StatisticsPlots.select_plots(entropy=False, plot_names=["unknown"])
+
+    def test_top_k(self):
+        statistics = _FakeStatistics("CREATE TABLE ip_degrees (ipAddress TEXT, inDegree INTEGER)",
+                                     "INSERT INTO ip_degrees VALUES (?, ?)",
+                                     [("10.0.0.%d" % i, i) for i in range(10)])
+        fetch = StatisticsPlots._top_k("ip_degrees", "ipAddress", "inDegree", lambda row: row[0],
+                                       "other {} IPs (mean)", ascending=True, positive=True)
+        self.assertEqual(fetch(statistics, 3), [("other 6 IPs (mean)", 3.5), ("10.0.0.7", 7), ("10.0.0.8", 8),
+                                                ("10.0.0.9", 9)])
+        self.assertEqual(len(fetch(statistics, 20)), 9)
+
+    def test_top_k_not_positive(self):
+        with self.assertRaises(ValueError):
+            StatisticsPlots.plot_statistics(None, entropy=False, top_k=0)
+
+    def test_log_histogram(self):
+        statistics = _FakeStatistics("CREATE TABLE ip_degrees (ipAddress TEXT, inDegree INTEGER)",
+                                     "INSERT INTO ip_degrees VALUES (?, ?)",
+                                     [("10.0.0.%d" % i, i) for i in range(1001)])
+        edges, frequencies = StatisticsPlots._log_histogram("ip_degrees", "inDegree")(statistics, 10)
+        self.assertEqual(len(edges), StatisticsPlots.LOG_HISTOGRAM_BINS + 1)
+        self.assertAlmostEqual(edges[0], 1)
+        self.assertAlmostEqual(frequencies.sum(), 1)
+        self.assertGreater(frequencies[-1], frequencies[0])
+
+
+class _FakeStatistics(object):
+    def __init__(self, create: str, insert: str, rows: list):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute(create)
+        self.connection.executemany(insert, rows)
+        self.stats_db = self
+
+    def process_user_defined_query(self, query: str):
+        return self.connection.execute(query).fetchall()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import Core.StatsDatabase as StatsDB
+
+schema = """
+CREATE TABLE ip_statistics (ipAddress TEXT, pktsReceived INTEGER, pktsSent INTEGER, kbytesReceived REAL,
+    kbytesSent REAL, maxPktRate REAL, minPktRate REAL, maxKByteRate REAL, minKByteRate REAL, maxLatency INTEGER,
+    minLatency INTEGER, avgLatency INTEGER, ipClass TEXT COLLATE NOCASE, PRIMARY KEY(ipAddress));
+CREATE TABLE ip_ttl (ipAddress TEXT, ttlValue INTEGER, ttlCount INTEGER, PRIMARY KEY(ipAddress, ttlValue));
+CREATE TABLE file_statistics (packetCount INTEGER, captureDuration TEXT, timestampFirstPacket TEXT,
+    timestampLastPacket TEXT, avgPacketRate REAL, avgPacketSize REAL, avgPacketsSentPerHost REAL,
+    avgBandwidthIn REAL, avgBandwidthOut REAL, doExtraTests INTEGER);
+CREATE TABLE interval_tables (name TEXT, is_default INTEGER, extra_tests INTEGER);
+CREATE TABLE interval_statistics_1000000 (last_pkt_timestamp TEXT, first_pkt_timestamp TEXT, pkts_count INTEGER,
+    pkt_rate REAL, kBytes REAL, kByte_rate REAL, PRIMARY KEY(last_pkt_timestamp));
+"""
+
+
+def create_db(path: str, ip_stats: list, ttls: list, file_stats: tuple):
+    db = sqlite3.connect(path)
+    db.executescript(schema)
+    db.executemany("INSERT INTO ip_statistics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", ip_stats)
+    db.executemany("INSERT INTO ip_ttl VALUES (?, ?, ?)", ttls)
+    db.execute("INSERT INTO file_statistics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", file_stats)
+    db.execute("INSERT INTO interval_tables VALUES ('interval_statistics_1000000', 1, 0)")
+    db.executemany("INSERT INTO interval_statistics_1000000 VALUES (?, ?, ?, ?, ?, ?)",
+                   [("2000000", "1000000", 10, 10, 1, 1), ("3000000", "2000000", 10, 10, 1, 1)])
+    db.commit()
+    db.close()
+
+
+class TestStatisticsUpdate(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.base_path = os.path.join(self.tmp_dir, "base.sqlite3")
+        self.injected_path = os.path.join(self.tmp_dir, "injected.sqlite3")
+        create_db(self.base_path,
+                  [("10.0.0.1", 10, 10, 1, 1, 5, 1, 5, 1, 10, 2, 4, "A"),
+                   ("10.0.0.2", 10, 10, 1, 1, 5, 1, 5, 1, 10, 2, 4, "A")],
+                  [("10.0.0.1", 64, 10), ("10.0.0.2", 128, 10)],
+                  (20, "2.0", "2018-01-01 00:00:01.000000", "2018-01-01 00:00:03.000000", 10, 0.1, 10, 4, 4, 0))
+        create_db(self.injected_path,
+                  [("10.0.0.1", 2, 2, 1, 1, 9, 0, 9, 0, 20, 1, 10, "A"),
+                   ("10.0.0.3", 2, 2, 1, 1, 1, 1, 1, 1, 0, 0, 0, "A")],
+                  [("10.0.0.1", 64, 2), ("10.0.0.3", 64, 2)],
+                  (4, "1.0", "2018-01-01 00:00:02.000000", "2018-01-01 00:00:04.000000", 4, 0.2, 2, 1, 1, 0))
+        self.stats_db = StatsDB.StatsDatabase(self.base_path)
+        self.stats_db.fold_statistics(self.injected_path, [(1500000, 1024), (2500000, 1024), (3500000, 60)])
+
+    def tearDown(self):
+        self.stats_db.database.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_counters_summed(self):
+        self.assertEqual(self.stats_db.process_user_defined_query(
+            "SELECT ipAddress, ttlValue, ttlCount FROM ip_ttl ORDER BY ipAddress"),
+            [("10.0.0.1", 64, 12), ("10.0.0.2", 128, 10), ("10.0.0.3", 64, 2)])
+
+    def test_ip_statistics_combined(self):
+        self.assertEqual(self.stats_db.process_user_defined_query(
+            "SELECT pktsSent, maxPktRate, minPktRate, maxLatency, minLatency, avgLatency FROM ip_statistics "
+            "WHERE ipAddress='10.0.0.1'"), [(12, 9.0, 1.0, 20, 1, 5)])
+
+    def test_file_statistics_recalculated(self):
+        file_info = self.stats_db.get_file_info()
+        self.assertEqual(file_info["packetCount"], 24)
+        self.assertEqual(float(file_info["captureDuration"]), 3.0)
+        self.assertEqual(file_info["timestampLastPacket"], "2018-01-01 00:00:04.000000")
+        self.assertEqual(file_info["avgPacketsSentPerHost"], 8)
+
+    def test_interval_range(self):
+        self.assertEqual(self.stats_db.get_interval_range(), (1000000, 3000000))
+
+    def test_interval_statistics_counted(self):
+        self.assertEqual(self.stats_db.process_user_defined_query(
+            "SELECT pkts_count, pkt_rate, kBytes FROM interval_statistics_1000000 ORDER BY last_pkt_timestamp"),
+            [(11, 11.0, 2.0), (11, 11.0, 2.0)])
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock as mock
+
+import scapy.layers.inet as inet
+import scapy.utils
+
+import ID2TLib.TemplateCache as TemplateCache
+
+
+class TestTemplateCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, "templates")
+        self.template_path = os.path.join(self.tmp_dir, "template.pcap")
+        packets = [inet.Ether() / inet.IP(src="10.0.0.1", dst="10.0.0.2") / inet.TCP(sport=1000, dport=445),
+                   inet.Ether() / inet.IP(src="10.0.0.2", dst="10.0.0.1") / inet.TCP(sport=445, dport=1000),
+                   inet.Ether() / inet.IP(src="10.0.0.1", dst="10.0.0.2") / inet.TCP(sport=1002, dport=445)]
+        for i, pkt in enumerate(packets):
+            pkt.time = 100 + i
+        scapy.utils.wrpcap(self.template_path, packets)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_packets_cached(self):
+        cache = TemplateCache.TemplateCache(self.cache_dir)
+        packets = cache.get_packets(self.template_path)
+        self.assertEqual(len(packets), 3)
+        self.assertEqual((packets[1][1][0], packets[1][1][1]), (101, 0))
+        self.assertIs(cache.get_packets(self.template_path), packets)
+
+    def test_conversations(self):
+        cache = TemplateCache.TemplateCache()
+        conversations, order_list_conversations = cache.get_conversations(self.template_path)
+        self.assertEqual(order_list_conversations, (("10.0.0.1", 1000, "10.0.0.2", 445),
+                                                    ("10.0.0.1", 1002, "10.0.0.2", 445)))
+        self.assertEqual(len(conversations[order_list_conversations[0]]), 2)
+
+    def test_packets_without_ports(self):
+        packets = [inet.Ether() / inet.IP(src="10.0.0.1", dst="10.0.0.2") / inet.ICMP(),
+                   inet.Ether() / inet.IP(src="10.0.0.2", dst="10.0.0.1") / inet.ICMP(type=0)]
+        scapy.utils.wrpcap(self.template_path, packets)
+        conversations, order_list_conversations = TemplateCache.TemplateCache().get_conversations(self.template_path)
+        self.assertEqual(order_list_conversations, (("10.0.0.1", None, "10.0.0.2", None),))
+        self.assertEqual(len(conversations[order_list_conversations[0]]), 2)
+
+    def test_disk_cache(self):
+        packets = TemplateCache.TemplateCache(self.cache_dir).get_packets(self.template_path)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        with mock.patch("scapy.utils.RawPcapReader", side_effect=AssertionError):
+            self.assertEqual(TemplateCache.TemplateCache(self.cache_dir).get_packets(self.template_path), packets)
+
+
+if __name__ == '__main__':
+    unittest.main()
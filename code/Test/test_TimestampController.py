@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 import Core.TimestampController as tsCtrl
 
 
@@ -32,4 +34,39 @@ class TestTimestampController(unittest.TestCase):
         pps = 5
         latency = 10
         tc = tsCtrl.TimestampController(timestamp, pps)
-        self.assertTrue(tc.next_timestamp() <= tc.next_timestamp(latency))
\ No newline at end of file
+        self.assertTrue(tc.next_timestamp() <= tc.next_timestamp(latency))
+
+    def test_next_timestamps(self):
+        timestamp = 100
+        pps = 5
+        latency = 1 / pps
+        tc = tsCtrl.TimestampController(timestamp, pps)
+        values = tc.next_timestamps(100)
+        self.assertEqual(len(values), 100)
+        for val in values:
+            self.assertTrue(timestamp + latency / 1.3 <= val <= timestamp + latency * 1.3)
+            timestamp = val
+        self.assertEqual(tc.get_timestamp(), values[-1])
+
+    def test_next_timestamps_seeded(self):
+        tc = tsCtrl.TimestampController(100, 5)
+        np.random.seed(42)
+        first = tc.next_timestamps(10, latency=10)
+        tc.reset_timestamp()
+        np.random.seed(42)
+        second = tc.next_timestamps(10, latency=10)
+        np.testing.assert_array_equal(first, second)
+
+    def test_next_timestamps_until(self):
+        tc = tsCtrl.TimestampController(100, 50)
+        values = tc.next_timestamps_until(110)
+        self.assertTrue(all(100 < val <= 110 for val in values))
+        self.assertTrue(np.all(np.diff(values) > 0))
+        # the last timestamp is less than one maximum delay of 1.3 / pps before the end
+        self.assertGreater(values[-1], 110 - 1.3 / 50)
+        self.assertEqual(tc.get_timestamp(), values[-1])
+
+    def test_next_timestamps_until_passed(self):
+        tc = tsCtrl.TimestampController(100, 5)
+        self.assertEqual(len(tc.next_timestamps_until(99)), 0)
+        self.assertEqual(tc.get_timestamp(), 100)
@@ -11,6 +11,7 @@ pcap_processor::pcap_processor(std::string path, std::string extraTests, std::st
     resourcePath = resource_path;
     databasePath = database_path;
     hasUnrecognized = false;
+    shardable = false;
     if(extraTests == "True")
         stats.setDoExtraTests(true);
     else stats.setDoExtraTests(false);
@@ -43,78 +44,137 @@ long double pcap_processor::get_timestamp_mu_sec(const int after_packet_number)
  * @return The string containing the file path to the merged PCAP file.
  */
 std::string pcap_processor::merge_pcaps(const std::string pcap_path) {
-    // Build new filename with timestamp
-    // Build timestamp
-    time_t curr_time = time(0);
-    char buff[1024];
-    struct tm *now = localtime(&curr_time);
-    strftime(buff, sizeof(buff), "%Y%m%d-%H%M%S", now);
-    std::string tstmp(buff);
-
-    // Replace filename with 'timestamp_filename'
-    std::string new_filepath = filePath;
-    const std::string &newExt = "_" + tstmp + ".pcap";
-    std::string::size_type h = new_filepath.rfind('.', new_filepath.length());
-
-    if ((filePath.length() + newExt.length()) < 250) {
-
-        if (h != std::string::npos) {
-            new_filepath.replace(h, newExt.length(), newExt);
-        } else {
-            new_filepath.append(newExt);
-        }
-    }
+    return merge_pcap_files({pcap_path}, "");
+}
 
-    else {
-        new_filepath = (new_filepath.substr(0, new_filepath.find('_'))).append(newExt);
+/**
+ * Merges the loaded PCAP file with all PCAP files given by the paths in pcap_paths in a single pass.
+ * @param pcap_paths The paths to the files which should be merged with the loaded PCAP file.
+ * @param out_path The path of the merged PCAP file. If empty, a path with the current time is derived from the path
+ * of the loaded PCAP file.
+ * @return The string containing the file path to the merged PCAP file.
+ */
+std::string pcap_processor::merge_pcaps_multi(const py::list &pcap_paths, const std::string &out_path) {
+    std::vector<std::string> paths;
+    for (auto path: pcap_paths) {
+        paths.push_back(path.cast<std::string>());
     }
+    return merge_pcap_files(paths, out_path);
+}
 
-    FileSniffer sniffer_base(filePath);
-    SnifferIterator iterator_base = sniffer_base.begin();
+/**
+ * Merges the loaded PCAP file with the given PCAP files by a k-way merge over the packet timestamps. Each file is read
+ * exactly once, independent of the number of files. Packets with equal timestamps are written in the order of the
+ * former pairwise merges: packets of later files first, packets of the loaded PCAP file last. The packet records are
+ * copied without dissecting them; malformed Ethernet frames are skipped, like the FileSniffer does. All files must
+ * have the same link type.
+ * @param pcap_paths The paths to the files which should be merged with the loaded PCAP file.
+ * @param out_path The path of the merged PCAP file, see merge_pcaps_multi.
+ * @return The string containing the file path to the merged PCAP file.
+ */
+std::string pcap_processor::merge_pcap_files(const std::vector<std::string> &pcap_paths, const std::string &out_path) {
+    std::string new_filepath = out_path;
+    if (new_filepath.empty()) {
+        // Build new filename with timestamp
+        // Build timestamp
+        time_t curr_time = time(0);
+        char buff[1024];
+        struct tm *now = localtime(&curr_time);
+        strftime(buff, sizeof(buff), "%Y%m%d-%H%M%S", now);
+        std::string tstmp(buff);
+
+        // Replace filename with 'timestamp_filename'
+        new_filepath = filePath;
+        const std::string &newExt = "_" + tstmp + ".pcap";
+        std::string::size_type h = new_filepath.rfind('.', new_filepath.length());
+
+        if ((filePath.length() + newExt.length()) < 250) {
+
+            if (h != std::string::npos) {
+                new_filepath.replace(h, newExt.length(), newExt);
+            } else {
+                new_filepath.append(newExt);
+            }
+        }
 
-    FileSniffer sniffer_attack(pcap_path);
-    SnifferIterator iterator_attack = sniffer_attack.begin();
+        else {
+            new_filepath = (new_filepath.substr(0, new_filepath.find('_'))).append(newExt);
+        }
+    }
 
-    PacketWriter writer(new_filepath, PacketWriter::ETH2);
+    // the loaded PCAP file has the lowest priority for packets with equal timestamps
+    std::vector<std::string> inputs(1, filePath);
+    inputs.insert(inputs.end(), pcap_paths.begin(), pcap_paths.end());
+    std::vector<std::unique_ptr<pcap_reader>> readers;
+    std::vector<pcap_record> records(inputs.size());
+    for (auto &input: inputs) {
+        readers.emplace_back(new pcap_reader(input));
+        if (readers.back()->link_type() != readers[0]->link_type()) {
+            throw std::runtime_error("Cannot merge '" + input + "' with '" + filePath +
+                                     "', the PCAP files have different link types.");
+        }
+    }
+    uint32_t linkType = readers[0]->link_type();
 
-    bool all_attack_pkts_processed = false;
-    // Go through base PCAP and merge packets by timestamp
-    for (; iterator_base != sniffer_base.end();) {
-        auto tstmp_base = (iterator_base->timestamp().seconds()) + (iterator_base->timestamp().microseconds()*1e-6);
-        auto tstmp_attack = (iterator_attack->timestamp().seconds()) + (iterator_attack->timestamp().microseconds()*1e-6);
-        if (!all_attack_pkts_processed && tstmp_attack <= tstmp_base) {
-            try {
-                writer.write(*iterator_attack);
-            } catch (serialization_error&) {
-                std::cerr << std::setprecision(15) << "Could not serialize attack packet with timestamp " << tstmp_attack << std::endl;
+    auto next_record = [&](std::size_t input) {
+        while (readers[input]->next(records[input])) {
+            if (linkType != LINKTYPE_ETHERNET || !packet_view(records[input]).is_malformed()) {
+                return true;
             }
-            iterator_attack++;
-            if (iterator_attack == sniffer_attack.end())
-                all_attack_pkts_processed = true;
-        } else {
-            try {
-                writer.write(*iterator_base);
-            } catch (serialization_error&) {
-                    std::cerr << "Could not serialize base packet with timestamp " << std::setprecision(15) << tstmp_base << std::endl;
-            }
-            iterator_base++;
+        }
+        return false;
+    };
+
+    std::priority_queue<merge_entry, std::vector<merge_entry>, std::greater<merge_entry>> heap;
+    for (std::size_t i = 0; i < inputs.size(); i++) {
+        if (next_record(i)) {
+            heap.push({records[i].timestamp, i == 0 ? inputs.size() : inputs.size() - i, i});
         }
     }
 
-    // This may happen if the base PCAP is smaller than the attack PCAP
-    // In this case append the remaining packets of the attack PCAP
-    for (; iterator_attack != sniffer_attack.end(); iterator_attack++) {
-        try {
-            writer.write(*iterator_attack);
-        } catch (serialization_error&) {
-            auto tstmp_attack = (iterator_attack->timestamp().seconds()) + (iterator_attack->timestamp().microseconds()*1e-6);
-            std::cerr << "Could not serialize attack packet with timestamp " << std::setprecision(15) << tstmp_attack << std::endl;
+    std::ofstream writer(new_filepath, std::ios::binary | std::ios::trunc);
+    if (!writer) {
+        throw std::runtime_error("Could not open '" + new_filepath + "' for writing.");
+    }
+    // classic PCAP file header with microsecond timestamps, the snapshot length is the maximum of libpcap
+    uint32_t fileHeader[6] = {0xa1b2c3d4, 0, 0, 0, 262144, linkType};
+    uint16_t version[2] = {2, 4};
+    std::memcpy(&fileHeader[1], version, sizeof(version));
+    writer.write(reinterpret_cast<const char *>(fileHeader), sizeof(fileHeader));
+
+    // Always write the earliest pending packet of all files
+    while (!heap.empty()) {
+        merge_entry entry = heap.top();
+        heap.pop();
+        const pcap_record &record = records[entry.input];
+        long long micros = record.timestamp.count();
+        uint32_t recordHeader[4] = {static_cast<uint32_t>(micros / 1000000), static_cast<uint32_t>(micros % 1000000),
+                                    record.capturedLength, record.originalLength};
+        writer.write(reinterpret_cast<const char *>(recordHeader), sizeof(recordHeader));
+        writer.write(reinterpret_cast<const char *>(record.data), record.capturedLength);
+        if (next_record(entry.input)) {
+            heap.push({records[entry.input].timestamp, entry.rank, entry.input});
         }
     }
+    if (!writer.flush()) {
+        throw std::runtime_error("Could not write '" + new_filepath + "'.");
+    }
     return new_filepath;
 }
 
-bool pcap_processor::read_pcap_info(const std::string &filePath, std::size_t &totalPakets) {
+/**
+ * Reads the number of packets and the timestamps of the first and last packet of a PCAP file. Additionally records
+ * the file position of every CHECKPOINT_INTERVAL-th packet and whether the file can be split into shards. If the file
+ * can be split, the packets at which the intervals of the interval statistics end are recorded as well, like the
+ * single-threaded collect_statistics determines them. An interval only ends at the first packet after its barrier,
+ * so the ends depend on all preceding timestamps and cannot be determined by the shards.
+ * @param filePath The path of the PCAP file.
+ * @param totalPakets The number of packets in the PCAP file.
+ * @param timeIntervals The sorted interval lengths of the interval statistics, empty if they are not known yet.
+ * @return True iff the PCAP file could be read and is not empty.
+ */
+bool pcap_processor::read_pcap_info(const std::string &filePath, std::size_t &totalPakets,
+                                    const std::vector<std::chrono::duration<int, std::micro>> &timeIntervals) {
     // libtins has a lot of overhead when just iterating through, so we use libpcap directly
     char errbuf[PCAP_ERRBUF_SIZE];
     pcap_t *pcap_handle = pcap_open_offline(filePath.c_str(), errbuf);
@@ -123,6 +183,18 @@ bool pcap_processor::read_pcap_info(const std::string &filePath, std::size_t &to
         return false;
     }
 
+    // shards are read by the memory-mapped reader, which starts reading at the recorded file positions
+    FILE *file = pcap_file(pcap_handle);
+    shardable = file != nullptr && pcap_datalink(pcap_handle) == DLT_EN10MB;
+    try {
+        shardable = shardable && pcap_reader(filePath).link_type() == LINKTYPE_ETHERNET;
+    } catch (std::runtime_error&) {
+        shardable = false;
+    }
+    checkpoints.clear();
+    intervalCloses.clear();
+    long offset = shardable ? ftell(file) : -1;
+
     const u_char *packet;
     pcap_pkthdr header;
 
@@ -139,10 +211,42 @@ bool pcap_processor::read_pcap_info(const std::string &filePath, std::size_t &to
 
     totalPakets = 0;
     timeval lv;
+    std::chrono::microseconds firstTimestamp = stats.getTimestampFirstPacket();
+    std::chrono::microseconds previousTimestamp = firstTimestamp;
+    std::vector<std::chrono::microseconds> barriers(timeIntervals.begin(), timeIntervals.end());
+    std::vector<std::chrono::microseconds> intervalStartTimestamp(timeIntervals.size(), firstTimestamp);
     while (packet != nullptr) {
+        if (shardable) {
+            std::chrono::microseconds timestamp = Tins::Timestamp(header.ts);
+            if (totalPakets % CHECKPOINT_INTERVAL == 0) {
+                checkpoints.push_back({offset, totalPakets, timestamp});
+            }
+            // merging the conversations of the shards requires the packets to be ordered by their timestamps
+            if (timestamp < previousTimestamp) {
+                shardable = false;
+            }
+            previousTimestamp = timestamp;
+
+            // malformed packets are skipped by the shards and cannot end an interval
+            pcap_record record = {timestamp, packet, header.caplen, header.len};
+            packet_view pkt(record);
+            if (!timeIntervals.empty() && !pkt.is_malformed()) {
+                std::chrono::microseconds currentDuration = timestamp - firstTimestamp;
+                for (std::size_t j = 0; j < timeIntervals.size(); j++) {
+                    if (currentDuration > barriers[j]) {
+                        intervalCloses.push_back({totalPakets, j, intervalStartTimestamp[j], timestamp});
+                        barriers[j] = barriers[j] + timeIntervals[j];
+                        intervalStartTimestamp[j] = timestamp;
+                    }
+                }
+            }
+        }
         totalPakets++;
         // Extract last timestamp
         lv = header.ts;
+        if (shardable && totalPakets % CHECKPOINT_INTERVAL == 0) {
+            offset = ftell(file);
+        }
         packet = pcap_next(pcap_handle, &header);
     }
 
@@ -152,22 +256,298 @@ bool pcap_processor::read_pcap_info(const std::string &filePath, std::size_t &to
     return true;
 }
 
+/**
+ * Reads the timestamp of the first packet and optionally of the last packet of a PCAP file, without iterating over
+ * all packets. The last packet is found by following the packet record headers in the tail of the file, which is
+ * only possible for PCAP files in the classic (non-pcapng) format.
+ * @param filePath The path of the PCAP file.
+ * @param readLast Whether the timestamp of the last packet is required.
+ * @return True iff the required timestamps could be read.
+ */
+bool pcap_processor::read_pcap_timestamps(const std::string &filePath, bool readLast) {
+    char errbuf[PCAP_ERRBUF_SIZE];
+    pcap_t *pcap_handle = pcap_open_offline(filePath.c_str(), errbuf);
+    if (pcap_handle == nullptr) {
+        return false;
+    }
+    pcap_pkthdr header;
+    const u_char *packet = pcap_next(pcap_handle, &header);
+    pcap_close(pcap_handle);
+    if (packet == nullptr) {
+        return false;
+    }
+    stats.setTimestampFirstPacket(Tins::Timestamp(header.ts));
+    if (!readLast) {
+        return true;
+    }
+
+    std::ifstream file(filePath, std::ios::binary | std::ios::ate);
+    long fileSize = static_cast<long>(file.tellg());
+    uint32_t fileHeader[6];
+    file.seekg(0);
+    if (fileSize < 24 || !file.read(reinterpret_cast<char *>(fileHeader), sizeof(fileHeader))) {
+        return false;
+    }
+
+    // the magic number indicates the byte order and the timestamp resolution
+    bool swapped;
+    long fractionsPerSecond;
+    switch (fileHeader[0]) {
+        case 0xa1b2c3d4: swapped = false; fractionsPerSecond = 1000000; break;
+        case 0xd4c3b2a1: swapped = true; fractionsPerSecond = 1000000; break;
+        case 0xa1b23c4d: swapped = false; fractionsPerSecond = 1000000000; break;
+        case 0x4d3cb2a1: swapped = true; fractionsPerSecond = 1000000000; break;
+        default: return false;
+    }
+    auto field = [swapped](uint32_t value) { return swapped ? __builtin_bswap32(value) : value; };
+    uint32_t snaplen = field(fileHeader[4]);
+    if (snaplen == 0) {
+        snaplen = 262144;
+    }
+
+    // the tail is large enough to contain the last packet record and the start of the chain leading to it
+    long tailSize = std::min(fileSize - 24, 2 * (static_cast<long>(snaplen) + 16) + 65536);
+    std::vector<char> tail(static_cast<std::size_t>(tailSize));
+    file.seekg(fileSize - tailSize);
+    if (!file.read(tail.data(), tailSize)) {
+        return false;
+    }
+
+    time_t firstSeconds = header.ts.tv_sec;
+    auto record_header = [&](long pos, uint32_t *values) {
+        std::memcpy(values, tail.data() + pos, 16);
+        for (int k = 0; k < 4; k++) {
+            values[k] = field(values[k]);
+        }
+        return static_cast<time_t>(values[0]) >= firstSeconds && static_cast<long>(values[1]) < fractionsPerSecond &&
+               values[2] <= snaplen;
+    };
+
+    // find the first position from which the record headers chain up exactly to the end of the file
+    uint32_t values[4];
+    for (long start = 0; start + 16 <= tailSize; start++) {
+        long pos = start;
+        long last = -1;
+        while (pos + 16 <= tailSize && record_header(pos, values)) {
+            last = pos;
+            pos += 16 + values[2];
+        }
+        if (pos == tailSize && last >= 0) {
+            record_header(last, values);
+            timeval lastTimestamp;
+            lastTimestamp.tv_sec = values[0];
+            lastTimestamp.tv_usec = values[1] / (fractionsPerSecond / 1000000);
+            stats.setTimestampLastPacket(Tins::Timestamp(lastTimestamp));
+            return true;
+        }
+    }
+    return false;
+}
+
+/**
+ * Splits the loaded PCAP file into at most threads shards of roughly the same number of packets. The shards start at
+ * the recorded checkpoints, so that every worker can start reading at the file position of its first packet.
+ * Requires a prior call of read_pcap_info.
+ * @param threads The maximum number of shards.
+ * @param totalPackets The number of packets in the PCAP file.
+ * @return a vector of shards in file order. It is empty if the file cannot be split.
+ */
+std::vector<pcap_shard> pcap_processor::plan_shards(int threads, std::size_t totalPackets) {
+    std::vector<pcap_shard> shards;
+    if (threads < 2 || !shardable || checkpoints.empty()) {
+        return shards;
+    }
+
+    long offset = checkpoints[0].offset;
+    std::size_t firstPacket = checkpoints[0].packetNumber;
+    for (int k = 1; k < threads; k++) {
+        std::size_t target = totalPackets * k / threads;
+        auto checkpoint = std::upper_bound(checkpoints.begin(), checkpoints.end(), target,
+                                           [](std::size_t n, const pcap_checkpoint &c) { return n < c.packetNumber; });
+        --checkpoint;
+        if (checkpoint->packetNumber > firstPacket) {
+            shards.push_back({offset, firstPacket, checkpoint->packetNumber});
+            offset = checkpoint->offset;
+            firstPacket = checkpoint->packetNumber;
+        }
+    }
+    if (!shards.empty()) {
+        shards.push_back({offset, firstPacket, totalPackets});
+    }
+    return shards;
+}
+
+/**
+ * Collects the statistics of a single shard of the loaded PCAP file. Called by the worker threads of
+ * collect_statistics_parallel, therefore it must not access any Python objects. Instead of the interval statistics,
+ * the shard records an interval segment before every packet at which an interval ends and after its last packet.
+ * @param shard The shard to process.
+ * @param shardStats The statistics object of this shard.
+ * @param shardUnrecognized Set to true if unrecognized PDUs were found in this shard.
+ * @param closes The interval ends of the whole PCAP file, see read_pcap_info.
+ * @param inspectedPackets Counter of the inspected packets of all shards, used to indicate the progress.
+ * @param abort Stops the processing of the shard if set to true.
+ */
+void pcap_processor::collect_shard(const pcap_shard &shard, statistics &shardStats, bool &shardUnrecognized,
+                                   const std::vector<interval_close> &closes,
+                                   std::atomic<std::size_t> &inspectedPackets, std::atomic<bool> &abort) {
+    pcap_reader reader(filePath);
+    reader.seek(static_cast<std::size_t>(shard.offset));
+
+    auto close = std::lower_bound(closes.begin(), closes.end(), shard.firstPacket,
+                                  [](const interval_close &c, std::size_t n) { return c.packetNumber < n; });
+    std::chrono::microseconds lastPktTimestamp;
+    bool started = false;
+    std::size_t pendingPackets = 0;
+
+    pcap_record record;
+    for (std::size_t packetNumber = shard.firstPacket;
+         packetNumber < shard.endPacket && !abort && reader.next(record); packetNumber++) {
+        // the intervals ending at this packet are calculated from the statistics of the preceding packets
+        if (close != closes.end() && close->packetNumber == packetNumber) {
+            shardStats.closeIntervalSegment(packetNumber);
+            while (close != closes.end() && close->packetNumber == packetNumber) {
+                ++close;
+            }
+        }
+
+        // skip malformed packets, like the FileSniffer does
+        packet_view pkt(record);
+        if (pkt.is_malformed()) {
+            continue;
+        }
+
+        shardStats.incrementPacketCount();
+        process_packet(pkt, shardStats, shardUnrecognized);
+        lastPktTimestamp = record.timestamp;
+        started = true;
+
+        if (++pendingPackets == 1024) {
+            inspectedPackets += pendingPackets;
+            pendingPackets = 0;
+        }
+    }
+    inspectedPackets += pendingPackets;
+    shardStats.closeIntervalSegment(shard.endPacket);
+
+    if (started) {
+        shardStats.setTimestampLastPacket(lastPktTimestamp);
+    }
+}
+
+/**
+ * Collects the statistics of the loaded PCAP file with one worker thread per shard. Each worker collects the
+ * statistics of its shard in a separate statistics object, which are merged in file order afterwards. The interval
+ * statistics are calculated while merging, by applying the interval segments of the shards in packet order, so that
+ * they are identical to the interval statistics collected by a single thread.
+ * @param shards The shards of the PCAP file, see plan_shards.
+ * @param timeIntervals The sorted interval lengths of the interval statistics.
+ * @param totalPackets The number of packets in the PCAP file.
+ */
+void pcap_processor::collect_statistics_parallel(const std::vector<pcap_shard> &shards,
+                                                 const std::vector<std::chrono::duration<int, std::micro>> &timeIntervals,
+                                                 std::size_t totalPackets) {
+    std::vector<statistics> shardStats(shards.size(), statistics(resourcePath));
+    std::vector<char> shardUnrecognized(shards.size(), false);
+    std::vector<std::exception_ptr> errors(shards.size());
+    std::atomic<std::size_t> inspectedPackets(0);
+    std::atomic<std::size_t> finishedShards(0);
+    std::atomic<bool> abort(false);
+
+    std::cout << "Collecting statistics with " << shards.size() << " threads." << std::endl;
+
+    std::vector<std::thread> workers;
+    for (std::size_t i = 0; i < shards.size(); i++) {
+        shardStats[i].setDoExtraTests(stats.getDoExtraTests());
+        shardStats[i].setTimestampFirstPacket(stats.getTimestampFirstPacket());
+        workers.emplace_back([&, i]() {
+            bool unrecognized = false;
+            try {
+                collect_shard(shards[i], shardStats[i], unrecognized, intervalCloses, inspectedPackets, abort);
+            } catch (...) {
+                errors[i] = std::current_exception();
+                abort = true;
+            }
+            shardUnrecognized[i] = unrecognized;
+            finishedShards++;
+        });
+    }
+
+    // Indicate progress once every second, signals can only be checked by the main thread
+    std::chrono::system_clock::time_point lastPrinted = std::chrono::system_clock::now();
+    while (finishedShards < shards.size()) {
+        std::this_thread::sleep_for(std::chrono::milliseconds(100));
+        if (std::chrono::system_clock::now() - lastPrinted >= std::chrono::seconds(1)) {
+            std::size_t packetCount = inspectedPackets;
+            std::cout << "\rInspected packets: ";
+            std::cout << std::fixed << std::setprecision(1) << (static_cast<float>(packetCount)*100/totalPackets) << "%";
+            std::cout << " (" << packetCount << "/" << totalPackets << ")" << std::flush;
+            lastPrinted = std::chrono::system_clock::now();
+
+            if (PyErr_CheckSignals()) {
+                abort = true;
+                for (auto &worker: workers) {
+                    worker.join();
+                }
+                throw py::error_already_set();
+            }
+        }
+    }
+    for (auto &worker: workers) {
+        worker.join();
+    }
+    for (auto &error: errors) {
+        if (error) {
+            std::rethrow_exception(error);
+        }
+    }
+
+    std::cout << "\rInspected packets: ";
+    std::cout << "100.0% (" << totalPackets << "/" << totalPackets << ")" << std::endl;
+
+    // Calculate the interval statistics from the interval segments and merge the statistics of all shards in file order
+    auto close = intervalCloses.begin();
+    for (std::size_t i = 0; i < shards.size(); i++) {
+        for (auto &segment: shardStats[i].getIntervalSegments()) {
+            stats.applyIntervalSegment(segment, shardStats[i]);
+            for (; close != intervalCloses.end() && close->packetNumber <= segment.packetNumber; ++close) {
+                stats.addIntervalStat(timeIntervals[close->interval], close->start, close->end);
+            }
+        }
+        stats.mergeStatistics(shardStats[i]);
+        hasUnrecognized = hasUnrecognized || shardUnrecognized[i];
+    }
+}
+
 /**
  * Collect statistics of the loaded PCAP file. Calls for each packet the method process_packets.
+ * If more than one thread is requested, the PCAP file is split into shards, which are processed in parallel.
  * param: user specified interval in seconds
+ * param: number of threads used to collect the statistics
  */
-void pcap_processor::collect_statistics(py::list& intervals) {
+void pcap_processor::collect_statistics(py::list& intervals, int threads) {
     // Only process PCAP if file exists
     if (file_exists(filePath)) {
         std::cout << "Loading pcap..." << std::endl;
-        FileSniffer sniffer(filePath);
-
-        SnifferIterator i = sniffer.begin();
         std::chrono::microseconds currentPktTimestamp;
 
+        std::vector<double> intervals_vec;
+        for (auto interval: intervals) {
+            intervals_vec.push_back(interval.cast<double>());
+        }
+        bool useDefaultInterval = intervals_vec.size() == 0 || intervals_vec[0] == 0;
+
         // Read PCAP file info
+        // A single thread reads the PCAP file only once: the capture duration is only needed for the default
+        // interval and taken from the last packet record. Sharding requires the checkpoints and interval ends of
+        // read_pcap_info, which are recorded in a single pass once the interval lengths are known.
         std::size_t totalPackets = 0;
-        if (!read_pcap_info(filePath, totalPackets)) return;
+        bool timestampsRead = read_pcap_timestamps(filePath, useDefaultInterval);
+        if (!timestampsRead) {
+            // the capture duration is only known after this pass, so the interval ends are not recorded
+            if (!read_pcap_info(filePath, totalPackets, {})) return;
+            shardable = false;
+        }
 
         // choose a suitable time interval
         int timeIntervalCounter = 1;
@@ -178,12 +558,7 @@ void pcap_processor::collect_statistics(py::list& intervals) {
         std::vector<std::chrono::duration<int, std::micro>> timeIntervals;
         std::vector<std::chrono::microseconds> barriers;
 
-        std::vector<double> intervals_vec;
-        for (auto interval: intervals) {
-            intervals_vec.push_back(interval.cast<double>());
-        }
-
-        if (intervals_vec.size() == 0 || intervals_vec[0] == 0) {
+        if (useDefaultInterval) {
             int timeIntervalsNum = 100;
             std::chrono::microseconds lastTimestamp = stats.getTimestampLastPacket();
             std::chrono::microseconds captureDuration = lastTimestamp - firstTimestamp;
@@ -216,48 +591,109 @@ void pcap_processor::collect_statistics(py::list& intervals) {
         std::sort(timeIntervals.begin(), timeIntervals.end());
         std::sort(barriers.begin(), barriers.end());
 
-        std::cout << std::endl;
-        std::chrono::system_clock::time_point lastPrinted = std::chrono::system_clock::now();
+        if (threads > 1 && timestampsRead) {
+            if (!read_pcap_info(filePath, totalPackets, timeIntervals)) return;
+        }
 
-        int barrier_count = static_cast<int>(barriers.size());
+        // Split the PCAP file into shards, if multiple threads are requested
+        std::vector<pcap_shard> shards = plan_shards(threads, totalPackets);
+        if (shards.size() > 1) {
+            collect_statistics_parallel(shards, timeIntervals, totalPackets);
+        } else {
+            if (threads > 1) {
+                std::cout << "PCAP file cannot be split into shards. Collecting statistics single-threaded." << std::endl;
+            }
+
+            std::cout << std::endl;
+            std::chrono::system_clock::time_point lastPrinted = std::chrono::system_clock::now();
+            struct stat fileStat;
+            long fileSize = stat(filePath.c_str(), &fileStat) == 0 ? static_cast<long>(fileStat.st_size) : 0;
 
-        // Iterate over all packets and collect statistics
-        for (; i != sniffer.end(); i++) {
-            currentPktTimestamp = i->timestamp();
-            std::chrono::microseconds currentDuration = currentPktTimestamp - firstTimestamp;
+            int barrier_count = static_cast<int>(barriers.size());
 
-            // For each interval
-            // drops last interval too small
-            for (int j = 0; j < barrier_count; j++) {
-                if(currentDuration>barriers[j]){
-                    stats.addIntervalStat(timeIntervals[j], intervalStartTimestamp[j], currentPktTimestamp);
-                    timeIntervalCounter++;
+            auto inspect_packet = [&](std::chrono::microseconds timestamp) {
+                currentPktTimestamp = timestamp;
+                std::chrono::microseconds currentDuration = currentPktTimestamp - firstTimestamp;
 
-                    barriers[j] =  barriers[j] + timeIntervals[j];
-                    intervalStartTimestamp[j] = currentPktTimestamp;
+                // For each interval
+                // drops last interval too small
+                for (int j = 0; j < barrier_count; j++) {
+                    if(currentDuration>barriers[j]){
+                        stats.addIntervalStat(timeIntervals[j], intervalStartTimestamp[j], currentPktTimestamp);
+                        timeIntervalCounter++;
+
+                        barriers[j] =  barriers[j] + timeIntervals[j];
+                        intervalStartTimestamp[j] = currentPktTimestamp;
+                    }
                 }
-            }
 
-            stats.incrementPacketCount();
-            this->process_packets(*i);
+                stats.incrementPacketCount();
+            };
 
-            // Indicate progress once every second
-            if (std::chrono::system_clock::now() - lastPrinted >= std::chrono::seconds(1)) {
+            auto indicate_progress = [&](long position) {
+                // Indicate progress once every second
+                if (std::chrono::system_clock::now() - lastPrinted < std::chrono::seconds(1)) {
+                    return;
+                }
                 int packetCount = stats.getPacketCount();
                 std::cout << "\rInspected packets: ";
-                std::cout << std::fixed << std::setprecision(1) << (static_cast<float>(packetCount)*100/totalPackets) << "%";
-                std::cout << " (" << packetCount << "/" << totalPackets << ")" << std::flush;
+                if (totalPackets > 0) {
+                    std::cout << std::fixed << std::setprecision(1) << (static_cast<float>(packetCount)*100/totalPackets) << "%";
+                    std::cout << " (" << packetCount << "/" << totalPackets << ")" << std::flush;
+                } else {
+                    // without a packet count, estimate the progress from the read bytes
+                    float progress = (position > 0 && fileSize > 0) ? static_cast<float>(position) / fileSize : 0;
+                    std::cout << std::fixed << std::setprecision(1) << (progress * 100) << "%";
+                    std::cout << " (" << packetCount << "/~";
+                    std::cout << (progress > 0 ? static_cast<long>(packetCount / progress) : packetCount) << ")      " << std::flush;
+                }
                 lastPrinted = std::chrono::system_clock::now();
 
                 if (PyErr_CheckSignals()) throw py::error_already_set();
+            };
+
+            // Ethernet captures are read through a memory mapping and only their headers are inspected,
+            // captures of other link types are dissected by libtins
+            std::unique_ptr<pcap_reader> reader;
+            try {
+                reader.reset(new pcap_reader(filePath));
+                if (reader->link_type() != LINKTYPE_ETHERNET) {
+                    reader.reset();
+                }
+            } catch (std::runtime_error&) {}
+
+            // Iterate over all packets and collect statistics
+            if (reader) {
+                pcap_record record;
+                while (reader->next(record)) {
+                    packet_view pkt(record);
+                    // skip malformed packets, like the FileSniffer does
+                    if (pkt.is_malformed()) {
+                        continue;
+                    }
+                    inspect_packet(record.timestamp);
+                    process_packet(pkt, stats, hasUnrecognized);
+                    indicate_progress(static_cast<long>(reader->position()));
+                }
+            } else {
+                FileSniffer sniffer(filePath);
+                FILE *file = pcap_file(sniffer.get_pcap_handle());
+                for (SnifferIterator i = sniffer.begin(); i != sniffer.end(); i++) {
+                    inspect_packet(i->timestamp());
+                    this->process_packets(*i);
+                    indicate_progress(file != nullptr ? ftell(file) : -1);
+                }
             }
-        }
 
-        std::cout << "\rInspected packets: ";
-        std::cout << "100.0% (" << totalPackets << "/" << totalPackets << ")" << std::endl;
+            if (totalPackets == 0) {
+                totalPackets = static_cast<std::size_t>(stats.getPacketCount());
+            }
+            std::cout << "\rInspected packets: ";
+            std::cout << "100.0% (" << totalPackets << "/" << totalPackets << ")      " << std::endl;
 
-        // Save timestamp of last packet into statistics
-        stats.setTimestampLastPacket(currentPktTimestamp);
+            // Save timestamp of last packet into statistics
+            stats.setTimestampLastPacket(currentPktTimestamp);
+        }
 
         // Create the communication interval statistics from the gathered communication intervals within every extended conversation statistic
         stats.createCommIntervalStats();
@@ -273,6 +709,16 @@ void pcap_processor::collect_statistics(py::list& intervals) {
  * @param pkt The packet to get analyzed.
  */
 void pcap_processor::process_packets(const Packet &pkt) {
+    process_packet(pkt, stats, hasUnrecognized);
+}
+
+/**
+ * Analyzes a given packet and collects statistical information into the given statistics object.
+ * @param pkt The packet to get analyzed.
+ * @param stats The statistics object to collect the information into.
+ * @param hasUnrecognized Set to true if the packet contains an unrecognized PDU.
+ */
+void pcap_processor::process_packet(const Packet &pkt, statistics &stats, bool &hasUnrecognized) {
     // Layer 2: Data Link Layer ------------------------
     std::string macAddressSender;
     std::string macAddressReceiver;
@@ -408,6 +854,108 @@ void pcap_processor::process_packets(const Packet &pkt) {
     }
 }
 
+/**
+ * Analyzes the headers of a given Ethernet frame and collects statistical information into the given statistics
+ * object. Collects the same information as the variant for dissected packets.
+ * @param pkt The view on the frame to get analyzed.
+ * @param stats The statistics object to collect the information into.
+ * @param hasUnrecognized Set to true if the frame contains an unrecognized network layer.
+ */
+void pcap_processor::process_packet(packet_view &pkt, statistics &stats, bool &hasUnrecognized) {
+    // Layer 2: Data Link Layer ------------------------
+    std::string macAddressSender = pkt.src_mac();
+    std::string macAddressReceiver = pkt.dst_mac();
+    uint32_t sizeCurrentPacket = pkt.size();
+
+    stats.addPacketSize(sizeCurrentPacket);
+
+    // Layer 3 - Network -------------------------------
+    std::string ipAddressSender;
+    std::string ipAddressReceiver;
+
+    // PDU is IPv4
+    if (pkt.is_ipv4()) {
+        ipAddressSender = pkt.src_ip();
+        ipAddressReceiver = pkt.dst_ip();
+
+        // IP distribution
+        stats.addIpStat_packetSent(ipAddressSender, ipAddressReceiver, sizeCurrentPacket, pkt.timestamp());
+
+        // TTL distribution
+        stats.incrementTTLcount(ipAddressSender, pkt.ttl());
+
+        // ToS distribution
+        stats.incrementToScount(ipAddressSender, pkt.tos());
+
+        // Protocol distribution
+        stats.incrementProtocolCount(ipAddressSender, "IPv4");
+        stats.increaseProtocolByteCount(ipAddressSender, "IPv4", sizeCurrentPacket);
+
+        // Assign IP Address to MAC Address
+        stats.assignMacAddress(ipAddressSender, macAddressSender);
+        stats.assignMacAddress(ipAddressReceiver, macAddressReceiver);
+
+    } //PDU is unrecognized
+    else {
+        hasUnrecognized = true;
+
+        long long ts = pkt.timestamp().count();
+        std::string timestamp_pkt = stats.getFormattedTimestamp(ts / 1000000, ts % 1000000);
+
+        stats.incrementUnrecognizedPDUCount(macAddressSender, macAddressReceiver, pkt.ether_type(), timestamp_pkt);
+    }
+
+    // Layer 4 - Transport -------------------------------
+    packet_view::transport_type p = pkt.transport();
+    if (p != packet_view::NONE) {
+        // Check for IPv4: payload
+        if (pkt.is_ipv4()) {
+            stats.checkPayload(static_cast<int>(pkt.transport_size() - pkt.transport_header_size()));
+        }
+
+        if (p == packet_view::TCP) {
+            // Check TCP checksum
+            if (pkt.is_ipv4()) {
+                stats.checkTCPChecksum(ipAddressSender, ipAddressReceiver, pkt.transport_data(), pkt.transport_size(),
+                                       pkt.transport_header_size());
+            }
+
+            stats.incrementProtocolCount(ipAddressSender, "TCP");
+            stats.increaseProtocolByteCount(ipAddressSender, "TCP", sizeCurrentPacket);
+
+            // Conversation statistics
+            stats.addConvStat(ipAddressSender, pkt.sport(), ipAddressReceiver, pkt.dport(), pkt.timestamp(), pkt.tcp_flags());
+            stats.addConvStatExt(ipAddressSender, pkt.sport(), ipAddressReceiver, pkt.dport(), "TCP", pkt.timestamp());
+
+            // Window Size distribution
+            stats.incrementWinCount(ipAddressSender, pkt.tcp_window());
+
+            // MSS distribution
+            uint16_t mss_value;
+            if (pkt.tcp_mss(mss_value)) {
+                stats.incrementMSScount(ipAddressSender, mss_value);
+            }
+
+            stats.incrementPortCount(ipAddressSender, pkt.sport(), ipAddressReceiver, pkt.dport(), "TCP");
+            stats.increasePortByteCount(ipAddressSender, pkt.sport(), ipAddressReceiver, pkt.dport(), sizeCurrentPacket, "TCP");
+
+          // UDP Packet
+        } else if (p == packet_view::UDP) {
+            stats.incrementProtocolCount(ipAddressSender, "UDP");
+            stats.increaseProtocolByteCount(ipAddressSender, "UDP", sizeCurrentPacket);
+            stats.incrementPortCount(ipAddressSender, pkt.sport(), ipAddressReceiver, pkt.dport(), "UDP");
+            stats.increasePortByteCount(ipAddressSender, pkt.sport(), ipAddressReceiver, pkt.dport(), sizeCurrentPacket, "UDP");
+            stats.addConvStatExt(ipAddressSender, pkt.sport(), ipAddressReceiver, pkt.dport(), "UDP", pkt.timestamp());
+        } else if (p == packet_view::ICMP) {
+            stats.incrementProtocolCount(ipAddressSender, "ICMP");
+            stats.increaseProtocolByteCount(ipAddressSender, "ICMP", sizeCurrentPacket);
+        } else if (p == packet_view::ICMPV6) {
+            stats.incrementProtocolCount(ipAddressSender, "ICMPv6");
+            stats.increaseProtocolByteCount(ipAddressSender, "ICMPv6", sizeCurrentPacket);
+        }
+    }
+}
+
 /**
  * Writes the collected statistic data into a SQLite3 database located at database_path. Uses an existing
  * database or, if not present, creates a new database.
@@ -490,7 +1038,8 @@ PYBIND11_MODULE (libpcapreader, m) {
     py::class_<pcap_processor>(m, "pcap_processor")
             .def(py::init<std::string, std::string, std::string, std::string>())
             .def("merge_pcaps", &pcap_processor::merge_pcaps)
-            .def("collect_statistics", &pcap_processor::collect_statistics)
+            .def("merge_pcaps_multi", &pcap_processor::merge_pcaps_multi, py::arg("pcap_paths"), py::arg("out_path") = "")
+            .def("collect_statistics", &pcap_processor::collect_statistics, py::arg("intervals"), py::arg("threads") = 1)
             .def("get_timestamp_mu_sec", &pcap_processor::get_timestamp_mu_sec)
             .def("write_to_database", &pcap_processor::write_to_database)
             .def("write_new_interval_statistics", &pcap_processor::write_new_interval_statistics)
@@ -9,18 +9,84 @@
 #include <iomanip>
 #include <tins/tins.h>
 #include <iostream>
+#include <fstream>
+#include <memory>
+#include <cstring>
 #include <pybind11/pybind11.h>
 #include <time.h>
 #include <stdio.h>
 #include <sys/stat.h>
 #include <unordered_map>
+#include <queue>
+#include <functional>
+#include <atomic>
+#include <thread>
+#include <exception>
+#include <stdexcept>
+#include "pcap_reader.h"
 #include "statistics.h"
 #include "statistics_db.h"
 
 namespace py = pybind11;
 
+#define CHECKPOINT_INTERVAL 16384  // number of packets between two recorded file positions
+
 using namespace Tins;
 
+/*
+ * Struct used to represent a position within the PCAP file, recorded while reading the PCAP file info:
+ * - File offset of the packet record
+ * - Number of packets preceding the packet
+ * - Timestamp of the packet
+ */
+struct pcap_checkpoint {
+    long offset;
+    std::size_t packetNumber;
+    std::chrono::microseconds timestamp;
+};
+
+/*
+ * Struct used to represent a shard of the PCAP file, which is processed by a single worker thread:
+ * - File offset of the first packet record of the shard
+ * - Number of the first packet record of the shard
+ * - Number of the first packet record following the shard
+ */
+struct pcap_shard {
+    long offset;
+    std::size_t firstPacket;
+    std::size_t endPacket;
+};
+
+/*
+ * Struct used to represent the end of an interval of the interval statistics:
+ * - Number of the packet record before which the interval ends
+ * - Index of the interval length
+ * - Timestamp of the first packet of the interval
+ * - Timestamp of the packet ending the interval
+ */
+struct interval_close {
+    std::size_t packetNumber;
+    std::size_t interval;
+    std::chrono::microseconds start;
+    std::chrono::microseconds end;
+};
+
+/*
+ * Struct used as entry of the heap of merge_pcap_files, represents the next pending packet of an input file:
+ * - Timestamp of the packet
+ * - Rank of the input file, which orders packets with equal timestamps
+ * - Index of the input file
+ */
+struct merge_entry {
+    std::chrono::microseconds timestamp;
+    std::size_t rank;
+    std::size_t input;
+
+    bool operator>(const merge_entry &other) const {
+        return timestamp > other.timestamp || (timestamp == other.timestamp && rank > other.rank);
+    }
+};
+
 class pcap_processor {
 
 public:
@@ -38,6 +104,9 @@ public:
     std::string resourcePath;
     bool hasUnrecognized;
     std::chrono::duration<int, std::micro> timeInterval;
+    std::vector<pcap_checkpoint> checkpoints;
+    std::vector<interval_close> intervalCloses;
+    bool shardable;
 
     /*
      * Methods
@@ -46,13 +115,34 @@ public:
 
     void process_packets(const Packet &pkt);
 
+    static void process_packet(const Packet &pkt, statistics &stats, bool &hasUnrecognized);
+
+    static void process_packet(packet_view &pkt, statistics &stats, bool &hasUnrecognized);
+
     long double get_timestamp_mu_sec(const int after_packet_number);
 
     std::string merge_pcaps(const std::string pcap_path);
 
-    bool read_pcap_info(const std::string &filePath, std::size_t &totalPakets);
+    std::string merge_pcaps_multi(const py::list &pcap_paths, const std::string &out_path);
+
+    std::string merge_pcap_files(const std::vector<std::string> &pcap_paths, const std::string &out_path);
+
+    bool read_pcap_info(const std::string &filePath, std::size_t &totalPakets,
+                        const std::vector<std::chrono::duration<int, std::micro>> &timeIntervals);
+
+    bool read_pcap_timestamps(const std::string &filePath, bool readLast);
+
+    void collect_statistics(py::list& intervals, int threads);
+
+    std::vector<pcap_shard> plan_shards(int threads, std::size_t totalPackets);
+
+    void collect_shard(const pcap_shard &shard, statistics &shardStats, bool &shardUnrecognized,
+                       const std::vector<interval_close> &closes,
+                       std::atomic<std::size_t> &inspectedPackets, std::atomic<bool> &abort);
 
-    void collect_statistics(py::list& intervals);
+    void collect_statistics_parallel(const std::vector<pcap_shard> &shards,
+                                     const std::vector<std::chrono::duration<int, std::micro>> &timeIntervals,
+                                     std::size_t totalPackets);
 
     void write_to_database(std::string database_path, const py::list& intervals, bool del);
 
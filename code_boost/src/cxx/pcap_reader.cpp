@@ -0,0 +1,506 @@
+#include "pcap_reader.h"
+
+#include <algorithm>
+#include <cstdio>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+/**
+ * Maps the given PCAP or PCAPNG file read-only into memory and reads its file header.
+ * @param filePath The path of the PCAP file.
+ */
+pcap_reader::pcap_reader(const std::string &filePath) : data(nullptr), mappedSize(0), offset(0), pcapng(false),
+                                                        swapped(false), linkType(0), unitsPerSecond(1000000) {
+    int fd = open(filePath.c_str(), O_RDONLY);
+    if (fd < 0) {
+        throw std::runtime_error("Could not open PCAP '" + filePath + "'");
+    }
+    struct stat fileStat;
+    if (fstat(fd, &fileStat) != 0 || fileStat.st_size < 24) {
+        close(fd);
+        throw std::runtime_error("Could not read PCAP '" + filePath + "'");
+    }
+    mappedSize = static_cast<std::size_t>(fileStat.st_size);
+    void *mapping = mmap(nullptr, mappedSize, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if (mapping == MAP_FAILED) {
+        throw std::runtime_error("Could not map PCAP '" + filePath + "' into memory");
+    }
+    // packets are read in file order, so the kernel may read ahead aggressively
+    posix_madvise(mapping, mappedSize, POSIX_MADV_SEQUENTIAL);
+    data = static_cast<const uint8_t *>(mapping);
+
+    try {
+        read_file_header();
+    } catch (...) {
+        munmap(mapping, mappedSize);
+        throw;
+    }
+}
+
+/**
+ * Unmaps the file. All records handed out by this reader become invalid.
+ */
+pcap_reader::~pcap_reader() {
+    munmap(const_cast<uint8_t *>(data), mappedSize);
+}
+
+/**
+ * Reads the file header and positions the reader in front of the first packet record. For PCAPNG files, the section
+ * header and the interface descriptions in front of the first packet are read.
+ */
+void pcap_reader::read_file_header() {
+    uint32_t magic;
+    std::memcpy(&magic, data, sizeof(magic));
+    // the magic number indicates the byte order and the timestamp resolution
+    switch (magic) {
+        case 0xa1b2c3d4: swapped = false; unitsPerSecond = 1000000; break;
+        case 0xd4c3b2a1: swapped = true; unitsPerSecond = 1000000; break;
+        case 0xa1b23c4d: swapped = false; unitsPerSecond = 1000000000; break;
+        case 0x4d3cb2a1: swapped = true; unitsPerSecond = 1000000000; break;
+        case 0x0a0d0d0a: pcapng = true; break;
+        default: throw std::runtime_error("Unsupported PCAP file format");
+    }
+
+    if (!pcapng) {
+        // the upper bits of the link type field may contain FCS information
+        linkType = read32(20) & 0x03ffffff;
+        offset = 24;
+        return;
+    }
+
+    // like libpcap, the first interface determines the link type of the whole file
+    if (!read_pcapng_metadata() || interfaces.empty()) {
+        throw std::runtime_error("Unsupported PCAPNG file layout");
+    }
+    linkType = interfaces[0].linkType;
+}
+
+/**
+ * Reads the PCAPNG blocks from the current position up to the next packet block. Section headers and interface
+ * descriptions are interpreted, all other blocks are skipped.
+ * @return True iff the reader is positioned in front of a packet block or at the end of the file.
+ */
+bool pcap_reader::read_pcapng_metadata() {
+    while (offset + 12 <= mappedSize) {
+        uint32_t type;
+        std::memcpy(&type, data + offset, sizeof(type));
+        if (type == 0x0a0d0d0a) {
+            // the byte order magic of a section header determines the byte order of the whole section
+            if (offset + 28 > mappedSize) {
+                return false;
+            }
+            uint32_t magic;
+            std::memcpy(&magic, data + offset + 8, sizeof(magic));
+            if (magic == 0x1a2b3c4d) {
+                swapped = false;
+            } else if (magic == 0x4d3c2b1a) {
+                swapped = true;
+            } else {
+                return false;
+            }
+            interfaces.clear();
+        } else {
+            type = read32(offset);
+        }
+
+        uint32_t length = read32(offset + 4);
+        if (length < 12 || length % 4 != 0 || length > mappedSize - offset) {
+            return false;
+        }
+
+        // enhanced, simple and obsolete packet blocks
+        if (type == 6 || type == 3 || type == 2) {
+            return true;
+        }
+
+        // interface description block
+        if (type == 1) {
+            if (length < 20) {
+                return false;
+            }
+            pcapng_interface interface = {read16(offset + 8), read32(offset + 12), 1000000, 0};
+            std::size_t optionsEnd = offset + length - 4;
+            for (std::size_t pos = offset + 16; pos + 4 <= optionsEnd;) {
+                uint16_t code = read16(pos);
+                uint16_t optionLength = read16(pos + 2);
+                if (code == 0 || pos + 4 + optionLength > optionsEnd) {
+                    break;
+                }
+                if (code == 9 && optionLength == 1) {
+                    // if_tsresol: negative power of 10 or, if the most significant bit is set, of 2
+                    uint8_t resolution = data[pos + 4];
+                    uint8_t exponent = resolution & 0x7f;
+                    uint64_t base = (resolution & 0x80) ? 2 : 10;
+                    if (exponent > (base == 2 ? 63 : 19)) {
+                        return false;
+                    }
+                    interface.unitsPerSecond = 1;
+                    for (uint8_t k = 0; k < exponent; k++) {
+                        interface.unitsPerSecond *= base;
+                    }
+                } else if (code == 14 && optionLength == 8) {
+                    // if_tsoffset: seconds added to all timestamps of the interface
+                    uint64_t value;
+                    std::memcpy(&value, data + pos + 4, sizeof(value));
+                    interface.offsetSeconds = static_cast<int64_t>(swapped ? __builtin_bswap64(value) : value);
+                }
+                pos += 4 + ((optionLength + 3u) & ~3u);
+            }
+            interfaces.push_back(interface);
+        }
+        offset += length;
+    }
+    return true;
+}
+
+/**
+ * Reads the next packet record of the file. Reading stops at the first truncated or corrupt record, like libpcap does.
+ * @param record The record to fill. Its data points into the memory mapping and is not copied.
+ * @return True iff a record was read.
+ */
+bool pcap_reader::next(pcap_record &record) {
+    if (pcapng) {
+        return next_pcapng(record);
+    }
+    if (offset + 16 > mappedSize) {
+        return false;
+    }
+    uint32_t capturedLength = read32(offset + 8);
+    if (capturedLength > mappedSize - offset - 16) {
+        return false;
+    }
+    record.timestamp = to_microseconds(read32(offset), read32(offset + 4), unitsPerSecond);
+    record.data = data + offset + 16;
+    record.capturedLength = capturedLength;
+    record.originalLength = read32(offset + 12);
+    offset += 16 + capturedLength;
+    return true;
+}
+
+/**
+ * Reads the next packet block of a PCAPNG file, skipping all other blocks.
+ * @param record The record to fill. Its data points into the memory mapping and is not copied.
+ * @return True iff a record was read.
+ */
+bool pcap_reader::next_pcapng(pcap_record &record) {
+    if (!read_pcapng_metadata() || offset + 12 > mappedSize) {
+        return false;
+    }
+    uint32_t type = read32(offset);
+    uint32_t length = read32(offset + 4);
+    std::size_t body = offset + 8;
+    std::size_t end = offset + length - 4;
+    uint32_t interfaceId = 0;
+    uint64_t timestamp = 0;
+    std::size_t packetData;
+
+    if (type == 3) {
+        // simple packet blocks have no timestamp and are captured on the first interface
+        if (length < 16 || interfaces.empty()) {
+            return false;
+        }
+        record.originalLength = read32(body);
+        packetData = body + 4;
+        record.capturedLength = static_cast<uint32_t>(std::min<std::size_t>(record.originalLength, end - packetData));
+        if (interfaces[0].snapLength != 0) {
+            record.capturedLength = std::min(record.capturedLength, interfaces[0].snapLength);
+        }
+    } else {
+        // enhanced packet blocks and obsolete packet blocks share the same layout
+        if (length < 32) {
+            return false;
+        }
+        interfaceId = type == 6 ? read32(body) : read16(body);
+        timestamp = (static_cast<uint64_t>(read32(body + 4)) << 32) | read32(body + 8);
+        record.capturedLength = read32(body + 12);
+        record.originalLength = read32(body + 16);
+        packetData = body + 20;
+        if (record.capturedLength > end - packetData) {
+            return false;
+        }
+    }
+
+    // libpcap refuses files whose interfaces have different link types
+    if (interfaceId >= interfaces.size() || interfaces[interfaceId].linkType != linkType) {
+        return false;
+    }
+    const pcapng_interface &interface = interfaces[interfaceId];
+    if (type == 3) {
+        record.timestamp = std::chrono::microseconds(0);
+    } else {
+        record.timestamp = to_microseconds(static_cast<int64_t>(timestamp / interface.unitsPerSecond) + interface.offsetSeconds,
+                                           timestamp % interface.unitsPerSecond, interface.unitsPerSecond);
+    }
+    record.data = data + packetData;
+    offset += length;
+    return true;
+}
+
+/**
+ * Converts a timestamp given in seconds and fractions of a second to microseconds, truncating finer resolutions.
+ * @param seconds The seconds of the timestamp.
+ * @param fraction The fractions of a second of the timestamp.
+ * @param fractionsPerSecond The number of fractions per second.
+ * @return the timestamp in microseconds.
+ */
+std::chrono::microseconds pcap_reader::to_microseconds(int64_t seconds, uint64_t fraction, uint64_t fractionsPerSecond) {
+    uint64_t microseconds;
+    if (fractionsPerSecond % 1000000 == 0) {
+        microseconds = fraction / (fractionsPerSecond / 1000000);
+    } else if (1000000 % fractionsPerSecond == 0) {
+        microseconds = fraction * (1000000 / fractionsPerSecond);
+    } else {
+        microseconds = static_cast<uint64_t>(static_cast<long double>(fraction) * 1000000 / fractionsPerSecond);
+    }
+    return std::chrono::microseconds(seconds * 1000000 + static_cast<int64_t>(microseconds));
+}
+
+/**
+ * Computes the offsets of the network and transport layer. Frames which libtins would reject as malformed, like
+ * frames with truncated IPv4 or TCP headers, are marked as malformed.
+ */
+void packet_view::parse() {
+    if (parsed) {
+        return;
+    }
+    parsed = true;
+    malformed = false;
+    ipv4 = false;
+    networkOffset = 14;
+    networkSize = 0;
+    transportType = NONE;
+    transportOffset = 0;
+    transportSize = 0;
+    transportHeaderSize = 0;
+
+    if (record.capturedLength < networkOffset) {
+        malformed = true;
+        frameSize = record.capturedLength;
+        return;
+    }
+
+    networkSize = record.capturedLength - networkOffset;
+    if (networkSize > 0) {
+        uint16_t type = ether_type();
+        if (type == 0x0800) {
+            malformed = !parse_ipv4();
+        } else if (type == 0x86dd) {
+            malformed = !parse_ipv6();
+        }
+    }
+
+    // like libtins, trailing bytes behind the IP packet are ignored and frames are padded to the minimum frame size
+    frameSize = std::max<uint32_t>(60, networkOffset + networkSize);
+}
+
+/**
+ * Parses the IPv4 header and the transport layer header behind it.
+ * @return False iff the packet is malformed.
+ */
+bool packet_view::parse_ipv4() {
+    const uint8_t *ip = record.data + networkOffset;
+    if (networkSize < 20) {
+        return false;
+    }
+    uint32_t headerSize = (ip[0] & 0x0fu) * 4;
+    if (headerSize < 20 || headerSize > networkSize) {
+        return false;
+    }
+    for (uint32_t i = 20; i < headerSize;) {
+        uint8_t number = ip[i] & 0x1f;
+        if (number == 0) {
+            break;
+        } else if (number == 1) {
+            i++;
+            continue;
+        }
+        if (i + 1 >= headerSize || ip[i + 1] < 2 || i + ip[i + 1] > headerSize) {
+            return false;
+        }
+        i += ip[i + 1];
+    }
+    ipv4 = true;
+
+    // the total length limits the payload, unless it is unset because of TCP segmentation offload
+    uint32_t available = networkSize - headerSize;
+    uint32_t totalLength = be16(ip + 2);
+    uint32_t payloadSize = available;
+    if (totalLength != 0 && totalLength >= headerSize && totalLength - headerSize < available) {
+        payloadSize = totalLength - headerSize;
+    }
+    networkSize = headerSize + payloadSize;
+    transportOffset = networkOffset + headerSize;
+    transportSize = payloadSize;
+    if (available == 0) {
+        return true;
+    }
+
+    // the payload of fragments is not parsed
+    if ((ip[6] & 0x20) != 0 || (be16(ip + 6) & 0x1fff) != 0) {
+        transportType = RAW;
+        transportHeaderSize = transportSize;
+        return true;
+    }
+    return parse_transport(ip[9]);
+}
+
+/**
+ * Parses the IPv6 header, skips its extension headers and parses the transport layer header behind them.
+ * @return False iff the packet is malformed.
+ */
+bool packet_view::parse_ipv6() {
+    const uint8_t *ip = record.data + networkOffset;
+    if (networkSize < 40) {
+        return false;
+    }
+    uint32_t available = networkSize - 40;
+    uint32_t payloadLength = be16(ip + 4);
+    uint32_t payloadSize = (payloadLength != 0 && payloadLength < available) ? payloadLength : available;
+    networkSize = 40 + payloadSize;
+
+    uint8_t nextHeader = ip[6];
+    uint32_t headerSize = 40;
+    bool fragmented = false;
+    // hop-by-hop options, routing, fragment, authentication and destination options headers
+    while (!fragmented && (nextHeader == 0 || nextHeader == 43 || nextHeader == 44 || nextHeader == 51 || nextHeader == 60)) {
+        if (headerSize + 8 > networkSize) {
+            return false;
+        }
+        const uint8_t *extension = ip + headerSize;
+        uint32_t extensionSize;
+        if (nextHeader == 44) {
+            extensionSize = 8;
+            fragmented = true;
+        } else if (nextHeader == 51) {
+            extensionSize = (extension[1] + 2u) * 4;
+        } else {
+            extensionSize = (extension[1] + 1u) * 8;
+        }
+        if (headerSize + extensionSize > networkSize) {
+            return false;
+        }
+        nextHeader = extension[0];
+        headerSize += extensionSize;
+    }
+
+    transportOffset = networkOffset + headerSize;
+    transportSize = networkSize - headerSize;
+    if (transportSize == 0) {
+        return true;
+    }
+    if (fragmented) {
+        transportType = RAW;
+        transportHeaderSize = transportSize;
+        return true;
+    }
+    return parse_transport(nextHeader);
+}
+
+/**
+ * Parses the transport layer header.
+ * @param protocol The IP protocol number of the transport layer.
+ * @return False iff the packet is malformed.
+ */
+bool packet_view::parse_transport(uint8_t protocol) {
+    switch (protocol) {
+        case 6:
+            if (transportSize < 20) {
+                return false;
+            }
+            transportHeaderSize = (transport_data()[12] >> 4) * 4u;
+            if (transportHeaderSize < 20 || transportHeaderSize > transportSize) {
+                return false;
+            }
+            transportType = TCP;
+            return parse_tcp_options();
+        case 17:
+            transportType = UDP;
+            transportHeaderSize = 8;
+            return transportSize >= transportHeaderSize;
+        case 1:
+            transportType = ICMP;
+            transportHeaderSize = 8;
+            return transportSize >= transportHeaderSize;
+        case 58:
+            transportType = ICMPV6;
+            transportHeaderSize = 8;
+            return transportSize >= transportHeaderSize;
+        default:
+            transportType = RAW;
+            transportHeaderSize = transportSize;
+            return true;
+    }
+}
+
+/**
+ * Checks that the TCP options do not exceed the TCP header.
+ * @return False iff the options are malformed.
+ */
+bool packet_view::parse_tcp_options() const {
+    const uint8_t *tcp = transport_data();
+    for (uint32_t i = 20; i < transportHeaderSize;) {
+        if (tcp[i] == 0) {
+            break;
+        } else if (tcp[i] == 1) {
+            i++;
+            continue;
+        }
+        if (i + 1 >= transportHeaderSize || tcp[i + 1] < 2 || i + tcp[i + 1] > transportHeaderSize) {
+            return false;
+        }
+        i += tcp[i + 1];
+    }
+    return true;
+}
+
+/**
+ * Searches the TCP options for the maximum segment size.
+ * @param mss Set to the maximum segment size, if the option is present.
+ * @return True iff the packet contains a valid MSS option.
+ */
+bool packet_view::tcp_mss(uint16_t &mss) const {
+    const uint8_t *tcp = transport_data();
+    for (uint32_t i = 20; i < transportHeaderSize;) {
+        if (tcp[i] == 0) {
+            break;
+        } else if (tcp[i] == 1) {
+            i++;
+            continue;
+        }
+        if (tcp[i] == 2) {
+            if (tcp[i + 1] != 4) {
+                return false;
+            }
+            mss = be16(tcp + i + 2);
+            return true;
+        }
+        i += tcp[i + 1];
+    }
+    return false;
+}
+
+/**
+ * Formats an IPv4 address like libtins does.
+ * @param address The four bytes of the address in network byte order.
+ * @return the address in dotted decimal notation.
+ */
+std::string packet_view::ipv4_to_string(const uint8_t *address) {
+    char buffer[16];
+    snprintf(buffer, sizeof(buffer), "%u.%u.%u.%u", address[0], address[1], address[2], address[3]);
+    return std::string(buffer);
+}
+
+/**
+ * Formats a MAC address like libtins does.
+ * @param address The six bytes of the address.
+ * @return the address as colon separated lowercase hex digits.
+ */
+std::string packet_view::mac_to_string(const uint8_t *address) {
+    char buffer[18];
+    snprintf(buffer, sizeof(buffer), "%02x:%02x:%02x:%02x:%02x:%02x",
+             address[0], address[1], address[2], address[3], address[4], address[5]);
+    return std::string(buffer);
+}
@@ -0,0 +1,209 @@
+/**
+ * Classes for reading PCAP and PCAPNG files through a read-only memory mapping and for inspecting the headers of the
+ * read packets without copying or dissecting them into PDU objects.
+ */
+
+#ifndef CPP_PCAPREADER_PCAP_READER_H
+#define CPP_PCAPREADER_PCAP_READER_H
+
+#include <chrono>
+#include <cstdint>
+#include <cstring>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#define LINKTYPE_ETHERNET 1  // link type of Ethernet frames in PCAP and PCAPNG files
+
+/*
+ * Struct used to represent a packet record of a PCAP file:
+ * - Timestamp of the packet
+ * - Pointer to the captured bytes of the packet, valid as long as the pcap_reader exists
+ * - Number of captured bytes
+ * - Original length of the packet on the wire
+ */
+struct pcap_record {
+    std::chrono::microseconds timestamp;
+    const uint8_t *data;
+    uint32_t capturedLength;
+    uint32_t originalLength;
+};
+
+/*
+ * Struct used to represent an interface of a PCAPNG section:
+ * - Link type of the interface
+ * - Maximum number of captured bytes per packet
+ * - Number of timestamp units per second
+ * - Offset in seconds added to all timestamps
+ */
+struct pcapng_interface {
+    uint32_t linkType;
+    uint32_t snapLength;
+    uint64_t unitsPerSecond;
+    int64_t offsetSeconds;
+};
+
+class pcap_reader {
+
+public:
+    /*
+     * Class constructor, throws std::runtime_error if the file cannot be mapped or has an unsupported format
+     */
+    explicit pcap_reader(const std::string &filePath);
+
+    ~pcap_reader();
+
+    pcap_reader(const pcap_reader &) = delete;
+
+    pcap_reader &operator=(const pcap_reader &) = delete;
+
+    /*
+     * Methods
+     */
+    bool next(pcap_record &record);
+
+    void seek(std::size_t position) { offset = position < mappedSize ? position : mappedSize; }
+
+    std::size_t position() const { return offset; }
+
+    std::size_t size() const { return mappedSize; }
+
+    uint32_t link_type() const { return linkType; }
+
+private:
+    /*
+     * Attributes
+     */
+    const uint8_t *data;
+    std::size_t mappedSize;
+    std::size_t offset;
+    bool pcapng;
+    bool swapped;
+    uint32_t linkType;
+    uint64_t unitsPerSecond;
+    std::vector<pcapng_interface> interfaces;
+
+    /*
+     * Methods
+     */
+    void read_file_header();
+
+    bool read_pcapng_metadata();
+
+    bool next_pcapng(pcap_record &record);
+
+    static std::chrono::microseconds to_microseconds(int64_t seconds, uint64_t fraction, uint64_t fractionsPerSecond);
+
+    uint16_t read16(std::size_t position) const {
+        uint16_t value;
+        std::memcpy(&value, data + position, sizeof(value));
+        return swapped ? __builtin_bswap16(value) : value;
+    }
+
+    uint32_t read32(std::size_t position) const {
+        uint32_t value;
+        std::memcpy(&value, data + position, sizeof(value));
+        return swapped ? __builtin_bswap32(value) : value;
+    }
+};
+
+/*
+ * Read-only view on the headers of a captured Ethernet frame. The layer offsets are computed on first access and all
+ * header fields are read directly from the captured bytes, which must outlive the view.
+ */
+class packet_view {
+
+public:
+    /*
+     * Transport layer protocols distinguished by the statistics, RAW stands for any other or unparsed payload
+     */
+    enum transport_type { NONE, TCP, UDP, ICMP, ICMPV6, RAW };
+
+    /*
+     * Class constructor
+     */
+    explicit packet_view(const pcap_record &record) : record(record), parsed(false) {}
+
+    /*
+     * Methods
+     */
+    std::chrono::microseconds timestamp() const { return record.timestamp; }
+
+    bool is_malformed() { parse(); return malformed; }
+
+    uint32_t size() { parse(); return frameSize; }
+
+    std::string src_mac() const { return mac_to_string(record.data + 6); }
+
+    std::string dst_mac() const { return mac_to_string(record.data); }
+
+    uint16_t ether_type() const { return be16(record.data + 12); }
+
+    bool is_ipv4() { parse(); return ipv4; }
+
+    std::string src_ip() const { return ipv4_to_string(record.data + networkOffset + 12); }
+
+    std::string dst_ip() const { return ipv4_to_string(record.data + networkOffset + 16); }
+
+    uint8_t ttl() const { return record.data[networkOffset + 8]; }
+
+    uint8_t tos() const { return record.data[networkOffset + 1]; }
+
+    transport_type transport() { parse(); return transportType; }
+
+    const uint8_t *transport_data() const { return record.data + transportOffset; }
+
+    uint32_t transport_size() const { return transportSize; }
+
+    uint32_t transport_header_size() const { return transportHeaderSize; }
+
+    uint16_t sport() const { return be16(record.data + transportOffset); }
+
+    uint16_t dport() const { return be16(record.data + transportOffset + 2); }
+
+    uint16_t tcp_flags() const {
+        return static_cast<uint16_t>(((record.data[transportOffset + 12] & 0x0f) << 8) | record.data[transportOffset + 13]);
+    }
+
+    uint16_t tcp_window() const { return be16(record.data + transportOffset + 14); }
+
+    bool tcp_mss(uint16_t &mss) const;
+
+    static uint16_t be16(const uint8_t *bytes) { return static_cast<uint16_t>((bytes[0] << 8) | bytes[1]); }
+
+    static std::string ipv4_to_string(const uint8_t *address);
+
+    static std::string mac_to_string(const uint8_t *address);
+
+private:
+    /*
+     * Attributes
+     */
+    pcap_record record;
+    bool parsed;
+    bool malformed;
+    bool ipv4;
+    uint32_t frameSize;
+    uint32_t networkOffset;
+    uint32_t networkSize;
+    transport_type transportType;
+    uint32_t transportOffset;
+    uint32_t transportSize;
+    uint32_t transportHeaderSize;
+
+    /*
+     * Methods
+     */
+    void parse();
+
+    bool parse_ipv4();
+
+    bool parse_ipv6();
+
+    bool parse_transport(uint8_t protocol);
+
+    bool parse_tcp_options() const;
+};
+
+
+#endif //CPP_PCAPREADER_PCAP_READER_H
@@ -2,6 +2,7 @@
 #include <fstream>
 #include <vector>
 #include <math.h>
+#include <iterator>
 #include "statistics.h"
 #include <sstream>
 #include <SQLiteCpp/SQLiteCpp.h>
@@ -20,7 +21,16 @@ void statistics::checkPayload(const PDU *pdu_l4) {
         // pdu_l4: Tarnsport layer 4
         int pktSize = pdu_l4->size();
         int headerSize = pdu_l4->header_size(); // TCP/UDP header
-        int payloadSize = pktSize - headerSize;
+        checkPayload(pktSize - headerSize);
+    }
+}
+
+/**
+ * Increments the packet counter for the packets with a payload, if the given payload size is not zero.
+ * @param payloadSize The size of the transport layer payload.
+ */
+void statistics::checkPayload(int payloadSize) {
+    if(this->getDoExtraTests()) {
         if (payloadSize > 0)
             payloadCount++;
     }
@@ -40,6 +50,23 @@ void statistics::checkTCPChecksum(const std::string &ipAddressSender, const std:
     }
 }
 
+/**
+ * Checks the correctness of the TCP checksum of a captured TCP segment and increments counter if the checksum was incorrect.
+ * @param ipAddressSender The source IP.
+ * @param ipAddressReceiver The destination IP.
+ * @param segment The captured bytes of the TCP segment.
+ * @param size The size of the TCP segment.
+ * @param headerSize The size of the TCP header.
+ */
+void statistics::checkTCPChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver,
+                                  const uint8_t *segment, uint32_t size, uint32_t headerSize) {
+    if(this->getDoExtraTests()) {
+        if(check_tcpChecksum(ipAddressSender, ipAddressReceiver, segment, size, headerSize))
+            correctTCPChecksumCount++;
+        else incorrectTCPChecksumCount++;
+    }
+}
+
 /**
  * Calculates entropy of the source and destination IPs in a time interval.
  * @param intervalStartTimestamp The timstamp where the interval starts.
@@ -508,6 +535,301 @@ void statistics::createCommIntervalStats(){
     }
 }
 
+/**
+ * Appends all elements of a vector to another vector.
+ * @param dst The vector to which the elements are appended.
+ * @param src The vector whose elements are appended.
+ */
+template<class T>
+static void appendVector(std::vector<T> &dst, std::vector<T> &src) {
+    dst.insert(dst.end(), std::make_move_iterator(src.begin()), std::make_move_iterator(src.end()));
+}
+
+/**
+ * Removes the first occurrence of a value from a vector, if there is any.
+ * @param vec The vector from which the value is removed.
+ * @param value The value to remove.
+ */
+static void eraseFirst(std::vector<std::chrono::microseconds> &vec, std::chrono::microseconds value) {
+    auto found = std::find(vec.begin(), vec.end(), value);
+    if (found != vec.end())
+        vec.erase(found);
+}
+
+/**
+ * Ends the current interval segment of this object before the given packet, see interval_segment. Called by the
+ * shards of a PCAP file before every packet at which an interval ends and after their last packet, so that the
+ * interval statistics can be calculated in packet order by applyIntervalSegment. The TTL, window size, ToS, MSS and
+ * port values are moved into the segment.
+ * @param packetNumber The number of the packet record before which the segment ends.
+ */
+void statistics::closeIntervalSegment(std::size_t packetNumber) {
+    interval_segment segment;
+    segment.packetNumber = packetNumber;
+    segment.packetCount = packetCount - segmentPacketCount;
+    segment.sumPacketSize = sumPacketSize - segmentSumPacketSize;
+    segment.payloadCount = payloadCount - segmentPayloadCount;
+    segment.incorrectTCPChecksumCount = incorrectTCPChecksumCount - segmentIncorrectTCPChecksumCount;
+    segment.correctTCPChecksumCount = correctTCPChecksumCount - segmentCorrectTCPChecksumCount;
+    segmentPacketCount = packetCount;
+    segmentSumPacketSize = sumPacketSize;
+    segmentPayloadCount = payloadCount;
+    segmentIncorrectTCPChecksumCount = incorrectTCPChecksumCount;
+    segmentCorrectTCPChecksumCount = correctTCPChecksumCount;
+
+    for (auto &cur_elem : ip_statistics) {
+        const entry_ipStat &e = cur_elem.second;
+        auto found = segmentIPRanges.find(cur_elem.first);
+        if (found == segmentIPRanges.end()) {
+            found = segmentIPRanges.emplace(cur_elem.first, entry_ipSegment{0, 0, 0, 0, 0, 0}).first;
+        } else if (found->second.sent_end == e.pkts_sent_timestamp.size()
+                   && found->second.received_end == e.pkts_received_timestamp.size()) {
+            continue;
+        }
+        entry_ipSegment &last = found->second;
+        last = {last.sent_end, e.pkts_sent_timestamp.size(), last.received_end, e.pkts_received_timestamp.size(),
+                last.kbytes_end, e.pkts_kbytes.size()};
+        segment.ip_ranges.emplace(cur_elem.first, last);
+    }
+
+    segment.ttl_values = std::move(ttl_values);
+    segment.win_values = std::move(win_values);
+    segment.tos_values = std::move(tos_values);
+    segment.mss_values = std::move(mss_values);
+    segment.port_values = std::move(port_values);
+    ttl_values.clear();
+    win_values.clear();
+    tos_values.clear();
+    mss_values.clear();
+    port_values.clear();
+
+    interval_segments.push_back(std::move(segment));
+}
+
+/**
+ * Applies an interval segment of a subsequent statistics object to the state of this object read by addIntervalStat,
+ * so that the next interval statistics are calculated exactly as if this object had seen the packets of the segment.
+ * @param segment The interval segment of the other object, its value counts are moved.
+ * @param other The statistics object the segment belongs to.
+ */
+void statistics::applyIntervalSegment(interval_segment &segment, const statistics &other) {
+    packetCount += segment.packetCount;
+    sumPacketSize += segment.sumPacketSize;
+    payloadCount += segment.payloadCount;
+    incorrectTCPChecksumCount += segment.incorrectTCPChecksumCount;
+    correctTCPChecksumCount += segment.correctTCPChecksumCount;
+
+    for (auto &cur_elem : segment.ip_ranges) {
+        entry_ipStat &e = ip_statistics[cur_elem.first];
+        const entry_ipStat &o = other.ip_statistics.at(cur_elem.first);
+        const entry_ipSegment &range = cur_elem.second;
+        e.pkts_sent += static_cast<long>(range.sent_end - range.sent_begin);
+        e.pkts_received += static_cast<long>(range.received_end - range.received_begin);
+        e.pkts_sent_timestamp.insert(e.pkts_sent_timestamp.end(), o.pkts_sent_timestamp.begin() + range.sent_begin,
+                                     o.pkts_sent_timestamp.begin() + range.sent_end);
+        e.pkts_received_timestamp.insert(e.pkts_received_timestamp.end(),
+                                         o.pkts_received_timestamp.begin() + range.received_begin,
+                                         o.pkts_received_timestamp.begin() + range.received_end);
+        e.pkts_kbytes.insert(e.pkts_kbytes.end(), o.pkts_kbytes.begin() + range.kbytes_begin,
+                             o.pkts_kbytes.begin() + range.kbytes_end);
+    }
+
+    for (auto &cur_elem : segment.ttl_values)
+        ttl_values[cur_elem.first] += cur_elem.second;
+    for (auto &cur_elem : segment.win_values)
+        win_values[cur_elem.first] += cur_elem.second;
+    for (auto &cur_elem : segment.tos_values)
+        tos_values[cur_elem.first] += cur_elem.second;
+    for (auto &cur_elem : segment.mss_values)
+        mss_values[cur_elem.first] += cur_elem.second;
+    for (auto &cur_elem : segment.port_values)
+        port_values[cur_elem.first] += cur_elem.second;
+}
+
+/**
+ * Getter for the interval segments recorded by closeIntervalSegment.
+ */
+std::vector<interval_segment> &statistics::getIntervalSegments() {
+    return interval_segments;
+}
+
+/**
+ * Merges the statistics collected by another statistics object into this object. The other object must contain the
+ * statistics of packets which all follow the packets seen by this object, e.g. the next shard of the same PCAP file.
+ * The state read by addIntervalStat, i.e. the packet counters, the value counts and the packets of the IPs, is not
+ * merged here: all interval segments of the other object have to be applied by applyIntervalSegment beforehand.
+ * The containers of the other object are moved and must not be used afterwards.
+ * @param other The statistics of the subsequent packets.
+ */
+void statistics::mergeStatistics(statistics &other) {
+    // Conversations have to be merged first, because they correct the inter-arrival times in other.ip_statistics
+    for (auto &cur_elem : other.conv_statistics) {
+        mergeConvStat(cur_elem.first, cur_elem.second, other);
+    }
+    for (auto &cur_elem : other.conv_statistics_extended) {
+        mergeConvStatExt(cur_elem.first, cur_elem.second);
+    }
+
+    for (auto &cur_elem : other.ip_statistics) {
+        auto found = ip_statistics.find(cur_elem.first);
+        if (found == ip_statistics.end()) {
+            ip_statistics.emplace(cur_elem.first, std::move(cur_elem.second));
+            continue;
+        }
+        // the packet counts, timestamps and sizes and the interval rates were set by applyIntervalSegment
+        entry_ipStat &e = found->second;
+        entry_ipStat &o = cur_elem.second;
+        e.kbytes_received += o.kbytes_received;
+        e.kbytes_sent += o.kbytes_sent;
+        if (e.ip_class.empty())
+            e.ip_class = o.ip_class;
+        appendVector(e.interarrival_times, o.interarrival_times);
+    }
+
+    for (auto &cur_elem : other.ttl_distribution)
+        ttl_distribution[cur_elem.first] += cur_elem.second;
+    for (auto &cur_elem : other.mss_distribution)
+        mss_distribution[cur_elem.first] += cur_elem.second;
+    for (auto &cur_elem : other.win_distribution)
+        win_distribution[cur_elem.first] += cur_elem.second;
+    for (auto &cur_elem : other.tos_distribution)
+        tos_distribution[cur_elem.first] += cur_elem.second;
+
+    for (auto &cur_elem : other.protocol_distribution) {
+        protocol_distribution[cur_elem.first].count += cur_elem.second.count;
+        protocol_distribution[cur_elem.first].byteCount += cur_elem.second.byteCount;
+    }
+    for (auto &cur_elem : other.ip_ports) {
+        ip_ports[cur_elem.first].count += cur_elem.second.count;
+        ip_ports[cur_elem.first].byteCount += cur_elem.second.byteCount;
+    }
+    for (auto &cur_elem : other.unrecognized_PDUs) {
+        unrecognized_PDUs[cur_elem.first].count += cur_elem.second.count;
+        unrecognized_PDUs[cur_elem.first].timestamp_last_occurrence = cur_elem.second.timestamp_last_occurrence;
+    }
+    for (auto &cur_elem : other.ip_mac_mapping)
+        ip_mac_mapping[cur_elem.first] = cur_elem.second;
+    for (auto &cur_elem : other.contacted_ips)
+        contacted_ips[cur_elem.first].insert(cur_elem.second.begin(), cur_elem.second.end());
+
+    if (other.packetCount > 0)
+        timestamp_lastPacket = other.timestamp_lastPacket;
+
+    if (this->getDoExtraTests())
+        recalculateDegrees();
+}
+
+/**
+ * Merges a conversation of a subsequent statistics object into conv_statistics, see mergeStatistics.
+ * @param conversation The conversation as stored by the other statistics object.
+ * @param entry The conversation statistics of the other statistics object.
+ * @param other The statistics object the conversation belongs to.
+ */
+void statistics::mergeConvStat(const conv &conversation, entry_convStat &entry, statistics &other) {
+    // look up the conversation in the same order as addConvStat does
+    conv reverse = {conversation.ipAddressB, conversation.portB, conversation.ipAddressA, conversation.portA};
+    auto found = conv_statistics.find(reverse);
+    if (found == conv_statistics.end())
+        found = conv_statistics.find(conversation);
+    if (found == conv_statistics.end()) {
+        conv_statistics.emplace(conversation, std::move(entry));
+        return;
+    }
+
+    // The inter-arrival times of the other object belong to its first packets of the conversation only,
+    // so they are removed from its IP statistics and recalculated for the merged conversation.
+    for (auto interarrival_time : entry.interarrival_time) {
+        eraseFirst(other.ip_statistics[conversation.ipAddressA].interarrival_times, interarrival_time);
+        eraseFirst(other.ip_statistics[conversation.ipAddressB].interarrival_times, interarrival_time);
+    }
+
+    entry_convStat &e = found->second;
+    std::size_t i = 0;
+    for (; i < entry.pkts_timestamp.size() && e.pkts_count < 3; i++) {
+        e.pkts_count++;
+        if (e.pkts_timestamp.size() > 0) {
+            auto interarrival_time = std::chrono::duration_cast<std::chrono::microseconds>(entry.pkts_timestamp[i] - e.pkts_timestamp.back());
+            e.interarrival_time.push_back(interarrival_time);
+            ip_statistics[found->first.ipAddressA].interarrival_times.push_back(interarrival_time);
+            ip_statistics[found->first.ipAddressB].interarrival_times.push_back(interarrival_time);
+        }
+        e.pkts_timestamp.push_back(entry.pkts_timestamp[i]);
+        e.tcp_types.push_back(entry.tcp_types[i]);
+    }
+    e.pkts_count += entry.pkts_count - static_cast<long>(i);
+    e.pkts_timestamp.insert(e.pkts_timestamp.end(), entry.pkts_timestamp.begin() + i, entry.pkts_timestamp.end());
+    e.tcp_types.insert(e.tcp_types.end(), entry.tcp_types.begin() + i, entry.tcp_types.end());
+}
+
+/**
+ * Merges an extended conversation of a subsequent statistics object into conv_statistics_extended,
+ * see mergeStatistics.
+ * @param conversation The conversation as stored by the other statistics object.
+ * @param entry The extended conversation statistics of the other statistics object.
+ */
+void statistics::mergeConvStatExt(const convWithProt &conversation, entry_convStatExt &entry) {
+    // look up the conversation in the same order as addConvStatExt does
+    convWithProt reverse = {conversation.ipAddressB, conversation.portB, conversation.ipAddressA, conversation.portA,
+                            conversation.protocol};
+    auto found = conv_statistics_extended.find(reverse);
+    if (found == conv_statistics_extended.end())
+        found = conv_statistics_extended.find(conversation);
+    if (found == conv_statistics_extended.end()) {
+        conv_statistics_extended.emplace(conversation, std::move(entry));
+        return;
+    }
+
+    entry_convStatExt &e = found->second;
+    std::size_t i = 0;
+    for (; i < entry.pkts_timestamp.size() && e.pkts_count < 3; i++) {
+        e.pkts_count++;
+        if (e.pkts_timestamp.size() > 0)
+            e.interarrival_time.push_back(std::chrono::duration_cast<std::chrono::microseconds> (entry.pkts_timestamp[i] - e.pkts_timestamp.back()));
+        e.pkts_timestamp.push_back(entry.pkts_timestamp[i]);
+    }
+    e.pkts_count += entry.pkts_count - static_cast<long>(i);
+    e.pkts_timestamp.insert(e.pkts_timestamp.end(), entry.pkts_timestamp.begin() + i, entry.pkts_timestamp.end());
+
+    // continue the last communication interval, if the first interval of the other object is close enough
+    std::size_t j = 0;
+    if (!entry.comm_intervals.empty() && !(entry.comm_intervals[0].start - e.comm_intervals.back().end > (std::chrono::microseconds) ((unsigned long) COMM_INTERVAL_THRESHOLD))) {
+        e.comm_intervals.back().end = entry.comm_intervals[0].end;
+        e.comm_intervals.back().pkts_count += entry.comm_intervals[0].pkts_count;
+        j = 1;
+    }
+    e.comm_intervals.insert(e.comm_intervals.end(), entry.comm_intervals.begin() + j, entry.comm_intervals.end());
+}
+
+/**
+ * Recalculates the in, out and overall degrees of all IPs from contacted_ips, like addIpStat_packetSent does
+ * incrementally.
+ */
+void statistics::recalculateDegrees() {
+    for (auto &cur_elem : ip_statistics) {
+        cur_elem.second.in_degree = 0;
+        cur_elem.second.out_degree = 0;
+        cur_elem.second.overall_degree = 0;
+    }
+    for (auto &sender : contacted_ips) {
+        for (auto &receiver : sender.second) {
+            ip_statistics[sender.first].out_degree++;
+            ip_statistics[receiver].in_degree++;
+
+            if (receiver == sender.first) {
+                ip_statistics[receiver].overall_degree += 2;
+                continue;
+            }
+            // count connections in both directions only once
+            auto reverse = contacted_ips.find(receiver);
+            bool bidirectional = reverse != contacted_ips.end() && reverse->second.count(sender.first) > 0;
+            if (!bidirectional || sender.first < receiver) {
+                ip_statistics[sender.first].overall_degree++;
+                ip_statistics[receiver].overall_degree++;
+            }
+        }
+    }
+}
+
 /**
  * Increments the packet counter for the given IP address and MSS value.
  * @param ipAddress The IP address whose MSS packet counter should be incremented.
@@ -834,8 +1156,10 @@ std::string statistics::getFormattedTimestamp(time_t seconds, suseconds_t micros
     tv.tv_sec = seconds;
     tv.tv_usec = microseconds;
     char tmbuf[20], buf[64];
-    auto nowtm = gmtime(&(tv.tv_sec));
-    strftime(tmbuf, sizeof(tmbuf), "%Y-%m-%d %H:%M:%S", nowtm);
+    // gmtime_r instead of gmtime, which returns a shared buffer, because the shard workers format timestamps concurrently
+    struct tm nowtm;
+    gmtime_r(&(tv.tv_sec), &nowtm);
+    strftime(tmbuf, sizeof(tmbuf), "%Y-%m-%d %H:%M:%S", &nowtm);
     snprintf(buf, sizeof(buf), "%s.%06u", tmbuf, static_cast<uint>(tv.tv_usec));
     return std::string(buf);
 }
@@ -933,6 +1257,7 @@ void statistics::writeToDatabase(std::string database_path, std::vector<std::chr
 
         // Create database and write information
         statistics_db db(database_path, resourcePath);
+        db.beginBulkWrite();
         db.writeStatisticsFile(packetCount, getCaptureDurationSeconds(),
                                getFormattedTimestamp(timestamp_firstPacket.seconds(), timestamp_firstPacket.microseconds()),
                                getFormattedTimestamp(timestamp_lastPacket.seconds(), timestamp_lastPacket.microseconds()),
@@ -950,8 +1275,11 @@ void statistics::writeToDatabase(std::string database_path, std::vector<std::chr
         db.writeStatisticsConv(conv_statistics);
         db.writeStatisticsConvExt(conv_statistics_extended);
         db.writeStatisticsInterval(interval_statistics, timeIntervals, del, this->default_interval, this->getDoExtraTests());
-        db.writeDbVersion();
         db.writeStatisticsUnrecognizedPDUs(unrecognized_PDUs);
+        db.writeSummary();
+        // written last, so that a database interrupted while being written is recognized as outdated
+        db.writeDbVersion();
+        db.endBulkWrite();
     }
     else {
         // Tinslib failed to recognize the types of the packets in the input PCAP
@@ -962,5 +1290,7 @@ void statistics::writeToDatabase(std::string database_path, std::vector<std::chr
 
 void statistics::writeIntervalsToDatabase(std::string database_path, std::vector<std::chrono::duration<int, std::micro>> timeIntervals, bool del) {
     statistics_db db(database_path, resourcePath);
+    db.beginBulkWrite();
     db.writeStatisticsInterval(interval_statistics, timeIntervals, del, this->default_interval, this->getDoExtraTests());
+    db.endBulkWrite();
 }
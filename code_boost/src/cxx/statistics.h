@@ -297,6 +297,44 @@ struct entry_intervalStat {
     }
 };
 
+/*
+ * Struct used to represent the packets of an IP within an interval segment, see interval_segment:
+ * - Range of the sent packet timestamps of the IP
+ * - Range of the received packet timestamps of the IP
+ * - Range of the sizes of the sent and received packets of the IP
+ */
+struct entry_ipSegment {
+    std::size_t sent_begin;
+    std::size_t sent_end;
+    std::size_t received_begin;
+    std::size_t received_end;
+    std::size_t kbytes_begin;
+    std::size_t kbytes_end;
+};
+
+/*
+ * Struct used to represent the changes of the state read by addIntervalStat between two interval ends within a
+ * shard of a PCAP file:
+ * - Number of the packet record before which the segment ends
+ * - # packets, sum of the packet sizes, # payloads, # incorrect TCP checksums and # correct TCP checksums
+ * - The ranges of the packets of every IP seen in the segment, relative to the ip_statistics of the shard
+ * - Counts of the TTL, window size, ToS, MSS and port values
+ */
+struct interval_segment {
+    std::size_t packetNumber;
+    int packetCount;
+    double sumPacketSize;
+    int payloadCount;
+    int incorrectTCPChecksumCount;
+    int correctTCPChecksumCount;
+    std::unordered_map<std::string, entry_ipSegment> ip_ranges;
+    std::unordered_map<int, int> ttl_values;
+    std::unordered_map<int, int> win_values;
+    std::unordered_map<int, int> tos_values;
+    std::unordered_map<int, int> mss_values;
+    std::unordered_map<int, int> port_values;
+};
+
 /*
  * Struct used to represent converstaion statistics:
  * - # packets
@@ -569,6 +607,14 @@ public:
 
     void createCommIntervalStats();
 
+    void mergeStatistics(statistics &other);
+
+    void closeIntervalSegment(std::size_t packetNumber);
+
+    void applyIntervalSegment(interval_segment &segment, const statistics &other);
+
+    std::vector<interval_segment> &getIntervalSegments();
+
     std::vector<double> calculateIPsCumEntropy();
 
     std::vector<double> calculateLastIntervalIPsEntropy(std::chrono::microseconds intervalStartTimestamp);
@@ -579,8 +625,13 @@ public:
 
     void checkPayload(const PDU *pdu_l4);
 
+    void checkPayload(int payloadSize);
+
     void checkTCPChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver, TCP tcpPkt);
 
+    void checkTCPChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver,
+                          const uint8_t *segment, uint32_t size, uint32_t headerSize);
+
     void checkToS(uint8_t ToS);
 
     void incrementToScount(const std::string &ipAddress, int tosValue);
@@ -654,7 +705,7 @@ private:
      */
     Tins::Timestamp timestamp_firstPacket;
     Tins::Timestamp timestamp_lastPacket;
-    float sumPacketSize = 0;
+    double sumPacketSize = 0;
     int packetCount = 0;
     std::string resourcePath;
 
@@ -675,7 +726,7 @@ private:
     int intervalIncorrectTCPChecksumCount = 0;
     int intervalCorrectTCPChecksumCount = 0;
     int intervalCumPktCount = 0;
-    float intervalCumSumPktSize = 0;
+    double intervalCumSumPktSize = 0;
     size_t ip_src_novel_count = 0;
     size_t ip_dst_novel_count = 0;
     int intervalCumNovelIPCount = 0;
@@ -691,6 +742,15 @@ private:
     std::unordered_map<int,int> intervalCumMSSValues;
     std::unordered_map<int,int> intervalCumPortValues;
 
+    // Variables that are used to split the state read by addIntervalStat into segments, see closeIntervalSegment
+    std::vector<interval_segment> interval_segments;
+    std::unordered_map<std::string, entry_ipSegment> segmentIPRanges;
+    int segmentPacketCount = 0;
+    double segmentSumPacketSize = 0;
+    int segmentPayloadCount = 0;
+    int segmentIncorrectTCPChecksumCount = 0;
+    int segmentCorrectTCPChecksumCount = 0;
+
     int default_interval = 0;
 
     /*
@@ -760,6 +820,12 @@ private:
      * Helper functions
      */
     void storeConvStat(conv *conversation, const std::chrono::microseconds timestamp, const small_uint<12> *flags);
+
+    void mergeConvStat(const conv &conversation, entry_convStat &entry, statistics &other);
+
+    void mergeConvStatExt(const convWithProt &conversation, entry_convStatExt &entry);
+
+    void recalculateDegrees();
 };
 
 
@@ -4,6 +4,7 @@
 #include <sstream>
 #include <fstream>
 #include <numeric>
+#include <algorithm>
 #include <unistd.h>
 #include <stdio.h>
 #include <pybind11/pybind11.h>
@@ -58,14 +59,68 @@ void statistics_db::getNoneExtraTestsInveralStats(std::vector<double>& intervals
     }
 }
 
+/**
+ * Prepares the database for writing all statistics at once: Disables the rollback journal and the synchronization
+ * with the disk, as a database interrupted while being written is recreated anyway, and enlarges the page cache.
+ */
+void statistics_db::beginBulkWrite() {
+    try {
+        db->exec("PRAGMA journal_mode = OFF;");
+        db->exec("PRAGMA synchronous = OFF;");
+        db->exec("PRAGMA temp_store = MEMORY;");
+        db->exec("PRAGMA cache_size = -262144;");
+    }
+    catch (std::exception &e) {
+        std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
+    }
+    writeTimes.clear();
+}
+
+/**
+ * Restores the default journal and synchronization modes after writing all statistics and prints how long writing
+ * each table took, slowest table first.
+ */
+void statistics_db::endBulkWrite() {
+    try {
+        db->exec("PRAGMA journal_mode = DELETE;");
+        db->exec("PRAGMA synchronous = FULL;");
+    }
+    catch (std::exception &e) {
+        std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
+    }
+
+    std::sort(writeTimes.begin(), writeTimes.end(),
+              [](const std::pair<std::string, double> &a, const std::pair<std::string, double> &b) {
+                  return a.second > b.second;
+              });
+    double total = 0;
+    std::ostringstream breakdown;
+    for (auto &writeTime: writeTimes) {
+        total += writeTime.second;
+        breakdown << std::endl << "  " << writeTime.first << ": " << writeTime.second << " s";
+    }
+    std::cout << "Wrote statistics database in " << total << " s:" << breakdown.str() << std::endl;
+}
+
+/**
+ * Records how long writing a table took.
+ * @param table The name of the table.
+ * @param writeStart The point in time writing the table started.
+ */
+void statistics_db::recordWriteTime(const std::string &table, std::chrono::steady_clock::time_point writeStart) {
+    std::chrono::duration<double> duration = std::chrono::steady_clock::now() - writeStart;
+    writeTimes.emplace_back(table, duration.count());
+}
+
 /**
  * Writes the IP statistics into the database.
  * @param ipStatistics The IP statistics from class statistics.
  */
 void statistics_db::writeStatisticsIP(const std::unordered_map<std::string, entry_ipStat> &ipStatistics) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS ip_statistics");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS ip_statistics");
         const char *createTable = "CREATE TABLE ip_statistics ( "
                 "ipAddress TEXT, "
                 "pktsReceived INTEGER, "
@@ -107,7 +162,9 @@ void statistics_db::writeStatisticsIP(const std::unordered_map<std::string, entr
 
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
+        db->exec("CREATE INDEX ipClassIP ON ip_statistics(ipClass);");
         transaction.commit();
+        recordWriteTime("ip_statistics", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -120,9 +177,10 @@ void statistics_db::writeStatisticsIP(const std::unordered_map<std::string, entr
  *        therefore they use the same parameter. But for now they are inserted into their own table.
  */
 void statistics_db::writeStatisticsDegree(const std::unordered_map<std::string, entry_ipStat> &ipStatistics){
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS ip_degrees");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS ip_degrees");
         const char *createTable = "CREATE TABLE ip_degrees ( "
                 "ipAddress TEXT, "
                 "inDegree INTEGER, "
@@ -143,6 +201,7 @@ void statistics_db::writeStatisticsDegree(const std::unordered_map<std::string,
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
         transaction.commit();
+        recordWriteTime("ip_degrees", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -154,15 +213,15 @@ void statistics_db::writeStatisticsDegree(const std::unordered_map<std::string,
  * @param ttlDistribution The TTL distribution from class statistics.
  */
 void statistics_db::writeStatisticsTTL(const std::unordered_map<ipAddress_ttl, int> &ttlDistribution) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS ip_ttl");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS ip_ttl");
         const char *createTable = "CREATE TABLE ip_ttl ("
                 "ipAddress TEXT,"
                 "ttlValue INTEGER,"
                 "ttlCount INTEGER,"
-                "PRIMARY KEY(ipAddress,ttlValue));"
-                "CREATE INDEX ipAddressTTL ON ip_ttl(ipAddress);";
+                "PRIMARY KEY(ipAddress,ttlValue));";
         db->exec(createTable);
         SQLite::Statement query(*db, "INSERT INTO ip_ttl VALUES (?, ?, ?)");
         for (auto it = ttlDistribution.begin(); it != ttlDistribution.end(); ++it) {
@@ -175,7 +234,10 @@ void statistics_db::writeStatisticsTTL(const std::unordered_map<ipAddress_ttl, i
 
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
+        db->exec("CREATE INDEX ipAddressTTL ON ip_ttl(ipAddress);");
+        db->exec("CREATE INDEX ttlValueTTL ON ip_ttl(ttlValue, ttlCount);");
         transaction.commit();
+        recordWriteTime("ip_ttl", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -187,15 +249,15 @@ void statistics_db::writeStatisticsTTL(const std::unordered_map<ipAddress_ttl, i
  * @param mssDistribution The MSS distribution from class statistics.
  */
 void statistics_db::writeStatisticsMSS(const std::unordered_map<ipAddress_mss, int> &mssDistribution) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS tcp_mss");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS tcp_mss");
         const char *createTable = "CREATE TABLE tcp_mss ("
                 "ipAddress TEXT,"
                 "mssValue INTEGER,"
                 "mssCount INTEGER,"
-                "PRIMARY KEY(ipAddress,mssValue));"
-                "CREATE INDEX ipAddressMSS ON tcp_mss(ipAddress);";
+                "PRIMARY KEY(ipAddress,mssValue));";
         db->exec(createTable);
         SQLite::Statement query(*db, "INSERT INTO tcp_mss VALUES (?, ?, ?)");
         for (auto it = mssDistribution.begin(); it != mssDistribution.end(); ++it) {
@@ -208,7 +270,10 @@ void statistics_db::writeStatisticsMSS(const std::unordered_map<ipAddress_mss, i
 
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
+        db->exec("CREATE INDEX ipAddressMSS ON tcp_mss(ipAddress);");
+        db->exec("CREATE INDEX mssValueMSS ON tcp_mss(mssValue, mssCount);");
         transaction.commit();
+        recordWriteTime("tcp_mss", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -220,9 +285,10 @@ void statistics_db::writeStatisticsMSS(const std::unordered_map<ipAddress_mss, i
  * @param tosDistribution The ToS distribution from class statistics.
  */
 void statistics_db::writeStatisticsToS(const std::unordered_map<ipAddress_tos, int> &tosDistribution) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS ip_tos");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS ip_tos");
         const char *createTable = "CREATE TABLE ip_tos ("
                 "ipAddress TEXT,"
                 "tosValue INTEGER,"
@@ -241,6 +307,7 @@ void statistics_db::writeStatisticsToS(const std::unordered_map<ipAddress_tos, i
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
         transaction.commit();
+        recordWriteTime("ip_tos", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -252,15 +319,15 @@ void statistics_db::writeStatisticsToS(const std::unordered_map<ipAddress_tos, i
  * @param winDistribution The window size distribution from class statistics.
  */
 void statistics_db::writeStatisticsWin(const std::unordered_map<ipAddress_win, int> &winDistribution) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS tcp_win");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS tcp_win");
         const char *createTable = "CREATE TABLE tcp_win ("
                 "ipAddress TEXT,"
                 "winSize INTEGER,"
                 "winCount INTEGER,"
-                "PRIMARY KEY(ipAddress,winSize));"
-                "CREATE INDEX ipAddressWIN ON tcp_win(ipAddress);";
+                "PRIMARY KEY(ipAddress,winSize));";
         db->exec(createTable);
         SQLite::Statement query(*db, "INSERT INTO tcp_win VALUES (?, ?, ?)");
         for (auto it = winDistribution.begin(); it != winDistribution.end(); ++it) {
@@ -273,7 +340,10 @@ void statistics_db::writeStatisticsWin(const std::unordered_map<ipAddress_win, i
 
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
+        db->exec("CREATE INDEX ipAddressWIN ON tcp_win(ipAddress);");
+        db->exec("CREATE INDEX winSizeWIN ON tcp_win(winSize, winCount);");
         transaction.commit();
+        recordWriteTime("tcp_win", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -285,9 +355,10 @@ void statistics_db::writeStatisticsWin(const std::unordered_map<ipAddress_win, i
  * @param protocolDistribution The protocol distribution from class statistics.
  */
 void statistics_db::writeStatisticsProtocols(const std::unordered_map<ipAddress_protocol, entry_protocolStat> &protocolDistribution) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS ip_protocols");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS ip_protocols");
         const char *createTable = "CREATE TABLE ip_protocols ("
                 "ipAddress TEXT,"
                 "protocolName TEXT COLLATE NOCASE,"
@@ -307,7 +378,9 @@ void statistics_db::writeStatisticsProtocols(const std::unordered_map<ipAddress_
 
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
+        db->exec("CREATE INDEX protocolNameProtocols ON ip_protocols(protocolName, protocolCount);");
         transaction.commit();
+        recordWriteTime("ip_protocols", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -319,9 +392,10 @@ void statistics_db::writeStatisticsProtocols(const std::unordered_map<ipAddress_
  * @param portsStatistics The ports statistics from class statistics.
  */
 void statistics_db::writeStatisticsPorts(const std::unordered_map<ipAddress_inOut_port, entry_portStat> &portsStatistics) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS ip_ports");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS ip_ports");
         const char *createTable = "CREATE TABLE ip_ports ("
                 "ipAddress TEXT,"
                 "portDirection TEXT COLLATE NOCASE,"
@@ -354,7 +428,9 @@ void statistics_db::writeStatisticsPorts(const std::unordered_map<ipAddress_inOu
 
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
+        db->exec("CREATE INDEX portNumberPorts ON ip_ports(portNumber);");
         transaction.commit();
+        recordWriteTime("ip_ports", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -366,9 +442,10 @@ void statistics_db::writeStatisticsPorts(const std::unordered_map<ipAddress_inOu
  * @param IpMacStatistics The IP address -> MAC address mapping from class statistics.
  */
 void statistics_db::writeStatisticsIpMac(const std::unordered_map<std::string, std::string> &IpMacStatistics) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS ip_mac");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS ip_mac");
         const char *createTable = "CREATE TABLE ip_mac ("
                 "ipAddress TEXT,"
                 "macAddress TEXT COLLATE NOCASE,"
@@ -383,7 +460,9 @@ void statistics_db::writeStatisticsIpMac(const std::unordered_map<std::string, s
 
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
+        db->exec("CREATE INDEX macAddressMAC ON ip_mac(macAddress);");
         transaction.commit();
+        recordWriteTime("ip_mac", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -406,9 +485,10 @@ void statistics_db::writeStatisticsFile(int packetCount, float captureDuration,
                                         std::string timestampLastPkt, float avgPacketRate, float avgPacketSize,
                                         float avgPacketsSentPerHost, float avgBandwidthIn, float avgBandwidthOut,
                                         bool doExtraTests) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS file_statistics");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS file_statistics");
         const char *createTable = "CREATE TABLE file_statistics ("
                 "packetCount	INTEGER,"
                 "captureDuration TEXT,"
@@ -434,6 +514,7 @@ void statistics_db::writeStatisticsFile(int packetCount, float captureDuration,
         query.bind(10, doExtraTests);
         query.exec();
         transaction.commit();
+        recordWriteTime("file_statistics", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -472,9 +553,10 @@ void statistics_db::calculate_latency(const std::vector<std::chrono::microsecond
  * @param convStatistics The conversation from class statistics.
  */
 void statistics_db::writeStatisticsConv(std::unordered_map<conv, entry_convStat> &convStatistics){
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS conv_statistics");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS conv_statistics");
         const char *createTable = "CREATE TABLE conv_statistics ("
                 "ipAddressA TEXT,"
                 "portA INTEGER,"
@@ -553,6 +635,7 @@ void statistics_db::writeStatisticsConv(std::unordered_map<conv, entry_convStat>
             }
         }
         transaction.commit();
+        recordWriteTime("conv_statistics", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -564,9 +647,10 @@ void statistics_db::writeStatisticsConv(std::unordered_map<conv, entry_convStat>
  * @param conv_statistics_extended The extended conversation statistics from class statistics.
  */
 void statistics_db::writeStatisticsConvExt(std::unordered_map<convWithProt, entry_convStatExt> &conv_statistics_extended){
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS conv_statistics_extended");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS conv_statistics_extended");
         const char *createTable = "CREATE TABLE conv_statistics_extended ("
                 "ipAddressA TEXT,"
                 "portA INTEGER,"
@@ -649,6 +733,7 @@ void statistics_db::writeStatisticsConvExt(std::unordered_map<convWithProt, entr
 
         }
         transaction.commit();
+        recordWriteTime("conv_statistics_extended", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -708,6 +793,7 @@ void statistics_db::writeStatisticsInterval(const std::unordered_map<std::string
         }
 
         for (auto timeInterval: timeIntervals) {
+            auto writeStart = std::chrono::steady_clock::now();
             // get interval statistics table name
             std::ostringstream strs;
             strs << timeInterval.count();
@@ -720,13 +806,13 @@ void statistics_db::writeStatisticsInterval(const std::unordered_map<std::string
                 is_default = "0";
             }
 
+            SQLite::Transaction transaction(*db);
             // add interval_tables entry
             db->exec("DELETE FROM interval_tables WHERE name = '" + table_name + "';");
             db->exec("INSERT INTO interval_tables VALUES ('" + table_name + "', '" + is_default + "', '" + extra + "');");
 
             // new interval statistics implementation
             db->exec("DROP TABLE IF EXISTS " + table_name);
-            SQLite::Transaction transaction(*db);
             db->exec("CREATE TABLE " + table_name + " ("
                     "last_pkt_timestamp TEXT,"
                     "first_pkt_timestamp TEXT,"
@@ -836,6 +922,7 @@ void statistics_db::writeStatisticsInterval(const std::unordered_map<std::string
                 if (PyErr_CheckSignals()) throw py::error_already_set();
             }
             transaction.commit();
+            recordWriteTime(table_name, writeStart);
         }
     }
     catch (std::exception &e) {
@@ -899,9 +986,10 @@ void statistics_db::readPortServicesFromNmap()
  */
 void statistics_db::writeStatisticsUnrecognizedPDUs(const std::unordered_map<unrecognized_PDU, unrecognized_PDU_stat>
                                                     &unrecognized_PDUs) {
+    auto writeStart = std::chrono::steady_clock::now();
     try {
-        db->exec("DROP TABLE IF EXISTS unrecognized_pdus");
         SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS unrecognized_pdus");
         const char *createTable = "CREATE TABLE unrecognized_pdus ("
                 "srcMac TEXT COLLATE NOCASE,"
                 "dstMac TEXT COLLATE NOCASE,"
@@ -924,6 +1012,129 @@ void statistics_db::writeStatisticsUnrecognizedPDUs(const std::unordered_map<unr
             if (PyErr_CheckSignals()) throw py::error_already_set();
         }
         transaction.commit();
+        recordWriteTime("unrecognized_pdus", writeStart);
+    }
+    catch (std::exception &e) {
+        std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
+    }
+}
+
+/**
+ * Writes the results of the most_used, least_used and avg named queries into the summary table, so that these named
+ * queries are answered by looking up their precomputed results instead of aggregating whole tables. Must be called
+ * after all tables the queries select from are written. The queries must match the named queries of StatsDatabase,
+ * which is checked by test_NamedQueries.
+ */
+void statistics_db::writeSummary() {
+    static const std::vector<std::pair<std::string, std::string>> summaryQueries = {
+        {"most_used.ipaddress",
+         "SELECT ipAddress FROM ip_statistics WHERE (pktsSent+pktsReceived) == (SELECT "
+         "MAX(pktsSent+pktsReceived) from ip_statistics) ORDER BY ipAddress ASC"},
+        {"most_used.macaddress",
+         "SELECT macAddress FROM (SELECT macAddress, COUNT(*) as occ from ip_mac GROUP BY macAddress) "
+         "WHERE occ=(SELECT COUNT(*) as occ from ip_mac GROUP BY macAddress ORDER BY occ DESC LIMIT 1) "
+         "ORDER BY macAddress ASC"},
+        {"most_used.portnumber",
+         "SELECT portNumber FROM ip_ports GROUP BY portNumber HAVING COUNT(portNumber)=(SELECT "
+         "MAX(cntPort) from (SELECT portNumber, COUNT(portNumber) as cntPort FROM ip_ports GROUP BY "
+         "portNumber)) ORDER BY portNumber ASC"},
+        {"most_used.protocolname",
+         "SELECT protocolName FROM ip_protocols GROUP BY protocolName HAVING COUNT(protocolCount)=(SELECT "
+         "COUNT(protocolCount) as cnt FROM ip_protocols GROUP BY protocolName ORDER BY cnt DESC LIMIT 1) "
+         "ORDER BY protocolName ASC"},
+        {"most_used.ttlvalue",
+         "SELECT ttlValue FROM (SELECT ttlValue, SUM(ttlCount) as occ FROM ip_ttl GROUP BY ttlValue) "
+         "WHERE occ=(SELECT SUM(ttlCount) as occ FROM ip_ttl GROUP BY ttlValue ORDER BY occ DESC LIMIT 1) "
+         "ORDER BY ttlValue ASC"},
+        {"most_used.mssvalue",
+         "SELECT mssValue FROM (SELECT mssValue, SUM(mssCount) as occ FROM tcp_mss GROUP BY mssValue) "
+         "WHERE occ=(SELECT SUM(mssCount) as occ FROM tcp_mss GROUP BY mssValue ORDER BY occ DESC LIMIT "
+         "1) ORDER BY mssValue ASC"},
+        {"most_used.winsize",
+         "SELECT winSize FROM (SELECT winSize, SUM(winCount) as occ FROM tcp_win GROUP BY winSize) WHERE "
+         "occ=(SELECT SUM(winCount) as occ FROM tcp_win GROUP BY winSize ORDER BY occ DESC LIMIT 1) ORDER "
+         "BY winSize ASC"},
+        {"most_used.ipclass",
+         "SELECT ipClass FROM (SELECT ipClass, COUNT(*) as occ from ip_statistics GROUP BY ipClass ORDER "
+         "BY occ DESC) WHERE occ=(SELECT COUNT(*) as occ from ip_statistics GROUP BY ipClass ORDER BY occ "
+         "DESC LIMIT 1) ORDER BY ipClass ASC"},
+        {"least_used.ipaddress",
+         "SELECT ipAddress FROM ip_statistics WHERE (pktsSent+pktsReceived) == (SELECT "
+         "MIN(pktsSent+pktsReceived) from ip_statistics) ORDER BY ipAddress ASC"},
+        {"least_used.macaddress",
+         "SELECT macAddress FROM (SELECT macAddress, COUNT(*) as occ from ip_mac GROUP BY macAddress) "
+         "WHERE occ=(SELECT COUNT(*) as occ from ip_mac GROUP BY macAddress ORDER BY occ ASC LIMIT 1) "
+         "ORDER BY macAddress ASC"},
+        {"least_used.portnumber",
+         "SELECT portNumber FROM ip_ports GROUP BY portNumber HAVING COUNT(portNumber)=(SELECT "
+         "MIN(cntPort) from (SELECT portNumber, COUNT(portNumber) as cntPort FROM ip_ports GROUP BY "
+         "portNumber)) ORDER BY portNumber ASC"},
+        {"least_used.protocolname",
+         "SELECT protocolName FROM ip_protocols GROUP BY protocolName HAVING COUNT(protocolCount)=(SELECT "
+         "COUNT(protocolCount) as cnt FROM ip_protocols GROUP BY protocolName ORDER BY cnt ASC LIMIT 1) "
+         "ORDER BY protocolName ASC"},
+        {"least_used.ttlvalue",
+         "SELECT ttlValue FROM (SELECT ttlValue, SUM(ttlCount) as occ FROM ip_ttl GROUP BY ttlValue) "
+         "WHERE occ=(SELECT SUM(ttlCount) as occ FROM ip_ttl GROUP BY ttlValue ORDER BY occ ASC LIMIT 1) "
+         "ORDER BY ttlValue ASC"},
+        {"least_used.mssvalue",
+         "SELECT mssValue FROM (SELECT mssValue, SUM(mssCount) as occ FROM tcp_mss GROUP BY mssValue) "
+         "WHERE occ=(SELECT SUM(mssCount) as occ FROM tcp_mss GROUP BY mssValue ORDER BY occ ASC LIMIT 1) "
+         "ORDER BY mssValue ASC"},
+        {"least_used.winsize",
+         "SELECT winSize FROM (SELECT winSize, SUM(winCount) as occ FROM tcp_win GROUP BY winSize) WHERE "
+         "occ=(SELECT SUM(winCount) as occ FROM tcp_win GROUP BY winSize ORDER BY occ ASC LIMIT 1) ORDER "
+         "BY winSize ASC"},
+        {"least_used.ipclass",
+         "SELECT ipClass FROM (SELECT ipClass, COUNT(*) as occ from ip_statistics GROUP BY ipClass ORDER "
+         "BY occ DESC) WHERE occ=(SELECT COUNT(*) as occ from ip_statistics GROUP BY ipClass ORDER BY occ "
+         "ASC LIMIT 1) ORDER BY ipClass ASC"},
+        {"avg.pktsreceived",
+         "SELECT avg(pktsReceived) from ip_statistics"},
+        {"avg.pktssent",
+         "SELECT avg(pktsSent) from ip_statistics"},
+        {"avg.kbytesreceived",
+         "SELECT avg(kbytesReceived) from ip_statistics"},
+        {"avg.kbytessent",
+         "SELECT avg(kbytesSent) from ip_statistics"},
+        {"avg.ttlvalue",
+         "SELECT avg(ttlValue) from ip_ttl"},
+        {"avg.mss",
+         "SELECT avg(mssValue) from tcp_mss"}
+    };
+
+    auto writeStart = std::chrono::steady_clock::now();
+    try {
+        SQLite::Transaction transaction(*db);
+        db->exec("DROP TABLE IF EXISTS summary");
+        db->exec("CREATE TABLE summary ("
+                 "query TEXT,"
+                 "position INTEGER,"
+                 "value,"
+                 "PRIMARY KEY(query,position));");
+        SQLite::Statement insert(*db, "INSERT INTO summary VALUES (?, ?, ?)");
+        for (auto &summaryQuery: summaryQueries) {
+            SQLite::Statement query(*db, summaryQuery.second);
+            int position = 0;
+            while (query.executeStep()) {
+                SQLite::Column value = query.getColumn(0);
+                insert.bind(1, summaryQuery.first);
+                insert.bind(2, position++);
+                if (value.isInteger()) {
+                    insert.bind(3, value.getInt64());
+                } else if (value.isFloat()) {
+                    insert.bind(3, value.getDouble());
+                } else if (value.isText()) {
+                    insert.bind(3, value.getString());
+                } else {
+                    insert.bind(3);
+                }
+                insert.exec();
+                insert.reset();
+            }
+        }
+        transaction.commit();
+        recordWriteTime("summary", writeStart);
     }
     catch (std::exception &e) {
         std::cerr << "Exception in statistics_db::" << __func__ << ": " << e.what() << std::endl;
@@ -6,9 +6,11 @@
 #define CPP_PCAPREADER_STATISTICSDB_H
 
 #include <tins/tins.h>
+#include <chrono>
 #include <iostream>
 #include <memory>
 #include <string>
+#include <vector>
 #include "statistics.h"
 #include <pybind11/pybind11.h>
 #include <SQLiteCpp/SQLiteCpp.h>
@@ -26,7 +28,7 @@ public:
     /*
      * Database version: Increment number on every change in the C++ code!
      */
-    static const int DB_VERSION = 29;
+    static const int DB_VERSION = 31;
 
     /*
      * Methods to read from database
@@ -65,8 +67,14 @@ public:
 
     void writeStatisticsInterval(const std::unordered_map<std::string, entry_intervalStat> &intervalStatistics, std::vector<std::chrono::duration<int, std::micro>> timeInterval, bool del, int defaultInterval, bool extraTests);
 
+    void writeSummary();
+
     void writeDbVersion();
 
+    void beginBulkWrite();
+
+    void endBulkWrite();
+
     void readPortServicesFromNmap();
 
     void writeStatisticsUnrecognizedPDUs(const std::unordered_map<unrecognized_PDU, unrecognized_PDU_stat> &unrecognized_PDUs);
@@ -80,8 +88,13 @@ private:
 
     std::string resourcePath;
 
+    // Time in seconds spent writing each table
+    std::vector<std::pair<std::string, double>> writeTimes;
+
     // Helper functions
 
+    void recordWriteTime(const std::string &table, std::chrono::steady_clock::time_point writeStart);
+
     void calculate_latency(const std::vector<std::chrono::microseconds> *interarrival_times, int *maxLatency, int *minLatency, std::chrono::microseconds *avg_interarrival_time);
 
 };
@@ -148,31 +148,21 @@ u16 tcp_sum_calc(u16 len_tcp, u16 src_addr[],u16 dest_addr[], bool padding, u16
 }
 
 /**
- * Checks the TCP checksum of a given packet.
+ * Checks the TCP checksum of the given serialized TCP segment against the given checksum.
  * @param ipAddressSender The source IP.
  * @param ipAddressReceiver The destination IP.
- * @param tcpPkt The packet to get checked.
+ * @param segment The bytes of the TCP segment.
+ * @param size The size of the TCP segment.
+ * @param headerSize The size of the TCP header.
+ * @param checksum The checksum to check.
  */
-bool check_tcpChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver, TCP tcpPkt){
-    uint16_t checksum = tcpPkt.checksum();
-
+static bool verify_tcpChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver,
+                               const uint8_t *segment, uint32_t size, uint32_t headerSize, uint16_t checksum){
     unsigned short calculatedChecsum = 0;
 
-    int headerSize = tcpPkt.header_size();
-    std::vector<uint8_t> bufferArray_8;
-
-    try {
-        bufferArray_8 = tcpPkt.serialize();
-    } catch (serialization_error&) {
-        std::cerr << "Error: Could not serialize TCP packet with sender: " << ipAddressSender << ", receiver: "
-                  << ipAddressReceiver << ", seq: " << tcpPkt.seq() << std::endl;
-        return false;
-    }
-
-    std::vector<unsigned short> bufferArray_16;
-    for(int i=0; (unsigned)i<bufferArray_8.size();i++){
-        bufferArray_16.push_back(bufferArray_8[i]);
-    }
+    // tcp_sum_calc expects one byte per element and room for a padding byte
+    std::vector<unsigned short> bufferArray_16(segment, segment + size);
+    bufferArray_16.push_back(0);
 
     unsigned short* buff_16 = &bufferArray_16[0];
     unsigned short ipAddressSender_bytes[4];
@@ -181,16 +171,51 @@ bool check_tcpChecksum(const std::string &ipAddressSender, const std::string &ip
     convertIPv4toArray(ipAddressReceiver, ipAddressReceiver_bytes);
 
     bool padding = false;
-    int dataSize = bufferArray_8.size() - headerSize;
+    int dataSize = size - headerSize;
     if(dataSize != 0)
         if(dataSize % 2 != 0)
             padding = true; // padding if the data size is odd
 
-    calculatedChecsum = tcp_sum_calc(bufferArray_8.size(), ipAddressSender_bytes, ipAddressReceiver_bytes, padding, buff_16);
+    calculatedChecsum = tcp_sum_calc(size, ipAddressSender_bytes, ipAddressReceiver_bytes, padding, buff_16);
 
     return (calculatedChecsum == checksum);
 }
 
+/**
+ * Checks the TCP checksum of a given packet.
+ * @param ipAddressSender The source IP.
+ * @param ipAddressReceiver The destination IP.
+ * @param tcpPkt The packet to get checked.
+ */
+bool check_tcpChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver, TCP tcpPkt){
+    std::vector<uint8_t> bufferArray_8;
+
+    try {
+        bufferArray_8 = tcpPkt.serialize();
+    } catch (serialization_error&) {
+        std::cerr << "Error: Could not serialize TCP packet with sender: " << ipAddressSender << ", receiver: "
+                  << ipAddressReceiver << ", seq: " << tcpPkt.seq() << std::endl;
+        return false;
+    }
+
+    return verify_tcpChecksum(ipAddressSender, ipAddressReceiver, bufferArray_8.data(),
+                              static_cast<uint32_t>(bufferArray_8.size()), tcpPkt.header_size(), tcpPkt.checksum());
+}
+
+/**
+ * Checks the TCP checksum of a captured TCP segment.
+ * @param ipAddressSender The source IP.
+ * @param ipAddressReceiver The destination IP.
+ * @param segment The captured bytes of the TCP segment, starting with the TCP header.
+ * @param size The size of the TCP segment.
+ * @param headerSize The size of the TCP header.
+ */
+bool check_tcpChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver,
+                       const uint8_t *segment, uint32_t size, uint32_t headerSize){
+    uint16_t checksum = static_cast<uint16_t>((segment[16] << 8) | segment[17]);
+    return verify_tcpChecksum(ipAddressSender, ipAddressReceiver, segment, size, headerSize, checksum);
+}
+
 PYBIND11_MODULE (libcpputils, m) {
     m.def("getIPv4Class", getIPv4Class, "");
 }
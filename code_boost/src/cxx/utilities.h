@@ -31,6 +31,9 @@ u16 tcp_sum_calc(u16 len_tcp, u16 src_addr[],u16 dest_addr[], bool padding, u16
 
 bool check_tcpChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver, TCP tcpPkt);
 
+bool check_tcpChecksum(const std::string &ipAddressSender, const std::string &ipAddressReceiver,
+                       const uint8_t *segment, uint32_t size, uint32_t headerSize);
+
 template<class T>
 std::string integral_to_binary_string(T byte);
 